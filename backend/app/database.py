@@ -1,10 +1,24 @@
 """
 Database connection and initialization
-Uses aiosqlite for async SQLite operations
+SQLite (default) uses aiosqlite with a dedicated writer and a read-only pool;
+a postgresql:// DATABASE_URL selects the asyncpg backend in app.storage.postgres
 """
-import aiosqlite
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Dict, Any, List, Optional
 from app.config import settings
+from app.storage.pool import ReadPool, build_pragmas, open_connection
+from app.storage.write_coordinator import WriteCoordinator
+from app.storage.migrations import (
+    Migration,
+    MigrationError,
+    get_schema_version,
+    migrate,
+    pending_backfills,
+    run_backfills
+)
+from app.storage.schema import MIGRATIONS, SCHEMA_VERSION
+from app.models.campaign_payloads import reencode_payloads
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,23 +27,90 @@ logger = logging.getLogger(__name__)
 class Database:
     """Database connection manager"""
     
-    def __init__(self):
-        # Extract database path from DATABASE_URL
+    def __init__(self, db_path: Optional[str] = None):
+        # Extract database path from DATABASE_URL unless one is given explicitly
         # Format: sqlite:///./data/campaigns.db
-        db_path = settings.DATABASE_URL.replace("sqlite:///", "")
+        if db_path is None:
+            db_path = settings.DATABASE_URL.replace("sqlite:///", "")
         self.db_path = Path(db_path)
         # Ensure parent directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = None
+        self.writes: Optional[WriteCoordinator] = None
+        self.read_pool = ReadPool(
+            self.db_path,
+            size=settings.DB_READ_POOL_SIZE,
+            pragmas=build_pragmas(
+                settings.DB_BUSY_TIMEOUT_MS,
+                settings.DB_CACHE_SIZE_KB,
+                settings.DB_MMAP_SIZE
+            ),
+            acquire_timeout=settings.DB_POOL_ACQUIRE_TIMEOUT,
+            health_check_interval=settings.DB_HEALTH_CHECK_INTERVAL
+        )
     
     async def connect(self):
-        """Create database connection"""
-        self.conn = await aiosqlite.connect(str(self.db_path))
-        self.conn.row_factory = aiosqlite.Row
+        """Create the dedicated writer connection and its group-commit coordinator"""
+        if self.writes is not None:
+            await self.writes.stop()
+        self.conn = await open_connection(
+            self.db_path,
+            build_pragmas(
+                settings.DB_BUSY_TIMEOUT_MS,
+                settings.DB_CACHE_SIZE_KB,
+                settings.DB_MMAP_SIZE,
+                journal_mode=settings.DB_JOURNAL_MODE,
+                synchronous=settings.DB_SYNCHRONOUS,
+                auto_vacuum=settings.DB_AUTO_VACUUM
+            )
+        )
+        self.writes = WriteCoordinator(
+            self.conn,
+            window_ms=settings.DB_WRITE_BATCH_WINDOW_MS,
+            max_batch=settings.DB_WRITE_BATCH_MAX_SIZE
+        )
         logger.info(f"Connected to database: {self.db_path}")
         return self.conn
     
+    @property
+    def location(self) -> str:
+        return str(self.db_path)
+    
+    async def open_read_pool(self):
+        """Open the read-only pool (the writer must have created the file first)"""
+        if self.conn is None:
+            await self.connect()
+        await self.read_pool.open()
+    
+    @asynccontextmanager
+    async def read_connection(self):
+        """Borrow a read-only connection from the pool"""
+        if not self.read_pool.is_open:
+            await self.open_read_pool()
+        async with self.read_pool.acquire() as conn:
+            yield conn
+    
+    async def ping(self):
+        async with self.read_connection() as conn:
+            async with conn.execute("SELECT 1") as cursor:
+                await cursor.fetchone()
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool statistics for monitoring"""
+        return {
+            "backend": "sqlite",
+            "writer_connected": self.conn is not None,
+            "journal_mode": settings.DB_JOURNAL_MODE,
+            "read_pool": self.read_pool.stats(),
+            "write_batching": self.writes.stats() if self.writes is not None else None
+        }
+    
     async def close(self):
-        """Close database connection"""
+        """Close read pool and writer connection"""
+        await self.read_pool.close()
+        if self.writes is not None:
+            await self.writes.stop()
+            self.writes = None
         if hasattr(self, 'conn') and self.conn is not None:
             try:
                 await self.conn.close()
@@ -44,178 +125,96 @@ class Database:
                 self.conn = None
     
     async def init_db(self):
-        """Initialize database schema and keep connection open"""
+        """Bring the schema up to date and keep connection open"""
         if not hasattr(self, 'conn') or self.conn is None:
             await self.connect()
-        await self.create_tables()
-        logger.info("Database tables created successfully")
-    
-    async def create_tables(self):
-        """Create database tables"""
-        async with self.conn.cursor() as cursor:
-            # Campaigns table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS campaigns (
-                    id TEXT PRIMARY KEY,
-                    campaign_name TEXT NOT NULL,
-                    advertiser_name TEXT NOT NULL,
-                    status TEXT NOT NULL DEFAULT 'draft',
-                    created_at TEXT NOT NULL,
-                    approved_at TEXT,
-                    assets_s3_path TEXT,
-                    html_s3_path TEXT,
-                    proof_s3_path TEXT,
-                    ai_processing_data TEXT,
-                    updated_at TEXT,
-                    feedback TEXT
-                )
-            """)
-            
-            # Migrate existing tables to add feedback column if it doesn't exist
-            await self.migrate_add_feedback_column(cursor)
-            
-            # Migrate existing tables to add scheduling columns if they don't exist
-            await self.migrate_add_scheduling_columns(cursor)
-            
-            # Migrate existing tables to add review columns if they don't exist
-            await self.migrate_add_review_columns(cursor)
-            
-            # Migrate existing tables to add performance columns if they don't exist
-            await self.migrate_add_performance_columns(cursor)
-            
-            # Create indexes
-            await cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_campaigns_status 
-                ON campaigns(status)
-            """)
-            
-            await cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_campaigns_created_at 
-                ON campaigns(created_at)
-            """)
-            
-            await self.conn.commit()
-            logger.info("Database tables and indexes created")
-    
-    async def migrate_add_feedback_column(self, cursor):
-        """Add feedback column to existing campaigns table if it doesn't exist"""
-        try:
-            # Check if feedback column exists
-            await cursor.execute("PRAGMA table_info(campaigns)")
-            columns = await cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            if 'feedback' not in column_names:
-                logger.info("Adding feedback column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN feedback TEXT
-                """)
-                logger.info("Feedback column added successfully")
-        except Exception as e:
-            logger.warning(f"Could not add feedback column (may already exist): {e}")
-    
-    async def migrate_add_scheduling_columns(self, cursor):
-        """Add scheduling columns to existing campaigns table if they don't exist"""
-        try:
-            # Check if scheduling columns exist
-            await cursor.execute("PRAGMA table_info(campaigns)")
-            columns = await cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            if 'scheduled_at' not in column_names:
-                logger.info("Adding scheduled_at column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN scheduled_at TEXT
-                """)
-                logger.info("scheduled_at column added successfully")
-            
-            if 'scheduling_status' not in column_names:
-                logger.info("Adding scheduling_status column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN scheduling_status TEXT
-                """)
-                logger.info("scheduling_status column added successfully")
-        except Exception as e:
-            logger.warning(f"Could not add scheduling columns (may already exist): {e}")
-    
-    async def migrate_add_review_columns(self, cursor):
-        """Add review columns to existing campaigns table if they don't exist"""
-        try:
-            # Check if review columns exist
-            await cursor.execute("PRAGMA table_info(campaigns)")
-            columns = await cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            if 'review_status' not in column_names:
-                logger.info("Adding review_status column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN review_status TEXT
-                """)
-                logger.info("review_status column added successfully")
-            
-            if 'reviewer_notes' not in column_names:
-                logger.info("Adding reviewer_notes column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN reviewer_notes TEXT
-                """)
-                logger.info("reviewer_notes column added successfully")
-        except Exception as e:
-            logger.warning(f"Could not add review columns (may already exist): {e}")
-    
-    async def migrate_add_performance_columns(self, cursor):
-        """Add performance tracking columns to existing campaigns table if they don't exist"""
-        try:
-            # Check if performance columns exist
-            await cursor.execute("PRAGMA table_info(campaigns)")
-            columns = await cursor.fetchall()
-            column_names = [col[1] for col in columns]
-            
-            if 'open_rate' not in column_names:
-                logger.info("Adding open_rate column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN open_rate REAL
-                """)
-                logger.info("open_rate column added successfully")
-            
-            if 'click_rate' not in column_names:
-                logger.info("Adding click_rate column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN click_rate REAL
-                """)
-                logger.info("click_rate column added successfully")
-            
-            if 'conversion_rate' not in column_names:
-                logger.info("Adding conversion_rate column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN conversion_rate REAL
-                """)
-                logger.info("conversion_rate column added successfully")
-            
-            if 'performance_score' not in column_names:
-                logger.info("Adding performance_score column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN performance_score REAL
-                """)
-                logger.info("performance_score column added successfully")
-            
-            if 'performance_timestamp' not in column_names:
-                logger.info("Adding performance_timestamp column to campaigns table")
-                await cursor.execute("""
-                    ALTER TABLE campaigns ADD COLUMN performance_timestamp TEXT
-                """)
-                logger.info("performance_timestamp column added successfully")
-        except Exception as e:
-            logger.warning(f"Could not add performance columns (may already exist): {e}")
+        await self.migrate_schema()
+        await self.open_read_pool()
+    
+    async def migrate_schema(self):
+        """
+        Apply pending schema migrations, or verify the schema is current
+        
+        With DB_AUTO_MIGRATE disabled (migrations run via `python -m app.migrate`
+        before deploy) startup only reads PRAGMA user_version.
+        """
+        if settings.DB_AUTO_MIGRATE:
+            applied = await self.apply_migrations()
+            if applied:
+                logger.info(f"Applied {len(applied)} schema migration(s); schema version {SCHEMA_VERSION}")
+            return
+        
+        version = await self.schema_version()
+        if version != SCHEMA_VERSION:
+            raise MigrationError(
+                f"Database schema version is {version}, expected {SCHEMA_VERSION}; "
+                f"run `python -m app.migrate` before starting the app"
+            )
+    
+    async def schema_version(self) -> int:
+        return await get_schema_version(self.conn)
+    
+    async def apply_migrations(self, target: Optional[int] = None) -> List[Migration]:
+        return await migrate(self.conn, MIGRATIONS, target=target)
+    
+    @property
+    def migrations(self) -> List[Migration]:
+        return MIGRATIONS
+    
+    async def pending_backfills(self) -> List[Migration]:
+        return await pending_backfills(self.conn, MIGRATIONS)
+    
+    async def run_backfills(self):
+        """Run pending batched backfills from completed migrations"""
+        return await run_backfills(self.conn, MIGRATIONS)
+    
+    async def vacuum(self):
+        """
+        Rebuild the file with VACUUM, which also applies a changed DB_AUTO_VACUUM
+        
+        Rewrites the whole database and blocks writers meanwhile; run it from the
+        CLI (python -m app.migrate --vacuum), not while serving.
+        """
+        if self.conn is None:
+            await self.connect()
+        await self.conn.execute("VACUUM")
+    
+    async def reencode_payloads(self) -> int:
+        """Rewrite stored ai_processing_data in the configured AI_PAYLOAD_CODEC"""
+        return await reencode_payloads(self.conn, batch_size=settings.AI_PAYLOAD_REENCODE_BATCH_SIZE)
+
+
+POSTGRES_SCHEMES = ("postgresql", "postgres", "postgresql+asyncpg")
+
+
+def create_database(url: Optional[str] = None):
+    """
+    Database manager for a DATABASE_URL
+    
+    sqlite:///path selects the aiosqlite backend (split into DB_SHARDS files when
+    above 1), postgresql://... the asyncpg one.
+    """
+    url = url or settings.DATABASE_URL
+    scheme = url.split("://", 1)[0].lower() if "://" in url else ""
+    if scheme in POSTGRES_SCHEMES:
+        from app.storage.postgres import PostgresDatabase
+        return PostgresDatabase(url)
+    if scheme not in ("", "sqlite"):
+        raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme}")
+    if settings.DB_SHARDS > 1:
+        from app.storage.sharding import ShardedDatabase
+        return ShardedDatabase(url.replace("sqlite:///", ""), settings.DB_SHARDS)
+    return Database(db_path=url.replace("sqlite:///", ""))
 
 
 # Global database instance
-db = Database()
+db = create_database()
 
 
 async def get_db():
     """
-    Dependency for FastAPI to get database connection.
-    Note: For now, we use a single connection. In production, consider connection pooling.
+    Dependency for FastAPI to get the writer connection.
+    Use get_read_db for endpoints that only read.
     """
     # Ensure connection exists and is valid
     if not hasattr(db, 'conn') or db.conn is None:
@@ -234,3 +233,12 @@ async def get_db():
     # FastAPI will handle cleanup and exception propagation
     yield db.conn
 
+
+
+async def get_read_db():
+    """
+    Dependency for FastAPI to borrow a read-only connection from the pool.
+    Reads never queue behind the writer connection.
+    """
+    async with db.read_connection() as conn:
+        yield conn
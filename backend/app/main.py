@@ -2,14 +2,24 @@
 HiBid Email MVP - FastAPI Application
 Main entry point for the backend API
 """
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from app.config import settings
-from app.database import db
+from app.database import Database, db
 from app.services.s3_service import s3_service
+from app.services.ai_service import ai_client_stats, close_openai_client, warm_openai_client
+from app.services.ai_cache_service import ai_cache
 from app.services.scheduler_service import scheduler_service
+from app.services.archive_service import archive_service
+from app.services.maintenance_service import maintenance_service
+from app.services.snapshot_service import snapshot_service
+from app.services.change_feed_service import change_feed_follower
+from app.services.campaign_service import campaign_scope, campaign_cache_stats
+from app.utils.blocking_io import blocking_io_stats
+from app.utils.payload_codec import get_payload_codec
 from app.utils.error_handlers import (
     http_exception_handler,
     validation_exception_handler,
@@ -38,10 +48,23 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
     logger.info("Starting HiBid Email MVP API...")
+    backfill_task = None
+    reencode_task = None
+    
+    # Initialize database; schema (MigrationError) and AI_PAYLOAD_CODEC errors abort startup
+    # rather than serving requests against an outdated schema or unreadable payloads
+    await db.init_db()
+    logger.info("Database initialized")
+    get_payload_codec()
+    
     try:
-        # Initialize database
-        await db.init_db()
-        logger.info("Database initialized")
+        # Finish batched data backfills from schema migrations in the background while serving
+        if settings.DB_RUN_BACKFILLS:
+            backfill_task = asyncio.create_task(db.run_backfills())
+        
+        # Rewrite ai_processing_data stored by an earlier AI_PAYLOAD_CODEC, in small batches
+        if settings.AI_PAYLOAD_REENCODE:
+            reencode_task = asyncio.create_task(db.reencode_payloads())
         
         # Test S3 connection
         s3_connected = await s3_service.test_connection()
@@ -50,8 +73,27 @@ async def lifespan(app: FastAPI):
         else:
             logger.warning("S3 connection test failed - check credentials and bucket name")
         
+        # Open OpenAI connections now so the first AI call skips the TLS handshake
+        await warm_openai_client()
+        
         # Start scheduler service
         await scheduler_service.start()
+        
+        # Checkpoint, analyze and vacuum SQLite in quiet periods (PostgreSQL runs autovacuum)
+        if settings.MAINTENANCE_ENABLED and isinstance(db, Database):
+            await maintenance_service.start()
+        
+        # Periodic online snapshots of the SQLite file to S3
+        if settings.SNAPSHOT_ENABLED and isinstance(db, Database):
+            await snapshot_service.start()
+        
+        # Move finished campaigns to the archive in the background
+        if settings.ARCHIVE_ENABLED:
+            await archive_service.start()
+        
+        # Drop cached campaigns changed by other workers; prunes old change events
+        if settings.CAMPAIGN_EVENTS_POLL_SECONDS > 0:
+            await change_feed_follower.start()
     except Exception as e:
         logger.error(f"Error during startup: {e}")
     
@@ -59,7 +101,16 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down HiBid Email MVP API...")
+    for task in (backfill_task, reencode_task):
+        if task is not None and not task.done():
+            task.cancel()
     await scheduler_service.stop()
+    await maintenance_service.stop()
+    await snapshot_service.stop()
+    await archive_service.stop()
+    await change_feed_follower.stop()
+    await close_openai_client()
+    await ai_cache.close()
     await db.close()
 
 
@@ -88,14 +139,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request campaign identity map: repeated get_campaign calls reuse one object
+@app.middleware("http")
+async def campaign_request_scope(request: Request, call_next):
+    with campaign_scope():
+        return await call_next(request)
+
+
 # Include API routers
-from app.routes import upload, process, generate, preview, approve, download, campaign, edit, schedule, review, performance, recommendations
+from app.routes import upload, process, generate, preview, approve, download, campaign, edit, schedule, review, performance, recommendations, bulk
 app.include_router(upload.router, prefix="/api/v1", tags=["upload"])
 app.include_router(process.router, prefix="/api/v1", tags=["process"])
 app.include_router(generate.router, prefix="/api/v1", tags=["generate"])
 app.include_router(preview.router, prefix="/api/v1", tags=["preview"])
 app.include_router(approve.router, prefix="/api/v1", tags=["approve"])
 app.include_router(download.router, prefix="/api/v1", tags=["download"])
+app.include_router(bulk.router, prefix="/api/v1", tags=["bulk"])
 app.include_router(campaign.router, prefix="/api/v1", tags=["campaign"])
 app.include_router(edit.router, prefix="/api/v1", tags=["edit"])
 app.include_router(schedule.router, prefix="/api/v1", tags=["schedule"])
@@ -114,10 +173,9 @@ async def health_check():
         "s3": "unknown"
     }
     
-    # Test database connection
+    # Test database connection through the read pool (never tear down the shared writer)
     try:
-        await db.connect()
-        await db.close()
+        await db.ping()
         health_status["database"] = "connected"
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -138,6 +196,54 @@ async def health_check():
     return health_status
 
 
+@app.get("/health/db")
+async def database_pool_health():
+    """Database connection pool statistics for monitoring"""
+    return db.pool_stats()
+
+
+@app.get("/health/cache")
+async def campaign_cache_health():
+    """get_campaign cache hit/miss counters for monitoring"""
+    return campaign_cache_stats()
+
+
+@app.get("/health/archive")
+async def archive_health():
+    """Campaign archive job counters for monitoring"""
+    return archive_service.stats()
+
+
+@app.get("/health/maintenance")
+async def maintenance_health():
+    """SQLite maintenance actions and database size history for monitoring"""
+    return maintenance_service.stats()
+
+
+@app.get("/health/snapshots")
+async def snapshot_health():
+    """Snapshot counters and the duration and writer stall of the last snapshot"""
+    return snapshot_service.stats()
+
+
+@app.get("/health/ai")
+async def ai_client_health():
+    """OpenAI connection pool settings, call counters, rate limiter queue and AI cache hit rate for monitoring"""
+    return ai_client_stats()
+
+
+@app.get("/health/threads")
+async def thread_pool_health():
+    """Default thread pool usage by blocking S3 and snapshot calls"""
+    return blocking_io_stats()
+
+
+@app.get("/health/changes")
+async def change_feed_health():
+    """Change feed follower counters for monitoring"""
+    return change_feed_follower.stats()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
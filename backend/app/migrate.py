@@ -0,0 +1,154 @@
+"""
+Database migration CLI
+Run schema migrations ahead of a deploy so app workers start without them:
+
+    python -m app.migrate            # apply pending migrations, then backfills
+    python -m app.migrate --status   # show schema version and pending work
+    python -m app.migrate --no-backfill
+    python -m app.migrate --train-payload-dict data/payload.dict   # then set AI_PAYLOAD_ZSTD_DICT
+    python -m app.migrate --reencode-payloads                      # rewrite rows in AI_PAYLOAD_CODEC
+    python -m app.migrate --explain  # query plans of the catalogued SQL (SQLite)
+    python -m app.migrate --vacuum   # rebuild the file, switching it to DB_AUTO_VACUUM (SQLite)
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Optional, Sequence
+
+from app.database import Database, create_database
+from app.models.campaign_payloads import sample_payloads
+from app.storage.migrations import MigrationError, latest_version
+from app.storage.query_catalog import explain_catalog, redundant_indexes
+from app.utils.payload_codec import PayloadCodecError, train_dictionary
+
+logger = logging.getLogger(__name__)
+
+
+async def show_status(database) -> int:
+    version = await database.schema_version()
+    print(f"Database: {database.location}")
+    print(f"Schema version: {version} (latest {latest_version(database.migrations)})")
+    for migration in database.migrations:
+        if migration.version > version:
+            print(f"  pending  {migration.version}: {migration.name}")
+    for migration in await database.pending_backfills():
+        print(f"  backfill {migration.version}: {migration.name}")
+    return 0
+
+
+async def train_payload_dictionary(database, path: str, size: int, samples: int) -> int:
+    if not isinstance(database, Database):
+        print("Payload dictionaries only apply to SQLite (PostgreSQL stores JSONB)", file=sys.stderr)
+        return 1
+    payloads = await sample_payloads(database.conn, limit=samples)
+    try:
+        dictionary = train_dictionary(payloads, size=size)
+    except PayloadCodecError as e:
+        print(f"Training failed: {e}", file=sys.stderr)
+        return 1
+    with open(path, "wb") as f:
+        f.write(dictionary)
+    print(f"Wrote {len(dictionary)}-byte dictionary trained on {len(payloads)} payloads to {path}")
+    return 0
+
+
+async def explain_queries(database) -> int:
+    if not isinstance(database, Database):
+        print("The query catalog is checked against SQLite only", file=sys.stderr)
+        return 1
+    report = await explain_catalog(database.conn)
+    print(report.render(), end="")
+    for name, problems in report.problems.items():
+        for problem in problems:
+            print(f"problem  {name}: {problem}")
+    for index, covering in await redundant_indexes(database.conn):
+        print(f"redundant index {index} (covered by {covering})")
+    return 1 if report.problems else 0
+
+
+async def vacuum_database(database) -> int:
+    if not isinstance(database, Database):
+        print("VACUUM applies to SQLite only (PostgreSQL runs autovacuum)", file=sys.stderr)
+        return 1
+    await database.vacuum()
+    async with database.conn.execute("PRAGMA auto_vacuum") as cursor:
+        mode = (await cursor.fetchone())[0]
+    print(f"Vacuumed {database.location} (auto_vacuum {['NONE', 'FULL', 'INCREMENTAL'][mode]})")
+    return 0
+
+
+async def run(
+    db_path: Optional[str],
+    status: bool,
+    target: Optional[int],
+    backfill: bool,
+    url: Optional[str] = None,
+    reencode: bool = False,
+    train_dict: Optional[str] = None,
+    dict_size: int = 112640,
+    dict_samples: int = 2000,
+    explain: bool = False,
+    vacuum: bool = False
+) -> int:
+    database = Database(db_path=db_path) if db_path else create_database(url)
+    await database.connect()
+    try:
+        if status:
+            return await show_status(database)
+        if train_dict:
+            return await train_payload_dictionary(database, train_dict, dict_size, dict_samples)
+        if explain:
+            return await explain_queries(database)
+        if vacuum:
+            return await vacuum_database(database)
+
+        applied = await database.apply_migrations(target=target)
+        for migration in applied:
+            print(f"Applied {migration.version}: {migration.name}")
+        if not applied:
+            print(f"Schema is current (version {await database.schema_version()})")
+
+        if backfill:
+            for version, rows in (await database.run_backfills()).items():
+                print(f"Backfilled {rows} rows for migration {version}")
+        if reencode:
+            print(f"Re-encoded ai_processing_data for {await database.reencode_payloads()} campaigns")
+        return 0
+    except MigrationError as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        await database.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--db", dest="db_path", help="SQLite file (defaults to DATABASE_URL)")
+    parser.add_argument("--url", help="Database URL, sqlite:/// or postgresql:// (defaults to DATABASE_URL)")
+    parser.add_argument("--status", action="store_true", help="Show schema version and pending migrations")
+    parser.add_argument("--target", type=int, help="Migrate up to this schema version")
+    parser.add_argument("--no-backfill", dest="backfill", action="store_false",
+                        help="Skip batched data backfills")
+    parser.add_argument("--reencode-payloads", dest="reencode", action="store_true",
+                        help="Rewrite ai_processing_data in the configured AI_PAYLOAD_CODEC")
+    parser.add_argument("--train-payload-dict", dest="train_dict", metavar="PATH",
+                        help="Train a zstd dictionary for AI_PAYLOAD_ZSTD_DICT from stored payloads and exit")
+    parser.add_argument("--dict-size", type=int, default=112640, help="Dictionary size in bytes")
+    parser.add_argument("--dict-samples", type=int, default=2000, help="Number of recent payloads to train on")
+    parser.add_argument("--explain", action="store_true",
+                        help="Print query plans of the catalogued SQL and exit (1 if a plan scans or sorts)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Rebuild the SQLite file with VACUUM, applying DB_AUTO_VACUUM, and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return asyncio.run(run(
+        args.db_path, args.status, args.target, args.backfill, url=args.url, reencode=args.reencode,
+        train_dict=args.train_dict, dict_size=args.dict_size, dict_samples=args.dict_samples,
+        explain=args.explain, vacuum=args.vacuum
+    ))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,47 @@
 Campaign database model and operations
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
-import json
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
 import uuid
-from app.database import db
+import logging
+from app.utils.payload_codec import Stored, get_payload_codec
+from app.storage.repository import LIST_PARTS, repository_for
+from app.storage.unit_of_work import current_unit_of_work
+
+
+# Persisted columns, in table order
+CAMPAIGN_COLUMNS = (
+    'id', 'campaign_name', 'advertiser_name', 'status', 'created_at',
+    'approved_at', 'assets_s3_path', 'html_s3_path', 'proof_s3_path',
+    'ai_processing_data', 'updated_at', 'feedback', 'scheduled_at', 'scheduling_status',
+    'review_status', 'reviewer_notes', 'open_rate', 'click_rate', 'conversion_rate',
+    'performance_score', 'performance_timestamp'
+)
+_COLUMN_SET = frozenset(CAMPAIGN_COLUMNS)
+
+# Everything except the JSON blob, for queries that load ai_processing_data parts instead
+SUMMARY_COLUMNS = tuple(c for c in CAMPAIGN_COLUMNS if c != 'ai_processing_data')
+
+# Marker for an ai_processing_data blob that has been loaded but not decoded yet
+_UNDECODED = object()
+
+# Called with each campaign after it is written (see Campaign.add_save_listener)
+_save_listeners: List[Callable[['Campaign'], None]] = []
+
+logger = logging.getLogger(__name__)
 
 
 class Campaign:
     """Campaign model for database operations"""
     
+    def __setattr__(self, name, value):
+        """Record which persisted columns changed since the last load/save"""
+        if name in _COLUMN_SET and '_dirty' in self.__dict__:
+            # Dicts can be mutated in place, so always mark them; scalars only when they differ
+            if name == 'ai_processing_data' or self.__dict__.get(name) != value:
+                self._dirty.add(name)
+        object.__setattr__(self, name, value)
+    
     def __init__(
         self,
         id: str = None,
@@ -35,6 +67,12 @@ class Campaign:
         performance_score: Optional[float] = None,
         performance_timestamp: Optional[str] = None
     ):
+        # A fresh object has never been written; every column is dirty until the first save
+        self._dirty = set(CAMPAIGN_COLUMNS)
+        self._persisted = False
+        self._partial_ai_data = False
+        self._ai_stored: Optional[Stored] = None
+        self._ai_data: Any = {}
         self.id = id or str(uuid.uuid4())
         self.campaign_name = campaign_name
         self.advertiser_name = advertiser_name
@@ -57,39 +95,122 @@ class Campaign:
         self.performance_score = performance_score
         self.performance_timestamp = performance_timestamp
     
+    @property
+    def ai_processing_data(self) -> Dict[str, Any]:
+        """
+        AI payload, decoded from its stored form on first access
+        
+        A blob that cannot be decoded (corrupt, or a codec/dictionary that is not
+        configured) reads as empty and, like a partial load, cannot be saved over,
+        so the stored row survives until the configuration is fixed.
+        """
+        if self._ai_data is _UNDECODED:
+            try:
+                data = get_payload_codec().decode(self._ai_stored)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Cannot decode ai_processing_data of campaign {self.id}: {e}")
+                data = {}
+                self._partial_ai_data = True
+            object.__setattr__(self, '_ai_data', data if isinstance(data, dict) else {})
+        return self._ai_data
+    
+    @ai_processing_data.setter
+    def ai_processing_data(self, value: Optional[Dict[str, Any]]):
+        object.__setattr__(self, '_ai_data', value)
+    
+    @property
+    def ai_data_decoded(self) -> bool:
+        """Whether ai_processing_data has been decoded (or assigned) since loading"""
+        return self._ai_data is not _UNDECODED
+    
     @classmethod
     def from_row(cls, row):
-        """Create Campaign instance from database row"""
-        ai_data = {}
-        if row.get('ai_processing_data'):
-            try:
-                ai_data = json.loads(row['ai_processing_data'])
-            except (json.JSONDecodeError, TypeError):
-                ai_data = {}
+        """
+        Create Campaign instance from database row
         
-        return cls(
-            id=row['id'],
-            campaign_name=row['campaign_name'],
-            advertiser_name=row['advertiser_name'],
-            status=row['status'],
-            created_at=row['created_at'],
-            approved_at=row.get('approved_at'),
-            assets_s3_path=row.get('assets_s3_path'),
-            html_s3_path=row.get('html_s3_path'),
-            proof_s3_path=row.get('proof_s3_path'),
-            ai_processing_data=ai_data,
-            updated_at=row.get('updated_at'),
-            feedback=row.get('feedback'),
-            scheduled_at=row.get('scheduled_at'),
-            scheduling_status=row.get('scheduling_status'),
-            review_status=row.get('review_status'),
-            reviewer_notes=row.get('reviewer_notes'),
-            open_rate=row.get('open_rate'),
-            click_rate=row.get('click_rate'),
-            conversion_rate=row.get('conversion_rate'),
-            performance_score=row.get('performance_score'),
-            performance_timestamp=row.get('performance_timestamp')
-        )
+        ai_processing_data is kept as stored (JSON text or codec bytes) and only
+        decoded when first accessed, so list and scheduler paths never pay for the blob.
+        """
+        campaign = cls.__new__(cls)
+        state = campaign.__dict__
+        for column in SUMMARY_COLUMNS:
+            state[column] = row.get(column)
+        if state['created_at'] is None:
+            state['created_at'] = datetime.utcnow().isoformat()
+        if state['updated_at'] is None:
+            state['updated_at'] = datetime.utcnow().isoformat()
+        
+        raw = row.get('ai_processing_data')
+        state['_ai_data'] = _UNDECODED if raw else {}
+        state['_partial_ai_data'] = False
+        state['_dirty'] = set()
+        campaign._mark_clean(raw or None)
+        return campaign
+    
+    @classmethod
+    def from_partial_row(cls, row, ai_data: Dict[str, Any]):
+        """
+        Create Campaign from a row selected without ai_processing_data
+        
+        ai_data holds just the parts of the blob that were loaded; such
+        campaigns cannot save ai_processing_data changes.
+        """
+        campaign = cls.from_row(row)
+        object.__setattr__(campaign, 'ai_processing_data', ai_data)
+        campaign._partial_ai_data = True
+        return campaign
+    
+    def to_row(self) -> Dict[str, Any]:
+        """Stored column values of a clean, fully loaded campaign (ai_processing_data as stored)"""
+        row = {column: self.__dict__[column] for column in SUMMARY_COLUMNS}
+        row['ai_processing_data'] = self._ai_stored
+        return row
+    
+    @staticmethod
+    def add_save_listener(listener: Callable[['Campaign'], None]):
+        """Register a callback run after every save that writes to the database"""
+        _save_listeners.append(listener)
+    
+    def _notify_saved(self):
+        for listener in _save_listeners:
+            listener(self)
+    
+    def _mark_clean(self, ai_stored: Optional[Stored]):
+        """Reset change tracking after the object matches its database row"""
+        self._dirty.clear()
+        self._persisted = True
+        self._ai_stored = ai_stored
+    
+    def mark_dirty(self, *fields: str):
+        """Flag columns as changed (e.g. after mutating ai_processing_data in place)"""
+        for field in fields:
+            if field not in _COLUMN_SET:
+                raise ValueError(f"Unknown campaign column: {field}")
+            self._dirty.add(field)
+    
+    @property
+    def dirty_fields(self) -> frozenset:
+        """Columns that will be written by the next save()"""
+        return frozenset(self._dirty)
+    
+    def _encode_ai_data(self) -> Optional[Stored]:
+        """Serialize ai_processing_data for storage (untouched blobs are written back verbatim)"""
+        if self._ai_data is _UNDECODED:
+            return self._ai_stored
+        return get_payload_codec().encode(self._ai_data)
+    
+    def _changed_values(self) -> Dict[str, Any]:
+        """Values of dirty columns that differ from the stored row (ai_processing_data encoded)"""
+        values = {}
+        for column in self._dirty:
+            if column == 'ai_processing_data':
+                encoded = self._encode_ai_data()
+                if encoded == self._ai_stored:
+                    continue
+                values[column] = encoded
+            else:
+                values[column] = getattr(self, column)
+        return values
     
     def to_dict(self):
         """Convert campaign to dictionary"""
@@ -118,44 +239,64 @@ class Campaign:
         }
     
     async def save(self, conn):
-        """Save campaign to database"""
+        """
+        Save campaign to database
+        
+        New campaigns are inserted; loaded campaigns only UPDATE the columns that
+        changed, and ai_processing_data is only re-encoded when it was reassigned.
+        On SQLite, writes on the shared writer connection are group-committed with
+        other concurrent writes; this returns once the shared transaction commits.
+        Inside a unit of work (app.storage.unit_of_work) the write is deferred
+        until the unit of work flushes.
+        """
         # Ensure connection is valid
         if conn is None:
             raise ValueError("Database connection is None")
         
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                INSERT OR REPLACE INTO campaigns 
-                (id, campaign_name, advertiser_name, status, created_at, 
-                 approved_at, assets_s3_path, html_s3_path, proof_s3_path, 
-                 ai_processing_data, updated_at, feedback, scheduled_at, scheduling_status, 
-                 review_status, reviewer_notes, open_rate, click_rate, conversion_rate, 
-                 performance_score, performance_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                self.id,
-                self.campaign_name,
-                self.advertiser_name,
-                self.status,
-                self.created_at,
-                self.approved_at,
-                self.assets_s3_path,
-                self.html_s3_path,
-                self.proof_s3_path,
-                json.dumps(self.ai_processing_data) if self.ai_processing_data else None,
-                self.updated_at,
-                self.feedback,
-                self.scheduled_at,
-                self.scheduling_status,
-                self.review_status,
-                self.reviewer_notes,
-                self.open_rate,
-                self.click_rate,
-                self.conversion_rate,
-                self.performance_score,
-                self.performance_timestamp
-            ))
-            await conn.commit()
+        if self._partial_ai_data and 'ai_processing_data' in self._dirty:
+            raise ValueError(
+                "Campaign was loaded with partial or undecodable ai_processing_data; "
+                "load it with get_by_id (with a working AI_PAYLOAD_CODEC) before changing ai_processing_data"
+            )
+        
+        uow = current_unit_of_work()
+        if uow is not None:
+            # Written when the unit of work flushes
+            uow.stage(self)
+            return
+        
+        write = self._pending_write()
+        if write is None:
+            return
+        
+        kind, payload = write
+        repository = repository_for(conn)
+        if kind == 'insert':
+            await repository.insert(self, payload)
+            self._written(payload)
+        else:
+            self._written(await repository.update(self, payload))
+    
+    def _pending_write(self) -> Optional[Tuple[str, Any]]:
+        """
+        What the next save has to write
+        
+        Returns:
+            ('insert', ai_stored) for a new campaign, ('update', changed values) for
+            a loaded one, or None when nothing changed
+        """
+        if not self._persisted:
+            return 'insert', self._encode_ai_data()
+        values = self._changed_values()
+        if not values:
+            self._dirty.clear()
+            return None
+        return 'update', values
+    
+    def _written(self, ai_stored: Optional[Stored]):
+        """Record a completed write"""
+        self._mark_clean(ai_stored)
+        self._notify_saved()
     
     async def update(self, conn, **kwargs):
         """Update campaign fields"""
@@ -172,84 +313,77 @@ class Campaign:
     @staticmethod
     async def get_by_id(conn, campaign_id: str):
         """Get campaign by ID"""
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns WHERE id = ?
-            """, (campaign_id,))
-            row = await cursor.fetchone()
-            
-            if row:
-                return Campaign.from_row(dict(row))
-            return None
+        return await repository_for(conn).get_by_id(campaign_id)
+    
+    @staticmethod
+    async def get_by_ids(conn, campaign_ids: Iterable[str]):
+        """Get several campaigns by ID in one query (missing IDs are left out)"""
+        return await repository_for(conn).get_by_ids(campaign_ids)
+    
+    @staticmethod
+    async def get_archived(conn, campaign_id: str):
+        """Get an archived campaign by ID (saving it moves it back to the campaigns table)"""
+        return await repository_for(conn).get_archived(campaign_id)
     
     @staticmethod
     async def get_all(conn, limit: int = 100, offset: int = 0):
         """Get all campaigns with pagination"""
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                ORDER BY created_at DESC 
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
-            rows = await cursor.fetchall()
-            
-            return [Campaign.from_row(dict(row)) for row in rows]
+        return await repository_for(conn).get_many(limit=limit, offset=offset)
     
     @staticmethod
     async def get_by_status(conn, status: str, limit: int = 100, offset: int = 0):
         """Get campaigns by status with pagination"""
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                WHERE status = ?
-                ORDER BY created_at DESC 
-                LIMIT ? OFFSET ?
-            """, (status, limit, offset))
-            rows = await cursor.fetchall()
-            
-            return [Campaign.from_row(dict(row)) for row in rows]
+        return await repository_for(conn).get_many(status=status, limit=limit, offset=offset)
     
     @staticmethod
     async def get_by_review_status(conn, review_status: str, limit: int = 100, offset: int = 0):
         """Get campaigns by review status with pagination"""
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                WHERE review_status = ?
-                ORDER BY created_at DESC 
-                LIMIT ? OFFSET ?
-            """, (review_status, limit, offset))
-            rows = await cursor.fetchall()
-            
-            return [Campaign.from_row(dict(row)) for row in rows]
+        return await repository_for(conn).get_many(review_status=review_status, limit=limit, offset=offset)
     
     @staticmethod
     async def get_scheduled_campaigns(conn):
         """Get all campaigns with scheduling_status = 'scheduled' and scheduled_at in the future"""
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                WHERE scheduling_status = 'scheduled' 
-                AND scheduled_at IS NOT NULL
-                AND scheduled_at > datetime('now')
-                ORDER BY scheduled_at ASC
-            """)
-            rows = await cursor.fetchall()
-            
-            return [Campaign.from_row(dict(row)) for row in rows]
+        return await repository_for(conn).get_scheduled()
     
     @staticmethod
     async def get_past_scheduled_campaigns(conn):
         """Get campaigns that were scheduled but the scheduled time has passed"""
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                WHERE scheduling_status = 'scheduled' 
-                AND scheduled_at IS NOT NULL
-                AND scheduled_at <= datetime('now')
-                ORDER BY scheduled_at ASC
-            """)
-            rows = await cursor.fetchall()
-            
-            return [Campaign.from_row(dict(row)) for row in rows]
-
+        return await repository_for(conn).get_scheduled(past=True)
+    
+    @staticmethod
+    async def get_by_id_with_parts(conn, campaign_id: str, parts: Iterable[str]):
+        """Get campaign by ID, loading only the requested ai_processing_data parts"""
+        return await repository_for(conn).get_by_id_with_parts(campaign_id, parts)
+    
+    @staticmethod
+    async def get_summaries(
+        conn,
+        status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        parts: Iterable[str] = LIST_PARTS,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List['Campaign']:
+        """
+        Get campaigns for list views (newest first) without decoding the JSON blob
+        
+        Pass `after` (the (created_at, id) of the last row seen) for keyset paging.
+        """
+        return await repository_for(conn).get_summaries(
+            status=status, limit=limit, offset=offset, parts=parts, after=after
+        )
+    
+    @staticmethod
+    async def get_review_summaries(
+        conn,
+        review_status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        parts: Iterable[str] = LIST_PARTS,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List['Campaign']:
+        """Get campaigns with a review status (or any review status) without decoding the JSON blob"""
+        return await repository_for(conn).get_summaries(
+            review_status=review_status, any_review_status=True,
+            limit=limit, offset=offset, parts=parts, after=after
+        )
@@ -0,0 +1,123 @@
+"""
+Cold storage for finished campaigns
+Campaigns that reached a terminal state (approved and sent, or rejected) and
+have not changed for a while are moved from `campaigns` into
+`campaigns_archive`, so the hot table and its indexes only hold live work.
+Archived rows keep every column (ai_processing_data as stored); saving an
+archived campaign moves it back into the hot table.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from app.models.campaign import CAMPAIGN_COLUMNS
+from app.models.campaign_parts import sync_campaign_parts
+
+# A campaign the archiver may move: (id, updated_at it was selected at, proof_s3_path)
+ArchiveCandidate = Tuple[str, Optional[str], Optional[str]]
+
+_ARCHIVE_COLUMNS = ", ".join(CAMPAIGN_COLUMNS)
+# Copies a hot row, taking the proof path from the first parameter when it is not NULL
+_MOVE_SELECT = ", ".join("COALESCE(?, proof_s3_path)" if c == 'proof_s3_path' else c for c in CAMPAIGN_COLUMNS)
+
+# Terminal campaigns; anything else is only archived once it is older than ARCHIVE_MAX_AGE_DAYS
+TERMINAL_CONDITION = "(status = 'rejected' OR (status = 'approved' AND scheduling_status = 'sent'))"
+
+CREATE_ARCHIVE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS campaigns_archive (
+        id TEXT PRIMARY KEY,
+        campaign_name TEXT NOT NULL,
+        advertiser_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        approved_at TEXT,
+        assets_s3_path TEXT,
+        html_s3_path TEXT,
+        proof_s3_path TEXT,
+        ai_processing_data TEXT,
+        updated_at TEXT,
+        feedback TEXT,
+        scheduled_at TEXT,
+        scheduling_status TEXT,
+        review_status TEXT,
+        reviewer_notes TEXT,
+        open_rate REAL,
+        click_rate REAL,
+        conversion_rate REAL,
+        performance_score REAL,
+        performance_timestamp TEXT,
+        archived_at TEXT NOT NULL
+    )
+    """,
+    # Candidate scans walk the hot table by age
+    "CREATE INDEX IF NOT EXISTS idx_campaigns_updated_at ON campaigns(updated_at)",
+)
+
+
+async def select_archive_candidates(
+    conn,
+    terminal_before: str,
+    stale_before: Optional[str],
+    limit: int
+) -> List[ArchiveCandidate]:
+    """
+    Oldest hot campaigns due for archiving
+
+    Args:
+        terminal_before: Terminal campaigns last updated before this ISO timestamp
+        stale_before: Any campaign (except ones still scheduled to send) last
+            updated before this ISO timestamp; None to only archive terminal ones
+        limit: Batch size
+    """
+    oldest = max(terminal_before, stale_before or "")
+    async with conn.execute(f"""
+        SELECT id, updated_at, proof_s3_path FROM campaigns
+        WHERE updated_at < ?
+        AND ({TERMINAL_CONDITION} OR (updated_at < ? AND scheduling_status IS NOT 'scheduled'))
+        ORDER BY updated_at
+        LIMIT ?
+    """, (oldest, stale_before or "", limit)) as cursor:
+        return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def move_to_archive(
+    conn,
+    moves: Sequence[Tuple[str, Optional[str], Optional[str]]],
+    archived_at: str
+) -> List[str]:
+    """
+    Move campaigns into campaigns_archive (caller's transaction; the caller commits)
+
+    Args:
+        moves: (id, updated_at, proof_s3_path) per campaign; a campaign is only
+            moved if it is unchanged since it was selected, and its proof path is
+            replaced when the proof was archived (None keeps it)
+
+    Returns:
+        IDs of the campaigns that were moved
+    """
+    moved = []
+    for campaign_id, updated_at, proof_s3_path in moves:
+        async with conn.execute(f"""
+            INSERT OR REPLACE INTO campaigns_archive ({_ARCHIVE_COLUMNS}, archived_at)
+            SELECT {_MOVE_SELECT}, ?
+            FROM campaigns WHERE id = ? AND updated_at IS ?
+        """, (proof_s3_path, archived_at, campaign_id, updated_at)) as cursor:
+            if cursor.rowcount == 0:
+                continue
+        # Counter and search triggers drop the campaign along with its row
+        await conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
+        await sync_campaign_parts(conn, campaign_id, None)
+        moved.append(campaign_id)
+    return moved
+
+
+async def get_archived_row(conn, campaign_id: str):
+    async with conn.execute(
+        f"SELECT {_ARCHIVE_COLUMNS}, archived_at FROM campaigns_archive WHERE id = ?", (campaign_id,)
+    ) as cursor:
+        return await cursor.fetchone()
+
+
+async def count_archived(conn) -> int:
+    async with conn.execute("SELECT COUNT(*) FROM campaigns_archive") as cursor:
+        return (await cursor.fetchone())[0]
@@ -0,0 +1,134 @@
+"""
+Trigger-maintained campaign counters by status and review status
+Lets list totals and include_stats read a handful of rows instead of
+scanning the campaigns table
+"""
+from typing import Dict, Optional, Tuple
+
+from app.utils.pagination import COUNT_NONE
+
+
+CREATE_COUNT_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS campaign_status_counts (
+        status TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    # Only campaigns with a review status are counted (the review list filters IS NOT NULL)
+    """
+    CREATE TABLE IF NOT EXISTS review_status_counts (
+        review_status TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_counts_insert
+    AFTER INSERT ON campaigns
+    BEGIN
+        INSERT INTO campaign_status_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+        INSERT INTO review_status_counts (review_status, count)
+        SELECT NEW.review_status, 1 WHERE NEW.review_status IS NOT NULL
+        ON CONFLICT(review_status) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_counts_delete
+    AFTER DELETE ON campaigns
+    BEGIN
+        UPDATE campaign_status_counts SET count = count - 1 WHERE status = OLD.status;
+        UPDATE review_status_counts SET count = count - 1 WHERE review_status = OLD.review_status;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_counts_status
+    AFTER UPDATE OF status ON campaigns
+    WHEN OLD.status IS NOT NEW.status
+    BEGIN
+        UPDATE campaign_status_counts SET count = count - 1 WHERE status = OLD.status;
+        INSERT INTO campaign_status_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_counts_review_status
+    AFTER UPDATE OF review_status ON campaigns
+    WHEN OLD.review_status IS NOT NEW.review_status
+    BEGIN
+        UPDATE review_status_counts SET count = count - 1 WHERE review_status = OLD.review_status;
+        INSERT INTO review_status_counts (review_status, count)
+        SELECT NEW.review_status, 1 WHERE NEW.review_status IS NOT NULL
+        ON CONFLICT(review_status) DO UPDATE SET count = count + 1;
+    END
+    """,
+)
+
+
+async def rebuild_status_counts(conn):
+    """
+    Recompute both counter tables from the campaigns table
+
+    Used by the schema migration that introduces the counters, and as a repair
+    tool. Runs inside the caller's transaction; the caller commits.
+    """
+    await conn.execute("DELETE FROM campaign_status_counts")
+    await conn.execute("DELETE FROM review_status_counts")
+    await conn.execute("""
+        INSERT INTO campaign_status_counts (status, count)
+        SELECT status, COUNT(*) FROM campaigns GROUP BY status
+    """)
+    await conn.execute("""
+        INSERT INTO review_status_counts (review_status, count)
+        SELECT review_status, COUNT(*) FROM campaigns
+        WHERE review_status IS NOT NULL GROUP BY review_status
+    """)
+
+
+async def _read_counts(conn, table: str, column: str) -> Dict[str, int]:
+    async with conn.execute(f"SELECT {column}, count FROM {table} WHERE count > 0") as cursor:
+        return {row[0]: row[1] for row in await cursor.fetchall()}
+
+
+async def get_status_counts(conn) -> Dict[str, int]:
+    """Campaign counts keyed by status"""
+    return await _read_counts(conn, 'campaign_status_counts', 'status')
+
+
+async def get_review_status_counts(conn) -> Dict[str, int]:
+    """Campaign counts keyed by review status (campaigns without one are not included)"""
+    return await _read_counts(conn, 'review_status_counts', 'review_status')
+
+
+async def count_campaigns(
+    conn,
+    status: Optional[str] = None,
+    review_status: Optional[str] = None,
+    any_review_status: bool = False,
+    mode: Optional[str] = None
+) -> Tuple[Optional[int], bool]:
+    """
+    Total for a list endpoint, read from the counters
+
+    Args:
+        conn: Database connection
+        status: Count campaigns with this status
+        review_status: Count campaigns with this review status
+        any_review_status: Count campaigns that have any review status
+        mode: One of pagination.COUNT_MODES; COUNT_NONE skips the lookup
+
+    Returns:
+        (total or None, whether the total is an estimate). Counters are exact,
+        so the second value is always False; it is kept for the response schema.
+    """
+    if mode == COUNT_NONE:
+        return None, False
+    if review_status or any_review_status:
+        counts = await get_review_status_counts(conn)
+        key = review_status
+    else:
+        counts = await get_status_counts(conn)
+        key = status
+    if key:
+        return counts.get(key, 0), False
+    return sum(counts.values()), False
@@ -0,0 +1,82 @@
+"""
+Append-only log of campaign changes
+Triggers on `campaigns` append one row per inserted, updated or deleted
+(including archived) campaign, in the transaction that made the change, so
+every Campaign.save() and batch write is logged with it. `seq` only grows
+(AUTOINCREMENT never reuses a value) and the single writer commits in seq
+order, so clients can sync with GET /campaigns/changes?since=<seq>.
+"""
+from typing import List, Tuple
+
+# (seq, campaign_id, kind) with kind 'insert', 'update' or 'delete'
+CampaignEvent = Tuple[int, str, str]
+
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+CREATE_EVENT_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS campaign_events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        campaign_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        changed_at TEXT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_events_insert
+    AFTER INSERT ON campaigns
+    BEGIN
+        INSERT INTO campaign_events (campaign_id, kind, changed_at) VALUES (NEW.id, 'insert', {_NOW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_events_update
+    AFTER UPDATE ON campaigns
+    BEGIN
+        INSERT INTO campaign_events (campaign_id, kind, changed_at) VALUES (NEW.id, 'update', {_NOW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_events_delete
+    AFTER DELETE ON campaigns
+    BEGIN
+        INSERT INTO campaign_events (campaign_id, kind, changed_at) VALUES (OLD.id, 'delete', {_NOW});
+    END
+    """,
+)
+
+
+async def read_events(conn, since: int, limit: int) -> List[CampaignEvent]:
+    """Events after `since`, oldest first"""
+    async with conn.execute(
+        "SELECT seq, campaign_id, kind FROM campaign_events WHERE seq > ? ORDER BY seq LIMIT ?", (since, limit)
+    ) as cursor:
+        return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def event_bounds(conn) -> Tuple[int, int]:
+    """(oldest, latest) retained seq; (0, 0) before the first event"""
+    # Separate subqueries, so each is a single seek on the primary key
+    async with conn.execute(
+        "SELECT (SELECT MIN(seq) FROM campaign_events), (SELECT MAX(seq) FROM campaign_events)"
+    ) as cursor:
+        oldest, latest = await cursor.fetchone()
+    return oldest or 0, latest or 0
+
+
+async def prune_events(conn, before: str) -> int:
+    """
+    Delete events logged before an ISO timestamp (caller commits)
+
+    The latest event is always kept, so the feed still knows its position.
+
+    Returns:
+        Number of events deleted
+    """
+    async with conn.execute("""
+        DELETE FROM campaign_events WHERE seq < COALESCE(
+            (SELECT seq FROM campaign_events WHERE changed_at >= ? ORDER BY seq LIMIT 1),
+            (SELECT MAX(seq) FROM campaign_events)
+        )
+    """, (before,)) as cursor:
+        return cursor.rowcount
@@ -0,0 +1,310 @@
+"""
+Normalized projections of campaigns.ai_processing_data
+The JSON blob stays the canonical record; these tables let list, analytics and
+recommendation queries load just the assets, content or AI results they need
+"""
+from typing import Dict, Any, Iterable, List, Optional
+import json
+import logging
+
+from app.storage.write_coordinator import run_write
+from app.utils import json_codec
+from app.utils.payload_codec import get_payload_codec
+
+logger = logging.getLogger(__name__)
+
+
+# Loadable parts of ai_processing_data
+PART_ASSETS = 'assets'                        # logo + hero_images upload metadata
+PART_CONTENT = 'content'                      # user-supplied / edited copy
+PART_TEXT_OPTIMIZATION = 'text_optimization'  # ai_results.text_optimization
+PART_IMAGE_ANALYSIS = 'image_analysis'        # ai_results.image_analysis
+PART_OPTIMIZED_IMAGES = 'optimized_images'    # ai_results.optimized_images
+
+AI_RESULT_PARTS = (PART_TEXT_OPTIMIZATION, PART_IMAGE_ANALYSIS, PART_OPTIMIZED_IMAGES)
+ALL_PARTS = (PART_ASSETS, PART_CONTENT) + AI_RESULT_PARTS
+
+CONTENT_COLUMNS = (
+    'subject_line', 'preview_text', 'headline', 'body_copy',
+    'cta_text', 'cta_url', 'footer_text'
+)
+
+CREATE_PART_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS campaign_assets (
+        campaign_id TEXT NOT NULL,
+        asset_type TEXT NOT NULL,
+        position INTEGER NOT NULL DEFAULT 0,
+        filename TEXT,
+        s3_url TEXT,
+        size INTEGER,
+        data TEXT,
+        PRIMARY KEY (campaign_id, asset_type, position)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS campaign_content (
+        campaign_id TEXT PRIMARY KEY,
+        subject_line TEXT,
+        preview_text TEXT,
+        headline TEXT,
+        body_copy TEXT,
+        cta_text TEXT,
+        cta_url TEXT,
+        footer_text TEXT,
+        extra TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS campaign_ai_results (
+        campaign_id TEXT NOT NULL,
+        result_type TEXT NOT NULL,
+        payload TEXT,
+        PRIMARY KEY (campaign_id, result_type)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+async def sync_campaign_parts(conn, campaign_id: str, ai_data: Optional[Dict[str, Any]]):
+    """
+    Rewrite the normalized rows for one campaign from its ai_processing_data
+
+    Runs inside the caller's transaction (Campaign.save or the backfill), so the
+    projections never drift from the blob.
+    """
+    await conn.execute("DELETE FROM campaign_assets WHERE campaign_id = ?", (campaign_id,))
+    await conn.execute("DELETE FROM campaign_content WHERE campaign_id = ?", (campaign_id,))
+    await conn.execute("DELETE FROM campaign_ai_results WHERE campaign_id = ?", (campaign_id,))
+
+    if ai_data is None:
+        return
+
+    asset_rows = []
+    logo = ai_data.get('logo')
+    if isinstance(logo, dict):
+        asset_rows.append(_asset_row(campaign_id, 'logo', 0, logo))
+    for position, hero in enumerate(ai_data.get('hero_images') or []):
+        if isinstance(hero, dict):
+            asset_rows.append(_asset_row(campaign_id, 'hero', position, hero))
+    if asset_rows:
+        await conn.executemany("""
+            INSERT INTO campaign_assets
+            (campaign_id, asset_type, position, filename, s3_url, size, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, asset_rows)
+
+    # A content row is always written so the backfill can tell this campaign is done
+    content = ai_data.get('content') if isinstance(ai_data.get('content'), dict) else {}
+    columns = {c: content.get(c) for c in CONTENT_COLUMNS if isinstance(content.get(c), str)}
+    # Anything that is not a plain string column (unknown keys, paragraph lists) keeps its JSON shape
+    extra = {k: v for k, v in content.items() if k not in columns and v is not None}
+    await conn.execute(f"""
+        INSERT INTO campaign_content (campaign_id, {", ".join(CONTENT_COLUMNS)}, extra)
+        VALUES (?, {", ".join("?" for _ in CONTENT_COLUMNS)}, ?)
+    """, [campaign_id] + [columns.get(c) for c in CONTENT_COLUMNS] + [json.dumps(extra) if extra else None])
+
+    ai_results = ai_data.get('ai_results')
+    if isinstance(ai_results, dict):
+        await conn.executemany("""
+            INSERT INTO campaign_ai_results (campaign_id, result_type, payload)
+            VALUES (?, ?, ?)
+        """, [
+            (campaign_id, result_type, json.dumps(payload))
+            for result_type, payload in ai_results.items()
+        ])
+
+
+def _asset_row(campaign_id: str, asset_type: str, position: int, asset: Dict[str, Any]):
+    return (
+        campaign_id,
+        asset_type,
+        position,
+        asset.get('filename'),
+        asset.get('s3_url'),
+        asset.get('size'),
+        json.dumps(asset)
+    )
+
+
+def _placeholders(values: List[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+async def load_campaign_parts(
+    conn,
+    campaign_ids: Iterable[str],
+    parts: Iterable[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Load selected parts of ai_processing_data for many campaigns
+
+    Args:
+        conn: Database connection
+        campaign_ids: Campaigns to load
+        parts: Any of ALL_PARTS
+
+    Returns:
+        Mapping campaign_id -> partial ai_processing_data shaped like the blob
+        (logo / hero_images / content / ai_results.<type>)
+    """
+    ids = list(campaign_ids)
+    parts = set(parts)
+    unknown = parts - set(ALL_PARTS)
+    if unknown:
+        raise ValueError(f"Unknown ai_processing_data parts: {sorted(unknown)}")
+
+    result: Dict[str, Dict[str, Any]] = {campaign_id: {} for campaign_id in ids}
+    if not ids or not parts:
+        return result
+
+    if PART_ASSETS in parts:
+        async with conn.execute(f"""
+            SELECT campaign_id, asset_type, position, data FROM campaign_assets
+            WHERE campaign_id IN ({_placeholders(ids)})
+            ORDER BY campaign_id, asset_type, position
+        """, ids) as cursor:
+            async for row in cursor:
+                data = result[row['campaign_id']]
+                asset = json_codec.loads(row['data']) if row['data'] else {}
+                if row['asset_type'] == 'logo':
+                    data['logo'] = asset
+                else:
+                    heroes = data.setdefault('hero_images', [])
+                    while len(heroes) < row['position']:
+                        heroes.append({})
+                    heroes.append(asset)
+
+    if PART_CONTENT in parts:
+        async with conn.execute(f"""
+            SELECT campaign_id, {", ".join(CONTENT_COLUMNS)}, extra FROM campaign_content
+            WHERE campaign_id IN ({_placeholders(ids)})
+        """, ids) as cursor:
+            async for row in cursor:
+                content = {c: row[c] for c in CONTENT_COLUMNS if row[c] is not None}
+                if row['extra']:
+                    content.update(json_codec.loads(row['extra']))
+                result[row['campaign_id']]['content'] = content
+
+    result_types = [p for p in AI_RESULT_PARTS if p in parts]
+    if result_types:
+        async with conn.execute(f"""
+            SELECT campaign_id, result_type, payload FROM campaign_ai_results
+            WHERE campaign_id IN ({_placeholders(ids)})
+            AND result_type IN ({_placeholders(result_types)})
+        """, ids + result_types) as cursor:
+            async for row in cursor:
+                ai_results = result[row['campaign_id']].setdefault('ai_results', {})
+                ai_results[row['result_type']] = json_codec.loads(row['payload']) if row['payload'] else None
+
+    return result
+
+
+def project_parts(ai_data: Any, parts: Iterable[str]) -> Dict[str, Any]:
+    """The requested parts of a decoded blob, shaped like load_campaign_parts output"""
+    parts = set(parts)
+    data: Dict[str, Any] = {}
+    if not isinstance(ai_data, dict):
+        return data
+    if PART_ASSETS in parts:
+        if isinstance(ai_data.get('logo'), dict):
+            data['logo'] = ai_data['logo']
+        if isinstance(ai_data.get('hero_images'), list):
+            data['hero_images'] = [hero if isinstance(hero, dict) else {} for hero in ai_data['hero_images']]
+    if PART_CONTENT in parts:
+        content = ai_data.get('content') if isinstance(ai_data.get('content'), dict) else {}
+        data['content'] = {k: v for k, v in content.items() if v is not None}
+    ai_results = ai_data.get('ai_results')
+    if isinstance(ai_results, dict):
+        for result_type in AI_RESULT_PARTS:
+            if result_type in parts and result_type in ai_results:
+                data.setdefault('ai_results', {})[result_type] = ai_results[result_type]
+    return data
+
+
+async def load_unsynced_parts(
+    conn,
+    campaign_ids: Iterable[str],
+    parts: Iterable[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Parts for campaigns the backfill has not normalized yet, decoded from their blobs
+
+    Until backfill_campaign_parts finishes, existing campaigns have no rows in
+    the part tables; list reads merge this in so they are not served empty.
+    Once the backfill is done this is one primary-key probe per campaign, and
+    blobs are only read for campaigns that have no content row.
+    """
+    ids = list(campaign_ids)
+    if not ids:
+        return {}
+    async with conn.execute(f"""
+        SELECT c.id FROM campaigns c
+        WHERE c.id IN ({_placeholders(ids)})
+        AND NOT EXISTS (SELECT 1 FROM campaign_content cc WHERE cc.campaign_id = c.id)
+    """, ids) as cursor:
+        missing = [row[0] for row in await cursor.fetchall()]
+    if not missing:
+        return {}
+
+    async with conn.execute(f"""
+        SELECT id, ai_processing_data FROM campaigns
+        WHERE id IN ({_placeholders(missing)}) AND ai_processing_data IS NOT NULL
+    """, missing) as cursor:
+        rows = await cursor.fetchall()
+
+    result = {}
+    for row in rows:
+        try:
+            ai_data = get_payload_codec().decode(row['ai_processing_data'])
+        except (ValueError, TypeError):
+            continue
+        result[row['id']] = project_parts(ai_data, parts)
+    return result
+
+
+async def backfill_campaign_parts(conn, batch_size: int = 200) -> int:
+    """
+    Populate the normalized tables from existing ai_processing_data blobs
+
+    Works in small batches, each in its own (group-committed) transaction, so it
+    can run while the app is serving traffic. Each batch is selected inside its
+    write transaction, so a save that commits first (and has already written
+    fresh parts) is never overwritten with the blob read before it. Safe to
+    re-run; campaigns that already have a campaign_content row are skipped, and
+    blobs the configured codec cannot decode are left for a later run.
+
+    Returns:
+        Number of campaigns migrated
+    """
+    migrated = 0
+    last_rowid = 0
+    while True:
+        async def migrate_batch(c, after=last_rowid):
+            async with c.execute("""
+                SELECT c.rowid, c.id, c.ai_processing_data FROM campaigns c
+                WHERE c.rowid > ? AND c.ai_processing_data IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM campaign_content cc WHERE cc.campaign_id = c.id)
+                ORDER BY c.rowid
+                LIMIT ?
+            """, (after, batch_size)) as cursor:
+                rows = await cursor.fetchall()
+
+            done = 0
+            for row in rows:
+                try:
+                    ai_data = get_payload_codec().decode(row['ai_processing_data'])
+                except (ValueError, TypeError):
+                    continue
+                await sync_campaign_parts(c, row['id'], ai_data if isinstance(ai_data, dict) else {})
+                done += 1
+            return (rows[-1]['rowid'] if rows else None), done
+
+        last_rowid, done = await run_write(conn, migrate_batch)
+        if last_rowid is None:
+            break
+        migrated += done
+
+    if migrated:
+        logger.info(f"Backfilled normalized ai_processing_data for {migrated} campaigns")
+    return migrated
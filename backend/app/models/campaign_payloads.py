@@ -0,0 +1,87 @@
+"""
+Background re-encoding of stored ai_processing_data
+After AI_PAYLOAD_CODEC changes, existing rows keep decoding in their old format;
+reencode_payloads rewrites them in the configured one. It walks the table by
+rowid in small batches, each in its own (group-committed) transaction, and only
+replaces a payload that is still the one it read, so concurrent saves win.
+"""
+from typing import Any, List, Optional
+import logging
+
+from app.storage.write_coordinator import run_write
+from app.utils.payload_codec import PayloadCodec, get_payload_codec
+
+logger = logging.getLogger(__name__)
+
+
+async def reencode_payloads(conn, codec: Optional[PayloadCodec] = None, batch_size: int = 200) -> int:
+    """
+    Rewrite ai_processing_data not yet stored in the codec's format
+
+    Safe to re-run or cancel at any point; undecodable payloads are left as they are.
+
+    Returns:
+        Number of campaigns rewritten
+    """
+    codec = codec or get_payload_codec()
+    rewritten = 0
+    last_rowid = 0
+    while True:
+        async with conn.execute("""
+            SELECT rowid, ai_processing_data FROM campaigns
+            WHERE rowid > ? AND ai_processing_data IS NOT NULL
+            ORDER BY rowid
+            LIMIT ?
+        """, (last_rowid, batch_size)) as cursor:
+            rows = await cursor.fetchall()
+
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+
+        updates = []
+        for rowid, stored in rows:
+            try:
+                if codec.is_current(stored):
+                    continue
+                encoded = codec.encode(codec.decode(stored))
+            except (ValueError, TypeError):
+                # Undecodable (corrupt, or written with a dictionary that is not configured)
+                continue
+            if encoded is not None and encoded != stored:
+                updates.append((encoded, rowid, stored))
+
+        if updates:
+            async def rewrite_batch(c, updates=updates):
+                # Compare-and-set: skip rows saved since they were read
+                cursor = await c.executemany("""
+                    UPDATE campaigns SET ai_processing_data = ?
+                    WHERE rowid = ? AND ai_processing_data IS ?
+                """, updates)
+                return cursor.rowcount
+
+            rewritten += await run_write(conn, rewrite_batch)
+
+    if rewritten:
+        logger.info(f"Re-encoded ai_processing_data for {rewritten} campaigns as {codec.name}")
+    return rewritten
+
+
+async def sample_payloads(conn, limit: int = 2000, codec: Optional[PayloadCodec] = None) -> List[Any]:
+    """Decoded ai_processing_data of the most recent campaigns, for dictionary training"""
+    codec = codec or get_payload_codec()
+    async with conn.execute("""
+        SELECT ai_processing_data FROM campaigns
+        WHERE ai_processing_data IS NOT NULL
+        ORDER BY rowid DESC
+        LIMIT ?
+    """, (limit,)) as cursor:
+        rows = await cursor.fetchall()
+
+    samples = []
+    for (stored,) in rows:
+        try:
+            samples.append(codec.decode(stored))
+        except (ValueError, TypeError):
+            continue
+    return samples
@@ -0,0 +1,195 @@
+"""
+Full-text search over campaigns (SQLite FTS5)
+campaigns_fts indexes campaign and advertiser names, the subject line,
+headline and body copy from campaign_content, and review feedback. Triggers on
+both tables keep it in sync; its rowid is the campaigns rowid.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+import re
+
+from app.storage.write_coordinator import run_write
+
+# Column weights for bm25(); names matter more than body copy
+SEARCH_COLUMNS = ('campaign_name', 'advertiser_name', 'subject_line', 'headline', 'body_copy', 'feedback')
+SEARCH_WEIGHTS = (10.0, 6.0, 4.0, 3.0, 1.0, 1.0)
+_RANK_FUNCTION = f"bm25({', '.join(str(w) for w in SEARCH_WEIGHTS)})"
+
+MAX_QUERY_TERMS = 8
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Re-index one campaign (by id expression) from campaigns + campaign_content
+_REINDEX = """
+        DELETE FROM campaigns_fts WHERE rowid = (SELECT rowid FROM campaigns WHERE id = {id});
+        INSERT INTO campaigns_fts (rowid, campaign_name, advertiser_name, subject_line, headline, body_copy, feedback)
+        SELECT c.rowid, c.campaign_name, c.advertiser_name, cc.subject_line, cc.headline, cc.body_copy, c.feedback
+        FROM campaigns c LEFT JOIN campaign_content cc ON cc.campaign_id = c.id
+        WHERE c.id = {id};
+"""
+
+CREATE_SEARCH_TABLES = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5(
+        campaign_name, advertiser_name, subject_line, headline, body_copy, feedback,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_fts_insert
+    AFTER INSERT ON campaigns
+    BEGIN
+        {_REINDEX.format(id='NEW.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_fts_update
+    AFTER UPDATE OF campaign_name, advertiser_name, feedback ON campaigns
+    BEGIN
+        {_REINDEX.format(id='NEW.id')}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_campaigns_fts_delete
+    AFTER DELETE ON campaigns
+    BEGIN
+        DELETE FROM campaigns_fts WHERE rowid = OLD.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaign_content_fts_insert
+    AFTER INSERT ON campaign_content
+    BEGIN
+        {_REINDEX.format(id='NEW.campaign_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaign_content_fts_update
+    AFTER UPDATE ON campaign_content
+    BEGIN
+        {_REINDEX.format(id='NEW.campaign_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_campaign_content_fts_delete
+    AFTER DELETE ON campaign_content
+    BEGIN
+        {_REINDEX.format(id='OLD.campaign_id')}
+    END
+    """,
+)
+
+
+DROP_SEARCH_TABLES = (
+    "DROP TRIGGER IF EXISTS trg_campaigns_fts_insert",
+    "DROP TRIGGER IF EXISTS trg_campaigns_fts_update",
+    "DROP TRIGGER IF EXISTS trg_campaigns_fts_delete",
+    "DROP TRIGGER IF EXISTS trg_campaign_content_fts_insert",
+    "DROP TRIGGER IF EXISTS trg_campaign_content_fts_update",
+    "DROP TRIGGER IF EXISTS trg_campaign_content_fts_delete",
+    "DROP TABLE IF EXISTS campaigns_fts",
+)
+
+
+def search_terms(query: str) -> List[str]:
+    """Searchable words of a free-text query (at most MAX_QUERY_TERMS)"""
+    return _TERM_PATTERN.findall(query or "")[:MAX_QUERY_TERMS]
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every word must match, as a prefix of some indexed word ("spr sal" finds
+    "Spring Sale"). Words are quoted, so FTS5 operators in user input are inert.
+
+    Returns:
+        MATCH expression, or None if the query has no searchable words
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+async def search_campaign_rows(
+    conn,
+    match: str,
+    columns: Sequence[str],
+    status: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None
+) -> List[Any]:
+    """
+    Run a ranked search and return campaign rows
+
+    Args:
+        conn: Database connection
+        match: Expression from build_match_query
+        columns: campaigns columns to select
+        status: Only campaigns with this status
+        limit: Maximum rows
+        after: (score, rowid) of the last row of the previous page
+
+    Returns:
+        Rows with the requested columns plus search_score (lower is better) and
+        search_rowid, best matches first
+    """
+    conditions = ["campaigns_fts MATCH ?", f"rank MATCH '{_RANK_FUNCTION}'"]
+    params: List[Any] = [match]
+    if status:
+        conditions.append("c.status = ?")
+        params.append(status)
+    if after is not None:
+        conditions.append("(f.rank > ? OR (f.rank = ? AND f.rowid > ?))")
+        params.extend([after[0], after[0], after[1]])
+
+    select = ", ".join(f"c.{column}" for column in columns)
+    async with conn.execute(f"""
+        SELECT {select}, f.rank AS search_score, f.rowid AS search_rowid
+        FROM campaigns_fts f
+        JOIN campaigns c ON c.rowid = f.rowid
+        WHERE {' AND '.join(conditions)}
+        ORDER BY f.rank, f.rowid
+        LIMIT ?
+    """, params + [limit]) as cursor:
+        return await cursor.fetchall()
+
+
+async def backfill_search_index(conn, batch_size: int = 500) -> int:
+    """
+    Index campaigns that are missing from campaigns_fts, in batches
+
+    New and updated campaigns are indexed by triggers, so this only has to
+    catch up rows written before the index existed.
+
+    Returns:
+        Number of campaigns indexed
+    """
+    indexed = 0
+    last_rowid = 0
+    while True:
+        async def index_batch(c, start=last_rowid):
+            async with c.execute("""
+                SELECT MAX(rowid) FROM (
+                    SELECT rowid FROM campaigns WHERE rowid > ? ORDER BY rowid LIMIT ?
+                )
+            """, (start, batch_size)) as cursor:
+                end = (await cursor.fetchone())[0]
+            if end is None:
+                return None, 0
+            cursor = await c.execute("""
+                INSERT INTO campaigns_fts
+                (rowid, campaign_name, advertiser_name, subject_line, headline, body_copy, feedback)
+                SELECT c.rowid, c.campaign_name, c.advertiser_name,
+                       cc.subject_line, cc.headline, cc.body_copy, c.feedback
+                FROM campaigns c LEFT JOIN campaign_content cc ON cc.campaign_id = c.id
+                WHERE c.rowid > ? AND c.rowid <= ?
+                AND NOT EXISTS (SELECT 1 FROM campaigns_fts f WHERE f.rowid = c.rowid)
+            """, (start, end))
+            return end, max(cursor.rowcount, 0)
+
+        last_rowid, count = await run_write(conn, index_batch)
+        if last_rowid is None:
+            return indexed
+        indexed += count
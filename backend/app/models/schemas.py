@@ -93,10 +93,30 @@ class CampaignResponse(BaseModel):
 class CampaignListResponse(BaseModel):
     """Response schema for campaign list"""
     campaigns: List[CampaignResponse]
-    total: int
+    total: Optional[int] = None  # None when count=none
     limit: int
     offset: int
     stats: Optional[Dict[str, int]] = None  # Quick stats by status
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+    total_estimated: bool = False
+    changes_since: Optional[int] = None  # Pass as ?since= to GET /campaigns/changes to follow updates
+
+
+class CampaignChangesResponse(BaseModel):
+    """Response schema for the campaign change feed"""
+    changed: List[CampaignResponse]
+    deleted: List[str]
+    next_since: int
+    has_more: bool
+    reset: bool = False
+
+
+class CampaignSearchResponse(BaseModel):
+    """Response schema for campaign full-text search"""
+    campaigns: List[CampaignResponse]  # Best matches first
+    query: str
+    limit: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 
 class PromptGenerateRequest(BaseModel):
@@ -198,6 +218,40 @@ class ReviewCampaignResponse(BaseModel):
     message: str
 
 
+class BulkOperation(BaseModel):
+    """One operation of a bulk request"""
+    campaign_id: str
+    action: str = Field(..., pattern="^(approve|reject|schedule|review)$", description="approve, reject, schedule or review")
+    feedback: Optional[str] = Field(None, max_length=2000, description="Feedback for approve/reject")
+    scheduled_at: Optional[str] = Field(None, description="ISO 8601 send time (schedule)")
+    review_status: Optional[str] = Field(None, pattern="^(pending|reviewed|approved|rejected)$", description="Review status (review)")
+    reviewer_notes: Optional[str] = Field(None, max_length=2000, description="Optional notes from the reviewer (review)")
+
+
+class BulkOperationsRequest(BaseModel):
+    """Request schema for bulk campaign operations"""
+    operations: List[BulkOperation] = Field(..., min_length=1)
+
+
+class BulkOperationResult(BaseModel):
+    """Outcome of one bulk operation"""
+    campaign_id: str
+    action: str
+    success: bool
+    status: Optional[str] = None
+    scheduling_status: Optional[str] = None
+    review_status: Optional[str] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkOperationsResponse(BaseModel):
+    """Response schema for bulk campaign operations (results in request order)"""
+    results: List[BulkOperationResult]
+    succeeded: int
+    failed: int
+
+
 class PerformanceUpdateRequest(BaseModel):
     """Request schema for updating campaign performance metrics"""
     open_rate: Optional[float] = Field(None, ge=0.0, le=1.0, description="Open rate as decimal (0.0 to 1.0)")
@@ -4,14 +4,11 @@ Approval endpoint for campaign approval/rejection
 from fastapi import APIRouter, HTTPException, Depends
 from datetime import datetime
 import logging
-from io import BytesIO
 
 from app.models.schemas import ApprovalRequest, ApprovalResponse
 from app.services.campaign_service import get_campaign
 from app.services.proof_service import generate_proof
-from app.services.template_service import generate_email_from_campaign
-from app.services.s3_service import s3_service
-from app.services.file_service import generate_s3_key
+from app.services.template_service import publish_final_html
 from app.services.test_data_generator import generate_single_campaign_performance
 from app.database import get_db
 
@@ -62,28 +59,13 @@ async def approve_campaign(
                     detail="Campaign must be processed before approval"
                 )
             
-            # Generate final HTML using template service
-            final_html = await generate_email_from_campaign(
+            # Generate final HTML and upload it to S3
+            final_html_s3_url, download_url = await publish_final_html(
                 campaign_id,
                 campaign,
                 ai_results
             )
             
-            # Upload final HTML to S3
-            final_html_key = generate_s3_key(campaign_id, 'final.html', 'html')
-            html_file_obj = BytesIO(final_html.encode('utf-8'))
-            final_html_s3_url = await s3_service.upload_file(
-                html_file_obj,
-                final_html_key,
-                content_type='text/html'
-            )
-            
-            # Generate presigned URL for download (24 hour expiration)
-            download_url = await s3_service.get_presigned_url(
-                final_html_key,
-                expiration=86400  # 24 hours
-            )
-            
             # Update campaign status and feedback
             campaign.status = 'approved'
             campaign.approved_at = datetime.utcnow().isoformat()
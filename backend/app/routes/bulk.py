@@ -0,0 +1,56 @@
+"""
+Bulk campaign operations endpoint
+"""
+from fastapi import APIRouter, HTTPException, Depends
+import logging
+
+from app.config import settings
+from app.models.schemas import BulkOperationsRequest, BulkOperationsResponse
+from app.services.bulk_service import run_bulk_operations
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/campaigns/bulk", response_model=BulkOperationsResponse)
+async def bulk_campaign_operations(
+    request: BulkOperationsRequest,
+    conn = Depends(get_db)
+):
+    """
+    Approve, reject, schedule or review many campaigns in one call
+    
+    Each operation follows the rules of its single-campaign endpoint and
+    succeeds or fails on its own; all successful changes are written in one
+    transaction.
+    
+    Args:
+    - operations: List of {campaign_id, action, ...}; action is approve, reject,
+      schedule (with scheduled_at) or review (with review_status, reviewer_notes)
+    
+    Returns:
+    - Per-operation results in request order, with succeeded/failed totals
+    """
+    if len(request.operations) > settings.BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_MAX_OPERATIONS} operations per request"
+        )
+    
+    try:
+        results = await run_bulk_operations(conn, request.operations)
+    except Exception as e:
+        logger.error(f"Error running bulk campaign operations: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run bulk operations: {str(e)}"
+        )
+    
+    succeeded = sum(1 for result in results if result["success"])
+    return BulkOperationsResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded
+    )
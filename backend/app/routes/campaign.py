@@ -8,13 +8,24 @@ import logging
 from app.models.schemas import (
     CampaignStatusResponse,
     CampaignResponse,
-    CampaignListResponse
+    CampaignListResponse,
+    CampaignSearchResponse,
+    CampaignChangesResponse
 )
 from app.services.campaign_service import get_campaign
+from app.services.change_feed_service import get_campaign_changes
 from app.models.campaign import Campaign
-from app.database import get_db
+from app.storage.repository import LIST_PARTS, repository_for
+from app.database import get_db, get_read_db
 from app.services.s3_service import s3_service
-from typing import Optional
+from app.utils.pagination import (
+    COUNT_EXACT,
+    COUNT_MODE_PATTERN,
+    decode_search_cursor,
+    encode_search_cursor,
+    parse_cursor_param,
+    split_page
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,88 +39,66 @@ async def list_campaigns(
     offset: int = Query(0, ge=0, description="Number of campaigns to skip"),
     last_n: Optional[int] = Query(None, ge=1, le=100, description="Get last N campaigns (overrides limit and offset)"),
     include_stats: bool = Query(False, description="Include quick stats by status"),
-    conn = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (keyset paging)"),
+    count: str = Query(COUNT_EXACT, pattern=COUNT_MODE_PATTERN, description="How to compute total: exact, estimate or none"),
+    conn = Depends(get_read_db)
 ):
     """
     List all campaigns with optional status filtering and pagination
     
+    Offset paging (limit/offset) is kept for existing clients; passing the
+    next_cursor of a previous page instead seeks straight to the next rows,
+    which stays fast on deep pages.
+    
     Returns:
     - campaigns: List of campaign objects (sorted by created_at DESC, newest first)
-    - total: Total number of campaigns (before pagination)
+    - total: Total number of campaigns (before pagination), None when count=none
     - limit: Number of campaigns per page
     - offset: Number of campaigns skipped
     - stats: Optional quick stats by status (if include_stats=true)
+    - next_cursor: Cursor for the next page, None on the last page
+    - changes_since: Change feed position to follow this list with GET /campaigns/changes
     """
     try:
         # Handle "last N" filter (for history view)
         if last_n:
             limit = last_n
             offset = 0
+            cursor = None
         
         # Default limit if not specified
         if limit is None:
             limit = 100
         
-        # Get campaigns based on status filter
-        if status:
-            campaigns = await Campaign.get_by_status(conn, status, limit=limit, offset=offset)
-            # For status filtering, we need to count total matching campaigns
-            async with conn.cursor() as cursor:
-                await cursor.execute("""
-                    SELECT COUNT(*) as total FROM campaigns WHERE status = ?
-                """, (status,))
-                result = await cursor.fetchone()
-                total = result['total'] if result else 0
-        else:
-            campaigns = await Campaign.get_all(conn, limit=limit, offset=offset)
-            # Count total campaigns
-            async with conn.cursor() as cursor:
-                await cursor.execute("SELECT COUNT(*) as total FROM campaigns")
-                result = await cursor.fetchone()
-                total = result['total'] if result else 0
+        after = parse_cursor_param(cursor, offset)
+        repository = repository_for(conn)
         
-        # Get quick stats if requested
-        stats = None
-        if include_stats:
-            async with conn.cursor() as cursor:
-                await cursor.execute("""
-                    SELECT status, COUNT(*) as count 
-                    FROM campaigns 
-                    GROUP BY status
-                """)
-                rows = await cursor.fetchall()
-                stats = {row['status']: row['count'] for row in rows}
+        # Feed position read before the page, so no later change is missed
+        _, changes_since = await repository.get_event_bounds()
         
-        # Convert to response format
-        campaign_responses = [
-            CampaignResponse(
-                id=c.id,
-                campaign_name=c.campaign_name,
-                advertiser_name=c.advertiser_name,
-                status=c.status,
-                created_at=c.created_at,
-                approved_at=c.approved_at,
-                assets_s3_path=c.assets_s3_path,
-                html_s3_path=c.html_s3_path,
-                proof_s3_path=c.proof_s3_path,
-                feedback=c.feedback,
-                ai_processing_data=c.ai_processing_data,
-                scheduled_at=c.scheduled_at,
-                scheduling_status=c.scheduling_status,
-                review_status=c.review_status,
-                reviewer_notes=c.reviewer_notes
-            )
-            for c in campaigns
-        ]
+        # Fetch one extra row to know whether there is a next page
+        campaigns, next_cursor = split_page(
+            await Campaign.get_summaries(conn, status=status, limit=limit + 1, offset=offset, after=after),
+            limit
+        )
+        total, total_estimated = await repository.count_campaigns(status=status, mode=count)
+        
+        # Get quick stats if requested
+        stats = await repository.get_status_counts() if include_stats else None
         
         return CampaignListResponse(
-            campaigns=campaign_responses,
+            campaigns=[summary_response(c) for c in campaigns],
             total=total,
             limit=limit,
             offset=offset,
-            stats=stats
+            stats=stats,
+            next_cursor=next_cursor,
+            total_estimated=total_estimated,
+            changes_since=changes_since
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing campaigns: {e}", exc_info=True)
         raise HTTPException(
@@ -118,6 +107,126 @@ async def list_campaigns(
         )
 
 
+@router.get("/campaigns/search", response_model=CampaignSearchResponse)
+async def search_campaigns(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for; each word matches as a prefix"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of campaigns to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    conn = Depends(get_read_db)
+):
+    """
+    Full-text search over campaign name, advertiser, subject line, headline, body copy
+    and review feedback. A query that is exactly a campaign ID returns that campaign
+    first (on the first page).
+    
+    Returns:
+    - campaigns: Matching campaigns, best matches first
+    - next_cursor: Cursor for the next page, None on the last page
+    """
+    try:
+        after = None
+        if cursor:
+            try:
+                after = decode_search_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        repository = repository_for(conn)
+        # Fetch one extra row to know whether there is a next page
+        try:
+            results = await repository.search(q, status=status, limit=limit + 1, after=after)
+        except ValueError as e:
+            # Cursor from the other storage backend
+            raise HTTPException(status_code=400, detail=str(e))
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_search_cursor(*results[-1][1])
+        
+        campaigns = [campaign for campaign, _ in results]
+        if after is None:
+            exact = await repository.get_by_id_with_parts(q.strip(), LIST_PARTS)
+            if exact is not None and (not status or exact.status == status):
+                campaigns = [exact] + [c for c in campaigns if c.id != exact.id]
+        return CampaignSearchResponse(
+            campaigns=[summary_response(c) for c in campaigns],
+            query=q,
+            limit=limit,
+            next_cursor=next_cursor
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching campaigns: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to search campaigns: {str(e)}"
+        )
+
+
+@router.get("/campaigns/changes", response_model=CampaignChangesResponse)
+async def list_campaign_changes(
+    since: int = Query(..., ge=0, description="next_since of the previous call (0 for the start of the feed)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of change events to read"),
+    conn = Depends(get_read_db)
+):
+    """
+    Campaigns created, changed or removed since a feed position
+    
+    Lets clients keep a list in sync without re-fetching it: load the list
+    once, then poll from its changes_since with the returned next_since. Changed campaigns come with
+    the same fields as GET /campaigns.
+    
+    Returns:
+    - changed: Campaigns as they are now, in the order they last changed
+    - deleted: IDs of campaigns that were deleted or archived
+    - next_since: Position to pass as since next time
+    - has_more: More changes are waiting; call again right away
+    - reset: The feed no longer reaches back to since; reload the full list
+    """
+    try:
+        changes = await get_campaign_changes(conn, since, limit=limit)
+        return CampaignChangesResponse(
+            changed=[summary_response(c) for c in changes["changed"]],
+            deleted=changes["deleted"],
+            next_since=changes["next_since"],
+            has_more=changes["has_more"],
+            reset=changes["reset"]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading campaign changes: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to read campaign changes: {str(e)}"
+        )
+
+
+def summary_response(c: Campaign) -> CampaignResponse:
+    """Build the list/search response item for a campaign loaded without its full JSON blob"""
+    return CampaignResponse(
+        id=c.id,
+        campaign_name=c.campaign_name,
+        advertiser_name=c.advertiser_name,
+        status=c.status,
+        created_at=c.created_at,
+        approved_at=c.approved_at,
+        assets_s3_path=c.assets_s3_path,
+        html_s3_path=c.html_s3_path,
+        proof_s3_path=c.proof_s3_path,
+        feedback=c.feedback,
+        ai_processing_data=c.ai_processing_data,
+        scheduled_at=c.scheduled_at,
+        scheduling_status=c.scheduling_status,
+        review_status=c.review_status,
+        reviewer_notes=c.reviewer_notes
+    )
+
+
 def extract_s3_key(s3_url: str) -> Optional[str]:
     """Extract S3 key from s3://bucket/key format"""
     if not s3_url or not s3_url.startswith('s3://'):
@@ -166,7 +275,7 @@ async def convert_s3_urls_to_presigned(ai_processing_data: Optional[dict]) -> Op
 @router.get("/campaigns/{campaign_id}", response_model=CampaignResponse)
 async def get_campaign_detail(
     campaign_id: str,
-    conn = Depends(get_db)
+    conn = Depends(get_read_db)
 ):
     """
     Get full campaign details by ID
@@ -214,7 +323,7 @@ async def get_campaign_detail(
 @router.get("/campaigns/{campaign_id}/status", response_model=CampaignStatusResponse)
 async def get_campaign_status(
     campaign_id: str,
-    conn = Depends(get_db)
+    conn = Depends(get_read_db)
 ):
     """
     Get campaign status
@@ -8,7 +8,7 @@ from io import BytesIO
 
 from app.services.campaign_service import get_campaign
 from app.services.s3_service import s3_service
-from app.database import get_db
+from app.database import get_read_db
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ router = APIRouter()
 @router.get("/download/{campaign_id}")
 async def download_campaign_html(
     campaign_id: str,
-    conn = Depends(get_db)
+    conn = Depends(get_read_db)
 ):
     """
     Download campaign HTML file
@@ -1,7 +1,7 @@
 """
 Generate endpoint for proof generation
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 import logging
 import time
 
@@ -9,6 +9,7 @@ from app.models.schemas import PreviewResponse, PromptGenerateRequest, PromptGen
 from app.services.proof_service import generate_proof, update_campaign_with_proof
 from app.services.campaign_service import get_campaign
 from app.services.ai_service import generate_campaign_from_prompt
+from app.services.ai_cache_service import CACHE_USE, CacheMode
 from app.database import get_db
 
 logger = logging.getLogger(__name__)
@@ -151,7 +152,8 @@ async def regenerate_campaign_proof(
 
 @router.post("/campaigns/generate-from-prompt", response_model=PromptGenerateResponse)
 async def generate_campaign_from_prompt_endpoint(
-    request: PromptGenerateRequest
+    request: PromptGenerateRequest,
+    cache: CacheMode = Query(CACHE_USE, description="AI result cache: use, bypass or refresh")
 ):
     """
     Generate campaign data from a natural language prompt using AI
@@ -164,6 +166,9 @@ async def generate_campaign_from_prompt_endpoint(
     Example prompts:
     - "Create a campaign for Acme Corp's Black Friday sale. 30% off all products. Use code BLACKFRIDAY30."
     - "I need an email campaign for TechStart's new product launch. The product is called CloudSync, a cloud storage solution for businesses."
+    
+    Submitting the same prompt again returns the cached result (`cache=refresh`
+    asks GPT again, `cache=bypass` skips the cache).
     """
     try:
         # Validate prompt length
@@ -174,7 +179,7 @@ async def generate_campaign_from_prompt_endpoint(
             raise HTTPException(status_code=400, detail="Prompt exceeds maximum length of 2000 characters")
         
         # Generate campaign data from prompt
-        result = await generate_campaign_from_prompt(request.prompt.strip())
+        result = await generate_campaign_from_prompt(request.prompt.strip(), cache_mode=cache)
         
         logger.info(f"Campaign generated from prompt: {result.get('campaign_name', 'Unknown')}")
         
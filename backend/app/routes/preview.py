@@ -7,7 +7,7 @@ import logging
 from app.models.schemas import PreviewResponse
 from app.services.campaign_service import get_campaign
 from app.services.proof_service import generate_proof
-from app.database import get_db
+from app.database import get_read_db
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ router = APIRouter()
 @router.get("/preview/{campaign_id}", response_model=PreviewResponse)
 async def get_campaign_preview(
     campaign_id: str,
-    conn = Depends(get_db)
+    conn = Depends(get_read_db)
 ):
     """
     Get preview data for a campaign
@@ -1,7 +1,7 @@
 """
 Process endpoint for AI processing of campaigns
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional
 import time
 import logging
@@ -10,6 +10,7 @@ import asyncio
 from app.models.schemas import ProcessCampaignRequest, ProcessCampaignResponse
 from app.services.campaign_service import get_campaign
 from app.services.ai_service import process_text_content, process_images_parallel
+from app.services.ai_cache_service import CACHE_USE, CacheMode
 from app.services.image_service import (
     download_image_from_s3,
     optimize_and_upload_logo,
@@ -25,11 +26,16 @@ router = APIRouter()
 @router.post("/process/{campaign_id}", response_model=ProcessCampaignResponse)
 async def process_campaign(
     campaign_id: str,
+    cache: CacheMode = Query(CACHE_USE, description="AI result cache: use, bypass or refresh"),
     conn = Depends(get_db)
 ):
     """
     Process campaign with AI: optimize content and images
     
+    Text and image analyses are reused from the AI cache when the copy or
+    images are unchanged; `cache=bypass` skips the cache and `cache=refresh`
+    replaces the entries.
+    
     This endpoint:
     1. Fetches campaign data
     2. Downloads images from S3
@@ -106,12 +112,12 @@ async def process_campaign(
         processing_tasks = []
         
         # Text processing
-        text_task = process_text_content(subject_line, body_copy, cta_text)
+        text_task = process_text_content(subject_line, body_copy, cta_text, cache_mode=cache)
         processing_tasks.append(('text', text_task))
         
         # Image analysis (if images available)
         if logo_bytes or hero_images_bytes:
-            image_analysis_task = process_images_parallel(logo_bytes, hero_images_bytes)
+            image_analysis_task = process_images_parallel(logo_bytes, hero_images_bytes, cache_mode=cache)
             processing_tasks.append(('images', image_analysis_task))
         else:
             image_analysis_task = None
@@ -9,7 +9,7 @@ from app.models.schemas import (
     RecommendationItem
 )
 from app.models.campaign import Campaign
-from app.database import get_db
+from app.database import get_read_db
 from app.services.recommendation_service import generate_recommendations
 
 logger = logging.getLogger(__name__)
@@ -20,7 +20,7 @@ router = APIRouter()
 @router.post("/campaigns/{campaign_id}/recommendations", response_model=RecommendationsResponse)
 async def get_recommendations(
     campaign_id: str,
-    conn = Depends(get_db)
+    conn = Depends(get_read_db)
 ):
     """
     Get AI-based content recommendations for a campaign based on past performance
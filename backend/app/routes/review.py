@@ -13,7 +13,14 @@ from app.models.schemas import (
 )
 from app.services.campaign_service import get_campaign
 from app.models.campaign import Campaign
-from app.database import get_db
+from app.storage.repository import repository_for
+from app.database import get_db, get_read_db
+from app.utils.pagination import (
+    COUNT_EXACT,
+    COUNT_MODE_PATTERN,
+    parse_cursor_param,
+    split_page
+)
 
 logger = logging.getLogger(__name__)
 
@@ -75,39 +82,29 @@ async def list_campaigns_by_review_status(
     review_status: Optional[str] = Query(None, description="Filter by review status (pending, reviewed, approved, rejected)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of campaigns to return"),
     offset: int = Query(0, ge=0, description="Number of campaigns to skip"),
-    conn = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor (keyset paging)"),
+    count: str = Query(COUNT_EXACT, pattern=COUNT_MODE_PATTERN, description="How to compute total: exact, estimate or none"),
+    conn = Depends(get_read_db)
 ):
     """
     List campaigns filtered by review status
     
+    Supports the same offset and cursor paging as GET /campaigns.
+    
     Returns:
     - List of campaigns with specified review status
     """
     try:
-        if review_status:
-            campaigns = await Campaign.get_by_review_status(conn, review_status, limit=limit, offset=offset)
-            # Count total matching campaigns
-            async with conn.cursor() as cursor:
-                await cursor.execute("""
-                    SELECT COUNT(*) as total FROM campaigns WHERE review_status = ?
-                """, (review_status,))
-                result = await cursor.fetchone()
-                total = result['total'] if result else 0
-        else:
-            # Get all campaigns with any review status (not null)
-            async with conn.cursor() as cursor:
-                await cursor.execute("""
-                    SELECT * FROM campaigns 
-                    WHERE review_status IS NOT NULL
-                    ORDER BY created_at DESC 
-                    LIMIT ? OFFSET ?
-                """, (limit, offset))
-                rows = await cursor.fetchall()
-                campaigns = [Campaign.from_row(dict(row)) for row in rows]
-                
-                await cursor.execute("SELECT COUNT(*) as total FROM campaigns WHERE review_status IS NOT NULL")
-                result = await cursor.fetchone()
-                total = result['total'] if result else 0
+        after = parse_cursor_param(cursor, offset)
+        
+        # Campaigns with the given review status, or with any review status (not null)
+        campaigns, next_cursor = split_page(
+            await Campaign.get_review_summaries(conn, review_status, limit=limit + 1, offset=offset, after=after),
+            limit
+        )
+        total, total_estimated = await repository_for(conn).count_campaigns(
+            review_status=review_status, any_review_status=True, mode=count
+        )
         
         # Convert to response format
         campaign_responses = [
@@ -135,9 +132,13 @@ async def list_campaigns_by_review_status(
             campaigns=campaign_responses,
             total=total,
             limit=limit,
-            offset=offset
+            offset=offset,
+            next_cursor=next_cursor,
+            total_estimated=total_estimated
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing campaigns by review status: {e}", exc_info=True)
         raise HTTPException(
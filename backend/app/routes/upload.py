@@ -8,7 +8,8 @@ import logging
 
 from app.models.schemas import CampaignCreateRequest, CampaignUploadResponse
 from app.services.file_service import process_uploaded_files, generate_s3_key
-from app.services.campaign_service import create_campaign, update_campaign_assets
+from app.services.campaign_service import create_campaign, get_campaign, update_campaign_assets
+from app.storage.unit_of_work import unit_of_work
 from app.services.s3_service import s3_service
 from app.utils.validators import (
     validate_image_file,
@@ -95,7 +96,6 @@ async def upload_campaign(
         
         if campaign_id:
             try:
-                from app.services.campaign_service import get_campaign
                 existing_campaign = await get_campaign(campaign_id, conn=conn)
                 if existing_campaign:
                     # Only allow updating rejected campaigns (for resubmission)
@@ -117,110 +117,110 @@ async def upload_campaign(
                 # If there's an error checking, proceed with creating new campaign
                 logger.warning("Proceeding with creating new campaign due to error checking existing one")
         
-        # Create new campaign if not updating
-        if not is_updating:
+        # Stage the INSERT/UPDATE and write it once, after the S3 uploads succeed;
+        # a failure part-way leaves no orphan draft row
+        async with unit_of_work(conn):
+            # Create new campaign if not updating
+            if not is_updating:
+                try:
+                    campaign = await create_campaign(
+                        campaign_name=campaign_name,
+                        advertiser_name=advertiser_name,
+                        conn=conn
+                    )
+                except Exception as e:
+                    logger.error(f"Error creating campaign: {e}", exc_info=True)
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to create campaign: {str(e)}"
+                    )
+            # Note: Campaign metadata (name, advertiser) will be updated via update_campaign_assets()
+        
+            # Upload logo to S3
             try:
-                campaign = await create_campaign(
-                    campaign_name=campaign_name,
-                    advertiser_name=advertiser_name,
-                    conn=conn
+                logo_s3_key = generate_s3_key(campaign.id, logo.filename, 'assets')
+                logo_file_obj = BytesIO(logo_content)
+                logo_s3_url = await s3_service.upload_file(
+                    logo_file_obj,
+                    logo_s3_key,
+                    content_type=logo.content_type or 'image/png'
                 )
             except Exception as e:
-                logger.error(f"Error creating campaign: {e}", exc_info=True)
+                logger.error(f"Error uploading logo to S3: {e}", exc_info=True)
                 raise HTTPException(
                     status_code=500,
-                    detail=f"Failed to create campaign: {str(e)}"
+                    detail=f"Failed to upload logo to S3: {str(e)}"
                 )
-        # Note: Campaign metadata (name, advertiser) will be updated via update_campaign_assets()
         
-        # Upload logo to S3
-        try:
-            logo_s3_key = generate_s3_key(campaign.id, logo.filename, 'assets')
-            logo_file_obj = BytesIO(logo_content)
-            logo_s3_url = await s3_service.upload_file(
-                logo_file_obj,
-                logo_s3_key,
-                content_type=logo.content_type or 'image/png'
-            )
-        except Exception as e:
-            logger.error(f"Error uploading logo to S3: {e}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to upload logo to S3: {str(e)}"
-            )
+            # Upload hero images to S3 and collect metadata
+            hero_s3_urls = []
+            hero_metadata = []
+            for idx, (hero_img, hero_content) in enumerate(hero_contents):
+                try:
+                    hero_s3_key = generate_s3_key(
+                        campaign.id,
+                        hero_img.filename or f"hero_{idx}.jpg",
+                        'assets'
+                    )
+                    hero_file_obj = BytesIO(hero_content)
+                    hero_s3_url = await s3_service.upload_file(
+                        hero_file_obj,
+                        hero_s3_key,
+                        content_type=hero_img.content_type or 'image/jpeg'
+                    )
+                    hero_s3_urls.append(hero_s3_url)
+                    hero_metadata.append({
+                        'filename': hero_img.filename,
+                        's3_key': hero_s3_key,
+                        's3_url': hero_s3_url,
+                        'content_type': hero_img.content_type or 'image/jpeg',
+                        'size': len(hero_content)
+                    })
+                except Exception as e:
+                    logger.error(f"Error uploading hero image {idx} to S3: {e}", exc_info=True)
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to upload hero image to S3: {str(e)}"
+                    )
+        
+            # Store asset metadata
+            asset_metadata = {
+                'logo': {
+                    'filename': logo.filename,
+                    's3_key': logo_s3_key,
+                    's3_url': logo_s3_url,
+                    'content_type': logo.content_type,
+                    'size': len(logo_content)
+                },
+                'hero_images': hero_metadata,
+                'content': {
+                    'subject_line': subject_line,
+                    'preview_text': preview_text,
+                    'body_copy': body_copy,
+                    'cta_text': cta_text,
+                    'cta_url': cta_url,
+                    'footer_text': footer_text
+                }
+            }
         
-        # Upload hero images to S3 and collect metadata
-        hero_s3_urls = []
-        hero_metadata = []
-        for idx, (hero_img, hero_content) in enumerate(hero_contents):
+            # Update campaign with S3 paths and reset status to 'uploaded' for resubmissions
             try:
-                hero_s3_key = generate_s3_key(
+                assets_s3_path = f"assets/{campaign.id}/"
+                campaign = await update_campaign_assets(
                     campaign.id,
-                    hero_img.filename or f"hero_{idx}.jpg",
-                    'assets'
-                )
-                hero_file_obj = BytesIO(hero_content)
-                hero_s3_url = await s3_service.upload_file(
-                    hero_file_obj,
-                    hero_s3_key,
-                    content_type=hero_img.content_type or 'image/jpeg'
+                    assets_s3_path,
+                    asset_metadata,
+                    campaign_name=campaign_name if is_updating else None,
+                    advertiser_name=advertiser_name if is_updating else None,
+                    conn=conn
                 )
-                hero_s3_urls.append(hero_s3_url)
-                hero_metadata.append({
-                    'filename': hero_img.filename,
-                    's3_key': hero_s3_key,
-                    's3_url': hero_s3_url,
-                    'content_type': hero_img.content_type or 'image/jpeg',
-                    'size': len(hero_content)
-                })
             except Exception as e:
-                logger.error(f"Error uploading hero image {idx} to S3: {e}", exc_info=True)
+                logger.error(f"Error updating campaign assets: {e}", exc_info=True)
                 raise HTTPException(
                     status_code=500,
-                    detail=f"Failed to upload hero image to S3: {str(e)}"
+                    detail=f"Failed to update campaign assets: {str(e)}"
                 )
         
-        # Store asset metadata
-        asset_metadata = {
-            'logo': {
-                'filename': logo.filename,
-                's3_key': logo_s3_key,
-                's3_url': logo_s3_url,
-                'content_type': logo.content_type,
-                'size': len(logo_content)
-            },
-            'hero_images': hero_metadata,
-            'content': {
-                'subject_line': subject_line,
-                'preview_text': preview_text,
-                'body_copy': body_copy,
-                'cta_text': cta_text,
-                'cta_url': cta_url,
-                'footer_text': footer_text
-            }
-        }
-        
-        # Update campaign with S3 paths and reset status to 'uploaded' for resubmissions
-        try:
-            assets_s3_path = f"assets/{campaign.id}/"
-            await update_campaign_assets(
-                campaign.id,
-                assets_s3_path,
-                asset_metadata,
-                campaign_name=campaign_name if is_updating else None,
-                advertiser_name=advertiser_name if is_updating else None,
-                conn=conn
-            )
-            # Refresh campaign to get updated status
-            from app.services.campaign_service import get_campaign
-            campaign = await get_campaign(campaign.id, conn=conn)
-        except Exception as e:
-            logger.error(f"Error updating campaign assets: {e}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to update campaign assets: {str(e)}"
-            )
-        
         action = "updated" if is_updating else "uploaded"
         logger.info(f"Successfully {action} campaign: {campaign.id}")
         
@@ -0,0 +1,339 @@
+"""
+Content-addressed cache of GPT text and vision results
+The key is a SHA-256 of (function, model, temperature, normalized inputs,
+prompt version), so reprocessing unchanged copy, resubmitting the same prompt
+or analyzing the same image bytes reuses the earlier answer instead of
+calling OpenAI. Bump a function's prompt version in ai_service whenever its
+prompt changes.
+
+Vision results also store a perceptual fingerprint of the image (dHash, mean
+colour and aspect ratio). On an exact miss, an entry of the same scope whose
+fingerprint is within a few dHash bits, and of a similar colour and shape, is
+reused, so a re-saved or re-compressed logo still hits; the answer is then
+also stored under the new image's own key.
+
+Entries live in their own SQLite file (AI_CACHE_PATH, shared by every worker
+and independent of DATABASE_URL), with the most recently used
+AI_CACHE_MEMORY_ENTRIES also kept in memory. When the file holds more than
+AI_CACHE_MAX_MB of results, the least recently used are evicted.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+import aiosqlite
+
+from app.config import settings
+from app.utils.image_utils import fingerprint_distance
+
+logger = logging.getLogger(__name__)
+
+# Route-level controls (`cache` query parameter)
+CACHE_USE = "use"  # return a cached result when there is one
+CACHE_BYPASS = "bypass"  # call OpenAI; neither read nor write the cache
+CACHE_REFRESH = "refresh"  # call OpenAI and replace the cached result
+CacheMode = Literal["use", "bypass", "refresh"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_cache (
+    key TEXT PRIMARY KEY,
+    function TEXT NOT NULL,
+    value TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_cache_last_used ON ai_cache(last_used_at);
+CREATE TABLE IF NOT EXISTS ai_cache_fingerprints (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_cache_fingerprints_scope ON ai_cache_fingerprints(scope);
+"""
+
+# (scope, fingerprint, max distance): entries of one scope (function, model,
+# prompt version, ...) within max distance (fingerprint_distance) are similar
+Similar = Tuple[str, int, int]
+
+
+def _normalize(value: Any) -> Any:
+    """Collapse whitespace in strings (recursively); empty strings count as missing"""
+    if isinstance(value, str):
+        return " ".join(value.split()) or None
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(function: str, model: str, temperature: float, inputs: Dict[str, Any], prompt_version: int) -> str:
+    """Content address of one GPT call"""
+    material = json.dumps(
+        [function, model, temperature, _normalize(inputs), prompt_version],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AICache:
+    """Two-tier (memory, then SQLite file) LRU cache of GPT JSON results"""
+
+    def __init__(self, path: str, max_bytes: int, memory_entries: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._open_lock = asyncio.Lock()
+        # key -> (serialized value, tokens)
+        self._memory: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        # Memory hits not yet written back as last_used_at (flushed before evicting)
+        self._touched: Dict[str, float] = {}
+        self._bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.refreshes = 0
+        self.stores = 0
+        self.evictions = 0
+        self.saved_tokens = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AI_CACHE_ENABLED and self.max_bytes > 0
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            async with self._open_lock:
+                if self._conn is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = await aiosqlite.connect(str(self.path))
+                    await conn.execute("PRAGMA journal_mode=WAL")
+                    await conn.execute("PRAGMA synchronous=NORMAL")
+                    await conn.execute(f"PRAGMA busy_timeout={settings.DB_BUSY_TIMEOUT_MS}")
+                    await conn.executescript(_SCHEMA)
+                    self._bytes = await self._stored_bytes(conn)
+                    self._conn = conn
+        return self._conn
+
+    @staticmethod
+    async def _stored_bytes(conn: aiosqlite.Connection) -> int:
+        async with conn.execute("SELECT COALESCE(SUM(size), 0) FROM ai_cache") as cursor:
+            return (await cursor.fetchone())[0]
+
+    def _remember(self, key: str, value: str, tokens: int):
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (value, tokens)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(
+        self,
+        key: str,
+        mode: str = CACHE_USE,
+        similar: Optional[Callable[[], Optional[Similar]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for `key` (a fresh copy), or None on a miss or when `mode` skips reads
+
+        Args:
+            similar: Called only on an exact miss (fingerprints cost an image
+                decode); the closest entry within its distance is returned and
+                also stored under `key`
+        """
+        if not self.enabled:
+            return None
+        if mode == CACHE_BYPASS:
+            self.bypasses += 1
+            return None
+        if mode == CACHE_REFRESH:
+            self.refreshes += 1
+            return None
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self._touched[key] = time.time()
+            self.memory_hits += 1
+        else:
+            similar_hit = False
+            try:
+                conn = await self._connection()
+                async with conn.execute("SELECT value, tokens FROM ai_cache WHERE key = ?", (key,)) as cursor:
+                    row = await cursor.fetchone()
+                if row is not None:
+                    await conn.execute("UPDATE ai_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                    await conn.commit()
+                elif similar is not None:
+                    target = similar()
+                    if target is not None:
+                        row = await self._alias_similar(conn, key, *target)
+                        similar_hit = row is not None
+            except Exception as e:
+                logger.warning(f"AI cache read failed: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            entry = (row[0], row[1])
+            self._remember(key, *entry)
+            if similar_hit:
+                self.similar_hits += 1
+            else:
+                self.disk_hits += 1
+
+        self.saved_tokens += entry[1]
+        return json.loads(entry[0])
+
+    async def _alias_similar(self, conn: aiosqlite.Connection, key: str, scope: str, fingerprint: int, max_distance: int):
+        """Copy the closest entry within `max_distance` to `key`; its (value, tokens), or None"""
+        async with conn.execute(
+            "SELECT f.key, f.fingerprint FROM ai_cache_fingerprints f JOIN ai_cache c ON c.key = f.key "
+            "WHERE f.scope = ?",
+            (scope,)
+        ) as cursor:
+            candidates = [(fingerprint_distance(fingerprint, int(stored, 16)), found) for found, stored in await cursor.fetchall()]
+        candidates = [candidate for candidate in candidates if candidate[0] <= max_distance]
+        if not candidates:
+            return None
+        _, found = min(candidates)
+        now = time.time()
+        await conn.execute(
+            "INSERT OR REPLACE INTO ai_cache (key, function, value, tokens, size, created_at, last_used_at) "
+            "SELECT ?, function, value, tokens, size, ?, ? FROM ai_cache WHERE key = ?",
+            (key, now, now, found)
+        )
+        await conn.execute(
+            "INSERT OR REPLACE INTO ai_cache_fingerprints (key, scope, fingerprint) VALUES (?, ?, ?)",
+            (key, scope, f"{fingerprint:x}")
+        )
+        await conn.commit()
+        async with conn.execute("SELECT value, tokens, size FROM ai_cache WHERE key = ?", (key,)) as cursor:
+            value, tokens, size = await cursor.fetchone()
+        self._bytes += size
+        return value, tokens
+
+    async def put(
+        self,
+        key: str,
+        function: str,
+        value: Dict[str, Any],
+        tokens: int,
+        mode: str = CACHE_USE,
+        fingerprint: Optional[Tuple[str, int]] = None
+    ):
+        """
+        Store a result that cost `tokens`; failures only log (the caller has its answer)
+
+        Args:
+            fingerprint: (scope, fingerprint) for similar lookups (see get)
+        """
+        if not self.enabled or mode == CACHE_BYPASS:
+            return
+        serialized = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        size = len(key) + len(serialized.encode("utf-8"))
+        now = time.time()
+        try:
+            conn = await self._connection()
+            async with conn.execute("SELECT size FROM ai_cache WHERE key = ?", (key,)) as cursor:
+                previous = await cursor.fetchone()
+            await conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, function, value, tokens, size, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, function, serialized, tokens, size, now, now)
+            )
+            if fingerprint is not None:
+                await conn.execute(
+                    "INSERT OR REPLACE INTO ai_cache_fingerprints (key, scope, fingerprint) VALUES (?, ?, ?)",
+                    (key, fingerprint[0], f"{fingerprint[1]:x}")
+                )
+            await conn.commit()
+            self._bytes += size - (previous[0] if previous else 0)
+            self._remember(key, serialized, tokens)
+            self.stores += 1
+            if self._bytes > self.max_bytes:
+                await self._evict(conn)
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {e}")
+
+    async def _flush_touched(self, conn: aiosqlite.Connection):
+        if self._touched:
+            await conn.executemany(
+                "UPDATE ai_cache SET last_used_at = ? WHERE key = ?",
+                [(used_at, key) for key, used_at in self._touched.items()]
+            )
+            await conn.commit()
+            self._touched.clear()
+
+    async def _evict(self, conn: aiosqlite.Connection):
+        """Drop least recently used entries until the file is back under 90% of the cap"""
+        await self._flush_touched(conn)
+        # Other workers write to the same file; start from its actual size
+        self._bytes = await self._stored_bytes(conn)
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        async with conn.execute("SELECT key, size FROM ai_cache ORDER BY last_used_at") as cursor:
+            async for key, size in cursor:
+                if self._bytes <= target:
+                    break
+                evicted.append(key)
+                self._bytes -= size
+        await conn.executemany("DELETE FROM ai_cache WHERE key = ?", [(key,) for key in evicted])
+        await conn.executemany("DELETE FROM ai_cache_fingerprints WHERE key = ?", [(key,) for key in evicted])
+        await conn.commit()
+        for key in evicted:
+            self._memory.pop(key, None)
+        self.evictions += len(evicted)
+
+    async def clear(self):
+        conn = await self._connection()
+        await conn.execute("DELETE FROM ai_cache")
+        await conn.execute("DELETE FROM ai_cache_fingerprints")
+        await conn.commit()
+        self._memory.clear()
+        self._touched.clear()
+        self._bytes = 0
+
+    async def close(self):
+        if self._conn is not None:
+            await self._flush_touched(self._conn)
+            await self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits + self.similar_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "refreshes": self.refreshes,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "saved_tokens": self.saved_tokens,
+            "hit_rate": round(hits / lookups, 4) if lookups else None
+        }
+
+
+ai_cache = AICache(
+    settings.AI_CACHE_PATH,
+    int(settings.AI_CACHE_MAX_MB * 1024 * 1024),
+    settings.AI_CACHE_MEMORY_ENTRIES
+)
@@ -0,0 +1,312 @@
+"""
+Global limiter for OpenAI calls
+Every chat completion from ai_service waits here for a request slot, an
+estimated token budget and a concurrency slot before it is sent, so bursts
+(bulk reprocessing, many uploads at once) queue instead of hitting 429s.
+
+- Requests and tokens per minute are token buckets (OPENAI_RPM_LIMIT,
+  OPENAI_TPM_LIMIT). A call's token cost is estimated up front from its
+  prompt, images and max_tokens, and corrected with the real usage afterwards.
+- Concurrency adapts (AIMD): it grows by about one per round of successful
+  calls up to OPENAI_MAX_CONCURRENCY, and halves on a 429, down to
+  OPENAI_MIN_CONCURRENCY. A 429's retry-after pauses every new call.
+- Rate limits, timeouts, connection errors and 5xx are retried up to
+  OPENAI_MAX_RETRIES times with full-jitter exponential backoff (at least
+  retry-after), each retry queueing again like a new call.
+
+Limits are per process: with several workers, divide the account limits
+between them. Queue depth, waits and the current concurrency are in
+/health/ai.
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+import openai
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Image token costs for gpt-4o: a low-detail image is a flat 85 tokens; a
+# high-detail one is 85 plus 170 per 512px tile (vision images are resized to
+# at most 1024px, so four tiles at most)
+_LOW_DETAIL_IMAGE_TOKENS = 85
+_HIGH_DETAIL_IMAGE_TOKENS = 85 + 170 * 4
+_RETRYABLE_STATUS = (408, 409, 429)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """Upper-bound token cost of a chat completion: prompt (~4 chars per token), images and max_tokens"""
+    chars = 0
+    tokens = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                chars += len(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                detail = part.get("image_url", {}).get("detail")
+                tokens += _LOW_DETAIL_IMAGE_TOKENS if detail == "low" else _HIGH_DETAIL_IMAGE_TOKENS
+        tokens += 4  # per-message overhead
+    return tokens + chars // 4 + (max_tokens or 0)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a rate-limit response's retry-after-ms or retry-after header"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return isinstance(error, openai.RateLimitError)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.RateLimitError):
+        # An exhausted quota does not recover by waiting
+        return getattr(error, "code", None) != "insufficient_quota"
+    if isinstance(error, openai.APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+class TokenBucket:
+    """`per_minute` units refilled continuously; a limit of 0 or less disables the bucket"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.capacity = float(max(per_minute, 0))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 when it is)"""
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        # A cost above the whole bucket waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.per_minute
+
+    def take(self, amount: float):
+        if self.enabled:
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or charge (negative) after the real cost is known"""
+        if self.enabled:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class OpenAIRateLimiter:
+    """Request, token and adaptive concurrency limits shared by every OpenAI call of the process"""
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.concurrency = float(self.max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Futures of queued callers, resolved when a slot is released
+        self._waiters: Set[asyncio.Future] = set()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.acquired = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.rate_limited = 0
+        self.retries = 0
+        self.estimated_tokens = 0
+        self.used_tokens = 0
+
+    def _delay(self, cost: int, now: float) -> float:
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(cost, now),
+            0.0
+        )
+
+    async def _acquire(self, cost: int):
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        started = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                has_slot = self.in_flight < int(self.concurrency)
+                delay = self._delay(cost, now)
+                if has_slot and delay <= 0:
+                    break
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.add(waiter)
+                try:
+                    # Woken early by a release; otherwise re-check when the buckets have refilled
+                    await asyncio.wait_for(waiter, delay if has_slot else None)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiters.discard(waiter)
+            # Checked and taken without an await in between, so no other caller interleaves
+            self.requests.take(1)
+            self.tokens.take(cost)
+            self.in_flight += 1
+        finally:
+            self.queued -= 1
+        wait_ms = (time.monotonic() - started) * 1000
+        self.acquired += 1
+        self.wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def _release(self):
+        # Synchronous, so it also completes for a caller that is being cancelled
+        self.in_flight -= 1
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _on_success(self, estimated: int, used: int):
+        # Additive increase: about +1 once every slot has completed a call
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+        if used:
+            self.tokens.adjust(estimated - used)
+            self.used_tokens += used
+
+    def _on_rate_limit(self, retry_after: Optional[float]):
+        self.rate_limited += 1
+        now = time.monotonic()
+        # Multiplicative decrease, once per burst of 429s from calls already in flight
+        if now - self._last_decrease >= 1.0:
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+            self._last_decrease = now
+            logger.warning(f"OpenAI rate limited; concurrency lowered to {int(self.concurrency)}")
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter, so callers that failed together do not retry together
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay += min(retry_after, self.backoff_max)
+        return delay
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+        used_tokens: Callable[[T], int] = lambda response: 0
+    ) -> T:
+        """
+        Send `request()` within the limits, retrying retryable failures
+
+        Args:
+            request: Makes one API call (called again for each retry)
+            estimated_tokens: Cost charged to the token bucket up front
+            used_tokens: Real cost from the response, to correct the estimate
+        """
+        self.estimated_tokens += estimated_tokens
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            try:
+                response = await request()
+            except Exception as error:
+                self._release()
+                retry_after = _retry_after(error)
+                if _is_rate_limit(error):
+                    self._on_rate_limit(retry_after)
+                if attempt >= self.max_retries or not _is_retryable(error):
+                    raise
+                delay = self._backoff(attempt, retry_after)
+                attempt += 1
+                self.retries += 1
+                logger.info(f"Retrying OpenAI call in {delay:.2f}s (attempt {attempt}/{self.max_retries}): {error}")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled mid-request (client disconnect, wait_for timeout)
+                self._release()
+                raise
+            self._release()
+            self._on_success(estimated_tokens, used_tokens(response))
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm_limit": self.requests.per_minute,
+            "tpm_limit": self.tokens.per_minute,
+            "concurrency_limit": int(self.concurrency),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "avg_wait_ms": round(self.wait_ms / self.acquired, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "estimated_tokens": self.estimated_tokens,
+            "used_tokens": self.used_tokens
+        }
+
+
+ai_rate_limiter = OpenAIRateLimiter(
+    rpm=settings.OPENAI_RPM_LIMIT,
+    tpm=settings.OPENAI_TPM_LIMIT,
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    min_concurrency=settings.OPENAI_MIN_CONCURRENCY,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    backoff_base=settings.OPENAI_RETRY_BASE_SECONDS,
+    backoff_max=settings.OPENAI_RETRY_MAX_SECONDS
+)
@@ -1,31 +1,170 @@
 """
 AI service for OpenAI GPT-4 and GPT-4 Vision integration
+Calls use AsyncOpenAI over one shared httpx connection pool (keep-alive,
+HTTP/2 when available), so in-flight calls hold sockets rather than threads
+and never queue ahead of S3 work in the default thread pool. Completions go
+through the global rate limiter (ai_rate_limiter), which also retries them.
 """
-from openai import OpenAI
+import hashlib
+import re
+import httpx
+from openai import AsyncOpenAI
 from typing import Dict, List, Optional, Any
 import json
 import asyncio
 import logging
+import time
 from app.config import settings
-from app.utils.image_utils import prepare_image_for_vision_api, convert_to_base64
+from app.services.ai_cache_service import CACHE_USE, ai_cache, cache_key
+from app.services.ai_rate_limiter import ai_rate_limiter, estimate_tokens
+from app.utils.image_utils import prepare_image_for_vision_api, convert_to_base64, image_fingerprint, is_flat_fingerprint
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+except ImportError:  # pragma: no cover - h2 is optional
+    h2 = None
 
 logger = logging.getLogger(__name__)
 
 # Lazy initialization of OpenAI client to avoid import-time errors
-_client = None
+_client: Optional[AsyncOpenAI] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_http2 = False
+
+# Prompt versions, part of the AI cache key: bump one whenever its prompt or
+# response handling changes so earlier cached results are no longer used
+TEXT_PROMPT_VERSION = 1
+TEXT_WITH_HISTORY_PROMPT_VERSION = 1
+GENERATE_PROMPT_VERSION = 1
+VISION_PROMPT_VERSION = 2  # 2: drops analyses shared between flat images by dHash alone
+VISION_BATCH_PROMPT_VERSION = 1
+
+# Calls per kind ("text", "vision", "vision_batch", "generate") for /health/ai
+_call_stats: Dict[str, Dict[str, float]] = {}
+
 
-def get_openai_client():
-    """Get or create OpenAI client instance"""
-    global _client
+def _build_http_client() -> httpx.AsyncClient:
+    """Connection pool shared by every OpenAI call"""
+    global _http2
+    _http2 = settings.OPENAI_HTTP2 and h2 is not None
+    if settings.OPENAI_HTTP2 and not _http2:
+        logger.warning("OPENAI_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(
+        http2=_http2,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(settings.OPENAI_TEXT_TIMEOUT_SECONDS, connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS)
+    )
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get or create the AsyncOpenAI client instance"""
+    global _client, _http_client
     if _client is None:
-        _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        _http_client = _build_http_client()
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=_http_client,
+            # Retries go through ai_rate_limiter, so they wait for the limits too
+            max_retries=0
+        )
     return _client
 
 
+async def warm_openai_client():
+    """
+    Open OPENAI_WARM_CONNECTIONS pooled connections before the first request
+
+    Lists models (a cheap authenticated call) concurrently, so TLS handshakes
+    happen at startup; failures are logged and leave the pool to connect lazily.
+    """
+    count = settings.OPENAI_WARM_CONNECTIONS
+    if count <= 0:
+        return
+    client = get_openai_client().with_options(max_retries=0)
+    if _http2:
+        count = 1  # one HTTP/2 connection multiplexes every call
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(client.models.list(timeout=settings.OPENAI_CONNECT_TIMEOUT_SECONDS * 2) for _ in range(count)),
+        return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        logger.warning(f"OpenAI connection warm-up: {len(errors)}/{count} failed ({errors[0]})")
+    else:
+        logger.info(f"OpenAI connection pool warmed ({count} in {(time.monotonic() - started) * 1000:.0f}ms)")
+
+
+async def close_openai_client():
+    """Close the shared connection pool (on shutdown)"""
+    global _client, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _client = None
+    _http_client = None
+
+
+async def _create_completion(kind: str, timeout: float, **kwargs):
+    """chat.completions.create within the rate limits, with a per-call timeout and counters for `kind`"""
+    stats = _call_stats.setdefault(
+        kind, {"calls": 0, "in_flight": 0, "peak_in_flight": 0, "errors": 0, "total_ms": 0.0, "tokens": 0}
+    )
+    stats["calls"] += 1
+    stats["in_flight"] += 1
+    stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+    started = time.monotonic()
+    try:
+        response = await ai_rate_limiter.call(
+            lambda: get_openai_client().chat.completions.create(timeout=timeout, **kwargs),
+            estimate_tokens(kwargs["messages"], kwargs.get("max_tokens")),
+            _tokens
+        )
+        stats["tokens"] += _tokens(response)
+        return response
+    except Exception:
+        stats["errors"] += 1
+        raise
+    finally:
+        stats["in_flight"] -= 1
+        stats["total_ms"] += (time.monotonic() - started) * 1000
+
+
+def _tokens(response) -> int:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", 0) or 0
+
+
+def ai_client_stats() -> Dict[str, Any]:
+    """Connection pool settings, per-kind call counters, rate limiter and AI cache counters for monitoring"""
+    return {
+        "http2": _http2,
+        "max_connections": settings.OPENAI_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        "calls": {
+            kind: {
+                "calls": stats["calls"],
+                "in_flight": stats["in_flight"],
+                "peak_in_flight": stats["peak_in_flight"],
+                "errors": stats["errors"],
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0,
+                "tokens": stats["tokens"]
+            }
+            for kind, stats in sorted(_call_stats.items())
+        },
+        "limiter": ai_rate_limiter.stats(),
+        "cache": ai_cache.stats()
+    }
+
+
 async def process_text_content(
     subject_line: Optional[str],
     body_copy: Optional[str],
-    cta_text: Optional[str] = None
+    cta_text: Optional[str] = None,
+    cache_mode: str = CACHE_USE
 ) -> Dict:
     """
     Process text content with GPT-4 to generate optimized email content
@@ -34,10 +173,19 @@ async def process_text_content(
         subject_line: Original subject line
         body_copy: Original body copy
         cta_text: Original CTA text
+        cache_mode: AI cache control (use, bypass or refresh)
         
     Returns:
         Dictionary with optimized content
     """
+    key = cache_key(
+        "process_text_content", "gpt-4o", 0.7,
+        {"subject_line": subject_line, "body_copy": body_copy, "cta_text": cta_text}, TEXT_PROMPT_VERSION
+    )
+    cached = await ai_cache.get(key, cache_mode)
+    if cached is not None:
+        return cached
+    
     try:
         prompt = f"""You are an email marketing expert. Extract and optimize the following campaign content:
 
@@ -65,11 +213,9 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
   "suggestions": "brief improvement suggestions"
 }}"""
 
-        # Run in thread pool since OpenAI client is synchronous
         # Using gpt-4o for better performance and cost
-        client = get_openai_client()
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
+        response = await _create_completion(
+            "text", settings.OPENAI_TEXT_TIMEOUT_SECONDS,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an email marketing expert. Always respond with valid JSON only."},
@@ -82,6 +228,7 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
         
         content = response.choices[0].message.content
         result = json.loads(content)
+        await ai_cache.put(key, "process_text_content", result, _tokens(response), cache_mode)
         
         logger.info("Text content processed successfully")
         return result
@@ -102,23 +249,88 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
         raise
 
 
-async def analyze_image(image_bytes: bytes, image_type: str = "image") -> Dict:
+class _VisionCacheEntry:
     """
-    Analyze image with GPT-4 Vision to generate alt text and assessment
+    AI cache key, fingerprint scope and (computed on demand) fingerprint of one image analysis
     
-    Args:
-        image_bytes: Image as bytes
-        image_type: Type of image (logo, hero, etc.)
-        
-    Returns:
-        Dictionary with analysis results
+    Batched analyses (another prompt, low detail) are cached apart from
+    per-image ones, so neither mode serves the other's answers.
     """
+    
+    def __init__(self, image_bytes: bytes, image_type: str, batched: bool = False):
+        self.image_bytes = image_bytes
+        self.image_type = image_type
+        self.batched = batched
+        if batched:
+            self.function, version = "analyze_image_batch", VISION_BATCH_PROMPT_VERSION
+        else:
+            self.function, version = "analyze_image", VISION_PROMPT_VERSION
+        # "hero image 2" -> "hero image": the position does not change the answer
+        category = re.sub(r"\s*\d+$", "", image_type)
+        self.scope = cache_key(self.function, "gpt-4o", None, {"image_type": category}, version)
+        self.key = cache_key(
+            self.function, "gpt-4o", None,
+            {"image_type": category, "sha256": hashlib.sha256(image_bytes).hexdigest()}, version
+        )
+        self._fingerprint: Optional[int] = None
+        self._hashed = False
+    
+    @property
+    def fingerprint(self) -> Optional[int]:
+        if not self._hashed:
+            self._fingerprint = image_fingerprint(self.image_bytes)
+            self._hashed = True
+        return self._fingerprint
+    
+    def _similar(self):
+        # Flat images (solid colours, faint gradients) all have nearly the same
+        # dHash, so they are only ever matched exactly
+        distance = settings.AI_VISION_DHASH_DISTANCE
+        if self.fingerprint is None or is_flat_fingerprint(self.fingerprint, distance):
+            return None
+        return self.scope, self.fingerprint, distance
+    
+    async def get(self, cache_mode: str) -> Optional[Dict]:
+        return await ai_cache.get(self.key, cache_mode, similar=self._similar)
+    
+    async def put(self, result: Dict, tokens: int, cache_mode: str):
+        similar = self._similar()
+        fingerprint = similar[:2] if similar is not None else None
+        await ai_cache.put(self.key, self.function, result, tokens, cache_mode, fingerprint=fingerprint)
+
+
+def _fallback_analysis(image_type: str) -> Dict:
+    return {
+        "alt_text": f"{image_type.capitalize()} image",
+        "contains_text": False,
+        "quality": "fair",
+        "crop_suggestion": None
+    }
+
+
+def _parse_json_object(content: str):
     try:
-        # Prepare image for API (downscale to 512px max)
-        prepared_image = prepare_image_for_vision_api(image_bytes)
-        base64_image = convert_to_base64(prepared_image)
-        
-        prompt = f"""Analyze this {image_type} for use in an email marketing campaign.
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # Try to extract JSON from markdown code blocks
+        json_match = re.search(r'\{[^}]+\}', content, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        raise
+
+
+def _image_part(image_bytes: bytes, detail: Optional[str] = None) -> Dict:
+    # Prepare image for API (downscale to 512px max)
+    base64_image = convert_to_base64(prepare_image_for_vision_api(image_bytes))
+    image_url = {"url": f"data:image/jpeg;base64,{base64_image}"}
+    if detail:
+        image_url["detail"] = detail
+    return {"type": "image_url", "image_url": image_url}
+
+
+async def _analyze_uncached(image_bytes: bytes, image_type: str):
+    """One GPT-4 Vision call for one image; (result, tokens used)"""
+    prompt = f"""Analyze this {image_type} for use in an email marketing campaign.
 
 TASKS:
 1. Generate descriptive alt text (max 125 chars, be specific about what's in the image)
@@ -134,129 +346,211 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
   "crop_suggestion": null
 }}"""
 
-        # Run in thread pool
-        # Using gpt-4o which supports vision
-        client = get_openai_client()
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=300
+    # Using gpt-4o which supports vision
+    response = await _create_completion(
+        "vision", settings.OPENAI_VISION_TIMEOUT_SECONDS,
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    _image_part(image_bytes)
+                ]
+            }
+        ],
+        max_tokens=300
+    )
+    return _parse_json_object(response.choices[0].message.content), _tokens(response)
+
+
+async def _analyze_batch(entries: List[_VisionCacheEntry]):
+    """
+    One GPT-4 Vision call for several images (low detail)
+    
+    Returns:
+        [(result, tokens share)] in the order of `entries`, or None when its
+        output is not one analysis per image (API errors are raised)
+    """
+    listing = "\n".join(f"Image {idx}: {entry.image_type}" for idx, entry in enumerate(entries, 1))
+    prompt = f"""Analyze these {len(entries)} images for use in an email marketing campaign. They are attached in this order:
+{listing}
+
+TASKS (for each image):
+1. Generate descriptive alt text (max 125 chars, be specific about what's in the image)
+2. Identify if image contains text (true/false)
+3. Assess image quality (good/fair/poor)
+4. Suggest cropping if needed (null if no cropping needed, or brief description)
+
+OUTPUT FORMAT: JSON only, no markdown, no code blocks; "images" has one entry per image, in order
+{{
+  "images": [
+    {{
+      "alt_text": "descriptive alt text",
+      "contains_text": true,
+      "quality": "good",
+      "crop_suggestion": null
+    }}
+  ]
+}}"""
+    response = await _create_completion(
+        "vision_batch", settings.OPENAI_VISION_TIMEOUT_SECONDS,
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": prompt}] + [
+                    _image_part(entry.image_bytes, detail="low") for entry in entries
+                ]
+            }
+        ],
+        max_tokens=150 * len(entries) + 100,
+        response_format={"type": "json_object"}
+    )
+    try:
+        analyses = json.loads(response.choices[0].message.content or "").get("images")
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Batched image analysis did not parse, analyzing one by one: {e}")
+        return None
+    
+    if (
+        not isinstance(analyses, list) or len(analyses) != len(entries)
+        or not all(isinstance(analysis, dict) and analysis.get("alt_text") for analysis in analyses)
+    ):
+        logger.warning(
+            f"Batched image analysis returned {len(analyses) if isinstance(analyses, list) else 'no'} "
+            f"analyses for {len(entries)} images, analyzing one by one"
         )
-        
-        content = response.choices[0].message.content
-        
-        # Try to extract JSON from response
-        try:
-            result = json.loads(content)
-        except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks
-            import re
-            json_match = re.search(r'\{[^}]+\}', content, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                raise
-        
-        logger.info(f"Image analysis completed for {image_type}")
+        return None
+    tokens = _tokens(response) // len(entries)
+    return [(analysis, tokens) for analysis in analyses]
+
+
+async def _analyze_and_store(entry: _VisionCacheEntry, cache_mode: str) -> Dict:
+    try:
+        result, tokens = await _analyze_uncached(entry.image_bytes, entry.image_type)
+        await entry.put(result, tokens, cache_mode)
+        logger.info(f"Image analysis completed for {entry.image_type}")
         return result
-        
     except Exception as e:
         logger.error(f"Error analyzing image: {e}")
         # Fallback alt text
-        return {
-            "alt_text": f"{image_type.capitalize()} image",
-            "contains_text": False,
-            "quality": "fair",
-            "crop_suggestion": None
-        }
+        return _fallback_analysis(entry.image_type)
+
+
+async def analyze_image(image_bytes: bytes, image_type: str = "image", cache_mode: str = CACHE_USE) -> Dict:
+    """
+    Analyze image with GPT-4 Vision to generate alt text and assessment
+    
+    Results are cached by the SHA-256 of the image bytes, falling back to a
+    perceptually similar image (dHash within AI_VISION_DHASH_DISTANCE bits).
+    
+    Args:
+        image_bytes: Image as bytes
+        image_type: Type of image (logo, hero, etc.)
+        cache_mode: AI cache control (use, bypass or refresh)
+        
+    Returns:
+        Dictionary with analysis results
+    """
+    entry = _VisionCacheEntry(image_bytes, image_type)
+    cached = await entry.get(cache_mode)
+    if cached is not None:
+        return cached
+    return await _analyze_and_store(entry, cache_mode)
 
 
 async def process_images_parallel(
     logo_bytes: Optional[bytes],
-    hero_images_bytes: List[bytes]
+    hero_images_bytes: List[bytes],
+    cache_mode: str = CACHE_USE,
+    batch: Optional[bool] = None
 ) -> Dict:
     """
     Process multiple images in parallel with GPT-4 Vision
     
+    Only images missing from the AI cache reach the API, and an image that
+    appears more than once is analyzed once. With AI_VISION_BATCH (or
+    `batch`), two or more missing images are analyzed in one low-detail
+    request (cached apart from per-image analyses); if its output does not
+    parse into one analysis per image, each image is analyzed on its own. If
+    the request itself fails (e.g. still rate limited after retries), the
+    images get fallback analyses rather than one more request each.
+    
     Args:
         logo_bytes: Logo image bytes
         hero_images_bytes: List of hero image bytes
+        cache_mode: AI cache control (use, bypass or refresh)
+        batch: Override AI_VISION_BATCH
         
     Returns:
         Dictionary with analysis results for all images
     """
-    tasks = []
-    
-    # Add logo analysis if present
+    batched = settings.AI_VISION_BATCH if batch is None else batch
+    slots: List[_VisionCacheEntry] = []
     if logo_bytes:
-        tasks.append(analyze_image(logo_bytes, "logo"))
-    
-    # Add hero image analyses
+        slots.append(_VisionCacheEntry(logo_bytes, "logo", batched))
     for idx, hero_bytes in enumerate(hero_images_bytes):
-        tasks.append(analyze_image(hero_bytes, f"hero image {idx + 1}"))
+        slots.append(_VisionCacheEntry(hero_bytes, f"hero image {idx + 1}", batched))
+    if not slots:
+        return {"logo": None, "hero_images": []}
     
-    # Process all images in parallel
-    if tasks:
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle results
-        logo_analysis = None
-        hero_analyses = []
-        
-        result_idx = 0
-        if logo_bytes:
-            if isinstance(results[result_idx], Exception):
-                logger.error(f"Logo analysis failed: {results[result_idx]}")
-                logo_analysis = {
-                    "alt_text": "Company logo",
-                    "contains_text": False,
-                    "quality": "fair",
-                    "crop_suggestion": None
-                }
-            else:
-                logo_analysis = results[result_idx]
-            result_idx += 1
-        
-        for idx in range(len(hero_images_bytes)):
-            if isinstance(results[result_idx], Exception):
-                logger.error(f"Hero image {idx + 1} analysis failed: {results[result_idx]}")
-                hero_analyses.append({
-                    "alt_text": f"Hero image {idx + 1}",
-                    "contains_text": False,
-                    "quality": "fair",
-                    "crop_suggestion": None
-                })
-            else:
-                hero_analyses.append(results[result_idx])
-            result_idx += 1
-        
-        return {
-            "logo": logo_analysis,
-            "hero_images": hero_analyses
-        }
+    unique: Dict[str, _VisionCacheEntry] = {}
+    for entry in slots:
+        unique.setdefault(entry.key, entry)
+    cached = await asyncio.gather(*(entry.get(cache_mode) for entry in unique.values()))
+    analyses: Dict[str, Any] = {key: result for key, result in zip(unique, cached) if result is not None}
+    misses = [entry for key, entry in unique.items() if key not in analyses]
     
-    return {"logo": None, "hero_images": []}
+    if batched and len(misses) > 1:
+        try:
+            answers = await _analyze_batch(misses)
+        except Exception as e:
+            # Already retried by the rate limiter: a request per image would
+            # only hit the same limit, so these get fallback analyses
+            analyses.update((entry.key, e) for entry in misses)
+            misses = []
+        else:
+            if answers is not None:
+                for entry, (result, tokens) in zip(misses, answers):
+                    await entry.put(result, tokens, cache_mode)
+                    analyses[entry.key] = result
+                misses = []
+    
+    # Process the remaining images in parallel (per-image analyses, also
+    # when a batch did not parse)
+    results = await asyncio.gather(
+        *(analyze_image(entry.image_bytes, entry.image_type, cache_mode) if entry.batched
+          else _analyze_and_store(entry, cache_mode) for entry in misses),
+        return_exceptions=True
+    )
+    analyses.update(zip((entry.key for entry in misses), results))
+    
+    # Handle results
+    logo_analysis = None
+    hero_analyses = []
+    for entry in slots:
+        result = analyses[entry.key]
+        if isinstance(result, Exception):
+            logger.error(f"{entry.image_type.capitalize()} analysis failed: {result}")
+            result = _fallback_analysis(entry.image_type)
+        if entry.image_type == "logo":
+            logo_analysis = result
+        else:
+            hero_analyses.append(result)
+    
+    return {
+        "logo": logo_analysis,
+        "hero_images": hero_analyses
+    }
 
 
 async def process_text_content_with_history(
     subject_line: Optional[str],
     body_copy: Optional[str],
     cta_text: Optional[str] = None,
-    historical_examples: Optional[List[Dict[str, Any]]] = None
+    historical_examples: Optional[List[Dict[str, Any]]] = None,
+    cache_mode: str = CACHE_USE
 ) -> Dict:
     """
     Process text content with GPT-4 using historical high-performing examples as context
@@ -266,10 +560,25 @@ async def process_text_content_with_history(
         body_copy: Original body copy
         cta_text: Original CTA text
         historical_examples: List of high-performing campaign examples
+        cache_mode: AI cache control (use, bypass or refresh)
         
     Returns:
         Dictionary with optimized content aligned with proven patterns
     """
+    # Only the fields the prompt uses, so unrelated example data does not change the key
+    examples = [
+        {field: example.get(field) for field in ("performance_score", "subject_line", "preview_text", "cta_text")}
+        for example in (historical_examples or [])[:5]
+    ]
+    key = cache_key(
+        "process_text_content_with_history", "gpt-4o", 0.7,
+        {"subject_line": subject_line, "body_copy": body_copy, "cta_text": cta_text, "examples": examples},
+        TEXT_WITH_HISTORY_PROMPT_VERSION
+    )
+    cached = await ai_cache.get(key, cache_mode)
+    if cached is not None:
+        return cached
+    
     try:
         # Build historical context if available
         historical_context = ""
@@ -311,10 +620,8 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
   "suggestions": "brief improvement suggestions"
 }}"""
 
-        # Run in thread pool since OpenAI client is synchronous
-        client = get_openai_client()
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
+        response = await _create_completion(
+            "text", settings.OPENAI_TEXT_TIMEOUT_SECONDS,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an email marketing expert. Always respond with valid JSON only. Use historical examples as inspiration but create fresh, unique content."},
@@ -327,6 +634,7 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
         
         content = response.choices[0].message.content
         result = json.loads(content)
+        await ai_cache.put(key, "process_text_content_with_history", result, _tokens(response), cache_mode)
         
         logger.info("Text content processed with historical context successfully")
         return result
@@ -347,12 +655,13 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
         raise
 
 
-async def generate_campaign_from_prompt(prompt: str) -> Dict[str, Any]:
+async def generate_campaign_from_prompt(prompt: str, cache_mode: str = CACHE_USE) -> Dict[str, Any]:
     """
     Generate campaign data from a natural language prompt using GPT-4o-mini
     
     Args:
         prompt: Natural language description of the campaign
+        cache_mode: AI cache control (use, bypass or refresh)
         
     Returns:
         Dictionary with extracted campaign fields:
@@ -365,6 +674,11 @@ async def generate_campaign_from_prompt(prompt: str) -> Dict[str, Any]:
         - cta_url
         - footer_text
     """
+    key = cache_key("generate_campaign_from_prompt", "gpt-4o-mini", 0.7, {"prompt": prompt}, GENERATE_PROMPT_VERSION)
+    cached = await ai_cache.get(key, cache_mode)
+    if cached is not None:
+        return cached
+    
     try:
         system_prompt = """You are an email marketing expert. Extract campaign information from user prompts and return structured JSON data. Always respond with valid JSON only, no markdown, no code blocks."""
         
@@ -398,11 +712,9 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
   "footer_text": "..."
 }}"""
 
-        # Run in thread pool since OpenAI client is synchronous
         # Using gpt-4o-mini for faster response and lower cost
-        client = get_openai_client()
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
+        response = await _create_completion(
+            "generate", settings.OPENAI_TEXT_TIMEOUT_SECONDS,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -442,6 +754,7 @@ OUTPUT FORMAT: JSON only, no markdown, no code blocks
         # Ensure footer_text exists (optional field)
         if "footer_text" not in result:
             result["footer_text"] = ""
+        await ai_cache.put(key, "generate_campaign_from_prompt", result, _tokens(response), cache_mode)
         
         logger.info(f"Campaign generated from prompt successfully. Campaign: {result.get('campaign_name', 'Unknown')}")
         return result
@@ -5,6 +5,8 @@ from typing import Dict, List, Optional, Any
 import logging
 from datetime import datetime
 from app.models.campaign import Campaign
+from app.models.campaign_parts import PART_CONTENT, PART_OPTIMIZED_IMAGES
+from app.storage.repository import repository_for
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +24,10 @@ async def aggregate_campaign_performance(conn, min_campaigns: int = 5) -> Dict[s
     """
     try:
         # Get all approved campaigns with performance data
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                WHERE status = 'approved' 
-                AND performance_score IS NOT NULL
-                AND performance_score > 0
-                ORDER BY performance_score DESC
-            """)
-            rows = await cursor.fetchall()
-        
-        campaigns = [Campaign.from_row(dict(row)) for row in rows]
+        # Only content and optimized image URLs are needed, never the full AI blob
+        campaigns = await repository_for(conn).get_performance_summaries(
+            parts=(PART_CONTENT, PART_OPTIMIZED_IMAGES)
+        )
         
         if len(campaigns) < min_campaigns:
             logger.info(f"Insufficient data for analytics: {len(campaigns)} campaigns (need {min_campaigns})")
@@ -0,0 +1,181 @@
+"""
+Archive service for moving finished campaigns out of the hot table
+Runs as a background task that archives campaigns in batches (see
+app.models.campaign_archive); get_campaign falls through to the archive
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from app.config import settings
+from app.database import db
+from app.services.campaign_service import campaign_cache
+from app.services.s3_service import s3_service
+from app.storage.repository import repository_for
+
+logger = logging.getLogger(__name__)
+
+# Proofs copied to the archive prefix at the same time
+_PROOF_CONCURRENCY = 4
+
+
+def _s3_key(s3_url: str) -> str:
+    """Object key of an s3://bucket/key URL (plain keys are returned as-is)"""
+    if s3_url.startswith('s3://'):
+        return s3_url[len('s3://'):].split('/', 1)[1]
+    return s3_url
+
+
+class ArchiveService:
+    """Service for archiving finished campaigns"""
+
+    def __init__(self):
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.check_interval = settings.ARCHIVE_INTERVAL_SECONDS
+        self.batch_size = settings.ARCHIVE_BATCH_SIZE
+        self.runs = 0
+        self.archived = 0
+        self.proofs_archived = 0
+        self.last_run_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        """Start the archive background task"""
+        if self.running:
+            logger.warning("Archive service is already running")
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._run_archiver())
+        logger.info("Archive service started")
+
+    async def stop(self):
+        """Stop the archive background task"""
+        if not self.running:
+            return
+
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Archive service stopped")
+
+    async def _run_archiver(self):
+        """Main archive loop"""
+        while self.running:
+            try:
+                # Ensure database connection
+                if not hasattr(db, 'conn') or db.conn is None:
+                    await db.connect()
+                await self.run_once(db.conn)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Error in archive loop: {e}", exc_info=True)
+
+            # Wait before next run
+            await asyncio.sleep(self.check_interval)
+
+    async def run_once(self, conn) -> int:
+        """
+        Archive every campaign currently due, one batch at a time
+
+        Returns:
+            Number of campaigns archived
+        """
+        total = 0
+        while True:
+            selected, moved = await self.archive_batch(conn)
+            total += moved
+            if selected < self.batch_size:
+                break
+        self.runs += 1
+        self.last_run_at = datetime.utcnow().isoformat()
+        if total:
+            logger.info(f"Archived {total} campaigns")
+        return total
+
+    async def archive_batch(self, conn) -> Tuple[int, int]:
+        """
+        Archive the oldest batch of due campaigns
+
+        Proofs are copied to the archive prefix first, then the rows move in one
+        transaction, and only then are the original proof objects deleted. A
+        campaign updated in the meantime stays in the hot table (and its proof
+        copy is discarded); a proof that cannot be copied stays where it is.
+
+        Returns:
+            (campaigns selected, campaigns archived); fewer selected than the
+            batch size means nothing else is due
+        """
+        now = datetime.utcnow()
+        terminal_before = (now - timedelta(days=settings.ARCHIVE_TERMINAL_AFTER_DAYS)).isoformat()
+        stale_before = None
+        if settings.ARCHIVE_MAX_AGE_DAYS > 0:
+            stale_before = (now - timedelta(days=settings.ARCHIVE_MAX_AGE_DAYS)).isoformat()
+
+        repository = repository_for(conn)
+        candidates = await repository.archive_candidates(terminal_before, stale_before, self.batch_size)
+        if not candidates:
+            return 0, 0
+
+        semaphore = asyncio.Semaphore(_PROOF_CONCURRENCY)
+
+        async def archive_proof(candidate: Tuple) -> Optional[str]:
+            async with semaphore:
+                return await self._archive_proof(*candidate)
+
+        proofs = await asyncio.gather(*(archive_proof(candidate) for candidate in candidates))
+        moved = set(await repository.archive(
+            [(campaign_id, updated_at, proof) for (campaign_id, updated_at, _), proof in zip(candidates, proofs)],
+            now.isoformat()
+        ))
+
+        for (campaign_id, _, original), proof in zip(candidates, proofs):
+            if campaign_id in moved:
+                campaign_cache.invalidate(campaign_id)
+            if proof is None:
+                continue
+            if campaign_id in moved:
+                self.proofs_archived += 1
+                await s3_service.delete_file(_s3_key(original))
+            else:
+                await s3_service.delete_file(_s3_key(proof))
+
+        self.archived += len(moved)
+        return len(candidates), len(moved)
+
+    async def _archive_proof(self, campaign_id: str, updated_at: Optional[str], proof_s3_path: Optional[str]):
+        """Compressed archive copy of a campaign's proof, or None to keep the proof as it is"""
+        if not proof_s3_path:
+            return None
+        key = _s3_key(proof_s3_path)
+        prefix = settings.ARCHIVE_PROOF_PREFIX.strip('/')
+        if key.startswith(f"{prefix}/"):
+            return None
+        try:
+            return await s3_service.archive_file(
+                key, f"{prefix}/{key}", storage_class=settings.ARCHIVE_PROOF_STORAGE_CLASS
+            )
+        except Exception as e:
+            logger.warning(f"Keeping proof of archived campaign {campaign_id} in place: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Archive job counters for monitoring"""
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "archived": self.archived,
+            "proofs_archived": self.proofs_archived,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error
+        }
+
+
+# Global archive service instance
+archive_service = ArchiveService()
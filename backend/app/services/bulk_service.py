@@ -0,0 +1,174 @@
+"""
+Bulk campaign operations
+Applies many approve/reject/schedule/review decisions in one request. The
+campaigns are loaded in one query, approvals render and upload their final
+HTML with bounded concurrency, and every resulting change is written in one
+transaction through a unit of work (same-column updates go out as a single
+executemany batch). Each operation succeeds or fails on its own.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from app.config import settings
+from app.models.campaign import Campaign
+from app.models.schemas import BulkOperation
+from app.services.template_service import publish_final_html
+from app.services.test_data_generator import generate_single_campaign_performance
+from app.storage.unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+class BulkOperationError(Exception):
+    """An operation that cannot be applied to its campaign"""
+    pass
+
+
+def check_operation(operation: BulkOperation, campaign: Campaign):
+    """
+    Apply the rules of the single-campaign endpoints to one operation
+
+    Raises:
+        BulkOperationError: If the operation is not allowed for the campaign
+    """
+    if operation.action in ('approve', 'reject'):
+        if campaign.status == 'approved':
+            raise BulkOperationError(
+                "Campaign has already been approved and cannot be approved or rejected again."
+            )
+        if operation.action == 'approve':
+            ai_results = campaign.ai_processing_data.get('ai_results') if campaign.ai_processing_data else None
+            if not ai_results:
+                raise BulkOperationError("Campaign must be processed before approval")
+
+    elif operation.action == 'schedule':
+        if campaign.status != 'approved':
+            raise BulkOperationError(
+                f"Cannot schedule campaign with status '{campaign.status}'. Only approved campaigns can be scheduled."
+            )
+        try:
+            scheduled_datetime = datetime.fromisoformat((operation.scheduled_at or '').replace('Z', '+00:00'))
+        except ValueError:
+            raise BulkOperationError("Invalid datetime format. Use ISO 8601 format (e.g., '2025-12-01T10:00:00Z')")
+        if scheduled_datetime.replace(tzinfo=None) <= datetime.utcnow():
+            raise BulkOperationError("Scheduled time must be in the future")
+
+    elif operation.action == 'review':
+        if not operation.review_status:
+            raise BulkOperationError("review_status is required for review operations")
+
+
+async def _load_campaigns(conn, campaign_ids: Sequence[str]) -> Dict[str, Campaign]:
+    """Campaigns by ID: one query for the hot table, then the archive for the rest"""
+    campaigns = {campaign.id: campaign for campaign in await Campaign.get_by_ids(conn, campaign_ids)}
+    for campaign_id in campaign_ids:
+        if campaign_id not in campaigns:
+            archived = await Campaign.get_archived(conn, campaign_id)
+            if archived is not None:
+                campaigns[campaign_id] = archived
+    return campaigns
+
+
+async def _apply(conn, operation: BulkOperation, campaign: Campaign, html_s3_url: Optional[str]):
+    """Stage the changes of one operation (written when the unit of work flushes)"""
+    if operation.action == 'approve':
+        await campaign.update(
+            conn,
+            status='approved',
+            approved_at=datetime.utcnow().isoformat(),
+            html_s3_path=html_s3_url,
+            feedback=operation.feedback
+        )
+        # Same as the single approve endpoint; staged with the approval, and a
+        # failure here must not undo the approval (its HTML is already published)
+        try:
+            await generate_single_campaign_performance(conn, campaign)
+        except Exception as e:
+            logger.warning(f"Failed to generate performance stats for campaign {campaign.id}: {e}", exc_info=True)
+    elif operation.action == 'reject':
+        await campaign.update(conn, status='rejected', feedback=operation.feedback)
+    elif operation.action == 'schedule':
+        await campaign.update(conn, scheduled_at=operation.scheduled_at, scheduling_status='scheduled')
+    else:
+        await campaign.update(conn, review_status=operation.review_status, reviewer_notes=operation.reviewer_notes)
+
+
+async def run_bulk_operations(conn, operations: Sequence[BulkOperation]) -> List[Dict[str, Any]]:
+    """
+    Apply a list of campaign operations
+
+    Args:
+        conn: Database connection
+        operations: Operations to apply; at most one per campaign
+
+    Returns:
+        One result dict per operation, in request order (see BulkOperationResult)
+    """
+    results = [
+        {"campaign_id": operation.campaign_id, "action": operation.action, "success": False}
+        for operation in operations
+    ]
+    campaigns = await _load_campaigns(conn, list(dict.fromkeys(op.campaign_id for op in operations)))
+
+    accepted = []
+    seen = set()
+    for index, operation in enumerate(operations):
+        campaign = campaigns.get(operation.campaign_id)
+        if operation.campaign_id in seen:
+            results[index]["error"] = "Duplicate operation for this campaign in the same request"
+            continue
+        seen.add(operation.campaign_id)
+        if campaign is None:
+            results[index]["error"] = "Campaign not found"
+            continue
+        try:
+            check_operation(operation, campaign)
+        except BulkOperationError as e:
+            results[index]["error"] = str(e)
+            continue
+        accepted.append(index)
+
+    # Render and upload final HTML for approvals, a few at a time
+    semaphore = asyncio.Semaphore(settings.BULK_CONCURRENCY)
+
+    async def publish(index: int):
+        campaign = campaigns[operations[index].campaign_id]
+        async with semaphore:
+            return await publish_final_html(campaign.id, campaign, campaign.ai_processing_data['ai_results'])
+
+    approvals = [index for index in accepted if operations[index].action == 'approve']
+    published = {}
+    for index, outcome in zip(approvals, await asyncio.gather(
+        *(publish(index) for index in approvals), return_exceptions=True
+    )):
+        if isinstance(outcome, Exception):
+            logger.error(f"Bulk approval of campaign {operations[index].campaign_id} failed: {outcome}")
+            results[index]["error"] = f"Failed to publish final HTML: {outcome}"
+        else:
+            published[index] = outcome
+    accepted = [index for index in accepted if operations[index].action != 'approve' or index in published]
+
+    try:
+        async with unit_of_work(conn):
+            for index in accepted:
+                html_s3_url = published[index][0] if index in published else None
+                await _apply(conn, operations[index], campaigns[operations[index].campaign_id], html_s3_url)
+    except Exception as e:
+        logger.error(f"Bulk write of {len(accepted)} campaigns failed: {e}", exc_info=True)
+        for index in accepted:
+            results[index]["error"] = f"Failed to save campaign: {e}"
+        return results
+
+    for index in accepted:
+        campaign = campaigns[operations[index].campaign_id]
+        results[index].update(
+            success=True,
+            status=campaign.status,
+            scheduling_status=campaign.scheduling_status,
+            review_status=campaign.review_status,
+            download_url=published[index][1] if index in published else None
+        )
+    logger.info(f"Bulk operations: {len(accepted)} of {len(operations)} applied")
+    return results
@@ -3,12 +3,135 @@ Campaign service for database operations
 """
 from app.models.campaign import Campaign
 from app.database import db
-from typing import Optional, Dict, Any
+from app.config import settings
+from app.storage.unit_of_work import current_unit_of_work
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+class CampaignCache:
+    """
+    Process-wide LRU cache of stored campaign rows with a TTL
+    
+    Rows are cached rather than Campaign objects, so every lookup gets its own
+    object and concurrent requests never share mutable state. Campaign.save()
+    invalidates the saved campaign; the TTL bounds staleness from writes made
+    by other processes.
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._rows: "OrderedDict[str, tuple]" = OrderedDict()
+        # Bumped by every invalidation; loads that raced with a save are not cached
+        self.version = 0
+        self.hits = 0
+        self.request_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+    
+    def get(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._rows.get(campaign_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, row = entry
+        if expires_at <= self._clock():
+            del self._rows[campaign_id]
+            self.misses += 1
+            return None
+        self._rows.move_to_end(campaign_id)
+        self.hits += 1
+        return row
+    
+    def put(self, campaign_id: str, row: Dict[str, Any], version: int):
+        """Cache a row loaded while the cache was at `version`"""
+        if not self.enabled or version != self.version:
+            return
+        self._rows[campaign_id] = (self._clock() + self.ttl_seconds, row)
+        self._rows.move_to_end(campaign_id)
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, campaign_id: str):
+        self.version += 1
+        self.invalidations += 1
+        self._rows.pop(campaign_id, None)
+    
+    def clear(self):
+        self.version += 1
+        self._rows.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.request_hits + self.misses
+        return {
+            "size": len(self._rows),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "request_hits": self.request_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.request_hits) / lookups, 4) if lookups else None
+        }
+
+
+campaign_cache = CampaignCache(settings.CAMPAIGN_CACHE_SIZE, settings.CAMPAIGN_CACHE_TTL_SECONDS)
+
+# Campaigns already loaded by the current request, by id (see campaign_scope)
+_request_campaigns: ContextVar[Optional[Dict[str, Campaign]]] = ContextVar("request_campaigns", default=None)
+
+
+@contextmanager
+def campaign_scope():
+    """
+    Identity map for one request: repeated get_campaign calls return the same object
+    
+    Entered by the HTTP middleware in app.main; code outside a scope (scheduler,
+    scripts) only uses the shared cache.
+    """
+    campaigns: Dict[str, Campaign] = {}
+    token = _request_campaigns.set(campaigns)
+    try:
+        yield campaigns
+    finally:
+        _request_campaigns.reset(token)
+        # Tasks spawned by the request copied the context; don't let them reuse stale objects
+        campaigns.clear()
+
+
+def _on_campaign_saved(campaign: Campaign):
+    campaign_cache.invalidate(campaign.id)
+    scope = _request_campaigns.get()
+    if scope is not None:
+        if campaign._partial_ai_data:
+            scope.pop(campaign.id, None)
+        else:
+            scope[campaign.id] = campaign
+
+
+Campaign.add_save_listener(_on_campaign_saved)
+
+
+def campaign_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for get_campaign"""
+    return campaign_cache.stats()
+
+
 async def create_campaign(
     campaign_name: str,
     advertiser_name: str,
@@ -19,6 +142,8 @@ async def create_campaign(
     """
     Create a new campaign in the database
     
+    Inside a unit of work the INSERT is staged and written when it flushes.
+    
     Args:
         campaign_name: Name of the campaign
         advertiser_name: Name of the advertiser
@@ -63,6 +188,10 @@ async def get_campaign(campaign_id: str, conn=None) -> Optional[Campaign]:
     """
     Get campaign by ID
     
+    Reads through campaigns staged in the active unit of work, the request's
+    identity map, the shared campaign cache, then the database (campaigns
+    table first, then the archive).
+    
     Args:
         campaign_id: Campaign ID
         conn: Database connection (optional, will use db.conn if not provided)
@@ -70,13 +199,37 @@ async def get_campaign(campaign_id: str, conn=None) -> Optional[Campaign]:
     Returns:
         Campaign object or None if not found
     """
-    # Use provided connection or ensure database connection exists
-    if conn is None:
-        if not hasattr(db, 'conn') or db.conn is None:
-            await db.connect()
-        conn = db.conn
+    uow = current_unit_of_work()
+    staged = uow.get(campaign_id) if uow is not None else None
+    if staged is not None:
+        campaign_cache.request_hits += 1
+        return staged
     
-    return await Campaign.get_by_id(conn, campaign_id)
+    scope = _request_campaigns.get()
+    if scope is not None and campaign_id in scope:
+        campaign_cache.request_hits += 1
+        return scope[campaign_id]
+    
+    row = campaign_cache.get(campaign_id)
+    if row is not None:
+        campaign = Campaign.from_row(row)
+    else:
+        # Use provided connection or ensure database connection exists
+        if conn is None:
+            if not hasattr(db, 'conn') or db.conn is None:
+                await db.connect()
+            conn = db.conn
+        
+        version = campaign_cache.version
+        # Finished campaigns may have been moved to the archive (see archive_service)
+        campaign = await Campaign.get_by_id(conn, campaign_id) or await Campaign.get_archived(conn, campaign_id)
+        if campaign is None:
+            return None
+        campaign_cache.put(campaign_id, campaign.to_row(), version)
+    
+    if scope is not None:
+        scope[campaign_id] = campaign
+    return campaign
 
 
 async def update_campaign_assets(
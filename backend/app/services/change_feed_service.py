@@ -0,0 +1,159 @@
+"""
+Campaign change feed
+Reads the campaign_events log (app.models.campaign_events) for
+GET /campaigns/changes, and follows it in the background so every worker
+drops cached campaigns that another worker changed.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import logging
+
+from app.config import settings
+from app.database import db
+from app.services.campaign_service import campaign_cache
+from app.storage.repository import LIST_PARTS, repository_for
+
+logger = logging.getLogger(__name__)
+
+# Events read per poll by the cache follower
+_FOLLOW_BATCH = 1000
+
+
+async def get_campaign_changes(conn, since: int, limit: int = 100) -> Dict[str, Any]:
+    """
+    Campaigns changed after a feed position
+
+    Args:
+        since: Feed position the client has applied (next_since of an earlier call)
+        limit: Maximum number of events to read; several events of one
+            campaign collapse into one change
+
+    Returns:
+        changed: campaigns (list parts only) as they are now
+        deleted: IDs of campaigns that are gone (deleted or archived)
+        next_since: seq to pass as `since` next time
+        has_more: whether more events are waiting after next_since
+        reset: True when events after `since` were pruned (or `since` is from
+            another database, or the storage has no single feed, as with
+            DB_SHARDS > 1); the client must reload the full list
+    """
+    repository = repository_for(conn)
+    if not repository.change_feed:
+        return {"changed": [], "deleted": [], "next_since": 0, "has_more": False, "reset": True}
+    oldest, latest = await repository.get_event_bounds()
+    if since > latest or (oldest and since < oldest - 1):
+        return {"changed": [], "deleted": [], "next_since": latest, "has_more": False, "reset": True}
+
+    events = await repository.get_events(since, limit)
+    # One change per campaign, in the order of its latest event
+    latest_event: Dict[str, int] = {}
+    for seq, campaign_id, _ in events:
+        latest_event.pop(campaign_id, None)
+        latest_event[campaign_id] = seq
+    campaign_ids = list(latest_event)
+    current = {c.id: c for c in await repository.get_summaries_by_ids(campaign_ids, LIST_PARTS)}
+    return {
+        "changed": [current[campaign_id] for campaign_id in campaign_ids if campaign_id in current],
+        "deleted": [campaign_id for campaign_id in campaign_ids if campaign_id not in current],
+        "next_since": events[-1][0] if events else since,
+        "has_more": len(events) == limit,
+        "reset": False
+    }
+
+
+class ChangeFeedFollower:
+    """Background task that invalidates the campaign cache from the change feed"""
+
+    def __init__(self):
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.poll_interval = settings.CAMPAIGN_EVENTS_POLL_SECONDS
+        self.last_seq = 0
+        self.invalidated = 0
+        self.pruned = 0
+        self._last_prune: Optional[float] = None
+
+    async def start(self):
+        """Start following from the current end of the feed"""
+        if self.running:
+            logger.warning("Change feed follower is already running")
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._run_follower())
+        logger.info("Change feed follower started")
+
+    async def stop(self):
+        """Stop the follower task"""
+        if not self.running:
+            return
+
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Change feed follower stopped")
+
+    async def _run_follower(self):
+        """Main follow loop"""
+        while self.running:
+            try:
+                # Ensure database connection
+                if not hasattr(db, 'conn') or db.conn is None:
+                    await db.connect()
+                if not self.last_seq:
+                    self.last_seq = (await repository_for(db.conn).get_event_bounds())[1]
+                await self.poll(db.conn)
+                if self._last_prune is None or time.monotonic() - self._last_prune >= 3600:
+                    self._last_prune = time.monotonic()
+                    await self.prune(db.conn)
+            except Exception as e:
+                logger.error(f"Error in change feed follower: {e}", exc_info=True)
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll(self, conn) -> int:
+        """
+        Invalidate cached campaigns changed since the last poll
+
+        Returns:
+            Number of events read
+        """
+        repository = repository_for(conn)
+        read = 0
+        while True:
+            events = await repository.get_events(self.last_seq, _FOLLOW_BATCH)
+            for seq, campaign_id, _ in events:
+                campaign_cache.invalidate(campaign_id)
+                self.last_seq = seq
+            read += len(events)
+            self.invalidated += len(events)
+            if len(events) < _FOLLOW_BATCH:
+                return read
+
+    async def prune(self, conn) -> int:
+        """Delete events older than CAMPAIGN_EVENTS_RETENTION_DAYS"""
+        before = (datetime.utcnow() - timedelta(days=settings.CAMPAIGN_EVENTS_RETENTION_DAYS)).isoformat()
+        pruned = await repository_for(conn).prune_events(before)
+        self.pruned += pruned
+        if pruned:
+            logger.info(f"Pruned {pruned} campaign change events")
+        return pruned
+
+    def stats(self) -> Dict[str, Any]:
+        """Follower counters for monitoring"""
+        return {
+            "running": self.running,
+            "last_seq": self.last_seq,
+            "invalidated": self.invalidated,
+            "pruned": self.pruned
+        }
+
+
+# Global change feed follower instance
+change_feed_follower = ChangeFeedFollower()
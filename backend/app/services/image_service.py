@@ -7,6 +7,7 @@ import logging
 from app.utils.image_utils import resize_image, LOGO_MAX_SIZE, HERO_MAX_SIZE
 from app.services.s3_service import s3_service
 from app.services.file_service import generate_s3_key
+from app.utils.blocking_io import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -122,7 +123,6 @@ async def download_image_from_s3(s3_url: str) -> Optional[bytes]:
         # Download from S3 using the existing s3_service
         # We need to use boto3 directly for downloads
         import boto3
-        import asyncio
         from app.config import settings
         
         s3_client = boto3.client(
@@ -137,7 +137,7 @@ async def download_image_from_s3(s3_url: str) -> Optional[bytes]:
             response = s3_client.get_object(Bucket=bucket_name, Key=key)
             return response['Body'].read()
         
-        image_bytes = await asyncio.to_thread(download)
+        image_bytes = await run_blocking("s3", download)
         logger.info(f"Downloaded image from S3: {key}")
         return image_bytes
         
@@ -0,0 +1,273 @@
+"""
+SQLite maintenance service
+Runs as a background task next to the writer. Every run takes a passive WAL
+checkpoint (which never waits on anyone), so the WAL is copied back off the
+request path and the writer's own autocheckpoint rarely fires on a commit.
+When no write has happened for MAINTENANCE_QUIET_SECONDS it also refreshes
+planner statistics, returns a bounded number of free pages to the filesystem
+(incremental vacuum) and truncates an oversized WAL file. Each action is
+bounded by a budget setting; /health/maintenance reports what was done and
+how the file size develops.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import logging
+
+from app.config import settings
+from app.database import db
+from app.storage.pool import build_pragmas, open_connection
+from app.storage.write_coordinator import run_write
+
+logger = logging.getLogger(__name__)
+
+# Recent actions kept for /health/maintenance
+_ACTION_HISTORY = 50
+# One size sample every 5 minutes, 24 hours of them
+_SAMPLE_EVERY_SECONDS = 300.0
+_SAMPLE_HISTORY = 288
+
+# SQLite 3.46+ can check every table in PRAGMA optimize (0x10000); older ones
+# only look at tables the connection has queried, so a bounded ANALYZE is run instead
+_OPTIMIZE_ALL_TABLES = sqlite3.sqlite_version_info >= (3, 46, 0)
+
+
+class MaintenanceService:
+    """Service for checkpointing, analyzing and vacuuming the SQLite database"""
+
+    def __init__(self):
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.check_interval = settings.MAINTENANCE_INTERVAL_SECONDS
+        self.runs = 0
+        self.counts: Dict[str, int] = {}
+        self.actions: Deque[Dict[str, Any]] = deque(maxlen=_ACTION_HISTORY)
+        self.samples: Deque[Dict[str, Any]] = deque(maxlen=_SAMPLE_HISTORY)
+        self.last_run_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._conn = None
+        self._last_writes: Optional[int] = None
+        self._last_write_seen = time.monotonic()
+        self._last_analyze: Optional[float] = None
+        self._last_sample: Optional[float] = None
+        self._last_checkpoint: Optional[Tuple[int, int]] = None
+
+    async def start(self):
+        """Start the maintenance background task"""
+        if self.running:
+            logger.warning("Maintenance service is already running")
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._run_maintenance())
+        logger.info("Maintenance service started")
+
+    async def stop(self):
+        """Stop the maintenance background task and close its connection"""
+        if not self.running:
+            return
+
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.close()
+        logger.info("Maintenance service stopped")
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def _run_maintenance(self):
+        """Main maintenance loop"""
+        while self.running:
+            try:
+                # Ensure database connection
+                if not hasattr(db, 'conn') or db.conn is None:
+                    await db.connect()
+                await self.run_once(db)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Error in maintenance loop: {e}", exc_info=True)
+
+            # Wait before next run
+            await asyncio.sleep(self.check_interval)
+
+    async def _connection(self, database):
+        """
+        The service's own connection for checkpoints and size queries
+
+        Checkpoints cannot run inside the writer's group-commit transaction, and
+        its short busy timeout is the budget of a truncating checkpoint.
+        """
+        if self._conn is None:
+            self._conn = await open_connection(
+                database.db_path,
+                build_pragmas(settings.MAINTENANCE_BUSY_TIMEOUT_MS, cache_size_kb=1024, mmap_size=0)
+            )
+        return self._conn
+
+    def is_quiet(self, database) -> bool:
+        """Whether no write has been committed or queued for MAINTENANCE_QUIET_SECONDS"""
+        now = time.monotonic()
+        stats = database.writes.stats() if database.writes is not None else {"writes": 0, "queued": 0}
+        if stats["writes"] != self._last_writes or stats["queued"]:
+            self._last_writes = stats["writes"]
+            self._last_write_seen = now
+        return now - self._last_write_seen >= settings.MAINTENANCE_QUIET_SECONDS
+
+    async def run_once(self, database, force_quiet: bool = False) -> List[Dict[str, Any]]:
+        """
+        One maintenance pass
+
+        Args:
+            database: SQLite Database (other backends maintain themselves)
+            force_quiet: Run the quiet-period actions regardless of recent writes
+
+        Returns:
+            Actions taken in this pass
+        """
+        conn = await self._connection(database)
+        quiet = self.is_quiet(database) or force_quiet
+        taken = []
+
+        sample = await self.sample(conn, database)
+        if sample["wal_bytes"]:
+            taken.append(await self._checkpoint(conn, "PASSIVE"))
+
+        if quiet:
+            since_analyze = None if self._last_analyze is None else time.monotonic() - self._last_analyze
+            if since_analyze is None or since_analyze >= settings.MAINTENANCE_ANALYZE_INTERVAL_SECONDS:
+                taken.append(await self._analyze(database.conn))
+                self._last_analyze = time.monotonic()
+            vacuum_pages = min(sample["freelist_count"], settings.MAINTENANCE_VACUUM_PAGES)
+            if sample["auto_vacuum"] == "INCREMENTAL" and vacuum_pages > 0:
+                taken.append(await self._incremental_vacuum(database.conn, vacuum_pages))
+            if sample["wal_bytes"] >= settings.MAINTENANCE_WAL_TRUNCATE_MB * 1024 * 1024:
+                taken.append(await self._checkpoint(conn, "TRUNCATE"))
+        taken = [action for action in taken if action is not None]
+
+        now = time.monotonic()
+        if self._last_sample is None or now - self._last_sample >= _SAMPLE_EVERY_SECONDS:
+            self._last_sample = now
+            self.samples.append(await self.sample(conn, database) if taken else sample)
+
+        self.runs += 1
+        self.last_run_at = datetime.utcnow().isoformat()
+        return taken
+
+    async def sample(self, conn, database) -> Dict[str, Any]:
+        """Current file sizes and free pages"""
+        values = {}
+        for pragma in ("page_size", "page_count", "freelist_count", "auto_vacuum"):
+            async with conn.execute(f"PRAGMA {pragma}") as cursor:
+                values[pragma] = (await cursor.fetchone())[0]
+        wal_path = f"{database.db_path}-wal"
+        return {
+            "at": datetime.utcnow().isoformat(),
+            "db_bytes": values["page_size"] * values["page_count"],
+            "free_bytes": values["page_size"] * values["freelist_count"],
+            "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+            "page_count": values["page_count"],
+            "freelist_count": values["freelist_count"],
+            "auto_vacuum": ["NONE", "FULL", "INCREMENTAL"][values["auto_vacuum"]]
+        }
+
+    def _record(self, action: str, started: float, **detail) -> Dict[str, Any]:
+        entry = {
+            "action": action,
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round((time.monotonic() - started) * 1000, 3),
+            **detail
+        }
+        self.actions.append(entry)
+        self.counts[action] = self.counts.get(action, 0) + 1
+        return entry
+
+    async def _checkpoint(self, conn, mode: str) -> Optional[Dict[str, Any]]:
+        """
+        wal_checkpoint in PASSIVE or TRUNCATE mode
+
+        TRUNCATE waits for the writer and readers at most MAINTENANCE_BUSY_TIMEOUT_MS;
+        if they are still busy it reports busy and is retried on a later run.
+        A passive checkpoint that found nothing new is not recorded (None).
+        """
+        started = time.monotonic()
+        async with conn.execute(f"PRAGMA wal_checkpoint({mode})") as cursor:
+            busy, wal_frames, checkpointed = await cursor.fetchone()
+        previous, self._last_checkpoint = self._last_checkpoint, (wal_frames, checkpointed)
+        if mode == "PASSIVE" and previous == self._last_checkpoint:
+            return None
+        return self._record(
+            f"checkpoint_{mode.lower()}", started,
+            busy=bool(busy), wal_frames=wal_frames, checkpointed_frames=checkpointed
+        )
+
+    async def _analyze(self, writer) -> Dict[str, Any]:
+        """Refresh planner statistics, sampling at most MAINTENANCE_ANALYSIS_LIMIT rows per index"""
+        started = time.monotonic()
+
+        async def analyze(conn):
+            await conn.execute(f"PRAGMA analysis_limit = {int(settings.MAINTENANCE_ANALYSIS_LIMIT)}")
+            if _OPTIMIZE_ALL_TABLES:
+                await conn.execute("PRAGMA optimize = 0x10002")
+            else:
+                await conn.execute("ANALYZE")
+
+        # Statistics are written like any other change, in a group commit
+        await run_write(writer, analyze)
+        return self._record("optimize" if _OPTIMIZE_ALL_TABLES else "analyze", started)
+
+    async def _incremental_vacuum(self, writer, pages: int) -> Dict[str, Any]:
+        """Return free pages at the end of the file to the filesystem"""
+        started = time.monotonic()
+
+        async def vacuum(conn):
+            # Each step of incremental_vacuum frees one page, but the sqlite3 module
+            # steps a statement without result columns only once
+            for _ in range(pages):
+                async with conn.execute("PRAGMA incremental_vacuum(1)"):
+                    pass
+
+        await run_write(writer, vacuum)
+        return self._record("incremental_vacuum", started, pages=pages)
+
+    def trend(self) -> Dict[str, Any]:
+        """Growth of the database file over the sampled window"""
+        if len(self.samples) < 2:
+            return {"window_hours": 0.0, "db_bytes_change": 0, "db_bytes_per_hour": 0.0}
+        first, last = self.samples[0], self.samples[-1]
+        hours = (datetime.fromisoformat(last["at"]) - datetime.fromisoformat(first["at"])).total_seconds() / 3600
+        change = last["db_bytes"] - first["db_bytes"]
+        return {
+            "window_hours": round(hours, 3),
+            "db_bytes_change": change,
+            "db_bytes_per_hour": round(change / hours, 1) if hours else 0.0
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Actions taken and size history for monitoring"""
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+            "quiet_for_seconds": round(time.monotonic() - self._last_write_seen, 1),
+            "action_counts": dict(self.counts),
+            "recent_actions": list(self.actions),
+            "size": self.samples[-1] if self.samples else None,
+            "trend": self.trend(),
+            "samples": list(self.samples)
+        }
+
+
+# Global maintenance service instance
+maintenance_service = MaintenanceService()
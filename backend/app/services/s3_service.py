@@ -2,10 +2,12 @@
 AWS S3 service for file storage
 """
 import boto3
-import asyncio
+import gzip
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError, BotoCoreError
-from typing import Optional, BinaryIO
+from typing import Any, BinaryIO, Dict, List, Optional
 from app.config import settings
+from app.utils.blocking_io import run_blocking
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,7 +52,8 @@ class S3Service:
             file_obj.seek(0)
             
             # Run blocking boto3 operation in thread pool
-            await asyncio.to_thread(
+            await run_blocking(
+                "s3",
                 self.s3_client.upload_fileobj,
                 file_obj,
                 self.bucket_name,
@@ -69,6 +72,88 @@ class S3Service:
             logger.error(f"Unexpected error uploading file: {e}")
             raise
     
+    async def upload_large_file(
+        self,
+        path: str,
+        s3_key: str,
+        content_type: Optional[str] = None,
+        chunk_size_mb: int = 16,
+        max_concurrency: int = 4
+    ) -> str:
+        """
+        Upload a local file with multipart transfer (runs in thread pool)
+        
+        Args:
+            path: Local file to upload
+            s3_key: S3 object key (path)
+            content_type: MIME type of the file
+            chunk_size_mb: Part size; files larger than one part go up in parts
+            max_concurrency: Parts uploaded at the same time
+            
+        Returns:
+            S3 URL of uploaded file
+        """
+        chunk_size = chunk_size_mb * 1024 * 1024
+        config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=max_concurrency
+        )
+        try:
+            await run_blocking(
+                "s3",
+                self.s3_client.upload_file,
+                path,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': content_type} if content_type else None,
+                Config=config
+            )
+            url = f"s3://{self.bucket_name}/{s3_key}"
+            logger.info(f"File uploaded to S3: {url}")
+            return url
+        except ClientError as e:
+            logger.error(f"Error uploading file to S3: {e}")
+            raise Exception(f"Failed to upload file to S3: {str(e)}")
+    
+    async def download_file(self, s3_key: str, path: str):
+        """
+        Download an object to a local file, in parallel ranges if large (runs in thread pool)
+        
+        Args:
+            s3_key: S3 object key
+            path: Local file to write
+        """
+        try:
+            await run_blocking("s3", self.s3_client.download_file, self.bucket_name, s3_key, path)
+        except ClientError as e:
+            logger.error(f"Error downloading {s3_key}: {e}")
+            raise Exception(f"Failed to download file from S3: {str(e)}")
+    
+    async def list_files(self, prefix: str) -> List[Dict[str, Any]]:
+        """
+        Objects under a key prefix (runs in thread pool)
+        
+        Args:
+            prefix: Key prefix
+            
+        Returns:
+            Dicts with key, size and last_modified, in key order
+        """
+        def list_pages():
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            return [
+                {"key": item['Key'], "size": item['Size'], "last_modified": item['LastModified']}
+                for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+                for item in page.get('Contents', [])
+            ]
+        
+        try:
+            return await run_blocking("s3", list_pages)
+        except ClientError as e:
+            logger.error(f"Error listing {prefix}: {e}")
+            raise Exception(f"Failed to list files in S3: {str(e)}")
+    
     async def get_presigned_url(
         self,
         s3_key: str,
@@ -85,7 +170,8 @@ class S3Service:
             Presigned URL
         """
         try:
-            url = await asyncio.to_thread(
+            url = await run_blocking(
+                "s3",
                 self.s3_client.generate_presigned_url,
                 'get_object',
                 Params={
@@ -110,7 +196,8 @@ class S3Service:
             True if successful, False otherwise
         """
         try:
-            await asyncio.to_thread(
+            await run_blocking(
+                "s3",
                 self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=s3_key
@@ -121,6 +208,53 @@ class S3Service:
             logger.error(f"Error deleting file from S3: {e}")
             return False
     
+    async def archive_file(
+        self,
+        s3_key: str,
+        archive_key: str,
+        storage_class: str = "STANDARD_IA"
+    ) -> str:
+        """
+        Copy an object to a gzip-compressed archive copy (runs in thread pool)
+        
+        The copy keeps its Content-Type and is served with Content-Encoding: gzip,
+        so presigned URLs still open the original document. The source object is
+        left in place; delete it once the new key has been recorded.
+        
+        Args:
+            s3_key: S3 object key to archive
+            archive_key: Key of the compressed copy
+            storage_class: S3 storage class of the copy
+            
+        Returns:
+            S3 URL of the archived copy
+        """
+        try:
+            response = await run_blocking(
+                "s3",
+                self.s3_client.get_object,
+                Bucket=self.bucket_name,
+                Key=s3_key
+            )
+            body = await run_blocking("s3", response['Body'].read)
+            compressed = await run_blocking("s3", gzip.compress, body)
+            await run_blocking(
+                "s3",
+                self.s3_client.put_object,
+                Bucket=self.bucket_name,
+                Key=archive_key,
+                Body=compressed,
+                ContentType=response.get('ContentType') or 'application/octet-stream',
+                ContentEncoding='gzip',
+                StorageClass=storage_class
+            )
+            url = f"s3://{self.bucket_name}/{archive_key}"
+            logger.info(f"Archived {s3_key} to {url} ({len(body)} -> {len(compressed)} bytes)")
+            return url
+        except ClientError as e:
+            logger.error(f"Error archiving {s3_key}: {e}")
+            raise Exception(f"Failed to archive file in S3: {str(e)}")
+    
     async def file_exists(self, s3_key: str) -> bool:
         """
         Check if file exists in S3 (runs in thread pool)
@@ -132,7 +266,8 @@ class S3Service:
             True if file exists, False otherwise
         """
         try:
-            await asyncio.to_thread(
+            await run_blocking(
+                "s3",
                 self.s3_client.head_object,
                 Bucket=self.bucket_name,
                 Key=s3_key
@@ -152,7 +287,8 @@ class S3Service:
         """
         try:
             # Try to head bucket (requires ListBucket permission)
-            await asyncio.to_thread(
+            await run_blocking(
+                "s3",
                 self.s3_client.head_bucket,
                 Bucket=self.bucket_name
             )
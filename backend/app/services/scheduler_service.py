@@ -73,27 +73,33 @@ class SchedulerService:
             
             logger.info(f"Found {len(past_campaigns)} scheduled campaigns to process")
             
-            for campaign in past_campaigns:
-                try:
-                    # Update scheduling status to 'sent'
-                    # Note: Actual email sending is out of scope for MVP
-                    await campaign.update(
-                        conn,
-                        scheduling_status='sent'
-                    )
-                    
-                    logger.info(
-                        f"Marked campaign {campaign.id} ({campaign.campaign_name}) "
-                        f"as sent (scheduled for {campaign.scheduled_at})"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error processing scheduled campaign {campaign.id}: {e}",
-                        exc_info=True
-                    )
+            # Flip all due campaigns concurrently so the writes share one group commit
+            await asyncio.gather(*(
+                self._mark_campaign_sent(conn, campaign) for campaign in past_campaigns
+            ))
         
         except Exception as e:
             logger.error(f"Error checking scheduled campaigns: {e}", exc_info=True)
+    
+    async def _mark_campaign_sent(self, conn, campaign: Campaign):
+        """Mark a single due campaign as sent"""
+        try:
+            # Update scheduling status to 'sent'
+            # Note: Actual email sending is out of scope for MVP
+            await campaign.update(
+                conn,
+                scheduling_status='sent'
+            )
+            
+            logger.info(
+                f"Marked campaign {campaign.id} ({campaign.campaign_name}) "
+                f"as sent (scheduled for {campaign.scheduled_at})"
+            )
+        except Exception as e:
+            logger.error(
+                f"Error processing scheduled campaign {campaign.id}: {e}",
+                exc_info=True
+            )
 
 
 # Global scheduler instance
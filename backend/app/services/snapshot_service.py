@@ -0,0 +1,346 @@
+"""
+Online snapshots of the SQLite database to S3
+A snapshot copies the live file with the SQLite online backup API from a
+read-only connection, SNAPSHOT_STEP_PAGES pages per step with a pause in
+between, so the source is only locked for one short step at a time (in WAL
+mode a step does not block writers at all). Writes during the copy make SQLite
+restart it; after SNAPSHOT_MAX_RESTARTS the rest is copied in one step, which
+holds a single read snapshot. The copy is checked, gzip-compressed and uploaded
+with multipart transfer under SNAPSHOT_PREFIX. Old snapshots are pruned to every
+snapshot of the last SNAPSHOT_KEEP_ALL_HOURS plus the newest of each day for
+SNAPSHOT_KEEP_DAILY_DAYS; restore (python -m app.snapshot) picks the newest
+snapshot at or before a point in time.
+"""
+import asyncio
+import gzip
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from app.config import settings
+from app.database import db
+from app.services.s3_service import s3_service
+from app.utils.blocking_io import run_blocking
+
+logger = logging.getLogger(__name__)
+
+_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+_SUFFIX = ".db.gz"
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be taken or restored"""
+    pass
+
+
+class _BackupAborted(Exception):
+    """Raised from the backup progress callback to stop restarting"""
+    pass
+
+
+def snapshot_key(db_path: Path, taken_at: datetime, prefix: Optional[str] = None) -> str:
+    """S3 key of a snapshot: <prefix>/<database name>/<UTC timestamp>.db.gz"""
+    return f"{prefix or settings.SNAPSHOT_PREFIX}/{Path(db_path).stem}/{taken_at.strftime(_TIMESTAMP_FORMAT)}{_SUFFIX}"
+
+
+def snapshot_time(key: str) -> Optional[datetime]:
+    """When a snapshot was taken, from its key (None for other objects)"""
+    name = key.rsplit('/', 1)[-1]
+    if not name.endswith(_SUFFIX):
+        return None
+    try:
+        return datetime.strptime(name[:-len(_SUFFIX)], _TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def expired_snapshots(keys: Sequence[str], now: datetime) -> List[str]:
+    """
+    Snapshots the retention policy no longer keeps
+
+    Every snapshot newer than SNAPSHOT_KEEP_ALL_HOURS is kept, then the newest of
+    each UTC day up to SNAPSHOT_KEEP_DAILY_DAYS; the newest snapshot is always kept.
+    """
+    snapshots = sorted(
+        ((taken_at, key) for key in keys if (taken_at := snapshot_time(key)) is not None),
+        reverse=True
+    )
+    keep_all_after = now - timedelta(hours=settings.SNAPSHOT_KEEP_ALL_HOURS)
+    keep_daily_after = now - timedelta(days=settings.SNAPSHOT_KEEP_DAILY_DAYS)
+    days_kept = set()
+    expired = []
+    for index, (taken_at, key) in enumerate(snapshots):
+        if index == 0 or taken_at >= keep_all_after:
+            days_kept.add(taken_at.date())
+            continue
+        if taken_at >= keep_daily_after and taken_at.date() not in days_kept:
+            days_kept.add(taken_at.date())
+            continue
+        expired.append(key)
+    return expired
+
+
+def _backup(source_path: Path, target_path: Path, step_pages: int, step_sleep: float, max_restarts: int) -> Dict[str, Any]:
+    """
+    Copy a live database file with the online backup API (blocking; run in a thread)
+
+    Returns:
+        steps, restarts, pages and the longest step in ms (how long the source was locked)
+    """
+    source = sqlite3.connect(f"{Path(source_path).resolve().as_uri()}?mode=ro", uri=True)
+    target = sqlite3.connect(str(target_path))
+    metrics = {"steps": 0, "restarts": 0, "pages": 0, "max_step_ms": 0.0, "single_step": False}
+    state = {"remaining": None, "step_started": time.monotonic()}
+
+    def progress(status, remaining, total):
+        step_ms = (time.monotonic() - state["step_started"]) * 1000
+        metrics["steps"] += 1
+        metrics["pages"] = total
+        metrics["max_step_ms"] = max(metrics["max_step_ms"], step_ms)
+        # Pages left only goes up when a write elsewhere restarted the copy
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            metrics["restarts"] += 1
+            if metrics["restarts"] > max_restarts:
+                raise _BackupAborted()
+        state["remaining"] = remaining
+        if remaining and step_sleep:
+            time.sleep(step_sleep)
+        state["step_started"] = time.monotonic()
+
+    try:
+        try:
+            source.backup(target, pages=step_pages, progress=progress)
+        except _BackupAborted:
+            metrics["single_step"] = True
+            state["step_started"] = time.monotonic()
+            source.backup(target, pages=-1, progress=progress)
+        result = target.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise SnapshotError(f"Snapshot copy failed quick_check: {result}")
+    finally:
+        target.close()
+        source.close()
+    return metrics
+
+
+def _compress(path: Path, compressed_path: Path):
+    with open(path, "rb") as src, gzip.open(compressed_path, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _decompress(compressed_path: Path, path: Path):
+    with gzip.open(compressed_path, "rb") as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _restore(snapshot_path: Path, db_path: Path):
+    """Copy a snapshot file over a database with the backup API (blocking)"""
+    source = sqlite3.connect(str(snapshot_path))
+    try:
+        result = source.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise SnapshotError(f"Snapshot failed quick_check: {result}")
+        target = sqlite3.connect(str(db_path))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def _writer_commits(database) -> Dict[str, float]:
+    stats = database.writes.stats() if database.writes is not None else {"batches": 0, "avg_commit_ms": 0.0}
+    return {"batches": stats["batches"], "commit_ms": stats["avg_commit_ms"] * stats["batches"]}
+
+
+async def create_snapshot(database) -> Dict[str, Any]:
+    """
+    Snapshot a live SQLite database to S3
+
+    Args:
+        database: SQLite Database being served
+
+    Returns:
+        key, sizes, duration and stall metrics of the snapshot
+    """
+    started = time.monotonic()
+    taken_at = datetime.utcnow()
+    key = snapshot_key(database.db_path, taken_at)
+    writer_before = _writer_commits(database)
+
+    with tempfile.TemporaryDirectory(dir=database.db_path.parent, prefix=".snapshot-") as workdir:
+        copy_path = Path(workdir) / "snapshot.db"
+        compressed_path = Path(workdir) / f"snapshot{_SUFFIX}"
+        backup = await run_blocking(
+            "snapshot",
+            _backup, database.db_path, copy_path, settings.SNAPSHOT_STEP_PAGES,
+            settings.SNAPSHOT_STEP_SLEEP_MS / 1000, settings.SNAPSHOT_MAX_RESTARTS
+        )
+        backup_ms = (time.monotonic() - started) * 1000
+        writer_after = _writer_commits(database)
+
+        await run_blocking("snapshot", _compress, copy_path, compressed_path)
+        await s3_service.upload_large_file(
+            str(compressed_path), key, content_type="application/gzip",
+            chunk_size_mb=settings.SNAPSHOT_MULTIPART_CHUNK_MB
+        )
+        size, compressed_size = copy_path.stat().st_size, compressed_path.stat().st_size
+
+    commits = writer_after["batches"] - writer_before["batches"]
+    snapshot = {
+        "key": key,
+        "taken_at": taken_at.isoformat(),
+        "bytes": size,
+        "compressed_bytes": compressed_size,
+        "duration_ms": round((time.monotonic() - started) * 1000, 3),
+        "backup_ms": round(backup_ms, 3),
+        **backup,
+        "max_step_ms": round(backup["max_step_ms"], 3),
+        # Group commits the writer made while the copy ran, and their average latency
+        "writer_commits": commits,
+        "writer_avg_commit_ms": round((writer_after["commit_ms"] - writer_before["commit_ms"]) / commits, 3) if commits else 0.0
+    }
+    logger.info(
+        f"Snapshot {key}: {size} -> {compressed_size} bytes in {snapshot['duration_ms']:.0f}ms "
+        f"({backup['steps']} steps, {backup['restarts']} restarts, longest step {snapshot['max_step_ms']:.1f}ms)"
+    )
+    return snapshot
+
+
+async def list_snapshots(db_path: Path) -> List[Dict[str, Any]]:
+    """Snapshots of a database in S3, oldest first, with their taken_at time"""
+    prefix = snapshot_key(db_path, datetime.utcnow()).rsplit('/', 1)[0] + '/'
+    snapshots = []
+    for item in await s3_service.list_files(prefix):
+        taken_at = snapshot_time(item["key"])
+        if taken_at is not None:
+            snapshots.append({**item, "taken_at": taken_at})
+    return sorted(snapshots, key=lambda item: item["taken_at"])
+
+
+async def prune_snapshots(db_path: Path, now: Optional[datetime] = None) -> List[str]:
+    """Delete snapshots the retention policy no longer keeps; returns their keys"""
+    snapshots = await list_snapshots(db_path)
+    expired = expired_snapshots([item["key"] for item in snapshots], now or datetime.utcnow())
+    for key in expired:
+        await s3_service.delete_file(key)
+    if expired:
+        logger.info(f"Pruned {len(expired)} snapshots")
+    return expired
+
+
+async def restore_snapshot(db_path: Path, key: Optional[str] = None, at: Optional[datetime] = None) -> str:
+    """
+    Replace the contents of a database with a snapshot
+
+    Run it while the app is stopped; open connections would keep serving cached data.
+
+    Args:
+        db_path: Database file to restore into (created if missing)
+        key: Snapshot to restore; defaults to the newest one at or before `at`
+        at: Point in time (UTC); defaults to now
+
+    Returns:
+        Key of the restored snapshot
+    """
+    if key is None:
+        candidates = [item for item in await list_snapshots(db_path) if at is None or item["taken_at"] <= at]
+        if not candidates:
+            raise SnapshotError(f"No snapshot of {db_path} at or before {at or 'now'}")
+        key = candidates[-1]["key"]
+
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=db_path.parent, prefix=".restore-") as workdir:
+        compressed_path = Path(workdir) / f"snapshot{_SUFFIX}"
+        snapshot_path = Path(workdir) / "snapshot.db"
+        await s3_service.download_file(key, str(compressed_path))
+        await run_blocking("snapshot", _decompress, compressed_path, snapshot_path)
+        await run_blocking("snapshot", _restore, snapshot_path, db_path)
+    logger.info(f"Restored {db_path} from {key}")
+    return key
+
+
+class SnapshotService:
+    """Service for taking periodic snapshots"""
+
+    def __init__(self):
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.check_interval = settings.SNAPSHOT_INTERVAL_SECONDS
+        self.snapshots = 0
+        self.failures = 0
+        self.pruned = 0
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        """Start the snapshot background task"""
+        if self.running:
+            logger.warning("Snapshot service is already running")
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._run_snapshots())
+        logger.info("Snapshot service started")
+
+    async def stop(self):
+        """Stop the snapshot background task"""
+        if not self.running:
+            return
+
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Snapshot service stopped")
+
+    async def _run_snapshots(self):
+        """Main snapshot loop"""
+        while self.running:
+            # Wait first, so a restart does not snapshot again straight away
+            await asyncio.sleep(self.check_interval)
+            try:
+                # Ensure database connection
+                if not hasattr(db, 'conn') or db.conn is None:
+                    await db.connect()
+                await self.run_once(db)
+            except Exception as e:
+                logger.error(f"Error in snapshot loop: {e}", exc_info=True)
+
+    async def run_once(self, database) -> Dict[str, Any]:
+        """Take a snapshot, then prune expired ones"""
+        try:
+            snapshot = await create_snapshot(database)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            raise
+        self.snapshots += 1
+        self.last_snapshot = snapshot
+        self.pruned += len(await prune_snapshots(database.db_path))
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot counters and the metrics of the last snapshot for monitoring"""
+        return {
+            "running": self.running,
+            "snapshots": self.snapshots,
+            "failures": self.failures,
+            "pruned": self.pruned,
+            "last_error": self.last_error,
+            "last_snapshot": self.last_snapshot
+        }
+
+
+# Global snapshot service instance
+snapshot_service = SnapshotService()
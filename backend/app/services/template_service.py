@@ -1,12 +1,14 @@
 """
 Email template service for generating HTML emails from templates
 """
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 import logging
+from io import BytesIO
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from app.utils.mjml_compiler import compile_mjml_to_html, inline_css
 from app.services.s3_service import s3_service
+from app.services.file_service import generate_s3_key
 
 logger = logging.getLogger(__name__)
 
@@ -216,3 +218,29 @@ async def generate_email_from_campaign(
     
     return await generate_email_html(campaign_data, ai_results)
 
+
+async def publish_final_html(campaign_id: str, campaign_obj, ai_results: Dict) -> Tuple[str, str]:
+    """
+    Render a campaign's production HTML and upload it to S3
+    
+    Args:
+        campaign_id: Campaign ID
+        campaign_obj: Campaign model object
+        ai_results: AI results to render with
+        
+    Returns:
+        (S3 URL of the final HTML, presigned download URL valid for 24 hours)
+    """
+    final_html = await generate_email_from_campaign(campaign_id, campaign_obj, ai_results)
+    
+    final_html_key = generate_s3_key(campaign_id, 'final.html', 'html')
+    final_html_s3_url = await s3_service.upload_file(
+        BytesIO(final_html.encode('utf-8')),
+        final_html_key,
+        content_type='text/html'
+    )
+    download_url = await s3_service.get_presigned_url(
+        final_html_key,
+        expiration=86400  # 24 hours
+    )
+    return final_html_s3_url, download_url
@@ -1,11 +1,13 @@
 """
 Test data generator service for creating realistic performance metrics for demo purposes
 """
+import asyncio
 import random
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from app.models.campaign import Campaign
+from app.storage.repository import repository_for
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +29,8 @@ async def generate_test_performance_data(conn) -> Dict[str, Any]:
     """
     try:
         # Get all approved campaigns without performance data
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                SELECT * FROM campaigns 
-                WHERE status = 'approved' 
-                AND (performance_score IS NULL OR performance_score = 0)
-                ORDER BY created_at DESC
-            """)
-            rows = await cursor.fetchall()
-        
-        campaigns = [Campaign.from_row(dict(row)) for row in rows]
+        # Only performance columns are written, so skip ai_processing_data entirely
+        campaigns = await repository_for(conn).get_unscored_approved()
         
         if not campaigns:
             logger.info("No approved campaigns without performance data found")
@@ -56,12 +50,13 @@ async def generate_test_performance_data(conn) -> Dict[str, Any]:
         random.shuffle(campaigns)
         
         generated_campaigns = []
+        pending_updates = []
         
         # Generate high performer metrics
         for i in range(high_count):
             campaign = campaigns[i]
             metrics = _generate_high_performer_metrics()
-            await _update_campaign_performance(conn, campaign, metrics)
+            pending_updates.append(_update_campaign_performance(conn, campaign, metrics))
             generated_campaigns.append({
                 "campaign_id": campaign.id,
                 "campaign_name": campaign.campaign_name,
@@ -73,7 +68,7 @@ async def generate_test_performance_data(conn) -> Dict[str, Any]:
         for i in range(high_count, high_count + medium_count):
             campaign = campaigns[i]
             metrics = _generate_medium_performer_metrics()
-            await _update_campaign_performance(conn, campaign, metrics)
+            pending_updates.append(_update_campaign_performance(conn, campaign, metrics))
             generated_campaigns.append({
                 "campaign_id": campaign.id,
                 "campaign_name": campaign.campaign_name,
@@ -85,7 +80,7 @@ async def generate_test_performance_data(conn) -> Dict[str, Any]:
         for i in range(high_count + medium_count, total):
             campaign = campaigns[i]
             metrics = _generate_low_performer_metrics()
-            await _update_campaign_performance(conn, campaign, metrics)
+            pending_updates.append(_update_campaign_performance(conn, campaign, metrics))
             generated_campaigns.append({
                 "campaign_id": campaign.id,
                 "campaign_name": campaign.campaign_name,
@@ -93,6 +88,9 @@ async def generate_test_performance_data(conn) -> Dict[str, Any]:
                 **metrics
             })
         
+        # Run the updates concurrently so they are group-committed together
+        await asyncio.gather(*pending_updates)
+        
         logger.info(f"Generated test performance data for {total} campaigns")
         
         return {
@@ -0,0 +1,84 @@
+"""
+Database snapshot CLI (SQLite)
+Snapshots go to S3 under SNAPSHOT_PREFIX; see app.services.snapshot_service.
+
+    python -m app.snapshot create                      # snapshot the live database now
+    python -m app.snapshot list
+    python -m app.snapshot prune                       # apply the retention policy
+    python -m app.snapshot restore                     # newest snapshot (stop the app first)
+    python -m app.snapshot restore --at 2025-11-10T12:00:00
+    python -m app.snapshot restore --key snapshots/campaigns/20251110T120000Z.db.gz
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from app.database import Database, create_database
+from app.services.snapshot_service import (
+    SnapshotError,
+    create_snapshot,
+    list_snapshots,
+    prune_snapshots,
+    restore_snapshot
+)
+
+
+def _parse_at(value: str) -> datetime:
+    """ISO 8601 time as naive UTC, like snapshot times (an offset or Z is converted)"""
+    at = datetime.fromisoformat(value)
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+async def run(command: str, db_path: Optional[str], key: Optional[str] = None, at: Optional[str] = None) -> int:
+    database = Database(db_path=db_path) if db_path else create_database()
+    if not isinstance(database, Database):
+        print("Snapshots apply to SQLite only (use pg_dump or PITR for PostgreSQL)", file=sys.stderr)
+        return 1
+
+    try:
+        if command == "list":
+            for item in await list_snapshots(database.db_path):
+                print(f"{item['taken_at'].isoformat()}  {item['size']:>12}  {item['key']}")
+        elif command == "prune":
+            for expired in await prune_snapshots(database.db_path):
+                print(f"Deleted {expired}")
+        elif command == "restore":
+            restored = await restore_snapshot(
+                database.db_path, key=key, at=_parse_at(at) if at else None
+            )
+            print(f"Restored {database.location} from {restored}")
+        else:
+            await database.connect()
+            try:
+                snapshot = await create_snapshot(database)
+            finally:
+                await database.close()
+            print(
+                f"Snapshot {snapshot['key']}: {snapshot['bytes']} -> {snapshot['compressed_bytes']} bytes "
+                f"in {snapshot['duration_ms']:.0f}ms ({snapshot['restarts']} restarts)"
+            )
+        return 0
+    except SnapshotError as e:
+        print(f"Snapshot failed: {e}", file=sys.stderr)
+        return 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot the SQLite database to S3 and restore it")
+    parser.add_argument("command", choices=["create", "list", "prune", "restore"])
+    parser.add_argument("--db", dest="db_path", help="SQLite file (defaults to DATABASE_URL)")
+    parser.add_argument("--key", help="Snapshot to restore (defaults to the newest one)")
+    parser.add_argument("--at", help="Restore the newest snapshot taken at or before this UTC time (ISO 8601)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return asyncio.run(run(args.command, args.db_path, key=args.key, at=args.at))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Versioned schema migrations
+The schema version lives in PRAGMA user_version. Pending migrations run in a
+single transaction; when the database is current, startup costs one PRAGMA read.
+"""
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+from datetime import datetime
+import logging
+
+from app.storage.write_coordinator import run_write
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationError(Exception):
+    """Raised when the schema cannot be brought up to date"""
+    pass
+
+
+class Migration:
+    """
+    One schema version step
+
+    Args:
+        version: Schema version this migration produces (1, 2, 3, ...)
+        name: Short description, shown by the CLI
+        apply: Coroutine taking the connection; runs inside the migration transaction
+        backfill: Optional coroutine taking the connection that fills existing rows
+            in batches after the schema change is committed. It must be safe to
+            re-run and return the number of rows processed.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        name: str,
+        apply: Callable[..., Awaitable[None]],
+        backfill: Optional[Callable[..., Awaitable[int]]] = None
+    ):
+        self.version = version
+        self.name = name
+        self.apply = apply
+        self.backfill = backfill
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.name!r})"
+
+
+CREATE_BACKFILLS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_backfills (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        completed_at TEXT NOT NULL
+    )
+"""
+
+
+def latest_version(migrations: Sequence[Migration]) -> int:
+    return migrations[-1].version if migrations else 0
+
+
+def _check_order(migrations: Sequence[Migration]):
+    for expected, migration in enumerate(migrations, start=1):
+        if migration.version != expected:
+            raise MigrationError(f"Migrations must be numbered 1..N without gaps; found {migration!r} at {expected}")
+
+
+async def get_schema_version(conn) -> int:
+    async with conn.execute("PRAGMA user_version") as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def migrate(conn, migrations: Sequence[Migration], target: Optional[int] = None) -> List[Migration]:
+    """
+    Apply pending migrations in one transaction
+
+    Args:
+        conn: Writer connection
+        migrations: Ordered migrations (versions 1..N)
+        target: Stop at this version (defaults to the latest)
+
+    Returns:
+        Migrations that were applied (empty when the schema was current)
+
+    Raises:
+        MigrationError if the database is newer than this code or a migration fails
+    """
+    _check_order(migrations)
+    target = latest_version(migrations) if target is None else target
+    current = await get_schema_version(conn)
+    if current == target:
+        return []
+    if current > latest_version(migrations):
+        raise MigrationError(
+            f"Database schema version {current} is newer than this application ({latest_version(migrations)})"
+        )
+    if current > target:
+        raise MigrationError(f"Downgrades are not supported (database at {current}, target {target})")
+
+    if conn.in_transaction:
+        await conn.commit()
+    await conn.execute("BEGIN IMMEDIATE")
+    # Another process may have migrated while we waited for the write lock
+    locked_version = await get_schema_version(conn)
+    if locked_version != current:
+        await conn.rollback()
+        if locked_version >= target:
+            return []
+        return await migrate(conn, migrations, target=target)
+
+    pending = [m for m in migrations if current < m.version <= target]
+    try:
+        for migration in pending:
+            logger.info(f"Applying schema migration {migration.version}: {migration.name}")
+            await migration.apply(conn)
+        # user_version is part of the database header, so it commits or rolls back with the schema
+        await conn.execute(f"PRAGMA user_version = {int(target)}")
+        await conn.commit()
+    except Exception as e:
+        await conn.rollback()
+        raise MigrationError(f"Schema migration to version {target} failed: {e}") from e
+
+    logger.info(f"Database schema migrated from version {current} to {target}")
+    return pending
+
+
+async def pending_backfills(conn, migrations: Sequence[Migration]) -> List[Migration]:
+    """Migrations at or below the current schema version whose backfill has not completed"""
+    current = await get_schema_version(conn)
+    candidates = [m for m in migrations if m.backfill is not None and m.version <= current]
+    if not candidates:
+        return []
+    async with conn.execute("SELECT version FROM schema_backfills") as cursor:
+        done = {row[0] for row in await cursor.fetchall()}
+    return [m for m in candidates if m.version not in done]
+
+
+async def run_backfills(conn, migrations: Sequence[Migration]) -> Dict[int, int]:
+    """
+    Run outstanding batched backfills and record each one as complete
+
+    Meant to run after migrate(), either in the background while the app serves
+    traffic or from the CLI ahead of a deploy.
+
+    Returns:
+        Mapping of migration version -> rows processed
+    """
+    results = {}
+    for migration in await pending_backfills(conn, migrations):
+        logger.info(f"Running backfill for schema migration {migration.version}: {migration.name}")
+        rows = await migration.backfill(conn)
+        await run_write(conn, lambda c, m=migration, n=rows: c.execute(
+            "INSERT OR REPLACE INTO schema_backfills (version, name, rows, completed_at) VALUES (?, ?, ?, ?)",
+            (m.version, m.name, n, datetime.utcnow().isoformat())
+        ))
+        results[migration.version] = rows
+    return results
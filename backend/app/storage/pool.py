@@ -0,0 +1,228 @@
+"""
+SQLite connection pool with a reader/writer split
+Read-only connections are handed out per request; writes go through one dedicated writer
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import aiosqlite
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the acquire timeout"""
+    pass
+
+
+def build_pragmas(
+    busy_timeout_ms: int,
+    cache_size_kb: int,
+    mmap_size: int,
+    journal_mode: Optional[str] = None,
+    synchronous: Optional[str] = None,
+    auto_vacuum: Optional[str] = None
+) -> List[str]:
+    """
+    Build the PRAGMA statements applied to every new connection
+
+    Args:
+        busy_timeout_ms: How long SQLite waits on a locked database
+        cache_size_kb: Page cache size per connection in KiB
+        mmap_size: Memory-mapped I/O size in bytes (0 disables)
+        journal_mode: Journal mode (writer only, e.g. WAL)
+        synchronous: Synchronous level (writer only, e.g. NORMAL)
+        auto_vacuum: auto_vacuum mode (writer only, e.g. INCREMENTAL); applies to
+            a new file, an existing one switches on its next VACUUM
+
+    Returns:
+        List of PRAGMA statements
+    """
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(busy_timeout_ms)}",
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages
+        f"PRAGMA cache_size = -{int(cache_size_kb)}",
+        f"PRAGMA mmap_size = {int(mmap_size)}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    # Before journal_mode, which writes the header of a new file
+    if auto_vacuum:
+        pragmas.append(f"PRAGMA auto_vacuum = {auto_vacuum}")
+    if journal_mode:
+        pragmas.append(f"PRAGMA journal_mode = {journal_mode}")
+    if synchronous:
+        pragmas.append(f"PRAGMA synchronous = {synchronous}")
+    return pragmas
+
+
+async def open_connection(
+    db_path: Path,
+    pragmas: List[str],
+    read_only: bool = False
+) -> aiosqlite.Connection:
+    """
+    Open an aiosqlite connection and apply pragmas
+
+    Args:
+        db_path: Path to the SQLite file
+        pragmas: PRAGMA statements to run after connecting
+        read_only: Open the file with mode=ro so the connection can never write
+
+    Returns:
+        Open aiosqlite connection with Row factory
+    """
+    if read_only:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        conn = await aiosqlite.connect(uri, uri=True)
+    else:
+        conn = await aiosqlite.connect(str(db_path))
+    conn.row_factory = aiosqlite.Row
+
+    for pragma in pragmas:
+        await conn.execute(pragma)
+    if read_only:
+        await conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+class _PooledConnection:
+    """Pool bookkeeping for a single connection"""
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+        self.last_checked = time.monotonic()
+
+
+class ReadPool:
+    """Fixed-size pool of read-only SQLite connections"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        size: int,
+        pragmas: List[str],
+        acquire_timeout: float = 5.0,
+        health_check_interval: float = 30.0
+    ):
+        self.db_path = Path(db_path)
+        self.size = max(1, size)
+        self.pragmas = pragmas
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self._idle: Optional[asyncio.Queue] = None
+        self._all: List[_PooledConnection] = []
+        self._closed = True
+
+        # Monitoring counters
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._health_check_failures = 0
+        self._reconnects = 0
+
+    @property
+    def is_open(self) -> bool:
+        return not self._closed
+
+    async def open(self):
+        """Open all pooled connections"""
+        if not self._closed:
+            return
+        self._idle = asyncio.Queue()
+        self._all = []
+        for _ in range(self.size):
+            conn = await open_connection(self.db_path, self.pragmas, read_only=True)
+            pooled = _PooledConnection(conn)
+            self._all.append(pooled)
+            self._idle.put_nowait(pooled)
+        self._closed = False
+        logger.info(f"Read pool opened with {self.size} connections: {self.db_path}")
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self._closed:
+            return
+        self._closed = True
+        for pooled in self._all:
+            try:
+                await pooled.conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled connection: {e}")
+        self._all = []
+        self._idle = None
+        logger.info("Read pool closed")
+
+    async def _ensure_healthy(self, pooled: _PooledConnection) -> _PooledConnection:
+        """Ping a connection that has been idle past the check interval, replacing it if dead"""
+        now = time.monotonic()
+        if now - pooled.last_checked < self.health_check_interval:
+            return pooled
+
+        try:
+            async with pooled.conn.execute("SELECT 1") as cursor:
+                await cursor.fetchone()
+            pooled.last_checked = now
+            return pooled
+        except Exception as e:
+            self._health_check_failures += 1
+            logger.warning(f"Pooled read connection failed health check, reconnecting: {e}")
+            try:
+                await pooled.conn.close()
+            except Exception:
+                pass
+            pooled.conn = await open_connection(self.db_path, self.pragmas, read_only=True)
+            pooled.last_checked = time.monotonic()
+            self._reconnects += 1
+            return pooled
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Borrow a read-only connection for the duration of the block
+
+        Raises:
+            PoolTimeoutError: If no connection frees up within acquire_timeout
+        """
+        if self._closed:
+            raise RuntimeError("Read pool is not open")
+
+        started = time.monotonic()
+        try:
+            pooled = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise PoolTimeoutError(
+                f"Timed out after {self.acquire_timeout}s waiting for a read connection"
+            )
+
+        wait_ms = (time.monotonic() - started) * 1000
+        self._acquisitions += 1
+        self._total_wait_ms += wait_ms
+        self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+
+        try:
+            pooled = await self._ensure_healthy(pooled)
+            yield pooled.conn
+        finally:
+            if not self._closed:
+                self._idle.put_nowait(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool statistics for monitoring"""
+        idle = self._idle.qsize() if self._idle is not None else 0
+        return {
+            "size": self.size,
+            "open": not self._closed,
+            "idle": idle,
+            "in_use": (self.size - idle) if not self._closed else 0,
+            "acquisitions": self._acquisitions,
+            "timeouts": self._timeouts,
+            "avg_wait_ms": round(self._total_wait_ms / self._acquisitions, 3) if self._acquisitions else 0.0,
+            "max_wait_ms": round(self._max_wait_ms, 3),
+            "health_check_failures": self._health_check_failures,
+            "reconnects": self._reconnects
+        }
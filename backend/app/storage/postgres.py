@@ -0,0 +1,208 @@
+"""
+PostgreSQL database backend (asyncpg)
+Selected when DATABASE_URL is a postgresql:// URL. asyncpg's pool serves reads
+and writes alike, so the pool itself is the connection handle routes receive.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+import logging
+
+from app.config import settings
+from app.storage.migrations import Migration, MigrationError, _check_order, latest_version
+from app.storage.postgres_schema import POSTGRES_MIGRATIONS, POSTGRES_SCHEMA_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Serializes migrations across app workers starting at the same time
+_MIGRATION_LOCK_ID = 0x63616d70  # "camp"
+
+_CREATE_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version INTEGER NOT NULL
+    )
+"""
+
+
+def _import_asyncpg():
+    try:
+        import asyncpg
+    except ImportError as e:
+        raise RuntimeError("PostgreSQL DATABASE_URL requires the asyncpg package (pip install asyncpg)") from e
+    return asyncpg
+
+
+def _dsn(url: str) -> str:
+    """asyncpg accepts postgresql:// and postgres:// only; strip a +asyncpg driver suffix"""
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(scheme="postgresql"))
+
+
+async def get_schema_version(conn) -> int:
+    exists = await conn.fetchval("SELECT to_regclass('schema_version') IS NOT NULL")
+    if not exists:
+        return 0
+    return await conn.fetchval("SELECT version FROM schema_version") or 0
+
+
+async def migrate(pool, migrations: Sequence[Migration], target: Optional[int] = None) -> List[Migration]:
+    """
+    Apply pending migrations in one transaction (PostgreSQL DDL is transactional)
+
+    Same contract as app.storage.migrations.migrate; the version is kept in the
+    schema_version table and an advisory lock keeps concurrent workers from
+    migrating at the same time.
+    """
+    _check_order(migrations)
+    target = latest_version(migrations) if target is None else target
+    async with pool.acquire() as conn:
+        current = await get_schema_version(conn)
+        if current == target:
+            return []
+        try:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", _MIGRATION_LOCK_ID)
+                # Another worker may have migrated while we waited for the lock
+                current = await get_schema_version(conn)
+                if current == target:
+                    return []
+                if current > latest_version(migrations):
+                    raise MigrationError(
+                        f"Database schema version {current} is newer than this application "
+                        f"({latest_version(migrations)})"
+                    )
+                if current > target:
+                    raise MigrationError(f"Downgrades are not supported (database at {current}, target {target})")
+
+                pending = [m for m in migrations if current < m.version <= target]
+                for migration in pending:
+                    logger.info(f"Applying schema migration {migration.version}: {migration.name}")
+                    await migration.apply(conn)
+                await conn.execute(_CREATE_VERSION_TABLE)
+                await conn.execute("""
+                    INSERT INTO schema_version (id, version) VALUES (TRUE, $1)
+                    ON CONFLICT (id) DO UPDATE SET version = EXCLUDED.version
+                """, target)
+        except MigrationError:
+            raise
+        except Exception as e:
+            raise MigrationError(f"Schema migration to version {target} failed: {e}") from e
+
+    logger.info(f"Database schema migrated from version {current} to {target}")
+    return pending
+
+
+class PostgresDatabase:
+    """Database connection manager for PostgreSQL (asyncpg pool)"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.conn = None
+
+    @property
+    def location(self) -> str:
+        """DATABASE_URL without credentials, for logs and the CLI"""
+        parts = urlsplit(self.url)
+        host = parts.hostname or ""
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        return urlunsplit(parts._replace(netloc=host))
+
+    async def connect(self):
+        """Create the connection pool"""
+        asyncpg = _import_asyncpg()
+        if self.conn is not None:
+            await self.conn.close()
+        self.conn = await asyncpg.create_pool(
+            _dsn(self.url),
+            min_size=settings.DB_PG_POOL_MIN_SIZE,
+            max_size=settings.DB_PG_POOL_MAX_SIZE,
+            command_timeout=settings.DB_PG_COMMAND_TIMEOUT,
+            max_inactive_connection_lifetime=settings.DB_HEALTH_CHECK_INTERVAL * 10
+        )
+        logger.info(f"Connected to database: {self.location}")
+        return self.conn
+
+    async def open_read_pool(self):
+        """Reads share the asyncpg pool; only make sure it exists"""
+        if self.conn is None:
+            await self.connect()
+
+    @asynccontextmanager
+    async def read_connection(self):
+        """Connection handle for read-only requests (the pool itself)"""
+        if self.conn is None:
+            await self.connect()
+        yield self.conn
+
+    async def ping(self):
+        async with self.conn.acquire(timeout=settings.DB_POOL_ACQUIRE_TIMEOUT) as conn:
+            await conn.fetchval("SELECT 1")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool statistics for monitoring"""
+        pool = self.conn
+        return {
+            "backend": "postgresql",
+            "connected": pool is not None,
+            "pool": {
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size()
+            } if pool is not None else None
+        }
+
+    async def close(self):
+        if self.conn is not None:
+            try:
+                await self.conn.close()
+                logger.info("Database connection pool closed")
+            except Exception as e:
+                logger.warning(f"Error closing database pool: {e}")
+            finally:
+                self.conn = None
+
+    async def init_db(self):
+        """Bring the schema up to date and keep the pool open"""
+        if self.conn is None:
+            await self.connect()
+        await self.migrate_schema()
+
+    async def schema_version(self) -> int:
+        async with self.conn.acquire() as conn:
+            return await get_schema_version(conn)
+
+    async def apply_migrations(self, target: Optional[int] = None) -> List[Migration]:
+        return await migrate(self.conn, POSTGRES_MIGRATIONS, target=target)
+
+    async def migrate_schema(self):
+        """Apply pending schema migrations, or verify the schema is current (see DB_AUTO_MIGRATE)"""
+        if settings.DB_AUTO_MIGRATE:
+            applied = await self.apply_migrations()
+            if applied:
+                logger.info(f"Applied {len(applied)} schema migration(s); schema version {POSTGRES_SCHEMA_VERSION}")
+            return
+
+        version = await self.schema_version()
+        if version != POSTGRES_SCHEMA_VERSION:
+            raise MigrationError(
+                f"Database schema version is {version}, expected {POSTGRES_SCHEMA_VERSION}; "
+                f"run `python -m app.migrate` before starting the app"
+            )
+
+    @property
+    def migrations(self) -> List[Migration]:
+        return POSTGRES_MIGRATIONS
+
+    async def pending_backfills(self) -> List[Migration]:
+        # JSONB parts are projected at query time, so no migration needs a data backfill
+        return []
+
+    async def run_backfills(self) -> Dict[int, int]:
+        return {}
+
+    async def reencode_payloads(self) -> int:
+        # ai_processing_data is JSONB; TOAST compression already applies
+        return 0
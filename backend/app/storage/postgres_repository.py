@@ -0,0 +1,409 @@
+"""
+PostgreSQL campaign repository (asyncpg)
+Each write is a single statement, so it commits on its own and the counter
+trigger runs in the same transaction; write_all groups several in one.
+ai_processing_data stays JSONB (TOAST already compresses it): binary codec
+payloads are converted to JSON text on write, and it is read back as JSON text
+so Campaign keeps decoding it lazily.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.campaign import CAMPAIGN_COLUMNS, SUMMARY_COLUMNS, Campaign
+from app.models.campaign_archive import TERMINAL_CONDITION
+from app.models.campaign_parts import (
+    AI_RESULT_PARTS,
+    ALL_PARTS,
+    PART_ASSETS,
+    PART_CONTENT
+)
+from app.models.campaign_search import search_terms
+from app.storage.repository import LIST_PARTS, CampaignRepository, batch_updates
+from app.utils import json_codec
+from app.utils.payload_codec import Stored, get_payload_codec
+from app.utils.pagination import COUNT_NONE
+
+_SUMMARY_SELECT = ", ".join(SUMMARY_COLUMNS)
+_FULL_SELECT = ", ".join(
+    "ai_processing_data::text AS ai_processing_data" if c == 'ai_processing_data' else c
+    for c in CAMPAIGN_COLUMNS
+)
+
+# Copies a hot row into the archive, taking the proof path from $3 when it is not NULL
+_MOVE_SELECT = ", ".join("COALESCE($3, proof_s3_path)" if c == 'proof_s3_path' else c for c in CAMPAIGN_COLUMNS)
+
+# ts_rank weights for labels {D, C, B, A}; same ratios as the SQLite bm25 weights
+_RANK_WEIGHTS = "'{0.1, 0.4, 0.6, 1.0}'"
+
+
+def _placeholder(column: str, index: int) -> str:
+    return f"${index}::jsonb" if column == 'ai_processing_data' else f"${index}"
+
+
+def _as_json(stored: Optional[Stored]) -> Optional[str]:
+    """JSON text for a stored ai_processing_data value (JSONB cannot hold codec bytes)"""
+    if stored is None or isinstance(stored, str):
+        return stored
+    return json_codec.dumps(get_payload_codec().decode(stored))
+
+
+def _part_columns(parts: Iterable[str]) -> List[Tuple[str, str]]:
+    """(alias, JSONB expression) pairs selecting each requested part as JSON text"""
+    parts = set(parts)
+    unknown = parts - set(ALL_PARTS)
+    if unknown:
+        raise ValueError(f"Unknown ai_processing_data parts: {sorted(unknown)}")
+    columns = []
+    if PART_ASSETS in parts:
+        columns.append(("part_logo", "ai_processing_data->'logo'"))
+        columns.append(("part_hero_images", "ai_processing_data->'hero_images'"))
+    if PART_CONTENT in parts:
+        columns.append(("part_content", "ai_processing_data->'content'"))
+    for result_type in AI_RESULT_PARTS:
+        if result_type in parts:
+            columns.append((f"part_{result_type}", f"ai_processing_data->'ai_results'->'{result_type}'"))
+    return columns
+
+
+def _assemble_parts(row, columns: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """Rebuild a partial ai_processing_data shaped like the blob (as load_campaign_parts does)"""
+    data: Dict[str, Any] = {}
+    for alias, _ in columns:
+        raw = row[alias]
+        if raw is None:
+            continue
+        value = json_codec.loads(raw)
+        key = alias[len("part_"):]
+        if key in AI_RESULT_PARTS:
+            data.setdefault('ai_results', {})[key] = value
+        elif key == 'logo':
+            if isinstance(value, dict):
+                data['logo'] = value
+        elif key == 'hero_images':
+            if isinstance(value, list):
+                data['hero_images'] = [hero if isinstance(hero, dict) else {} for hero in value]
+        elif isinstance(value, dict):
+            data['content'] = {k: v for k, v in value.items() if v is not None}
+    return data
+
+
+class PostgresCampaignRepository(CampaignRepository):
+    """CampaignRepository over an asyncpg pool (or a single asyncpg connection)"""
+
+    async def insert(self, campaign: Campaign, ai_stored: Optional[Stored]):
+        await self._execute_insert(campaign, ai_stored)
+
+    async def _execute_insert(self, campaign: Campaign, ai_stored: Optional[Stored]):
+        await self.conn.execute(f"""
+            INSERT INTO campaigns ({", ".join(CAMPAIGN_COLUMNS)})
+            VALUES ({", ".join(_placeholder(c, i) for i, c in enumerate(CAMPAIGN_COLUMNS, start=1))})
+        """, *[
+            _as_json(ai_stored) if column == 'ai_processing_data' else getattr(campaign, column)
+            for column in CAMPAIGN_COLUMNS
+        ])
+
+    async def update(self, campaign: Campaign, values: Dict[str, Any]) -> Optional[Stored]:
+        columns = sorted(values)
+        assignments = ", ".join(
+            f"{column} = {_placeholder(column, i)}" for i, column in enumerate(columns, start=1)
+        )
+        params = [
+            _as_json(values[column]) if column == 'ai_processing_data' else values[column]
+            for column in columns
+        ]
+        status = await self.conn.execute(
+            f"UPDATE campaigns SET {assignments} WHERE id = ${len(columns) + 1}",
+            *params, campaign.id
+        )
+        if status != "UPDATE 0":
+            return values.get('ai_processing_data', campaign._ai_stored)
+        # Row disappeared underneath us (or was archived); write the full object back
+        ai_stored = campaign._encode_ai_data()
+        async with self._connection() as conn, conn.transaction():
+            await PostgresCampaignRepository(conn)._execute_insert(campaign, ai_stored)
+            await conn.execute("DELETE FROM campaigns_archive WHERE id = $1", campaign.id)
+        return ai_stored
+
+    async def write_all(self, writes: List[Tuple[Campaign, str, Any]]) -> List[Optional[Stored]]:
+        single, batches = batch_updates(writes)
+        async with self._connection() as conn, conn.transaction():
+            repository = PostgresCampaignRepository(conn)
+            stored: List[Optional[Stored]] = [None] * len(writes)
+            for index in single:
+                campaign, kind, payload = writes[index]
+                if kind == 'insert':
+                    await repository._execute_insert(campaign, payload)
+                    stored[index] = payload
+                else:
+                    stored[index] = await repository.update(campaign, payload)
+            for columns, indexes in batches.items():
+                assignments = ", ".join(
+                    f"{column} = {_placeholder(column, i)}" for i, column in enumerate(columns, start=1)
+                )
+                batch = [(writes[index][0], writes[index][2]) for index in indexes]
+                await conn.executemany(
+                    f"UPDATE campaigns SET {assignments} WHERE id = ${len(columns) + 1}",
+                    [[values[column] for column in columns] + [campaign.id] for campaign, values in batch]
+                )
+                # executemany reports no row counts; campaigns whose row is gone are written back in full
+                rows = await conn.fetch(
+                    "SELECT id FROM campaigns WHERE id = ANY($1::text[])", [campaign.id for campaign, _ in batch]
+                )
+                found = {row['id'] for row in rows}
+                for index, (campaign, values) in zip(indexes, batch):
+                    if campaign.id in found:
+                        stored[index] = campaign._ai_stored
+                    else:
+                        stored[index] = await repository.update(campaign, values)
+            return stored
+
+    @asynccontextmanager
+    async def _connection(self):
+        """A single connection: acquired from the pool, or the connection this wraps"""
+        if hasattr(self.conn, 'acquire'):
+            async with self.conn.acquire() as conn:
+                yield conn
+        else:
+            yield self.conn
+
+    async def get_by_id(self, campaign_id: str):
+        row = await self.conn.fetchrow(f"SELECT {_FULL_SELECT} FROM campaigns WHERE id = $1", campaign_id)
+        return Campaign.from_row(dict(row)) if row else None
+
+    async def get_by_ids(self, campaign_ids: Iterable[str]) -> List[Campaign]:
+        rows = await self.conn.fetch(
+            f"SELECT {_FULL_SELECT} FROM campaigns WHERE id = ANY($1::text[])", list(campaign_ids)
+        )
+        return [Campaign.from_row(dict(row)) for row in rows]
+
+    async def get_by_id_with_parts(self, campaign_id: str, parts: Iterable[str]):
+        campaigns = await self._summaries(["id = $1"], [campaign_id], "", parts)
+        return campaigns[0] if campaigns else None
+
+    async def get_many(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Campaign]:
+        conditions, params = _filters(status, review_status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = await self.conn.fetch(f"""
+            SELECT {_FULL_SELECT} FROM campaigns
+            {where}
+            ORDER BY created_at DESC
+            LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}
+        """, *params, limit, offset)
+        return [Campaign.from_row(dict(row)) for row in rows]
+
+    async def get_scheduled(self, past: bool = False) -> List[Campaign]:
+        comparison = "<=" if past else ">"
+        rows = await self.conn.fetch(f"""
+            SELECT {_FULL_SELECT} FROM campaigns
+            WHERE scheduling_status = 'scheduled'
+            AND scheduled_at IS NOT NULL
+            AND scheduled_at {comparison} $1
+            ORDER BY scheduled_at ASC
+        """, datetime.utcnow().isoformat())
+        return [Campaign.from_row(dict(row)) for row in rows]
+
+    async def _summaries(
+        self,
+        conditions: List[str],
+        params: List[Any],
+        tail: str,
+        parts: Iterable[str],
+        extra_params: Iterable[Any] = ()
+    ) -> List[Campaign]:
+        """Select summary columns plus the requested JSONB parts; `tail` is ORDER BY / LIMIT"""
+        part_columns = _part_columns(parts)
+        select = ", ".join([_SUMMARY_SELECT] + [f"{expr}::text AS {alias}" for alias, expr in part_columns])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = await self.conn.fetch(
+            f"SELECT {select} FROM campaigns {where} {tail}",
+            *params, *extra_params
+        )
+        return [Campaign.from_partial_row(dict(row), _assemble_parts(row, part_columns)) for row in rows]
+
+    async def get_summaries(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+        parts: Iterable[str] = LIST_PARTS,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Campaign]:
+        conditions, params = _filters(status, review_status)
+        if any_review_status and not review_status:
+            conditions.append("review_status IS NOT NULL")
+        if after is not None:
+            conditions.append(f"(created_at, id) < (${len(params) + 1}, ${len(params) + 2})")
+            params.extend(after)
+        tail = f"ORDER BY created_at DESC, id DESC LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}"
+        return await self._summaries(conditions, params, tail, parts, (limit, offset))
+
+    async def get_performance_summaries(self, parts: Iterable[str]) -> List[Campaign]:
+        return await self._summaries(
+            ["status = 'approved'", "performance_score IS NOT NULL", "performance_score > 0"],
+            [], "ORDER BY performance_score DESC", parts
+        )
+
+    async def get_unscored_approved(self) -> List[Campaign]:
+        return await self._summaries(
+            ["status = 'approved'", "(performance_score IS NULL OR performance_score = 0)"],
+            [], "ORDER BY created_at DESC", ()
+        )
+
+    async def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        mode: str = "exact"
+    ) -> Tuple[Optional[int], bool]:
+        if mode == COUNT_NONE:
+            return None, False
+        if review_status or any_review_status:
+            counts = await self._read_counts('review_status_counts', 'review_status')
+            key = review_status
+        else:
+            counts = await self.get_status_counts()
+            key = status
+        if key:
+            return counts.get(key, 0), False
+        return sum(counts.values()), False
+
+    async def _read_counts(self, table: str, column: str) -> Dict[str, int]:
+        rows = await self.conn.fetch(f"SELECT {column}, count FROM {table} WHERE count > 0")
+        return {row[0]: row[1] for row in rows}
+
+    async def get_status_counts(self) -> Dict[str, int]:
+        return await self._read_counts('campaign_status_counts', 'status')
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, Any]] = None,
+        parts: Iterable[str] = LIST_PARTS
+    ) -> List[Tuple[Campaign, Tuple[float, str]]]:
+        terms = search_terms(query)
+        if not terms:
+            return []
+        if after is not None and not isinstance(after[1], str):
+            raise ValueError("Invalid pagination cursor")
+
+        # Quoted prefix lexemes, all required; terms are \w+ so they need no escaping
+        tsquery = " & ".join(f"'{term}':*" for term in terms)
+        part_columns = _part_columns(parts)
+        select = ", ".join([_SUMMARY_SELECT] + [f"{expr}::text AS {alias}" for alias, expr in part_columns])
+        conditions = ["search_vector @@ q"]
+        params: List[Any] = [tsquery]
+        if status:
+            params.append(status)
+            conditions.append(f"status = ${len(params)}")
+        # Negated rank, so lower is better and cursors compare like the SQLite bm25 score
+        outer = ""
+        if after is not None:
+            params.extend(after)
+            outer = f"WHERE search_score > ${len(params) - 1} OR (search_score = ${len(params) - 1} AND id > ${len(params)})"
+        params.append(limit)
+        rows = await self.conn.fetch(f"""
+            SELECT * FROM (
+                SELECT {select}, (-ts_rank({_RANK_WEIGHTS}, search_vector, q))::float8 AS search_score
+                FROM campaigns, to_tsquery('simple', $1) q
+                WHERE {' AND '.join(conditions)}
+            ) ranked
+            {outer}
+            ORDER BY search_score, id
+            LIMIT ${len(params)}
+        """, *params)
+        return [
+            (Campaign.from_partial_row(dict(row), _assemble_parts(row, part_columns)), (row['search_score'], row['id']))
+            for row in rows
+        ]
+
+    async def get_archived(self, campaign_id: str):
+        row = await self.conn.fetchrow(f"SELECT {_FULL_SELECT} FROM campaigns_archive WHERE id = $1", campaign_id)
+        return Campaign.from_row(dict(row)) if row else None
+
+    async def archive_candidates(
+        self,
+        terminal_before: str,
+        stale_before: Optional[str],
+        limit: int
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        rows = await self.conn.fetch(f"""
+            SELECT id, updated_at, proof_s3_path FROM campaigns
+            WHERE updated_at < $1
+            AND ({TERMINAL_CONDITION} OR (updated_at < $2 AND scheduling_status IS DISTINCT FROM 'scheduled'))
+            ORDER BY updated_at
+            LIMIT $3
+        """, max(terminal_before, stale_before or ""), stale_before or "", limit)
+        return [tuple(row) for row in rows]
+
+    async def archive(
+        self,
+        moves: List[Tuple[str, Optional[str], Optional[str]]],
+        archived_at: str
+    ) -> List[str]:
+        moved = []
+        async with self._connection() as conn, conn.transaction():
+            for campaign_id, updated_at, proof_s3_path in moves:
+                await conn.execute("DELETE FROM campaigns_archive WHERE id = $1", campaign_id)
+                # The DELETE fires the counter trigger; campaigns updated since selection are skipped
+                archived = await conn.fetchval(f"""
+                    WITH moved AS (
+                        DELETE FROM campaigns
+                        WHERE id = $1 AND updated_at IS NOT DISTINCT FROM $2
+                        RETURNING {", ".join(CAMPAIGN_COLUMNS)}
+                    )
+                    INSERT INTO campaigns_archive ({", ".join(CAMPAIGN_COLUMNS)}, archived_at)
+                    SELECT {_MOVE_SELECT}, $4 FROM moved
+                    RETURNING id
+                """, campaign_id, updated_at, proof_s3_path, archived_at)
+                if archived is not None:
+                    moved.append(archived)
+        return moved
+
+    async def count_archived(self) -> int:
+        return await self.conn.fetchval("SELECT COUNT(*) FROM campaigns_archive")
+
+
+    async def get_summaries_by_ids(self, campaign_ids: Iterable[str], parts: Iterable[str] = LIST_PARTS) -> List[Campaign]:
+        return await self._summaries(["id = ANY($1::text[])"], [list(campaign_ids)], "", parts)
+
+    async def get_events(self, since: int, limit: int) -> List[Tuple[int, str, str]]:
+        rows = await self.conn.fetch(
+            "SELECT seq, campaign_id, kind FROM campaign_events WHERE seq > $1 ORDER BY seq LIMIT $2", since, limit
+        )
+        return [tuple(row) for row in rows]
+
+    async def get_event_bounds(self) -> Tuple[int, int]:
+        row = await self.conn.fetchrow("SELECT MIN(seq), MAX(seq) FROM campaign_events")
+        return row[0] or 0, row[1] or 0
+
+    async def prune_events(self, before: str) -> int:
+        status = await self.conn.execute("""
+            DELETE FROM campaign_events WHERE seq < COALESCE(
+                (SELECT seq FROM campaign_events WHERE changed_at >= $1 ORDER BY seq LIMIT 1),
+                (SELECT MAX(seq) FROM campaign_events)
+            )
+        """, before)
+        return int(status.split()[-1])
+
+def _filters(status: Optional[str], review_status: Optional[str]) -> Tuple[List[str], List[Any]]:
+    conditions: List[str] = []
+    params: List[Any] = []
+    if status:
+        params.append(status)
+        conditions.append(f"status = ${len(params)}")
+    if review_status:
+        params.append(review_status)
+        conditions.append(f"review_status = ${len(params)}")
+    return conditions, params
@@ -0,0 +1,243 @@
+"""
+Schema history for the PostgreSQL backend
+Mirrors app.storage.schema: same campaigns columns and list indexes, counters
+kept by a trigger, and search served from a generated tsvector column instead
+of FTS5. ai_processing_data is JSONB, so list and analytics reads project the
+parts they need straight from it and there are no normalized part tables.
+Append new migrations to POSTGRES_MIGRATIONS; never edit one that has shipped.
+"""
+from app.storage.migrations import Migration
+
+
+# Text columns compared by keyset cursors use the C collation so ordering
+# matches SQLite's byte order and the (created_at, id) indexes serve the cursors
+_CREATE_CAMPAIGNS = """
+    CREATE TABLE IF NOT EXISTS campaigns (
+        id TEXT COLLATE "C" PRIMARY KEY,
+        campaign_name TEXT NOT NULL,
+        advertiser_name TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'draft',
+        created_at TEXT COLLATE "C" NOT NULL,
+        approved_at TEXT,
+        assets_s3_path TEXT,
+        html_s3_path TEXT,
+        proof_s3_path TEXT,
+        ai_processing_data JSONB,
+        updated_at TEXT,
+        feedback TEXT,
+        scheduled_at TEXT COLLATE "C",
+        scheduling_status TEXT,
+        review_status TEXT,
+        reviewer_notes TEXT,
+        open_rate DOUBLE PRECISION,
+        click_rate DOUBLE PRECISION,
+        conversion_rate DOUBLE PRECISION,
+        performance_score DOUBLE PRECISION,
+        performance_timestamp TEXT
+    )
+"""
+
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status)",
+    "CREATE INDEX IF NOT EXISTS idx_campaigns_created_at ON campaigns(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_campaigns_created_id ON campaigns(created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_campaigns_status_created ON campaigns(status, created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_campaigns_review_created ON campaigns(review_status, created_at DESC, id DESC)",
+)
+
+# Same columns and relative weights as the SQLite FTS5 index (see campaign_search.SEARCH_WEIGHTS):
+# A = campaign name, B = advertiser, C = subject line, D = headline + body copy + feedback
+_SEARCH_COLUMN = """
+    ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(campaign_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(advertiser_name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(ai_processing_data->'content'->>'subject_line', '')), 'C') ||
+        setweight(to_tsvector('simple',
+            coalesce(ai_processing_data->'content'->>'headline', '') || ' ' ||
+            coalesce(ai_processing_data->'content'->>'body_copy', '') || ' ' ||
+            coalesce(feedback, '')
+        ), 'D')
+    ) STORED
+"""
+
+_COUNT_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS campaign_status_counts (
+        status TEXT PRIMARY KEY,
+        count BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    # Only campaigns with a review status are counted (the review list filters IS NOT NULL)
+    """
+    CREATE TABLE IF NOT EXISTS review_status_counts (
+        review_status TEXT PRIMARY KEY,
+        count BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION campaigns_update_counts() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE campaign_status_counts SET count = count - 1 WHERE status = OLD.status;
+            IF OLD.review_status IS NOT NULL THEN
+                UPDATE review_status_counts SET count = count - 1 WHERE review_status = OLD.review_status;
+            END IF;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO campaign_status_counts (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = campaign_status_counts.count + 1;
+            IF NEW.review_status IS NOT NULL THEN
+                INSERT INTO review_status_counts (review_status, count) VALUES (NEW.review_status, 1)
+                ON CONFLICT (review_status) DO UPDATE SET count = review_status_counts.count + 1;
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS trg_campaigns_counts ON campaigns",
+    """
+    CREATE TRIGGER trg_campaigns_counts
+    AFTER INSERT OR DELETE OR UPDATE OF status, review_status ON campaigns
+    FOR EACH ROW EXECUTE FUNCTION campaigns_update_counts()
+    """,
+)
+
+
+async def _baseline(conn):
+    await conn.execute(_CREATE_CAMPAIGNS)
+    for statement in _INDEXES:
+        await conn.execute(statement)
+
+
+async def _status_counts(conn):
+    for statement in _COUNT_TABLES:
+        await conn.execute(statement)
+    # Seeded in the migration transaction, under the migration lock
+    await conn.execute("DELETE FROM campaign_status_counts")
+    await conn.execute("DELETE FROM review_status_counts")
+    await conn.execute("""
+        INSERT INTO campaign_status_counts (status, count)
+        SELECT status, COUNT(*) FROM campaigns GROUP BY status
+    """)
+    await conn.execute("""
+        INSERT INTO review_status_counts (review_status, count)
+        SELECT review_status, COUNT(*) FROM campaigns
+        WHERE review_status IS NOT NULL GROUP BY review_status
+    """)
+
+
+async def _search_index(conn):
+    await conn.execute(_SEARCH_COLUMN)
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_search ON campaigns USING GIN (search_vector)")
+
+
+async def _search_feedback(conn):
+    # A generated column's expression cannot be altered; dropping it drops its GIN index too
+    await conn.execute("ALTER TABLE campaigns DROP COLUMN IF EXISTS search_vector")
+    await _search_index(conn)
+
+
+_ARCHIVE_TABLE = """
+    CREATE TABLE IF NOT EXISTS campaigns_archive (
+        id TEXT COLLATE "C" PRIMARY KEY,
+        campaign_name TEXT NOT NULL,
+        advertiser_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT COLLATE "C" NOT NULL,
+        approved_at TEXT,
+        assets_s3_path TEXT,
+        html_s3_path TEXT,
+        proof_s3_path TEXT,
+        ai_processing_data JSONB,
+        updated_at TEXT,
+        feedback TEXT,
+        scheduled_at TEXT COLLATE "C",
+        scheduling_status TEXT,
+        review_status TEXT,
+        reviewer_notes TEXT,
+        open_rate DOUBLE PRECISION,
+        click_rate DOUBLE PRECISION,
+        conversion_rate DOUBLE PRECISION,
+        performance_score DOUBLE PRECISION,
+        performance_timestamp TEXT,
+        archived_at TEXT NOT NULL
+    )
+"""
+
+
+async def _campaign_archive(conn):
+    await conn.execute(_ARCHIVE_TABLE)
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_updated_at ON campaigns(updated_at)")
+
+
+# Same log as app.models.campaign_events. Identity values are handed out in
+# insert order, not commit order, so the trigger takes a transaction-level
+# advisory lock first: a transaction that logged an event commits before the
+# next one can log, and readers never see seq N+1 before seq N.
+_EVENTS_LOCK = 0x63616d70  # 'camp'
+
+_EVENT_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS campaign_events (
+        seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        campaign_id TEXT COLLATE "C" NOT NULL,
+        kind TEXT NOT NULL,
+        changed_at TEXT COLLATE "C" NOT NULL
+    )
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION campaigns_log_event() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock({_EVENTS_LOCK});
+        INSERT INTO campaign_events (campaign_id, kind, changed_at) VALUES (
+            CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+            lower(TG_OP),
+            to_char(clock_timestamp() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+        );
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS trg_campaigns_events ON campaigns",
+    """
+    CREATE TRIGGER trg_campaigns_events
+    AFTER INSERT OR UPDATE OR DELETE ON campaigns
+    FOR EACH ROW EXECUTE FUNCTION campaigns_log_event()
+    """,
+)
+
+
+async def _query_indexes(conn):
+    # Same indexes as SQLite migration 8
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_scheduled_due
+        ON campaigns(scheduled_at) WHERE scheduling_status = 'scheduled'
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_status_score
+        ON campaigns(status, performance_score DESC)
+    """)
+    await conn.execute("DROP INDEX IF EXISTS idx_campaigns_status")
+    await conn.execute("DROP INDEX IF EXISTS idx_campaigns_created_at")
+
+
+async def _campaign_events(conn):
+    for statement in _EVENT_TABLES:
+        await conn.execute(statement)
+
+
+POSTGRES_MIGRATIONS = [
+    Migration(1, "campaigns table and list indexes", _baseline),
+    Migration(2, "trigger-maintained status counters", _status_counts),
+    Migration(3, "full-text search column", _search_index),
+    Migration(4, "search review feedback", _search_feedback),
+    Migration(5, "campaign archive table", _campaign_archive),
+    Migration(6, "scheduler and analytics indexes", _query_indexes),
+    Migration(7, "campaign change events", _campaign_events),
+]
+
+POSTGRES_SCHEMA_VERSION = POSTGRES_MIGRATIONS[-1].version
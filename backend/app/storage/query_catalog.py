@@ -0,0 +1,347 @@
+"""
+Catalog of the SQL the SQLite backend issues, with query-plan checks
+Each entry runs one real read path (repository method, counter, search,
+backfill or archive scan) with sample arguments. Running the catalog with a
+statement trace captures exactly the SQL those paths send, and EXPLAIN QUERY
+PLAN shows how SQLite runs each statement; plans that scan a whole table or
+sort in a temp b-tree are reported unless the entry allows them with a reason.
+
+tests/test_query_plans.py checks the catalog against a seeded 100k-campaign
+database and keeps the plans in tests/query_plans/sqlite.txt;
+`python -m app.migrate --explain` prints the report for a real database.
+Writes are single-row statements keyed by id and are not listed. The backfill
+and re-encode entries really run, so they finish any work still pending; both
+are idempotent.
+"""
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import re
+
+from app.models.campaign_counts import count_campaigns
+from app.models.campaign_parts import ALL_PARTS, backfill_campaign_parts, load_campaign_parts, load_unsynced_parts
+from app.models.campaign_payloads import reencode_payloads, sample_payloads
+from app.models.campaign_search import backfill_search_index
+from app.storage.repository import LIST_PARTS, repository_for
+
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+SAMPLE_CURSOR = ("2024-06-01T00:00:00", SAMPLE_ID)
+SAMPLE_CUTOFF = "2024-01-01T00:00:00"
+
+# Plan details that mean the whole table (or a sort of it) is read
+_SCAN = re.compile(r"^SCAN (\S+)(.*)$")
+# Inlined parameters, so batches of one statement are reported once
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\?(?:, \?)+")
+TEMP_SORT = "TEMP B-TREE"
+
+
+class CatalogQuery:
+    """
+    One catalogued query path
+
+    Args:
+        name: Stable name, used in reports and the plan snapshot
+        run: Coroutine taking a connection that issues the statements
+        allow: Plan findings this path may have, mapped to the reason: a table
+            (or alias) it may scan in full, or TEMP_SORT for a temp b-tree sort
+    """
+
+    def __init__(self, name: str, run: Callable[..., Awaitable], allow: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.run = run
+        self.allow = allow or {}
+
+    def __repr__(self):
+        return f"CatalogQuery({self.name!r})"
+
+
+QUERIES: List[CatalogQuery] = []
+
+
+def catalog(name: str, allow: Optional[Dict[str, str]] = None):
+    """Register the decorated coroutine as a catalog entry"""
+    def register(run):
+        QUERIES.append(CatalogQuery(name, run, allow))
+        return run
+    return register
+
+
+@catalog("campaigns.get_by_id")
+async def _get_by_id(conn):
+    await repository_for(conn).get_by_id(SAMPLE_ID)
+
+
+@catalog("campaigns.get_by_ids")
+async def _get_by_ids(conn):
+    await repository_for(conn).get_by_ids([SAMPLE_ID, SAMPLE_ID[:-1] + "1"])
+
+
+@catalog("campaigns.get_by_id_with_parts")
+async def _get_by_id_with_parts(conn):
+    await repository_for(conn).get_by_id_with_parts(SAMPLE_ID, ALL_PARTS)
+
+
+@catalog("campaigns.get_all")
+async def _get_all(conn):
+    await repository_for(conn).get_many(limit=100)
+
+
+@catalog("campaigns.get_by_status")
+async def _get_by_status(conn):
+    await repository_for(conn).get_many(status="approved", limit=100)
+
+
+@catalog("campaigns.get_by_review_status")
+async def _get_by_review_status(conn):
+    await repository_for(conn).get_many(review_status="pending", limit=100)
+
+
+@catalog("campaigns.get_scheduled")
+async def _get_scheduled(conn):
+    await repository_for(conn).get_scheduled()
+
+
+@catalog("campaigns.get_past_scheduled")
+async def _get_past_scheduled(conn):
+    await repository_for(conn).get_scheduled(past=True)
+
+
+@catalog("campaigns.list")
+async def _list(conn):
+    repository = repository_for(conn)
+    await repository.get_summaries(limit=20)
+    await repository.get_summaries(limit=20, after=SAMPLE_CURSOR)
+
+
+@catalog("campaigns.list_by_status")
+async def _list_by_status(conn):
+    repository = repository_for(conn)
+    await repository.get_summaries(status="approved", limit=20)
+    await repository.get_summaries(status="approved", limit=20, after=SAMPLE_CURSOR)
+
+
+@catalog("campaigns.list_reviews")
+async def _list_reviews(conn):
+    repository = repository_for(conn)
+    await repository.get_summaries(any_review_status=True, limit=20)
+    await repository.get_summaries(review_status="pending", any_review_status=True, limit=20, after=SAMPLE_CURSOR)
+
+
+@catalog("campaigns.performance_summaries", allow={
+    "campaign_content": "analytics loads content for every scored campaign; a scan beats that many lookups",
+})
+async def _performance_summaries(conn):
+    await repository_for(conn).get_performance_summaries(LIST_PARTS)
+
+
+@catalog("campaigns.unscored_approved", allow={
+    TEMP_SORT: "only unscored rows are read (through idx_campaigns_status_score), then sorted by date",
+})
+async def _unscored_approved(conn):
+    await repository_for(conn).get_unscored_approved()
+
+
+@catalog("campaigns.counts", allow={
+    "campaign_status_counts": "one row per status",
+    "review_status_counts": "one row per review status",
+})
+async def _counts(conn):
+    await count_campaigns(conn)
+    await count_campaigns(conn, any_review_status=True)
+
+
+@catalog("campaigns.search", allow={TEMP_SORT: "results are ranked by bm25 after matching"})
+async def _search(conn):
+    repository = repository_for(conn)
+    await repository.search("spring sale", status="approved", limit=20)
+    await repository.search("spring", limit=20, after=(-1.0, 1))
+
+
+@catalog("parts.load")
+async def _load_parts(conn):
+    ids = [SAMPLE_ID, SAMPLE_ID[:-1] + "1"]
+    await load_campaign_parts(conn, ids, ALL_PARTS)
+    await load_unsynced_parts(conn, ids, LIST_PARTS)
+
+
+@catalog("parts.backfill")
+async def _backfill_parts(conn):
+    await backfill_campaign_parts(conn, batch_size=5000)
+
+
+@catalog("search.backfill")
+async def _backfill_search(conn):
+    await backfill_search_index(conn, batch_size=5000)
+
+
+@catalog("payloads.reencode")
+async def _reencode(conn):
+    await reencode_payloads(conn, batch_size=5000)
+
+
+@catalog("payloads.sample", allow={"campaigns": "newest rows by rowid; stops after LIMIT"})
+async def _sample(conn):
+    await sample_payloads(conn, limit=100)
+
+
+@catalog("archive.candidates")
+async def _archive_candidates(conn):
+    await repository_for(conn).archive_candidates(SAMPLE_CUTOFF, "2023-01-01T00:00:00", 100)
+
+
+@catalog("archive.get")
+async def _archive_get(conn):
+    await repository_for(conn).get_archived(SAMPLE_ID)
+
+
+@catalog("events.read")
+async def _read_events(conn):
+    repository = repository_for(conn)
+    await repository.get_event_bounds()
+    await repository.get_events(1000, 100)
+
+
+@catalog("campaigns.summaries_by_ids")
+async def _summaries_by_ids(conn):
+    await repository_for(conn).get_summaries_by_ids([SAMPLE_ID, SAMPLE_ID[:-1] + "1"])
+
+
+async def capture_statements(conn, entry: CatalogQuery) -> List[str]:
+    """
+    SQL statements an entry sends, with parameters inlined by SQLite
+
+    Only SELECT/INSERT/UPDATE/DELETE statements are returned (not transaction
+    control or trigger bodies), each once, in the order first seen.
+    """
+    statements: List[str] = []
+    await conn.set_trace_callback(statements.append)
+    try:
+        await entry.run(conn)
+    finally:
+        await conn.set_trace_callback(None)
+
+    seen = []
+    for statement in statements:
+        statement = " ".join(statement.split())
+        # FTS5 reads its shadow tables through 'main'-qualified statements of its own
+        if "'main'." in statement:
+            continue
+        if statement.split(" ", 1)[0].upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+            if statement not in seen:
+                seen.append(statement)
+    return seen
+
+
+async def query_plan(conn, statement: str) -> List[Tuple[int, str]]:
+    """EXPLAIN QUERY PLAN rows as (depth, detail)"""
+    async with conn.execute(f"EXPLAIN QUERY PLAN {statement}") as cursor:
+        rows = await cursor.fetchall()
+    depth: Dict[int, int] = {0: -1}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append((depth[node_id], detail))
+    return plan
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement with literals replaced by ? and IN lists collapsed"""
+    return _PARAMETER_LIST.sub("?, ...", _LITERAL.sub("?", statement))
+
+
+def plan_problems(plan: Sequence[Tuple[int, str]], allow: Dict[str, str]) -> List[str]:
+    """Full table scans and temp b-tree sorts in a plan that are not allowed"""
+    problems = []
+    for _, detail in plan:
+        match = _SCAN.match(detail)
+        if match:
+            table, rest = match.groups()
+            # Index scans, virtual (FTS) tables and subquery results are not table scans
+            if table.startswith("(") or table == "CONSTANT" or "USING" in rest or "VIRTUAL TABLE" in rest:
+                continue
+            if table not in allow:
+                problems.append(detail)
+        elif TEMP_SORT in detail and TEMP_SORT not in allow:
+            problems.append(detail)
+    return problems
+
+
+class CatalogReport:
+    """Statements and plans of every catalog entry"""
+
+    def __init__(self):
+        # name -> [(statement, plan, problems)]
+        self.entries: Dict[str, List[Tuple[str, List[Tuple[int, str]], List[str]]]] = {}
+
+    @property
+    def problems(self) -> Dict[str, List[str]]:
+        found = {}
+        for name, statements in self.entries.items():
+            details = [problem for _, _, problems in statements for problem in problems]
+            if details:
+                found[name] = details
+        return found
+
+    def render(self, with_statements: bool = True) -> str:
+        """Plain-text plans (the snapshot format), entries in catalog order"""
+        lines = []
+        for name, statements in self.entries.items():
+            lines.append(f"== {name}")
+            for statement, plan, _ in statements:
+                if with_statements:
+                    lines.append(f"-- {statement}")
+                lines.extend(f"{'  ' * (depth + 1)}{detail}" for depth, detail in plan)
+        return "\n".join(lines) + "\n"
+
+
+async def explain_catalog(conn, queries: Sequence[CatalogQuery] = None) -> CatalogReport:
+    """Run the catalog on conn and collect the plan of every statement it issues"""
+    report = CatalogReport()
+    for entry in QUERIES if queries is None else queries:
+        statements = []
+        seen = set()
+        for statement in await capture_statements(conn, entry):
+            plan = await query_plan(conn, statement)
+            # The same statement with other values is only listed again if it is planned differently
+            key = (normalize_statement(statement), tuple(plan))
+            if key in seen:
+                continue
+            seen.add(key)
+            statements.append((key[0], plan, plan_problems(plan, entry.allow)))
+        report.entries[entry.name] = statements
+    return report
+
+
+async def redundant_indexes(conn) -> List[Tuple[str, str]]:
+    """
+    Indexes whose columns are a leading prefix of another index on the same table
+
+    Unique and partial indexes are never reported; they do more than speed up reads.
+
+    Returns:
+        (redundant index, index that covers it) pairs
+    """
+    async with conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'") as cursor:
+        tables = [row[0] for row in await cursor.fetchall()]
+
+    redundant = []
+    for table in tables:
+        async with conn.execute(f"PRAGMA index_list('{table}')") as cursor:
+            indexes = [(row[1], row[2], row[4]) for row in await cursor.fetchall()]
+        keys = {}
+        for name, _, _ in indexes:
+            async with conn.execute(f"PRAGMA index_xinfo('{name}')") as cursor:
+                keys[name] = [(row[2], row[3]) for row in await cursor.fetchall() if row[5]]
+        for name, unique, partial in indexes:
+            if unique or partial:
+                continue
+            for other, _, other_partial in indexes:
+                if other == name or other_partial or len(keys[other]) <= len(keys[name]):
+                    continue
+                prefix = keys[other][:len(keys[name])]
+                same = [column for column, _ in prefix] == [column for column, _ in keys[name]]
+                # Scanning an index backwards flips every column, so directions only need to agree relatively
+                flips = {desc != other_desc for (_, desc), (_, other_desc) in zip(keys[name], prefix)}
+                if same and len(flips) == 1:
+                    redundant.append((name, other))
+                    break
+    return redundant
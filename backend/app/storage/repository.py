@@ -0,0 +1,229 @@
+"""
+Campaign storage interface
+Campaign and the services talk to a CampaignRepository; the backend behind it
+(SQLite, sharded SQLite or PostgreSQL) is chosen from DATABASE_URL and DB_SHARDS. Routes keep passing the
+connection handle they get from get_db/get_read_db, and repository_for() wraps
+it in the matching implementation.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.campaign_parts import PART_ASSETS, PART_CONTENT
+from app.utils.payload_codec import Stored
+
+# Parts of ai_processing_data returned by list endpoints (never image analysis)
+LIST_PARTS = (PART_ASSETS, PART_CONTENT)
+
+
+class CampaignRepository(ABC):
+    """Data access for campaigns; one instance wraps one connection handle"""
+
+    # Whether get_events/get_event_bounds serve the change feed
+    change_feed = True
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @abstractmethod
+    async def insert(self, campaign, ai_stored: Optional[Stored]):
+        """Insert every column of a campaign as a new row"""
+
+    @abstractmethod
+    async def update(self, campaign, values: Dict[str, Any]) -> Optional[Stored]:
+        """
+        Write changed columns of a persisted campaign
+
+        Re-inserts the full campaign if its row has disappeared.
+
+        Returns:
+            The ai_processing_data now stored for the campaign
+        """
+
+    @abstractmethod
+    async def write_all(self, writes: List[Tuple[Any, str, Any]]) -> List[Optional[Stored]]:
+        """
+        Apply several campaign writes in one transaction
+
+        Args:
+            writes: (campaign, 'insert', ai_stored) or (campaign, 'update', values)
+
+        Updates that change the same columns (and not ai_processing_data) are
+        sent as one executemany batch.
+
+        Returns:
+            The ai_processing_data stored for each campaign, in order
+        """
+
+    @abstractmethod
+    async def get_by_id(self, campaign_id: str):
+        """Get campaign by ID with its full ai_processing_data"""
+
+    @abstractmethod
+    async def get_by_ids(self, campaign_ids: Iterable[str]) -> list:
+        """Get several campaigns by ID with their full ai_processing_data (missing IDs are left out)"""
+
+    @abstractmethod
+    async def get_by_id_with_parts(self, campaign_id: str, parts: Iterable[str]):
+        """Get campaign by ID, loading only the requested ai_processing_data parts"""
+
+    @abstractmethod
+    async def get_many(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> list:
+        """Get full campaigns (newest first), optionally filtered by status or review status"""
+
+    @abstractmethod
+    async def get_scheduled(self, past: bool = False) -> list:
+        """Get scheduled campaigns whose scheduled_at is in the future (or has passed)"""
+
+    @abstractmethod
+    async def get_summaries(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+        parts: Iterable[str] = LIST_PARTS,
+        after: Optional[Tuple[str, str]] = None
+    ) -> list:
+        """
+        Get campaigns for list views (newest first) without the full JSON blob
+
+        Pass `after` (the (created_at, id) of the last row seen) for keyset paging.
+        """
+
+    @abstractmethod
+    async def get_performance_summaries(self, parts: Iterable[str]) -> list:
+        """Get approved campaigns with a positive performance score, best first"""
+
+    @abstractmethod
+    async def get_unscored_approved(self) -> list:
+        """Get approved campaigns without performance data (no ai_processing_data), newest first"""
+
+    @abstractmethod
+    async def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        mode: str = "exact"
+    ) -> Tuple[Optional[int], bool]:
+        """Count campaigns for a list endpoint; returns (total, estimated)"""
+
+    @abstractmethod
+    async def get_status_counts(self) -> Dict[str, int]:
+        """Number of campaigns per status"""
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, Any]] = None,
+        parts: Iterable[str] = LIST_PARTS
+    ) -> List[Tuple[Any, Tuple[float, Any]]]:
+        """
+        Full-text search over names and content, best matches first
+
+        Returns:
+            (campaign, sort key) pairs; pass the last sort key as `after` for the next page
+        """
+
+
+    @abstractmethod
+    async def get_archived(self, campaign_id: str):
+        """Get an archived campaign by ID with its full ai_processing_data"""
+
+    @abstractmethod
+    async def archive_candidates(
+        self,
+        terminal_before: str,
+        stale_before: Optional[str],
+        limit: int
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Oldest campaigns due for the archive, as (id, updated_at, proof_s3_path)
+
+        Terminal campaigns (approved and sent, or rejected) qualify once last updated
+        before terminal_before; any other campaign not waiting to be sent once last
+        updated before stale_before (None disables that rule).
+        """
+
+    @abstractmethod
+    async def archive(
+        self,
+        moves: List[Tuple[str, Optional[str], Optional[str]]],
+        archived_at: str
+    ) -> List[str]:
+        """
+        Move campaigns into the archive in one transaction
+
+        Args:
+            moves: (id, updated_at, proof_s3_path) from archive_candidates; campaigns
+                updated since are skipped, and a proof path (when not None) replaces
+                the stored one
+
+        Returns:
+            IDs of the campaigns moved
+        """
+
+    @abstractmethod
+    async def count_archived(self) -> int:
+        """Number of archived campaigns"""
+
+    @abstractmethod
+    async def get_summaries_by_ids(self, campaign_ids: Iterable[str], parts: Iterable[str] = LIST_PARTS) -> list:
+        """Get campaigns for list views by ID (missing IDs are left out)"""
+
+    @abstractmethod
+    async def get_events(self, since: int, limit: int) -> List[Tuple[int, str, str]]:
+        """Change events after seq `since`, oldest first, as (seq, campaign_id, kind)"""
+
+    @abstractmethod
+    async def get_event_bounds(self) -> Tuple[int, int]:
+        """(oldest, latest) retained change event seq; (0, 0) before the first event"""
+
+    @abstractmethod
+    async def prune_events(self, before: str) -> int:
+        """Delete change events logged before an ISO timestamp, always keeping the latest"""
+
+
+def batch_updates(writes: List[Tuple[Any, str, Any]]) -> Tuple[List[int], Dict[Tuple[str, ...], List[int]]]:
+    """
+    Group the writes of write_all for batching
+
+    Returns:
+        (indexes of writes applied one at a time: inserts and ai_processing_data
+        changes, {changed columns: indexes of the updates setting exactly those})
+    """
+    single = []
+    batches: Dict[Tuple[str, ...], List[int]] = {}
+    for index, (_, kind, payload) in enumerate(writes):
+        if kind == 'insert' or 'ai_processing_data' in payload:
+            single.append(index)
+        else:
+            batches.setdefault(tuple(sorted(payload)), []).append(index)
+    return single, batches
+
+
+def repository_for(conn) -> CampaignRepository:
+    """Wrap a connection handle from the active database in its repository"""
+    import aiosqlite
+
+    if isinstance(conn, aiosqlite.Connection):
+        from app.storage.sqlite_repository import SQLiteCampaignRepository
+        return SQLiteCampaignRepository(conn)
+
+    from app.storage.sharding import ShardSet
+    if isinstance(conn, ShardSet):
+        from app.storage.sharded_repository import ShardedCampaignRepository
+        return ShardedCampaignRepository(conn)
+
+    from app.storage.postgres_repository import PostgresCampaignRepository
+    return PostgresCampaignRepository(conn)
@@ -0,0 +1,156 @@
+"""
+Schema history for the campaigns database
+Append new migrations to MIGRATIONS; never edit one that has shipped.
+"""
+import logging
+
+from app.models.campaign_archive import CREATE_ARCHIVE_TABLES
+from app.models.campaign_counts import CREATE_COUNT_TABLES, rebuild_status_counts
+from app.models.campaign_events import CREATE_EVENT_TABLES
+from app.models.campaign_parts import CREATE_PART_TABLES, backfill_campaign_parts
+from app.models.campaign_search import CREATE_SEARCH_TABLES, DROP_SEARCH_TABLES, backfill_search_index
+from app.storage.migrations import CREATE_BACKFILLS_TABLE, Migration
+
+logger = logging.getLogger(__name__)
+
+
+# Columns added to campaigns after the first release, in the order the old
+# startup migrations (migrate_add_*_columns) introduced them
+_LEGACY_COLUMNS = (
+    ('feedback', 'TEXT'),
+    ('scheduled_at', 'TEXT'),
+    ('scheduling_status', 'TEXT'),
+    ('review_status', 'TEXT'),
+    ('reviewer_notes', 'TEXT'),
+    ('open_rate', 'REAL'),
+    ('click_rate', 'REAL'),
+    ('conversion_rate', 'REAL'),
+    ('performance_score', 'REAL'),
+    ('performance_timestamp', 'TEXT'),
+)
+
+
+async def _baseline(conn):
+    """
+    Campaigns table as of the last release that used startup column probing
+
+    Databases created by those releases already have the table with some or all
+    of the later columns, so this is the only migration that inspects the schema.
+    """
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS campaigns (
+            id TEXT PRIMARY KEY,
+            campaign_name TEXT NOT NULL,
+            advertiser_name TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'draft',
+            created_at TEXT NOT NULL,
+            approved_at TEXT,
+            assets_s3_path TEXT,
+            html_s3_path TEXT,
+            proof_s3_path TEXT,
+            ai_processing_data TEXT,
+            updated_at TEXT,
+            feedback TEXT,
+            scheduled_at TEXT,
+            scheduling_status TEXT,
+            review_status TEXT,
+            reviewer_notes TEXT,
+            open_rate REAL,
+            click_rate REAL,
+            conversion_rate REAL,
+            performance_score REAL,
+            performance_timestamp TEXT
+        )
+    """)
+    async with conn.execute("PRAGMA table_info(campaigns)") as cursor:
+        existing = {row[1] for row in await cursor.fetchall()}
+    for column, column_type in _LEGACY_COLUMNS:
+        if column not in existing:
+            logger.info(f"Adding {column} column to campaigns table")
+            await conn.execute(f"ALTER TABLE campaigns ADD COLUMN {column} {column_type}")
+
+    await conn.execute(CREATE_BACKFILLS_TABLE)
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status)")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_created_at ON campaigns(created_at)")
+
+
+async def _keyset_indexes(conn):
+    # Composite indexes backing keyset pagination on (created_at, id)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_created_id
+        ON campaigns(created_at DESC, id DESC)
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_status_created
+        ON campaigns(status, created_at DESC, id DESC)
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_review_created
+        ON campaigns(review_status, created_at DESC, id DESC)
+    """)
+
+
+async def _campaign_parts(conn):
+    for statement in CREATE_PART_TABLES:
+        await conn.execute(statement)
+
+
+async def _status_counts(conn):
+    for statement in CREATE_COUNT_TABLES:
+        await conn.execute(statement)
+    # Triggers and seed run in the same transaction, so no write can be missed
+    await rebuild_status_counts(conn)
+
+
+async def _search_index(conn):
+    # Existing rows are indexed by the backfill so the migration stays short
+    for statement in CREATE_SEARCH_TABLES:
+        await conn.execute(statement)
+
+
+async def _search_feedback(conn):
+    # FTS5 tables cannot gain columns; rebuild the index (and its triggers) and re-index in the backfill
+    for statement in DROP_SEARCH_TABLES + CREATE_SEARCH_TABLES:
+        await conn.execute(statement)
+
+
+async def _campaign_archive(conn):
+    for statement in CREATE_ARCHIVE_TABLES:
+        await conn.execute(statement)
+
+
+async def _query_indexes(conn):
+    # Due-campaign scans of the scheduler (partial: only scheduled campaigns are indexed)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_scheduled_due
+        ON campaigns(scheduled_at) WHERE scheduling_status = 'scheduled'
+    """)
+    # Analytics: approved campaigns by performance score, best first
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_campaigns_status_score
+        ON campaigns(status, performance_score DESC)
+    """)
+    # Leading prefixes of idx_campaigns_status_created / idx_campaigns_created_id
+    await conn.execute("DROP INDEX IF EXISTS idx_campaigns_status")
+    await conn.execute("DROP INDEX IF EXISTS idx_campaigns_created_at")
+
+
+async def _campaign_events(conn):
+    # The log starts empty; clients take a full list first, then follow the feed
+    for statement in CREATE_EVENT_TABLES:
+        await conn.execute(statement)
+
+
+MIGRATIONS = [
+    Migration(1, "baseline campaigns table", _baseline),
+    Migration(2, "keyset pagination indexes", _keyset_indexes),
+    Migration(3, "normalized ai_processing_data tables", _campaign_parts, backfill=backfill_campaign_parts),
+    Migration(4, "trigger-maintained status counters", _status_counts),
+    Migration(5, "full-text search index", _search_index, backfill=backfill_search_index),
+    Migration(6, "search review feedback", _search_feedback, backfill=backfill_search_index),
+    Migration(7, "campaign archive table", _campaign_archive),
+    Migration(8, "scheduler and analytics indexes", _query_indexes),
+    Migration(9, "campaign change events", _campaign_events),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
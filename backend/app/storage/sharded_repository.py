@@ -0,0 +1,293 @@
+"""
+Sharded SQLite campaign repository
+Writes go to the shard of the campaign's advertiser (see app.storage.sharding),
+each through that shard's own group-commit writer; a unit of work flushes one
+transaction per shard, concurrently. Lookups by ID and list, count and search
+queries run on every shard concurrently and are merged in the order a single
+database would return (lists newest first by created_at). Offset paging reads
+offset + limit rows from each shard; keyset paging (`after`) reads limit.
+"""
+import asyncio
+import heapq
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.models.campaign import Campaign
+from app.models.campaign_parts import sync_campaign_parts
+from app.storage.repository import LIST_PARTS, CampaignRepository
+from app.storage.sharding import ShardSet
+from app.storage.sqlite_repository import SQLiteCampaignRepository
+from app.storage.write_coordinator import run_write
+from app.utils.payload_codec import Stored
+
+
+def _newest_first(campaign: Campaign):
+    return campaign.created_at or ""
+
+
+class ShardedCampaignRepository(CampaignRepository):
+    """CampaignRepository over a ShardSet"""
+
+    # Each shard numbers its change events on its own, so no single `since`
+    # position covers them all; change feed clients are told to reload instead
+    change_feed = False
+
+    def __init__(self, conn: ShardSet):
+        super().__init__(conn)
+        self.shards = conn
+
+    def _writer(self, index: int) -> SQLiteCampaignRepository:
+        return SQLiteCampaignRepository(self.shards.writer(index))
+
+    async def _read(self, index: int, call: Callable[[SQLiteCampaignRepository], Awaitable]):
+        async with self.shards.connection(index) as conn:
+            return await call(SQLiteCampaignRepository(conn))
+
+    async def _read_all(self, call: Callable[[SQLiteCampaignRepository], Awaitable]) -> list:
+        """Run a read on every shard concurrently; results in shard order"""
+        return await asyncio.gather(*(self._read(index, call) for index in range(len(self.shards))))
+
+    async def _merge(self, call, key, reverse: bool = False, offset: int = 0, limit: Optional[int] = None) -> list:
+        """Merge per-shard results that are each sorted by key, then page"""
+        merged = list(heapq.merge(*await self._read_all(call), key=key, reverse=reverse))
+        return merged[offset:offset + limit] if limit is not None else merged[offset:]
+
+    # Writes
+
+    async def _shard_holding(self, campaign_id: str) -> Optional[int]:
+        async def holds(repository: SQLiteCampaignRepository):
+            async with repository.conn.execute("SELECT 1 FROM campaigns WHERE id = ?", (campaign_id,)) as cursor:
+                return await cursor.fetchone() is not None
+
+        for index, found in enumerate(await self._read_all(holds)):
+            if found:
+                return index
+        return None
+
+    async def insert(self, campaign: Campaign, ai_stored: Optional[Stored]):
+        await self._writer(self.shards.shard_for(campaign.advertiser_name)).insert(campaign, ai_stored)
+
+    async def update(self, campaign: Campaign, values: Dict[str, Any]) -> Optional[Stored]:
+        target = self.shards.shard_for(campaign.advertiser_name)
+        if 'advertiser_name' in values:
+            source = await self._shard_holding(campaign.id)
+            if source is not None and source != target:
+                return await self._move(campaign, values, source, target)
+        return await self._writer(target).update(campaign, values)
+
+    async def _move(self, campaign: Campaign, values: Dict[str, Any], source: int, target: int) -> Optional[Stored]:
+        """
+        Move a campaign whose advertiser changed to its new shard
+
+        The full row is read from the old shard (the caller may hold a partial
+        load), written to the new shard, then deleted from the old one. The two
+        shards commit separately; get_by_id prefers the newer copy if the delete
+        never happens.
+        """
+        full = await self._writer(source).get_by_id(campaign.id)
+        for column, value in values.items():
+            if column != 'ai_processing_data':
+                setattr(full, column, value)
+        ai_stored = full._ai_stored
+        if 'ai_processing_data' in values:
+            ai_stored = values['ai_processing_data']
+            full.ai_processing_data = campaign.ai_processing_data
+        await self._writer(target).insert(full, ai_stored)
+
+        async def delete(conn):
+            await conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign.id,))
+            await sync_campaign_parts(conn, campaign.id, None)
+
+        await run_write(self.shards.writer(source), delete)
+        return ai_stored
+
+    async def write_all(self, writes: List[Tuple[Campaign, str, Any]]) -> List[Optional[Stored]]:
+        stored: List[Optional[Stored]] = [None] * len(writes)
+        by_shard: Dict[int, List[int]] = {}
+        moves = []
+        for index, (campaign, kind, payload) in enumerate(writes):
+            if kind == 'update' and 'advertiser_name' in payload:
+                moves.append(index)
+            else:
+                by_shard.setdefault(self.shards.shard_for(campaign.advertiser_name), []).append(index)
+
+        async def write_shard(shard: int, indexes: List[int]):
+            results = await self._writer(shard).write_all([writes[index] for index in indexes])
+            for index, ai_stored in zip(indexes, results):
+                stored[index] = ai_stored
+
+        # One transaction per shard, committed concurrently by each shard's writer
+        await asyncio.gather(*(write_shard(shard, indexes) for shard, indexes in by_shard.items()))
+        for index in moves:
+            campaign, _, values = writes[index]
+            stored[index] = await self.update(campaign, values)
+        return stored
+
+    # Reads by ID
+
+    @staticmethod
+    def _latest(found: List[Optional[Campaign]]) -> Optional[Campaign]:
+        # Two copies only exist after an interrupted move; the newer one wins
+        candidates = [campaign for campaign in found if campaign is not None]
+        return max(candidates, key=lambda c: c.updated_at or "") if candidates else None
+
+    async def get_by_id(self, campaign_id: str):
+        return self._latest(await self._read_all(lambda r: r.get_by_id(campaign_id)))
+
+    async def get_by_ids(self, campaign_ids: Iterable[str]) -> List[Campaign]:
+        campaign_ids = list(campaign_ids)
+        if not campaign_ids:
+            return []
+        return [c for shard in await self._read_all(lambda r: r.get_by_ids(campaign_ids)) for c in shard]
+
+    async def get_by_id_with_parts(self, campaign_id: str, parts: Iterable[str]):
+        parts = tuple(parts)
+        return self._latest(await self._read_all(lambda r: r.get_by_id_with_parts(campaign_id, parts)))
+
+    async def get_summaries_by_ids(self, campaign_ids: Iterable[str], parts: Iterable[str] = LIST_PARTS) -> List[Campaign]:
+        campaign_ids, parts = list(campaign_ids), tuple(parts)
+        if not campaign_ids:
+            return []
+        return [c for shard in await self._read_all(lambda r: r.get_summaries_by_ids(campaign_ids, parts)) for c in shard]
+
+    # Lists
+
+    async def get_many(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Campaign]:
+        return await self._merge(
+            lambda r: r.get_many(status=status, review_status=review_status, limit=offset + limit),
+            key=_newest_first, reverse=True, offset=offset, limit=limit
+        )
+
+    async def get_scheduled(self, past: bool = False) -> List[Campaign]:
+        return await self._merge(lambda r: r.get_scheduled(past=past), key=lambda c: c.scheduled_at or "")
+
+    async def get_summaries(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+        parts: Iterable[str] = LIST_PARTS,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Campaign]:
+        parts = tuple(parts)
+        return await self._merge(
+            lambda r: r.get_summaries(
+                status=status, review_status=review_status, any_review_status=any_review_status,
+                limit=offset + limit, parts=parts, after=after
+            ),
+            key=lambda c: (c.created_at or "", c.id), reverse=True, offset=offset, limit=limit
+        )
+
+    async def get_performance_summaries(self, parts: Iterable[str]) -> List[Campaign]:
+        parts = tuple(parts)
+        return await self._merge(
+            lambda r: r.get_performance_summaries(parts), key=lambda c: c.performance_score, reverse=True
+        )
+
+    async def get_unscored_approved(self) -> List[Campaign]:
+        return await self._merge(lambda r: r.get_unscored_approved(), key=_newest_first, reverse=True)
+
+    async def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        mode: str = "exact"
+    ) -> Tuple[Optional[int], bool]:
+        counts = await self._read_all(lambda r: r.count_campaigns(
+            status=status, review_status=review_status, any_review_status=any_review_status, mode=mode
+        ))
+        if any(total is None for total, _ in counts):
+            return None, False
+        return sum(total for total, _ in counts), any(estimated for _, estimated in counts)
+
+    async def get_status_counts(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for counts in await self._read_all(lambda r: r.get_status_counts()):
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+        return totals
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, Any]] = None,
+        parts: Iterable[str] = LIST_PARTS
+    ) -> List[Tuple[Campaign, Tuple[float, int]]]:
+        """
+        Search every shard and merge by score
+
+        Sort keys become (score, rowid * shard count + shard), so one cursor
+        continues every shard; scores are ranked per shard, which is close to,
+        but not exactly, the ranking of a single database.
+        """
+        if after is not None and not isinstance(after[1], int):
+            raise ValueError("Invalid pagination cursor")
+        count = len(self.shards)
+        parts = tuple(parts)
+
+        async def search_shard(index: int):
+            shard_after = None
+            if after is not None:
+                rowid, shard = divmod(after[1], count)
+                # Equal scores continue by (rowid, shard)
+                shard_after = (after[0], rowid - 1 if index > shard else rowid)
+            results = await self._read(index, lambda r: r.search(
+                query, status=status, limit=limit, after=shard_after, parts=parts
+            ))
+            return [(campaign, (score, rowid * count + index)) for campaign, (score, rowid) in results]
+
+        shards = await asyncio.gather(*(search_shard(index) for index in range(count)))
+        return list(heapq.merge(*shards, key=lambda result: result[1]))[:limit]
+
+    # Archive
+
+    async def get_archived(self, campaign_id: str):
+        return self._latest(await self._read_all(lambda r: r.get_archived(campaign_id)))
+
+    async def archive_candidates(
+        self,
+        terminal_before: str,
+        stale_before: Optional[str],
+        limit: int
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        return await self._merge(
+            lambda r: r.archive_candidates(terminal_before, stale_before, limit),
+            key=lambda candidate: candidate[1] or "", limit=limit
+        )
+
+    async def archive(
+        self,
+        moves: List[Tuple[str, Optional[str], Optional[str]]],
+        archived_at: str
+    ) -> List[str]:
+        # Each shard only moves the campaigns it holds
+        moved = await asyncio.gather(*(
+            self._writer(index).archive(moves, archived_at) for index in range(len(self.shards))
+        ))
+        return [campaign_id for shard in moved for campaign_id in shard]
+
+    async def count_archived(self) -> int:
+        return sum(await self._read_all(lambda r: r.count_archived()))
+
+    # Change events
+
+    async def get_events(self, since: int, limit: int) -> List[Tuple[int, str, str]]:
+        return []
+
+    async def get_event_bounds(self) -> Tuple[int, int]:
+        return 0, 0
+
+    async def prune_events(self, before: str) -> int:
+        return sum(await asyncio.gather(*(
+            self._writer(index).prune_events(before) for index in range(len(self.shards))
+        )))
@@ -0,0 +1,139 @@
+"""
+Per-advertiser sharding of the SQLite backend
+With DB_SHARDS > 1 the SQLite file is split into N files (campaigns.shard0.db,
+campaigns.shard1.db, ...), each a complete Database with its own writer, group
+commit coordinator and read pool. A campaign lives in the shard its
+advertiser_name hashes to, so writes for different advertisers commit in
+parallel. Routes receive a ShardSet as their connection handle and
+repository_for() wraps it in ShardedCampaignRepository, which routes writes
+and fans reads out to every shard.
+"""
+import asyncio
+import zlib
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.storage.migrations import Migration
+from app.storage.schema import MIGRATIONS
+
+
+def shard_path(db_path: Path, index: int) -> Path:
+    """File of one shard: data/campaigns.db -> data/campaigns.shard0.db"""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.shard{index}{db_path.suffix}")
+
+
+def shard_for(advertiser_name: Optional[str], count: int) -> int:
+    """Shard index of an advertiser (stable across processes and restarts)"""
+    return zlib.crc32((advertiser_name or "").encode("utf-8")) % count
+
+
+class ShardSet:
+    """
+    Connection handle over every shard
+
+    Writes always use each shard's writer connection; reads use the writer too,
+    or borrow from each shard's read pool when the handle came from get_read_db.
+    """
+
+    def __init__(self, shards: List[Any], read_only: bool = False):
+        self.shards = shards
+        self.read_only = read_only
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def shard_for(self, advertiser_name: Optional[str]) -> int:
+        return shard_for(advertiser_name, len(self.shards))
+
+    def writer(self, index: int):
+        return self.shards[index].conn
+
+    @asynccontextmanager
+    async def connection(self, index: int):
+        """Connection to read shard `index` with"""
+        if self.read_only:
+            async with self.shards[index].read_connection() as conn:
+                yield conn
+        else:
+            yield self.shards[index].conn
+
+
+class ShardedDatabase:
+    """Database manager over DB_SHARDS SQLite files (same interface as Database)"""
+
+    def __init__(self, db_path: str, shard_count: int):
+        from app.database import Database
+
+        self.db_path = Path(db_path)
+        self.shards = [Database(db_path=str(shard_path(self.db_path, index))) for index in range(shard_count)]
+        self.conn: Optional[ShardSet] = None
+
+    @property
+    def location(self) -> str:
+        return f"{self.db_path} ({len(self.shards)} shards)"
+
+    async def _each(self, method: str, *args) -> list:
+        return await asyncio.gather(*(getattr(shard, method)(*args) for shard in self.shards))
+
+    async def connect(self):
+        """Open every shard's writer connection"""
+        await self._each("connect")
+        self.conn = ShardSet(self.shards)
+        return self.conn
+
+    async def open_read_pool(self):
+        await self._each("open_read_pool")
+
+    @asynccontextmanager
+    async def read_connection(self):
+        """Handle whose reads borrow from each shard's read pool"""
+        if self.conn is None:
+            await self.connect()
+        yield ShardSet(self.shards, read_only=True)
+
+    async def ping(self):
+        await self._each("ping")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool statistics of every shard for monitoring"""
+        return {
+            "backend": "sqlite",
+            "shards": [{"path": str(shard.db_path), **shard.pool_stats()} for shard in self.shards]
+        }
+
+    async def close(self):
+        await self._each("close")
+        self.conn = None
+
+    async def init_db(self):
+        """Bring every shard's schema up to date and open their read pools"""
+        await self._each("init_db")
+        self.conn = ShardSet(self.shards)
+
+    async def schema_version(self) -> int:
+        return min(await self._each("schema_version"))
+
+    async def apply_migrations(self, target: Optional[int] = None) -> List[Migration]:
+        applied = await self._each("apply_migrations", target)
+        return max(applied, key=len)
+
+    @property
+    def migrations(self) -> List[Migration]:
+        return MIGRATIONS
+
+    async def pending_backfills(self) -> List[Migration]:
+        pending = {m.version: m for shard_pending in await self._each("pending_backfills") for m in shard_pending}
+        return [pending[version] for version in sorted(pending)]
+
+    async def run_backfills(self):
+        """Run pending backfills on every shard; rows per migration version, summed"""
+        totals: Dict[int, int] = {}
+        for rows in await self._each("run_backfills"):
+            for version, count in rows.items():
+                totals[version] = totals.get(version, 0) + count
+        return totals
+
+    async def reencode_payloads(self) -> int:
+        return sum(await self._each("reencode_payloads"))
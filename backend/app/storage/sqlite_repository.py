@@ -0,0 +1,331 @@
+"""
+SQLite campaign repository (aiosqlite)
+Writes go through the group-commit coordinator; list and analytics reads use
+the normalized ai_processing_data tables instead of decoding the JSON blob.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.campaign import CAMPAIGN_COLUMNS, SUMMARY_COLUMNS, Campaign
+from app.models.campaign_archive import (
+    count_archived,
+    get_archived_row,
+    move_to_archive,
+    select_archive_candidates
+)
+from app.models.campaign_counts import count_campaigns, get_status_counts
+from app.models.campaign_events import event_bounds, prune_events, read_events
+from app.models.campaign_parts import load_campaign_parts, load_unsynced_parts, sync_campaign_parts
+from app.models.campaign_search import build_match_query, search_campaign_rows
+from app.storage.repository import LIST_PARTS, CampaignRepository, batch_updates
+from app.storage.write_coordinator import run_write
+from app.utils.payload_codec import Stored
+
+_SUMMARY_SELECT = ", ".join(SUMMARY_COLUMNS)
+
+
+class SQLiteCampaignRepository(CampaignRepository):
+    """CampaignRepository over an aiosqlite connection"""
+
+    async def insert(self, campaign: Campaign, ai_stored: Optional[Stored]):
+        await run_write(self.conn, lambda c: self._execute_insert(c, campaign, ai_stored))
+
+    async def update(self, campaign: Campaign, values: Dict[str, Any]) -> Optional[Stored]:
+        return await run_write(self.conn, lambda c: self._execute_update(c, campaign, values))
+
+    async def write_all(self, writes: List[Tuple[Campaign, str, Any]]) -> List[Optional[Stored]]:
+        single, batches = batch_updates(writes)
+
+        async def write(c) -> List[Optional[Stored]]:
+            stored: List[Optional[Stored]] = [None] * len(writes)
+            for index in single:
+                campaign, kind, payload = writes[index]
+                if kind == 'insert':
+                    await self._execute_insert(c, campaign, payload)
+                    stored[index] = payload
+                else:
+                    stored[index] = await self._execute_update(c, campaign, payload)
+            for columns, indexes in batches.items():
+                await self._execute_update_batch(c, columns, [writes[index] for index in indexes])
+                for index in indexes:
+                    stored[index] = writes[index][0]._ai_stored
+            return stored
+
+        return await run_write(self.conn, write)
+
+    async def _execute_update_batch(self, conn, columns: Tuple[str, ...], writes: List[Tuple[Campaign, str, Any]]):
+        """UPDATE the same columns of several campaigns with one executemany (caller commits)"""
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        async with conn.cursor() as cursor:
+            await cursor.executemany(
+                f"UPDATE campaigns SET {assignments} WHERE id = ?",
+                [[values[column] for column in columns] + [campaign.id] for campaign, _, values in writes]
+            )
+            if cursor.rowcount == len(writes):
+                return
+        # Some rows disappeared (or were archived); the updates are idempotent, so
+        # redo them one by one to write those campaigns back in full
+        for campaign, _, values in writes:
+            await self._execute_update(conn, campaign, values)
+
+    async def _execute_update(self, conn, campaign: Campaign, values: Dict[str, Any]) -> Optional[Stored]:
+        """UPDATE the changed columns (caller commits); returns the stored ai_processing_data"""
+        columns = sorted(values)
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                f"UPDATE campaigns SET {assignments} WHERE id = ?",
+                [values[column] for column in columns] + [campaign.id]
+            )
+            if cursor.rowcount > 0:
+                if 'ai_processing_data' in values:
+                    await sync_campaign_parts(
+                        conn, campaign.id, campaign.ai_processing_data if values['ai_processing_data'] else None
+                    )
+                return values.get('ai_processing_data', campaign._ai_stored)
+        # Row disappeared underneath us (or was archived); write the full object back
+        ai_stored = campaign._encode_ai_data()
+        await self._execute_insert(conn, campaign, ai_stored)
+        await conn.execute("DELETE FROM campaigns_archive WHERE id = ?", (campaign.id,))
+        return ai_stored
+
+    @staticmethod
+    async def _execute_insert(conn, campaign: Campaign, ai_stored: Optional[Stored]):
+        """Insert every column as a new row (caller commits)"""
+        async with conn.cursor() as cursor:
+            await cursor.execute(f"""
+                INSERT INTO campaigns ({", ".join(CAMPAIGN_COLUMNS)})
+                VALUES ({", ".join("?" for _ in CAMPAIGN_COLUMNS)})
+            """, [
+                ai_stored if column == 'ai_processing_data' else getattr(campaign, column)
+                for column in CAMPAIGN_COLUMNS
+            ])
+        await sync_campaign_parts(conn, campaign.id, campaign.ai_processing_data if ai_stored else None)
+
+    async def get_by_id(self, campaign_id: str):
+        async with self.conn.cursor() as cursor:
+            await cursor.execute("""
+                SELECT * FROM campaigns WHERE id = ?
+            """, (campaign_id,))
+            row = await cursor.fetchone()
+
+            if row:
+                return Campaign.from_row(dict(row))
+            return None
+
+    async def get_by_ids(self, campaign_ids: Iterable[str]) -> List[Campaign]:
+        campaign_ids = list(campaign_ids)
+        if not campaign_ids:
+            return []
+        async with self.conn.execute(
+            f"SELECT * FROM campaigns WHERE id IN ({', '.join('?' for _ in campaign_ids)})", campaign_ids
+        ) as cursor:
+            return [Campaign.from_row(dict(row)) for row in await cursor.fetchall()]
+
+    async def get_by_id_with_parts(self, campaign_id: str, parts: Iterable[str]):
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT {_SUMMARY_SELECT} FROM campaigns WHERE id = ?
+            """, (campaign_id,))
+            row = await cursor.fetchone()
+
+        if not row:
+            return None
+        return (await self.from_summary_rows([row], parts))[0]
+
+    async def get_many(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Campaign]:
+        conditions, params = _filters(status, review_status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT * FROM campaigns
+                {where}
+                ORDER BY created_at DESC
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+            rows = await cursor.fetchall()
+
+            return [Campaign.from_row(dict(row)) for row in rows]
+
+    async def get_scheduled(self, past: bool = False) -> List[Campaign]:
+        comparison = "<=" if past else ">"
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT * FROM campaigns
+                WHERE scheduling_status = 'scheduled'
+                AND scheduled_at IS NOT NULL
+                AND scheduled_at {comparison} datetime('now')
+                ORDER BY scheduled_at ASC
+            """)
+            rows = await cursor.fetchall()
+
+            return [Campaign.from_row(dict(row)) for row in rows]
+
+    async def from_summary_rows(self, rows, parts: Iterable[str] = LIST_PARTS) -> List[Campaign]:
+        """
+        Build campaigns from rows selected without ai_processing_data
+
+        ai_processing_data is assembled from the normalized tables for just the
+        requested parts (or from the blob, for campaigns not backfilled yet).
+        Such campaigns cannot save ai_processing_data changes.
+        """
+        rows = [dict(row) for row in rows]
+        parts = tuple(parts)
+        loaded = {}
+        if parts:
+            ids = [row['id'] for row in rows]
+            loaded = await load_campaign_parts(self.conn, ids, parts)
+            # Campaigns the backfill has not reached yet fall back to their blob
+            loaded.update(await load_unsynced_parts(self.conn, ids, parts))
+        return [Campaign.from_partial_row(row, loaded.get(row['id'], {})) for row in rows]
+
+    async def get_summaries(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+        parts: Iterable[str] = LIST_PARTS,
+        after: Optional[Tuple[str, str]] = None
+    ) -> List[Campaign]:
+        # Served from idx_campaigns_status_created / idx_campaigns_review_created /
+        # idx_campaigns_created_id for both OFFSET and keyset paging
+        conditions, params = _filters(status, review_status)
+        if any_review_status and not review_status:
+            conditions.append("review_status IS NOT NULL")
+        if after is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT {_SUMMARY_SELECT} FROM campaigns
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+            rows = await cursor.fetchall()
+
+        return await self.from_summary_rows(rows, parts)
+
+    async def get_performance_summaries(self, parts: Iterable[str]) -> List[Campaign]:
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT {_SUMMARY_SELECT} FROM campaigns
+                WHERE status = 'approved'
+                AND performance_score IS NOT NULL
+                AND performance_score > 0
+                ORDER BY performance_score DESC
+            """)
+            rows = await cursor.fetchall()
+
+        return await self.from_summary_rows(rows, parts)
+
+    async def get_unscored_approved(self) -> List[Campaign]:
+        async with self.conn.cursor() as cursor:
+            await cursor.execute(f"""
+                SELECT {_SUMMARY_SELECT} FROM campaigns
+                WHERE status = 'approved'
+                AND (performance_score IS NULL OR performance_score = 0)
+                ORDER BY created_at DESC
+            """)
+            rows = await cursor.fetchall()
+
+        return await self.from_summary_rows(rows, parts=())
+
+    async def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        review_status: Optional[str] = None,
+        any_review_status: bool = False,
+        mode: str = "exact"
+    ) -> Tuple[Optional[int], bool]:
+        return await count_campaigns(
+            self.conn, status=status, review_status=review_status,
+            any_review_status=any_review_status, mode=mode
+        )
+
+    async def get_status_counts(self) -> Dict[str, int]:
+        return await get_status_counts(self.conn)
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, Any]] = None,
+        parts: Iterable[str] = LIST_PARTS
+    ) -> List[Tuple[Campaign, Tuple[float, int]]]:
+        match = build_match_query(query)
+        if match is None:
+            return []
+        if after is not None and not isinstance(after[1], int):
+            raise ValueError("Invalid pagination cursor")
+        rows = await search_campaign_rows(
+            self.conn, match, SUMMARY_COLUMNS, status=status, limit=limit, after=after
+        )
+        campaigns = await self.from_summary_rows(rows, parts)
+        return [
+            (campaign, (row['search_score'], row['search_rowid']))
+            for campaign, row in zip(campaigns, rows)
+        ]
+
+    async def get_archived(self, campaign_id: str):
+        row = await get_archived_row(self.conn, campaign_id)
+        return Campaign.from_row(dict(row)) if row else None
+
+    async def archive_candidates(
+        self,
+        terminal_before: str,
+        stale_before: Optional[str],
+        limit: int
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        return await select_archive_candidates(self.conn, terminal_before, stale_before, limit)
+
+    async def archive(
+        self,
+        moves: List[Tuple[str, Optional[str], Optional[str]]],
+        archived_at: str
+    ) -> List[str]:
+        return await run_write(self.conn, lambda c: move_to_archive(c, moves, archived_at))
+
+    async def count_archived(self) -> int:
+        return await count_archived(self.conn)
+
+
+    async def get_summaries_by_ids(self, campaign_ids: Iterable[str], parts: Iterable[str] = LIST_PARTS) -> List[Campaign]:
+        campaign_ids = list(campaign_ids)
+        if not campaign_ids:
+            return []
+        async with self.conn.execute(
+            f"SELECT {_SUMMARY_SELECT} FROM campaigns WHERE id IN ({', '.join('?' for _ in campaign_ids)})",
+            campaign_ids
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return await self.from_summary_rows(rows, parts)
+
+    async def get_events(self, since: int, limit: int) -> List[Tuple[int, str, str]]:
+        return await read_events(self.conn, since, limit)
+
+    async def get_event_bounds(self) -> Tuple[int, int]:
+        return await event_bounds(self.conn)
+
+    async def prune_events(self, before: str) -> int:
+        return await run_write(self.conn, lambda c: prune_events(c, before))
+
+def _filters(status: Optional[str], review_status: Optional[str]) -> Tuple[List[str], List[Any]]:
+    conditions: List[str] = []
+    params: List[Any] = []
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    if review_status:
+        conditions.append("review_status = ?")
+        params.append(review_status)
+    return conditions, params
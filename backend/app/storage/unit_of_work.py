@@ -0,0 +1,86 @@
+"""
+Unit of work for campaign writes
+Inside `async with unit_of_work(conn)`, Campaign.save() stages the campaign
+instead of writing it; all staged inserts and updates are flushed in one
+transaction when the block exits, and discarded if it raises.
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import logging
+
+from app.storage.repository import repository_for
+
+logger = logging.getLogger(__name__)
+
+_active: ContextVar[Optional["UnitOfWork"]] = ContextVar("campaign_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """Campaigns saved during one logical operation, written together"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        # Keyed by campaign id; saving the same campaign twice stages it once
+        self._staged: Dict[str, object] = {}
+
+    def stage(self, campaign):
+        self._staged[campaign.id] = campaign
+
+    def get(self, campaign_id: str):
+        """A campaign saved in this unit of work (visible before it is flushed)"""
+        return self._staged.get(campaign_id)
+
+    @property
+    def staged(self) -> List[object]:
+        return list(self._staged.values())
+
+    async def flush(self) -> int:
+        """
+        Write every staged campaign in a single transaction
+
+        Returns:
+            Number of campaigns written (unchanged ones are skipped)
+        """
+        writes = []
+        for campaign in self._staged.values():
+            write = campaign._pending_write()
+            if write is not None:
+                writes.append((campaign,) + write)
+        self._staged.clear()
+        if not writes:
+            return 0
+
+        stored = await repository_for(self.conn).write_all(writes)
+        for (campaign, _, _), ai_stored in zip(writes, stored):
+            campaign._written(ai_stored)
+        return len(writes)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _active.get()
+
+
+@asynccontextmanager
+async def unit_of_work(conn):
+    """
+    Stage campaign saves made inside the block and flush them in one transaction
+
+    Nested blocks join the outer unit of work.
+    """
+    outer = _active.get()
+    if outer is not None:
+        yield outer
+        return
+
+    uow = UnitOfWork(conn)
+    token = _active.set(uow)
+    try:
+        yield uow
+    except BaseException:
+        if uow.staged:
+            logger.info(f"Discarding {len(uow.staged)} staged campaign write(s)")
+        raise
+    finally:
+        _active.reset(token)
+    await uow.flush()
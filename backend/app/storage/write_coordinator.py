@@ -0,0 +1,207 @@
+"""
+Group-commit write coordinator
+Collects writes arriving within a short window into one transaction so concurrent
+requests share a single commit (and fsync) instead of paying one each
+"""
+import asyncio
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[Any], Awaitable[Any]]
+
+# Writer connection -> coordinator that owns its transactions
+_coordinators: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class WriteCoordinator:
+    """Batches write operations on one connection into group commits"""
+
+    def __init__(self, conn, window_ms: float = 2.0, max_batch: int = 64):
+        self.conn = conn
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # Metrics
+        self._batches = 0
+        self._writes = 0
+        self._failed_writes = 0
+        self._failed_commits = 0
+        self._max_batch_size = 0
+        self._total_commit_ms = 0.0
+        self._max_commit_ms = 0.0
+
+        _coordinators[conn] = self
+
+    @property
+    def running(self) -> bool:
+        return not self._closed
+
+    async def submit(self, op: WriteOp) -> Any:
+        """
+        Queue a write and wait until the transaction containing it commits
+
+        Args:
+            op: Coroutine function taking the connection; must not commit itself
+
+        Returns:
+            Whatever op returned
+        """
+        if self._closed:
+            raise RuntimeError("Write coordinator is closed")
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((op, future))
+        return await future
+
+    async def _collect(self) -> Tuple[List[Tuple[WriteOp, asyncio.Future]], bool]:
+        """
+        Wait for the first write, then gather more until the window closes or the batch is full
+
+        Returns:
+            (batch, stop_requested)
+        """
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        """Flush loop; exits after draining once stop() enqueues its sentinel"""
+        while True:
+            batch, stop_requested = await self._collect()
+            if batch:
+                await self._flush(batch)
+            if stop_requested and self._queue.empty():
+                return
+
+    async def _flush(self, batch: List[Tuple[WriteOp, asyncio.Future]]):
+        """Run every write in one transaction, isolating failures with savepoints"""
+        started = time.monotonic()
+        results: List[Tuple[asyncio.Future, bool, Any]] = []
+
+        # Savepoints need an enclosing transaction, otherwise RELEASE of the
+        # outermost savepoint would commit each write on its own
+        try:
+            if not self.conn.in_transaction:
+                await self.conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            self._failed_commits += 1
+            logger.error(f"Could not open transaction for {len(batch)} batched writes: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for idx, (op, future) in enumerate(batch):
+            savepoint = f"write_{idx}"
+            try:
+                await self.conn.execute(f"SAVEPOINT {savepoint}")
+                result = await op(self.conn)
+                await self.conn.execute(f"RELEASE {savepoint}")
+                results.append((future, True, result))
+            except Exception as e:
+                self._failed_writes += 1
+                try:
+                    await self.conn.execute(f"ROLLBACK TO {savepoint}")
+                    await self.conn.execute(f"RELEASE {savepoint}")
+                except Exception as rollback_error:
+                    logger.error(f"Failed to roll back batched write: {rollback_error}")
+                results.append((future, False, e))
+
+        try:
+            await self.conn.commit()
+        except Exception as e:
+            self._failed_commits += 1
+            logger.error(f"Group commit of {len(batch)} writes failed: {e}", exc_info=True)
+            try:
+                await self.conn.rollback()
+            except Exception:
+                pass
+            results = [(future, False, e) for future, _, _ in results]
+
+        commit_ms = (time.monotonic() - started) * 1000
+        self._batches += 1
+        self._writes += len(batch)
+        self._max_batch_size = max(self._max_batch_size, len(batch))
+        self._total_commit_ms += commit_ms
+        self._max_commit_ms = max(self._max_commit_ms, commit_ms)
+
+        for future, ok, value in results:
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def stop(self):
+        """Flush anything still queued and stop the flush loop"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._queue.put_nowait(None)
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Write coordinator stopped with error: {e}")
+        _coordinators.pop(self.conn, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batching metrics for monitoring"""
+        return {
+            "batches": self._batches,
+            "writes": self._writes,
+            "failed_writes": self._failed_writes,
+            "failed_commits": self._failed_commits,
+            "avg_batch_size": round(self._writes / self._batches, 3) if self._batches else 0.0,
+            "max_batch_size": self._max_batch_size,
+            "avg_commit_ms": round(self._total_commit_ms / self._batches, 3) if self._batches else 0.0,
+            "max_commit_ms": round(self._max_commit_ms, 3),
+            "fsyncs_saved": self._writes - self._batches,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
+
+
+async def run_write(conn, op: WriteOp) -> Any:
+    """
+    Execute a write on conn, group-committing it if a coordinator owns the connection
+
+    Args:
+        conn: Database connection
+        op: Coroutine function taking the connection; must not commit itself
+
+    Returns:
+        Whatever op returned
+    """
+    coordinator = _coordinators.get(conn)
+    if coordinator is not None and coordinator.running:
+        return await coordinator.submit(op)
+
+    result = await op(conn)
+    await conn.commit()
+    return result
@@ -0,0 +1,90 @@
+"""
+Blocking calls run in the default thread pool, with usage counters
+S3 (boto3), image downloads and snapshot file work have no async client, so
+they run in the event loop's default executor. run_blocking() is
+asyncio.to_thread() plus per-kind counters: calls in flight, the peak, and
+how long calls waited for a free thread, which shows when the pool is the
+bottleneck (see /health/threads).
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class _KindStats:
+    __slots__ = ("calls", "in_flight", "peak_in_flight", "errors", "wait_ms", "max_wait_ms", "run_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.errors = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.run_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.wait_ms / self.calls, 2) if self.calls else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "avg_run_ms": round(self.run_ms / self.calls, 2) if self.calls else 0.0
+        }
+
+
+_stats: Dict[str, _KindStats] = {}
+
+
+def _default_max_workers() -> int:
+    # ThreadPoolExecutor's default, which the loop's default executor uses
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+async def run_blocking(kind: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking call in the default thread pool (like asyncio.to_thread)
+
+    Args:
+        kind: Counter group for /health/threads (e.g. "s3", "snapshot")
+    """
+    stats = _stats.setdefault(kind, _KindStats())
+    stats.calls += 1
+    stats.in_flight += 1
+    stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        wait_ms = (started - submitted) * 1000
+        stats.wait_ms += wait_ms
+        stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.run_ms += (time.perf_counter() - started) * 1000
+
+    context = contextvars.copy_context()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(context.run, timed))
+    except Exception:
+        stats.errors += 1
+        raise
+    finally:
+        stats.in_flight -= 1
+
+
+def blocking_io_stats() -> Dict[str, Any]:
+    """Thread pool size and per-kind counters for monitoring"""
+    return {
+        "max_workers": _default_max_workers(),
+        "in_flight": sum(stats.in_flight for stats in _stats.values()),
+        "kinds": {kind: stats.as_dict() for kind, stats in sorted(_stats.items())}
+    }
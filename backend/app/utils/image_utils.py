@@ -1,10 +1,11 @@
 """
 Image utility functions for processing and optimization
 """
-from PIL import Image
+from PIL import Image, ImageStat
 from io import BytesIO
 from typing import Tuple, Optional
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -151,3 +152,96 @@ def prepare_image_for_vision_api(image_bytes: bytes, max_dimension: int = 512) -
         logger.error(f"Error preparing image for vision API: {e}")
         return image_bytes
 
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    """RGB image with transparent areas on white"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        img = Image.alpha_composite(background, img)
+    return img.convert('RGB')
+
+
+def _dhash(img: Image.Image, hash_size: int) -> int:
+    gray = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def image_dhash(image_bytes: bytes, hash_size: int = 8) -> Optional[int]:
+    """
+    Perceptual difference hash (dHash) of an image
+    
+    Re-saved, re-compressed or resized copies of an image get the same or a
+    nearby hash (compare with hamming_distance); transparent areas count as white.
+    
+    Args:
+        image_bytes: Image as bytes
+        hash_size: Hash is hash_size * hash_size bits
+        
+    Returns:
+        Hash as an integer, or None if the image cannot be decoded
+    """
+    try:
+        return _dhash(_flatten(Image.open(BytesIO(image_bytes))), hash_size)
+    except Exception as e:
+        logger.error(f"Error hashing image: {e}")
+        return None
+
+
+# Image fingerprints: the 64-bit dHash, with the mean colour (8 bits per
+# channel) and aspect ratio (1/8ths of a doubling, offset by 128) above it.
+# dHash only sees brightness edges, so every flat image hashes to 0 whatever
+# its colour or shape; those are compared too.
+_DHASH_BITS = 64
+_MAX_COLOUR_DIFFERENCE = 24  # per channel, of 255
+_MAX_ASPECT_DIFFERENCE = 1  # aspect ratio buckets
+
+
+def image_fingerprint(image_bytes: bytes) -> Optional[int]:
+    """
+    Perceptual fingerprint of an image (compare with fingerprint_distance)
+    
+    Returns:
+        Fingerprint as an integer, or None if the image cannot be decoded
+    """
+    try:
+        img = _flatten(Image.open(BytesIO(image_bytes)))
+        red, green, blue = (round(channel) for channel in ImageStat.Stat(img).mean)
+        aspect = min(255, max(0, round(math.log2(img.width / img.height) * 8) + 128))
+        colour = (aspect << 24) | (red << 16) | (green << 8) | blue
+        return (colour << _DHASH_BITS) | _dhash(img, 8)
+    except Exception as e:
+        logger.error(f"Error fingerprinting image: {e}")
+        return None
+
+
+def fingerprint_distance(a: int, b: int) -> int:
+    """Differing dHash bits of two fingerprints; more than any hash has when colour or shape differ"""
+    far = _DHASH_BITS + 1
+    a_colour, b_colour = a >> _DHASH_BITS, b >> _DHASH_BITS
+    if abs((a_colour >> 24) - (b_colour >> 24)) > _MAX_ASPECT_DIFFERENCE:
+        return far
+    for shift in (16, 8, 0):
+        if abs(((a_colour >> shift) & 0xFF) - ((b_colour >> shift) & 0xFF)) > _MAX_COLOUR_DIFFERENCE:
+            return far
+    mask = (1 << _DHASH_BITS) - 1
+    return hamming_distance(a & mask, b & mask)
+
+
+def is_flat_fingerprint(fingerprint: int, max_distance: int) -> bool:
+    """Whether the dHash is within max_distance bits of all zeros or all ones (a near-uniform image)"""
+    ones = bin(fingerprint & ((1 << _DHASH_BITS) - 1)).count('1')
+    return ones <= max_distance or ones >= _DHASH_BITS - max_distance
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two image hashes"""
+    return bin(a ^ b).count('1')
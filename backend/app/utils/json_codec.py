@@ -0,0 +1,33 @@
+"""
+JSON codec helpers
+Uses orjson when it is installed and falls back to the standard library
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def loads(data) -> Any:
+    """Decode JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> str:
+    """Encode a value as compact JSON text"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # Types orjson rejects (e.g. very large ints) still go through the stdlib
+            pass
+    return json.dumps(value, separators=(',', ':'))
+
+
+# Both codecs raise subclasses of ValueError on malformed input
+DecodeError = ValueError
@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination helpers for campaign list endpoints
+"""
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple, Union
+from fastapi import HTTPException
+
+# How list endpoints report `total`. Totals come from the trigger-maintained
+# counters in campaign_counts, so `estimate` is accepted but already exact.
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'          # Skip the count entirely
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+COUNT_MODE_PATTERN = f"^({'|'.join(COUNT_MODES)})$"
+
+
+def _encode(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode(token: str, types: Tuple[type, ...]) -> Tuple[Any, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types))
+    ):
+        raise ValueError("Invalid pagination cursor")
+    return tuple(values)
+
+
+def encode_cursor(created_at: str, campaign_id: str) -> str:
+    """Encode the (created_at, id) position of a row as an opaque token"""
+    return _encode([created_at, campaign_id])
+
+
+def decode_cursor(token: str) -> Tuple[str, str]:
+    """
+    Decode a token produced by encode_cursor
+
+    Raises:
+        ValueError if the token is malformed
+    """
+    return _decode(token, (str, str))
+
+
+def encode_search_cursor(score: float, key: Union[int, str]) -> str:
+    """Encode the (rank, tiebreak key) position of a search result as an opaque token"""
+    return _encode([score, key])
+
+
+def decode_search_cursor(token: str) -> Tuple[float, Union[int, str]]:
+    """
+    Decode a token produced by encode_search_cursor
+
+    Raises:
+        ValueError if the token is malformed
+    """
+    score, key = _decode(token, ((int, float), (int, str)))
+    return float(score), key
+
+
+def parse_cursor_param(cursor: Optional[str], offset: int) -> Optional[Tuple[str, str]]:
+    """Decode a ?cursor= query parameter, rejecting bad tokens and cursor+offset combinations"""
+    if not cursor:
+        return None
+    if offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def split_page(items: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a page fetched with limit + 1 rows and build the next cursor
+
+    Returns:
+        (items for this page, cursor for the next page or None on the last page)
+    """
+    page = list(items[:limit])
+    if len(items) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,221 @@
+"""
+Storage codec for the ai_processing_data column
+JSON text is the default. The msgpack codecs store the blob as bytes behind a
+one-byte format tag (optionally zstd-compressed with a shared trained
+dictionary). Decoding looks at the stored value rather than the configured
+codec, so rows written as JSON text, or by an earlier codec setting, keep
+decoding while they are rewritten in the background (see campaign_payloads).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from app.utils import json_codec
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+CODEC_JSON = "json"
+CODEC_MSGPACK = "msgpack"
+CODEC_MSGPACK_ZSTD = "msgpack+zstd"
+CODECS = (CODEC_JSON, CODEC_MSGPACK, CODEC_MSGPACK_ZSTD)
+
+# First byte of binary payloads; never the first byte of a JSON document
+TAG_MSGPACK = 0x01
+TAG_MSGPACK_ZSTD = 0x02
+
+Stored = Union[str, bytes]
+
+
+class PayloadCodecError(ValueError):
+    """Raised when a stored payload cannot be decoded (or a codec cannot be built)"""
+    pass
+
+
+def _pack(value: Any) -> Optional[bytes]:
+    """msgpack bytes, or None for values msgpack cannot represent (they stay JSON)"""
+    try:
+        return msgpack.packb(value, use_bin_type=True)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class PayloadCodec:
+    """
+    Encodes ai_processing_data for the campaigns table
+
+    Args:
+        name: One of CODECS
+        level: zstd compression level (msgpack+zstd)
+        dictionaries: Trained zstd dictionaries (raw bytes); the first one
+            compresses, all of them decompress, so a retired dictionary can be
+            kept until its rows have been re-encoded
+    """
+
+    def __init__(self, name: str = CODEC_JSON, level: int = 3, dictionaries: Sequence[bytes] = ()):
+        if name not in CODECS:
+            raise PayloadCodecError(f"Unknown ai_processing_data codec: {name!r} (expected one of {CODECS})")
+        if name != CODEC_JSON and msgpack is None:
+            raise PayloadCodecError(f"The {name} codec needs the msgpack package")
+        if (name == CODEC_MSGPACK_ZSTD or dictionaries) and zstandard is None:
+            raise PayloadCodecError(f"The {name} codec needs the zstandard package")
+        self.name = name
+        self.level = level
+        self._dictionaries: Dict[int, Any] = {}
+        self._compress_dict = None
+        for raw in dictionaries:
+            dictionary = zstandard.ZstdCompressionDict(raw)
+            self._dictionaries[dictionary.dict_id()] = dictionary
+            if self._compress_dict is None:
+                dictionary.precompute_compress(level=level)
+                self._compress_dict = dictionary
+
+    @property
+    def dictionary_id(self) -> int:
+        """ID of the dictionary new payloads are compressed with (0 for none)"""
+        return self._compress_dict.dict_id() if self._compress_dict is not None else 0
+
+    def encode(self, value: Any) -> Optional[Stored]:
+        """Serialize a payload for storage; empty payloads are stored as NULL"""
+        if not value:
+            return None
+        if self.name != CODEC_JSON:
+            packed = _pack(value)
+            if packed is not None:
+                if self.name == CODEC_MSGPACK:
+                    return bytes([TAG_MSGPACK]) + packed
+                if self._compress_dict is not None:
+                    compressor = zstandard.ZstdCompressor(dict_data=self._compress_dict)
+                else:
+                    compressor = zstandard.ZstdCompressor(level=self.level)
+                return bytes([TAG_MSGPACK_ZSTD]) + compressor.compress(packed)
+        return json_codec.dumps(value)
+
+    def decode(self, stored: Stored) -> Any:
+        """
+        Decode a stored payload, whatever codec wrote it
+
+        Raises:
+            PayloadCodecError (a ValueError) for malformed payloads
+            TypeError for values that are neither text nor bytes
+        """
+        if isinstance(stored, str):
+            return json_codec.loads(stored)
+        if not isinstance(stored, (bytes, bytearray, memoryview)):
+            raise TypeError(f"Cannot decode ai_processing_data of type {type(stored).__name__}")
+        data = bytes(stored)
+        if not data:
+            raise PayloadCodecError("Empty ai_processing_data payload")
+        tag = data[0]
+        try:
+            if tag == TAG_MSGPACK:
+                return self._unpack(data[1:])
+            if tag == TAG_MSGPACK_ZSTD:
+                return self._unpack(self._decompress(data[1:]))
+        except PayloadCodecError:
+            raise
+        except Exception as e:
+            raise PayloadCodecError(f"Corrupt ai_processing_data payload: {e}") from e
+        # JSON that ended up in a BLOB
+        return json_codec.loads(data)
+
+    def is_current(self, stored: Stored) -> bool:
+        """Whether a stored payload is already in this codec's format"""
+        if isinstance(stored, str):
+            return self.name == CODEC_JSON
+        data = bytes(stored)
+        if not data or data[0] not in (TAG_MSGPACK, TAG_MSGPACK_ZSTD):
+            return False
+        if self.name == CODEC_MSGPACK:
+            return data[0] == TAG_MSGPACK
+        if self.name == CODEC_MSGPACK_ZSTD and data[0] == TAG_MSGPACK_ZSTD:
+            try:
+                return zstandard.get_frame_parameters(data[1:]).dict_id == self.dictionary_id
+            except zstandard.ZstdError:
+                return False
+        return False
+
+    @staticmethod
+    def _unpack(data: bytes) -> Any:
+        if msgpack is None:
+            raise PayloadCodecError("Stored ai_processing_data is msgpack; install the msgpack package")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    def _decompress(self, frame: bytes) -> bytes:
+        if zstandard is None:
+            raise PayloadCodecError("Stored ai_processing_data is zstd-compressed; install the zstandard package")
+        try:
+            dict_id = zstandard.get_frame_parameters(frame).dict_id
+        except zstandard.ZstdError as e:
+            raise PayloadCodecError(f"Corrupt ai_processing_data payload: {e}") from e
+        if dict_id and dict_id not in self._dictionaries:
+            raise PayloadCodecError(f"ai_processing_data was compressed with unknown zstd dictionary {dict_id}")
+        dictionary = self._dictionaries.get(dict_id)
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary) if dictionary else zstandard.ZstdDecompressor()
+        return decompressor.decompress(frame)
+
+
+def train_dictionary(payloads: Iterable[Any], size: int = 112640) -> bytes:
+    """
+    Train a zstd dictionary on decoded ai_processing_data samples
+
+    Raises:
+        PayloadCodecError when the libraries are missing or there are too few samples
+    """
+    if msgpack is None or zstandard is None:
+        raise PayloadCodecError("Training a dictionary needs the msgpack and zstandard packages")
+    samples: List[bytes] = [packed for packed in map(_pack, payloads) if packed]
+    try:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    except zstandard.ZstdError as e:
+        raise PayloadCodecError(f"Could not train a dictionary from {len(samples)} samples: {e}") from e
+
+
+def load_dictionaries(paths: Optional[str]) -> List[bytes]:
+    """Read the comma-separated dictionary files from AI_PAYLOAD_ZSTD_DICT"""
+    dictionaries = []
+    for path in (paths or "").split(","):
+        if path.strip():
+            with open(path.strip(), "rb") as f:
+                dictionaries.append(f.read())
+    return dictionaries
+
+
+_active_codec: Optional[PayloadCodec] = None
+
+
+def get_payload_codec() -> PayloadCodec:
+    """
+    The codec configured by AI_PAYLOAD_CODEC (built on first use)
+
+    Raises:
+        PayloadCodecError when the codec's packages or dictionary files are
+        missing; there is deliberately no fallback, since a codec that cannot
+        read the stored payloads must not be used to rewrite them
+    """
+    global _active_codec
+    if _active_codec is None:
+        from app.config import settings
+
+        try:
+            dictionaries = load_dictionaries(settings.AI_PAYLOAD_ZSTD_DICT)
+        except OSError as e:
+            raise PayloadCodecError(f"Cannot read AI_PAYLOAD_ZSTD_DICT: {e}") from e
+        _active_codec = PayloadCodec(
+            settings.AI_PAYLOAD_CODEC,
+            level=settings.AI_PAYLOAD_ZSTD_LEVEL,
+            dictionaries=dictionaries
+        )
+    return _active_codec
+
+
+def set_payload_codec(codec: Optional[PayloadCodec]) -> Optional[PayloadCodec]:
+    """Replace the active codec (None rebuilds it from settings); returns the previous one"""
+    global _active_codec
+    previous, _active_codec = _active_codec, codec
+    return previous
@@ -0,0 +1,88 @@
+"""
+Benchmark of batched versus per-image GPT Vision analysis (calls OpenAI)
+Analyzes the same campaign images in both modes, bypassing the AI cache, and
+prints latency, requests and tokens per campaign, to choose AI_VISION_BATCH.
+
+    python -m app.vision_benchmark --logo logo.png --hero hero1.jpg --hero hero2.jpg
+    python -m app.vision_benchmark --logo logo.png --hero hero1.jpg --rounds 5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services.ai_cache_service import CACHE_BYPASS
+from app.services.ai_service import ai_client_stats, close_openai_client, process_images_parallel
+
+_VISION_KINDS = ("vision", "vision_batch")
+
+
+def _vision_totals() -> Dict[str, int]:
+    calls = ai_client_stats()["calls"]
+    return {
+        "requests": sum(calls.get(kind, {}).get("calls", 0) for kind in _VISION_KINDS),
+        "tokens": sum(calls.get(kind, {}).get("tokens", 0) for kind in _VISION_KINDS)
+    }
+
+
+async def benchmark(logo: Optional[bytes], heroes: List[bytes], rounds: int) -> Dict[str, Dict[str, Any]]:
+    """Per mode: median and max latency (ms), requests and tokens per campaign"""
+    results = {}
+    for mode, batch in (("per_image", False), ("batched", True)):
+        latencies = []
+        before = _vision_totals()
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await process_images_parallel(logo, heroes, cache_mode=CACHE_BYPASS, batch=batch)
+            latencies.append((time.perf_counter() - started) * 1000)
+        after = _vision_totals()
+        results[mode] = {
+            "median_ms": statistics.median(latencies),
+            "max_ms": max(latencies),
+            "requests": (after["requests"] - before["requests"]) / rounds,
+            "tokens": (after["tokens"] - before["tokens"]) / rounds
+        }
+    return results
+
+
+async def run(logo_path: Optional[str], hero_paths: List[str], rounds: int) -> int:
+    logo = Path(logo_path).read_bytes() if logo_path else None
+    heroes = [Path(path).read_bytes() for path in hero_paths]
+    if (1 if logo else 0) + len(heroes) < 2:
+        print("Give at least two images (--logo and/or --hero)", file=sys.stderr)
+        return 1
+
+    try:
+        results = await benchmark(logo, heroes, rounds)
+    finally:
+        await close_openai_client()
+
+    print(f"{'mode':<10} {'median ms':>10} {'max ms':>10} {'requests':>9} {'tokens':>8}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<10} {result['median_ms']:>10.0f} {result['max_ms']:>10.0f} "
+            f"{result['requests']:>9.1f} {result['tokens']:>8.0f}"
+        )
+    # A batched run that needed more than one request fell back to per-image calls
+    if results["batched"]["requests"] > 1:
+        print("Batched output did not parse in some rounds (fell back to per-image calls)")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare batched and per-image GPT Vision analysis")
+    parser.add_argument("--logo", help="Logo image file")
+    parser.add_argument("--hero", action="append", default=[], help="Hero image file (repeatable)")
+    parser.add_argument("--rounds", type=int, default=3, help="Campaigns analyzed per mode")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return asyncio.run(run(args.logo, args.hero, args.rounds))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,22 @@ Pytest configuration and shared fixtures
 """
 import pytest
 import asyncio
+import json
 from typing import AsyncGenerator
+import httpx
 from httpx import AsyncClient
+from openai import AsyncOpenAI
 from app.main import app
-from app.database import db
+from app.database import db, get_db, get_read_db, Database
 import os
 import tempfile
 import shutil
+import uuid
+
+# Storage tests also run against PostgreSQL when this points at a local server, e.g.
+# TEST_POSTGRES_URL=postgresql://postgres@localhost:5432/postgres; each test gets its
+# own schema, which is dropped afterwards
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
 
 
 @pytest.fixture(scope="session")
@@ -49,6 +58,82 @@ async def test_db() -> AsyncGenerator:
         del os.environ["DATABASE_URL"]
 
 
+@pytest.fixture
+async def isolated_db(tmp_path) -> AsyncGenerator:
+    """Fully initialized Database backed by a file in a per-test temp directory"""
+    database = Database(db_path=str(tmp_path / "isolated_campaigns.db"))
+    await database.init_db()
+    yield database
+    await database.close()
+
+
+@pytest.fixture(params=["sqlite", "sharded", "postgres"])
+async def database(request, tmp_path) -> AsyncGenerator:
+    """Initialized database for each storage backend (PostgreSQL only with TEST_POSTGRES_URL)"""
+    if request.param in ("sqlite", "sharded"):
+        if request.param == "sharded":
+            from app.storage.sharding import ShardedDatabase
+            database = ShardedDatabase(str(tmp_path / "campaigns.db"), shard_count=3)
+        else:
+            database = Database(db_path=str(tmp_path / "campaigns.db"))
+        await database.init_db()
+        yield database
+        await database.close()
+        return
+
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    asyncpg = pytest.importorskip("asyncpg")
+    from app.storage.postgres import PostgresDatabase
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    admin = await asyncpg.connect(TEST_POSTGRES_URL)
+    await admin.execute(f"CREATE SCHEMA {schema}")
+    separator = "&" if "?" in TEST_POSTGRES_URL else "?"
+    database = PostgresDatabase(f"{TEST_POSTGRES_URL}{separator}search_path={schema}")
+    try:
+        await database.init_db()
+        yield database
+    finally:
+        await database.close()
+        await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+        await admin.close()
+
+
+@pytest.fixture
+async def database_client(database) -> AsyncGenerator[AsyncClient, None]:
+    """Test client whose endpoints use the per-backend `database`"""
+    async def connection():
+        yield database.conn
+
+    app.dependency_overrides[get_db] = connection
+    app.dependency_overrides[get_read_db] = connection
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            yield ac
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
+
+
+@pytest.fixture
+def repository_calls(monkeypatch):
+    """Record the campaign repository methods called, on any backend"""
+    from app.storage.postgres_repository import PostgresCampaignRepository
+    from app.storage.sqlite_repository import SQLiteCampaignRepository
+
+    calls = []
+    for repository in (SQLiteCampaignRepository, PostgresCampaignRepository):
+        for name in ("insert", "update", "write_all", "get_by_id", "get_by_id_with_parts", "get_many"):
+            def spy(original, name=name):
+                async def recorded(self, *args, **kwargs):
+                    calls.append((name, args))
+                    return await original(self, *args, **kwargs)
+                return recorded
+            monkeypatch.setattr(repository, name, spy(getattr(repository, name)))
+    return calls
+
+
 @pytest.fixture
 async def client(test_db) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client"""
@@ -56,6 +141,54 @@ async def client(test_db) -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
 
+@pytest.fixture
+async def ai_cache(tmp_path, monkeypatch):
+    """Empty AI result cache in a per-test file, used by ai_service"""
+    from app.services.ai_cache_service import AICache
+
+    cache = AICache(str(tmp_path / "ai_cache.db"), max_bytes=1024 * 1024, memory_entries=16)
+    monkeypatch.setattr("app.services.ai_service.ai_cache", cache)
+    yield cache
+    await cache.close()
+
+
+class OpenAIMock:
+    """OpenAI API served by `handler` (sync or async; default answers {"headline": "Hi"}); records requests"""
+
+    def __init__(self):
+        self.requests = []
+        self.handler = lambda request: self.completion({"headline": "Hi"})
+
+    @staticmethod
+    def completion(content: dict, tokens: int = 20):
+        """Chat completion response whose message is `content` as JSON, using `tokens` in total"""
+        return httpx.Response(200, json={
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": json.dumps(content)}}],
+            "usage": {"prompt_tokens": tokens // 2, "completion_tokens": tokens - tokens // 2, "total_tokens": tokens}
+        })
+
+    async def _handle(self, request):
+        self.requests.append(request)
+        if request.url.path.endswith("/models"):
+            return httpx.Response(200, json={"object": "list", "data": []})
+        response = self.handler(request)
+        return await response if asyncio.iscoroutine(response) else response
+
+
+@pytest.fixture
+def openai_mock(monkeypatch, ai_cache):
+    """ai_service's OpenAI client on a mock transport, with fresh call counters and an empty AI cache"""
+    mock = OpenAIMock()
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(mock._handle))
+    monkeypatch.setattr("app.services.ai_service._http_client", http_client)
+    monkeypatch.setattr(
+        "app.services.ai_service._client", AsyncOpenAI(api_key="test", http_client=http_client, max_retries=0)
+    )
+    monkeypatch.setattr("app.services.ai_service._call_stats", {})
+    return mock
+
+
 @pytest.fixture
 def mock_openai_client(monkeypatch):
     """Mock OpenAI client for testing"""
@@ -0,0 +1,154 @@
+"""
+Tests for the content-addressed GPT result cache
+"""
+from io import BytesIO
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image, ImageDraw
+from app.main import app
+from app.services import ai_service
+from app.services.ai_cache_service import CACHE_BYPASS, CACHE_REFRESH, AICache, cache_key
+from app.utils.image_utils import image_dhash
+
+
+@pytest.fixture
+def gpt(openai_mock):
+    """Mock OpenAI answering with a numbered headline; returns the requests"""
+    def handler(request):
+        answer = f"Answer {len(openai_mock.requests)}"
+        return openai_mock.completion({"headline": answer, "campaign_name": answer}, tokens=500)
+
+    openai_mock.handler = handler
+    return openai_mock.requests
+
+
+@pytest.mark.asyncio
+async def test_unchanged_copy_is_answered_from_cache(gpt, ai_cache):
+    """Test reprocessing the same copy (modulo whitespace) skips GPT and returns a private copy"""
+    first = await ai_service.process_text_content("Spring  Sale", "Save 20% today.\n", "Shop")
+    again = await ai_service.process_text_content(" Spring Sale", "Save 20% today.", "Shop")
+    changed = await ai_service.process_text_content("Spring Sale", "Save 30% today.", "Shop")
+
+    assert len(gpt) == 2
+    assert again == first and first["headline"] == "Answer 1"
+    assert changed["headline"] == "Answer 2"
+    again["headline"] = "Edited"
+    assert await ai_service.process_text_content("Spring Sale", "Save 20% today.", "Shop") == first
+
+    for _ in range(100):
+        await ai_service.process_text_content("Spring Sale", "Save 20% today.", "Shop")
+
+    stats = ai_cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["stores"]) == (102, 2, 2)
+    assert stats["saved_tokens"] == 102 * 500
+
+
+@pytest.mark.asyncio
+async def test_bypass_and_refresh_controls(gpt, ai_cache):
+    """Test bypass neither reads nor writes, refresh replaces the entry, and the route validates the mode"""
+    assert await ai_service.generate_campaign_from_prompt("Black Friday", cache_mode=CACHE_BYPASS) is not None
+    await ai_service.generate_campaign_from_prompt("Black Friday")
+    assert len(gpt) == 2
+
+    refreshed = await ai_service.generate_campaign_from_prompt("Black Friday", cache_mode=CACHE_REFRESH)
+    assert refreshed["campaign_name"] == "Answer 3"
+    assert (await ai_service.generate_campaign_from_prompt("Black Friday"))["campaign_name"] == "Answer 3"
+    assert len(gpt) == 3
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        cached = await client.post("/api/v1/campaigns/generate-from-prompt", json={"prompt": "Black Friday"})
+        assert cached.json()["campaign_name"] == "Answer 3"
+        fresh = await client.post(
+            "/api/v1/campaigns/generate-from-prompt", params={"cache": "refresh"}, json={"prompt": "Black Friday"}
+        )
+        assert fresh.json()["campaign_name"] == "Answer 4"
+        invalid = await client.post(
+            "/api/v1/campaigns/generate-from-prompt", params={"cache": "never"}, json={"prompt": "Black Friday"}
+        )
+        assert invalid.status_code == 422
+    assert ai_cache.stats()["bypasses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_persistent_lru_eviction(tmp_path):
+    """Test entries survive a restart, and the least recently used go first past the size cap"""
+    path = str(tmp_path / "ai_cache.db")
+    cache = AICache(path, max_bytes=4000, memory_entries=0)
+    keys = [cache_key("f", "gpt-4o", 0.7, {"n": n}, 1) for n in range(5)]
+    for key in keys[:3]:
+        await cache.put(key, "f", {"text": "x" * 1000}, tokens=100)
+    await cache.close()
+
+    reopened = AICache(path, max_bytes=4000, memory_entries=0)
+    try:
+        assert await reopened.get(keys[0]) == {"text": "x" * 1000}
+        await reopened.put(keys[3], "f", {"text": "x" * 1000}, tokens=100)
+        # keys[1] is now the least recently used
+        assert await reopened.get(keys[1]) is None
+        assert all([await reopened.get(key) for key in (keys[0], keys[2], keys[3])])
+        assert reopened.stats()["evictions"] == 1
+        assert reopened.stats()["bytes"] <= 4000
+        assert cache_key("f", "gpt-4o", 0.7, {"n": 0}, 2) != keys[0]
+    finally:
+        await reopened.close()
+
+
+def _picture(flip: bool = False, format: str = "PNG", quality: int = 95) -> bytes:
+    image = Image.new("RGB", (240, 120))
+    image.putdata([
+        ((x * 255 // 240) if not flip else (y * 255 // 120), 80, 160)
+        for y in range(120) for x in range(240)
+    ])
+    ImageDraw.Draw(image).rectangle((20, 20, 90, 70), fill=(10, 10, 10))
+    buffer = BytesIO()
+    image.save(buffer, format=format, quality=quality)
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_known_images_need_no_vision_calls(gpt, ai_cache):
+    """Test repeated and re-compressed images reuse analyses; only new images reach the API"""
+    logo, hero = _picture(), _picture(flip=True)
+    first = await ai_service.process_images_parallel(logo, [hero, hero])
+    assert len(gpt) == 2
+    assert first["hero_images"][0] == first["hero_images"][1]
+
+    again = await ai_service.process_images_parallel(logo, [hero])
+    assert len(gpt) == 2
+    assert again["logo"] == first["logo"]
+
+    resaved = _picture(format="JPEG", quality=60)
+    assert resaved != logo
+    assert (await ai_service.analyze_image(resaved, "logo")) == first["logo"]
+    assert len(gpt) == 2
+    assert ai_cache.stats()["similar_hits"] == 1
+
+    # Logos and hero images are separate scopes; refresh asks again
+    await ai_service.analyze_image(hero, "logo")
+    await ai_service.process_images_parallel(logo, [], cache_mode=CACHE_REFRESH)
+    assert len(gpt) == 4
+
+
+def _flat(colour, size=(200, 80)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, colour).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_similar_images_must_match_colour_and_shape(gpt, ai_cache):
+    """Test flat images, and images with the same edges in another colour, get their own analyses"""
+    for image in (_flat("red"), _flat("blue"), _flat("white", size=(50, 400))):
+        await ai_service.analyze_image(image, "logo")
+    assert len(gpt) == 3
+
+    tinted = Image.open(BytesIO(_picture()))
+    tinted = Image.merge("RGB", [band.point(lambda value: value // 2) for band in tinted.split()])
+    buffer = BytesIO()
+    tinted.save(buffer, format="PNG")
+    assert image_dhash(buffer.getvalue()) == image_dhash(_picture())
+    await ai_service.analyze_image(_picture(), "logo")
+    await ai_service.analyze_image(buffer.getvalue(), "logo")
+    assert len(gpt) == 5
+    assert ai_cache.stats()["similar_hits"] == 0
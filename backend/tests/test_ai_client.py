@@ -0,0 +1,165 @@
+"""
+Tests for the shared async OpenAI client and thread pool counters
+"""
+import asyncio
+import json
+import time
+from io import BytesIO
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+from PIL import Image, ImageDraw
+from app import vision_benchmark
+from app.services import ai_service
+from app.utils.blocking_io import blocking_io_stats, run_blocking
+
+
+@pytest.fixture
+def openai_requests(openai_mock):
+    """Text and image analysis answers from the mock OpenAI; returns the requests seen"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "image_url" in request.content.decode():
+            return openai_mock.completion({"alt_text": "A product", "contains_text": False})
+        return openai_mock.completion({"headline": "Hi"})
+
+    openai_mock.handler = handler
+    return openai_mock.requests
+
+
+def _image() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 64), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_ai_calls_use_async_client_not_threads(openai_requests):
+    """Test text and vision calls go through the shared pool with per-call timeouts and no threads"""
+    threads_before = blocking_io_stats()["kinds"]
+    text, images = await asyncio.gather(
+        ai_service.process_text_content("Subject", "Body"),
+        ai_service.process_images_parallel(_image(), [_image()])
+    )
+
+    assert text == {"headline": "Hi"}
+    assert [analysis["alt_text"] for analysis in [images["logo"]] + images["hero_images"]] == ["A product"] * 2
+    timeouts = sorted(request.extensions["timeout"]["read"] for request in openai_requests)
+    assert timeouts == [30.0, 30.0, 60.0]
+    calls = ai_service.ai_client_stats()["calls"]
+    assert (calls["text"]["calls"], calls["vision"]["calls"], calls["vision"]["in_flight"]) == (1, 2, 0)
+    assert blocking_io_stats()["kinds"] == threads_before
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections_and_tolerates_failure(openai_requests, monkeypatch):
+    """Test warm-up lists models once per connection and only logs when OpenAI is unreachable"""
+    monkeypatch.setattr("app.config.settings.OPENAI_WARM_CONNECTIONS", 3)
+    await ai_service.warm_openai_client()
+    assert [request.url.path for request in openai_requests] == ["/v1/models"] * 3
+
+    def unreachable(request):
+        raise httpx.ConnectError("unreachable")
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(unreachable))
+    monkeypatch.setattr(ai_service, "_client", AsyncOpenAI(api_key="test", http_client=http_client))
+    await ai_service.warm_openai_client()
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_counts_waits_and_errors():
+    """Test blocking calls report in-flight peaks, waits and failures per kind"""
+    def fail():
+        raise ValueError("boom")
+
+    await asyncio.gather(*(run_blocking("test-sleep", time.sleep, 0.02) for _ in range(3)))
+    with pytest.raises(ValueError):
+        await run_blocking("test-sleep", fail)
+
+    stats = blocking_io_stats()
+    assert stats["max_workers"] >= 1
+    sleeps = stats["kinds"]["test-sleep"]
+    assert (sleeps["calls"], sleeps["in_flight"], sleeps["errors"]) == (4, 0, 1)
+    assert sleeps["peak_in_flight"] == 3
+    assert sleeps["avg_run_ms"] > 0
+
+
+def _images(count: int):
+    images = []
+    for idx in range(count):
+        buffer = BytesIO()
+        # Distinct shapes, so no two are perceptually similar
+        image = Image.new("RGB", (64, 64), "white")
+        ImageDraw.Draw(image).rectangle((idx * 12, 0, idx * 12 + 10, 63 - idx * 12), fill="black")
+        image.save(buffer, format="PNG")
+        images.append(buffer.getvalue())
+    return images
+
+
+@pytest.mark.asyncio
+async def test_batched_vision_request_and_fallback(openai_mock):
+    """Test one low-detail request covers every image, and a short answer falls back to per-image calls"""
+    bodies, batch_size = [], {"answers": None}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        images = [part for part in body["messages"][0]["content"] if part["type"] == "image_url"]
+        if len(images) > 1:
+            count = batch_size["answers"] or len(images)
+            return openai_mock.completion({"images": [{"alt_text": f"Batched {i}"} for i in range(count)]})
+        return openai_mock.completion({"alt_text": "Single"})
+
+    openai_mock.handler = handler
+    logo, first, second = _images(3)
+    result = await ai_service.process_images_parallel(logo, [first, second, first], batch=True)
+
+    assert len(bodies) == 1
+    parts = bodies[0]["messages"][0]["content"][1:]
+    assert [part["image_url"]["detail"] for part in parts] == ["low"] * 3
+    assert result["logo"]["alt_text"] == "Batched 0"
+    assert [hero["alt_text"] for hero in result["hero_images"]] == ["Batched 1", "Batched 2", "Batched 1"]
+    assert await ai_service.process_images_parallel(logo, [first, second], batch=True) == {
+        "logo": result["logo"], "hero_images": result["hero_images"][:2]
+    }
+    assert len(bodies) == 1
+
+    batch_size["answers"] = 1
+    third, fourth = _images(5)[3:]
+    fallback = await ai_service.process_images_parallel(None, [third, fourth], batch=True)
+    assert len(bodies) == 4
+    assert [hero["alt_text"] for hero in fallback["hero_images"]] == ["Single", "Single"]
+
+    # Batched and per-image analyses are cached apart
+    assert (await ai_service.analyze_image(logo, "logo"))["alt_text"] == "Single"
+    assert (await ai_service.analyze_image(third, "hero image"))["alt_text"] == "Single"
+    assert len(bodies) == 5
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_batch_does_not_fan_out(monkeypatch, openai_mock):
+    """Test a batch still rate limited after retries gives fallback analyses without per-image calls"""
+    monkeypatch.setattr(ai_service.ai_rate_limiter, "max_retries", 0)
+    openai_mock.handler = lambda request: httpx.Response(429, json={"error": {"message": "slow down"}})
+    logo, hero = _images(2)
+    result = await ai_service.process_images_parallel(logo, [hero], batch=True)
+
+    assert len(openai_mock.requests) == 1
+    assert result["logo"] == ai_service._fallback_analysis("logo")
+
+
+@pytest.mark.asyncio
+async def test_vision_benchmark_compares_modes(openai_mock):
+    """Test the benchmark reports one request per image against one per campaign"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        images = [part for part in body["messages"][0]["content"] if part["type"] == "image_url"]
+        content = {"images": [{"alt_text": "x"}] * len(images)} if len(images) > 1 else {"alt_text": "x"}
+        return openai_mock.completion(content)
+
+    openai_mock.handler = handler
+    logo, *heroes = _images(3)
+    results = await vision_benchmark.benchmark(logo, heroes, rounds=2)
+
+    assert (results["per_image"]["requests"], results["batched"]["requests"]) == (3, 1)
+    assert (results["per_image"]["tokens"], results["batched"]["tokens"]) == (60, 20)
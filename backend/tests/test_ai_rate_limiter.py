@@ -0,0 +1,151 @@
+"""
+Tests for the global OpenAI rate limiter
+"""
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+from app.services import ai_service
+from app.services.ai_rate_limiter import OpenAIRateLimiter, TokenBucket, estimate_tokens
+
+
+@pytest.fixture
+def limiter(monkeypatch, openai_mock):
+    """Fresh limiter used by ai_service, with short backoffs"""
+    limiter = OpenAIRateLimiter(rpm=0, tpm=0, max_concurrency=8, max_retries=2, backoff_base=0.01, backoff_max=1.0)
+    monkeypatch.setattr(ai_service, "ai_rate_limiter", limiter)
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_honours_retry_after_and_halves_concurrency(openai_mock, limiter):
+    """Test a 429 pauses for retry-after, lowers concurrency and is retried; success grows it back"""
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(time.monotonic())
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "200"}, json={"error": {"message": "slow down"}})
+        return openai_mock.completion({"headline": "Hi"}, tokens=100)
+
+    openai_mock.handler = handler
+    started = time.monotonic()
+    result = await ai_service.process_text_content("Subject", "Body", cache_mode="bypass")
+
+    assert result == {"headline": "Hi"}
+    assert len(sent) == 2
+    assert sent[1] - started >= 0.2
+    stats = limiter.stats()
+    assert (stats["rate_limited"], stats["retries"], stats["concurrency_limit"], stats["in_flight"]) == (1, 1, 4, 0)
+    assert stats["used_tokens"] == 100
+
+    for _ in range(4):
+        await ai_service.process_text_content("Subject", "Body", cache_mode="bypass")
+    assert limiter.stats()["concurrency_limit"] == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_calls(openai_mock, limiter):
+    """Test calls beyond the concurrency limit wait in the queue, which stats report"""
+    limiter.concurrency = 2.0
+    limiter.max_concurrency = 2
+    active = {"now": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        return openai_mock.completion({"headline": "Hi"})
+
+    openai_mock.handler = handler
+    await asyncio.gather(*(
+        ai_service.process_text_content(f"Subject {n}", "Body") for n in range(6)
+    ))
+
+    assert active["peak"] == 2
+    stats = limiter.stats()
+    assert stats["peak_queued"] >= 4
+    assert (stats["queued"], stats["in_flight"]) == (0, 0)
+    assert ai_service.ai_client_stats()["limiter"] == stats
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(openai_mock, limiter):
+    """Test a 400 and an exhausted quota fail at once without retries"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if len(openai_mock.requests) == 1:
+            return httpx.Response(400, json={"error": {"message": "bad request"}})
+        return httpx.Response(429, json={"error": {"message": "quota", "code": "insufficient_quota"}})
+
+    openai_mock.handler = handler
+    with pytest.raises(openai.BadRequestError):
+        await ai_service.process_text_content("Subject", "Body")
+    with pytest.raises(openai.RateLimitError):
+        await limiter.call(
+            lambda: ai_service.get_openai_client().chat.completions.create(
+                model="gpt-4o", messages=[{"role": "user", "content": "Hi"}]
+            ),
+            estimated_tokens=10
+        )
+    assert len(openai_mock.requests) == 2
+    assert (limiter.stats()["retries"], limiter.stats()["rate_limited"]) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_token_budget_delays_calls():
+    """Test estimated costs draw on the tokens-per-minute budget and real usage is given back"""
+    messages = [{"role": "user", "content": [
+        {"type": "text", "text": "x" * 400},
+        {"type": "image_url", "image_url": {"url": "data:", "detail": "low"}},
+        {"type": "image_url", "image_url": {"url": "data:"}}
+    ]}]
+    assert estimate_tokens(messages, max_tokens=300) == 100 + 85 + 765 + 4 + 300
+
+    bucket = TokenBucket(per_minute=600)
+    assert bucket.wait_time(600, time.monotonic()) == 0
+    bucket.take(600)
+    assert bucket.wait_time(10, time.monotonic()) == pytest.approx(1.0, abs=0.05)
+
+    limiter = OpenAIRateLimiter(rpm=0, tpm=6000, max_concurrency=4)
+
+    async def call():
+        return "done"
+
+    await limiter.call(call, estimated_tokens=6000, used_tokens=lambda response: 5990)
+    assert limiter.tokens.tokens >= 10
+    await limiter.call(call, estimated_tokens=10)
+    started = time.monotonic()
+    await limiter.call(call, estimated_tokens=20)
+    assert time.monotonic() - started >= 0.1
+    assert (limiter.stats()["estimated_tokens"], limiter.stats()["used_tokens"]) == (6030, 5990)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_release_their_slots():
+    """Test calls cancelled mid-request (client disconnects, wait_for) give back their concurrency slots"""
+    limiter = OpenAIRateLimiter(rpm=0, tpm=0, max_concurrency=2)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.Event().wait()
+
+    for _ in range(2):
+        started.clear()
+        task = asyncio.create_task(limiter.call(hang, estimated_tokens=10))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert limiter.stats()["in_flight"] == 0
+
+    async def answer():
+        return "done"
+
+    assert await asyncio.wait_for(limiter.call(answer, estimated_tokens=10), timeout=1) == "done"
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.call(hang, estimated_tokens=10), timeout=0.01)
+    assert (limiter.stats()["in_flight"], limiter.stats()["queued"]) == (0, 0)
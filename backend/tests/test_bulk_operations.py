@@ -0,0 +1,121 @@
+"""
+Tests for bulk campaign operations
+"""
+import pytest
+from httpx import AsyncClient
+from app.models.campaign import Campaign
+from app.services import bulk_service
+
+PROCESSED = {"ai_results": {"subject_lines": ["Hi"]}, "content": {"headline": "Hi"}}
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Fake final-HTML publishing; campaigns named 'Broken' fail to upload"""
+    calls = []
+
+    async def publish_final_html(campaign_id, campaign, ai_results):
+        if campaign.campaign_name == "Broken":
+            raise Exception("S3 unavailable")
+        calls.append(campaign_id)
+        return f"s3://bucket/html/{campaign_id}/final.html", f"https://download/{campaign_id}"
+
+    monkeypatch.setattr(bulk_service, "publish_final_html", publish_final_html)
+    return calls
+
+
+async def _saved(conn, name, **fields) -> Campaign:
+    campaign = Campaign(campaign_name=name, advertiser_name="Acme", **fields)
+    await campaign.save(conn)
+    return campaign
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_apply_in_one_write(database, database_client: AsyncClient, published, repository_calls):
+    """Test mixed operations report per-item results and are written in a single transaction"""
+    conn = database.conn
+    ready = [await _saved(conn, f"Ready {i}", status="ready", ai_processing_data=PROCESSED) for i in range(3)]
+    approved = await _saved(conn, "Approved", status="approved", ai_processing_data=PROCESSED)
+    unprocessed = await _saved(conn, "Draft")
+    broken = await _saved(conn, "Broken", status="ready", ai_processing_data=PROCESSED)
+    repository_calls.clear()
+
+    operations = [
+        {"campaign_id": ready[0].id, "action": "approve", "feedback": "Great"},
+        {"campaign_id": ready[1].id, "action": "approve"},
+        {"campaign_id": ready[2].id, "action": "reject", "feedback": "Off brand"},
+        {"campaign_id": approved.id, "action": "schedule", "scheduled_at": "2999-01-01T10:00:00Z"},
+        {"campaign_id": unprocessed.id, "action": "review", "review_status": "pending", "reviewer_notes": "Later"},
+        {"campaign_id": approved.id, "action": "approve"},
+        {"campaign_id": unprocessed.id + "-missing", "action": "reject"},
+        {"campaign_id": broken.id, "action": "approve"},
+    ]
+    response = await database_client.post("/api/v1/campaigns/bulk", json={"operations": operations})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (5, 3)
+
+    results = body["results"]
+    assert [r["success"] for r in results] == [True] * 5 + [False] * 3
+    assert results[0]["download_url"] == f"https://download/{ready[0].id}"
+    assert results[3]["scheduling_status"] == "scheduled"
+    assert results[5]["error"] == "Duplicate operation for this campaign in the same request"
+    assert results[6]["error"] == "Campaign not found"
+    assert results[7]["error"].startswith("Failed to publish final HTML")
+    assert sorted(published) == sorted([ready[0].id, ready[1].id])
+
+    assert [name for name, _ in repository_calls] == ["write_all"]
+    stored = await Campaign.get_by_id(conn, ready[0].id)
+    assert (stored.status, stored.feedback, stored.html_s3_path) == (
+        "approved", "Great", f"s3://bucket/html/{ready[0].id}/final.html"
+    )
+    assert stored.performance_score is not None
+    assert (await Campaign.get_by_id(conn, ready[2].id)).status == "rejected"
+    assert (await Campaign.get_by_id(conn, approved.id)).scheduled_at == "2999-01-01T10:00:00Z"
+    assert (await Campaign.get_by_id(conn, unprocessed.id)).reviewer_notes == "Later"
+    assert (await Campaign.get_by_id(conn, broken.id)).status == "ready"
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_validate_like_single_endpoints(database, database_client: AsyncClient, published):
+    """Test approval, scheduling and size rules of the single-campaign endpoints apply per item"""
+    conn = database.conn
+    draft = await _saved(conn, "Draft")
+    approved = await _saved(conn, "Approved", status="approved")
+
+    response = await database_client.post("/api/v1/campaigns/bulk", json={"operations": [
+        {"campaign_id": draft.id, "action": "approve"},
+        {"campaign_id": draft.id + "x", "action": "schedule"},
+        {"campaign_id": approved.id, "action": "schedule", "scheduled_at": "2000-01-01T00:00:00Z"},
+    ]})
+    results = response.json()["results"]
+    assert [r["error"] for r in results] == [
+        "Campaign must be processed before approval",
+        "Campaign not found",
+        "Scheduled time must be in the future",
+    ]
+    assert published == []
+
+    too_many = [{"campaign_id": draft.id, "action": "reject"}] * 1001
+    response = await database_client.post("/api/v1/campaigns/bulk", json={"operations": too_many})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_approval_survives_stats_failure(database, database_client: AsyncClient, published, monkeypatch):
+    """Test a failing performance stats generation is logged and the operations are still saved"""
+    async def broken_stats(conn, campaign):
+        raise Exception("stats unavailable")
+
+    monkeypatch.setattr(bulk_service, "generate_single_campaign_performance", broken_stats)
+    conn = database.conn
+    ready = await _saved(conn, "Ready", status="ready", ai_processing_data=PROCESSED)
+    other = await _saved(conn, "Other", status="ready", ai_processing_data=PROCESSED)
+
+    response = await database_client.post("/api/v1/campaigns/bulk", json={"operations": [
+        {"campaign_id": ready.id, "action": "approve"},
+        {"campaign_id": other.id, "action": "reject"},
+    ]})
+    assert response.json()["succeeded"] == 2
+    assert (await Campaign.get_by_id(conn, ready.id)).status == "approved"
+    assert (await Campaign.get_by_id(conn, other.id)).status == "rejected"
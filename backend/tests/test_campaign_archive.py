@@ -0,0 +1,121 @@
+"""
+Tests for archiving finished campaigns out of the hot table
+"""
+import pytest
+from app.models.campaign import Campaign
+from app.services import archive_service as archive_module
+from app.services.archive_service import ArchiveService
+from app.services.campaign_service import get_campaign
+from app.storage.repository import repository_for
+
+OLD = "2020-01-01T00:00:00"
+
+
+class FakeS3:
+    def __init__(self, fail=()):
+        self.archived = []
+        self.deleted = []
+        self.fail = set(fail)
+
+    async def archive_file(self, s3_key, archive_key, storage_class="STANDARD_IA"):
+        if s3_key in self.fail:
+            raise Exception("NoSuchKey")
+        self.archived.append((s3_key, archive_key))
+        return f"s3://bucket/{archive_key}"
+
+    async def delete_file(self, s3_key):
+        self.deleted.append(s3_key)
+        return True
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(archive_module, "s3_service", fake)
+    return fake
+
+
+async def _saved(conn, name, updated_at=OLD, **fields) -> Campaign:
+    campaign = Campaign(
+        campaign_name=name, advertiser_name="Acme", updated_at=updated_at,
+        ai_processing_data={"content": {"headline": name}}, **fields
+    )
+    await campaign.save(conn)
+    return campaign
+
+
+@pytest.mark.asyncio
+async def test_finished_campaigns_move_to_archive(database, s3):
+    """Test only old terminal campaigns are archived, with their proofs, and stay readable"""
+    conn = database.conn
+    sent = await _saved(conn, "Sent", status="approved", scheduling_status="sent",
+                        proof_s3_path="s3://bucket/proofs/sent/proof.html")
+    rejected = await _saved(conn, "Rejected", status="rejected")
+    await _saved(conn, "Fresh", updated_at="2999-01-01T00:00:00", status="rejected")
+    await _saved(conn, "Scheduled", status="approved", scheduling_status="scheduled")
+    await _saved(conn, "Draft")
+
+    service = ArchiveService()
+    service.batch_size = 1
+    assert await service.run_once(conn) == 2
+
+    repository = repository_for(conn)
+    assert await repository.count_archived() == 2
+    assert await repository.get_status_counts() == {"approved": 1, "rejected": 1, "draft": 1}
+    assert await Campaign.get_by_id(conn, sent.id) is None
+    assert s3.archived == [("proofs/sent/proof.html", "archive/proofs/sent/proof.html")]
+    assert s3.deleted == ["proofs/sent/proof.html"]
+
+    archived = await get_campaign(sent.id, conn=conn)
+    assert archived.proof_s3_path == "s3://bucket/archive/proofs/sent/proof.html"
+    assert archived.ai_processing_data == {"content": {"headline": "Sent"}}
+    assert (await get_campaign(rejected.id, conn=conn)).status == "rejected"
+    assert await service.run_once(conn) == 0
+
+
+@pytest.mark.asyncio
+async def test_campaigns_updated_since_selection_stay_hot(database, s3, monkeypatch):
+    """Test the move skips a campaign changed after it was selected and drops its proof copy"""
+    conn = database.conn
+    campaign = await _saved(conn, "Racing", status="rejected", proof_s3_path="s3://bucket/proofs/r/proof.html")
+    repository = repository_for(conn)
+    candidates = await repository.archive_candidates("2021-01-01T00:00:00", None, 10)
+    assert [c[0] for c in candidates] == [campaign.id]
+
+    await campaign.update(conn, feedback="Second look")
+    assert await repository.archive(candidates, "2024-01-01T00:00:00") == []
+    assert (await Campaign.get_by_id(conn, campaign.id)).feedback == "Second look"
+
+    # Same race through the service: the archived copy is removed, the original kept
+    await campaign.update(conn, updated_at=OLD)
+    real_archive = repository.archive
+
+    async def archive_after_edit(moves, archived_at):
+        await campaign.update(conn, feedback="Third look")
+        return await real_archive(moves, archived_at)
+
+    repository.archive = archive_after_edit
+    monkeypatch.setattr(archive_module, "repository_for", lambda c: repository)
+    assert await ArchiveService().archive_batch(conn) == (1, 0)
+    assert s3.deleted == ["archive/proofs/r/proof.html"]
+
+
+@pytest.mark.asyncio
+async def test_saving_archived_campaign_restores_it(database, s3, monkeypatch):
+    """Test an archived campaign that is edited moves back into the hot table"""
+    conn = database.conn
+    s3.fail.add("proofs/x/proof.html")
+    monkeypatch.setattr(archive_module.settings, "ARCHIVE_MAX_AGE_DAYS", 365.0)
+    campaign = await _saved(conn, "Old draft", proof_s3_path="s3://bucket/proofs/x/proof.html")
+    assert await ArchiveService().run_once(conn) == 1
+
+    archived = await get_campaign(campaign.id, conn=conn)
+    # The proof could not be copied, so it stays where it was
+    assert archived.proof_s3_path == "s3://bucket/proofs/x/proof.html"
+    await archived.update(conn, status="uploaded")
+
+    repository = repository_for(conn)
+    assert await repository.count_archived() == 0
+    restored = await Campaign.get_by_id(conn, campaign.id)
+    assert (restored.status, restored.ai_processing_data) == ("uploaded", {"content": {"headline": "Old draft"}})
+    assert await repository.get_status_counts() == {"uploaded": 1}
@@ -0,0 +1,99 @@
+"""
+Tests for the get_campaign read-through cache and per-request identity map
+"""
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.models.campaign import Campaign
+from app.services import campaign_service
+from app.services.campaign_service import CampaignCache, campaign_scope, get_campaign
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = CampaignCache(max_size=2, ttl_seconds=10, clock=FakeClock())
+    monkeypatch.setattr(campaign_service, "campaign_cache", cache)
+    return cache
+
+
+async def _saved(conn, name="Spring Sale") -> Campaign:
+    campaign = Campaign(campaign_name=name, advertiser_name="Acme", ai_processing_data={"content": {"headline": "H"}})
+    await campaign.save(conn)
+    return campaign
+
+
+@pytest.mark.asyncio
+async def test_read_through_returns_fresh_objects(database, cache, repository_calls):
+    """Test a cache hit skips the database but never hands out a shared object"""
+    conn = database.conn
+    campaign = await _saved(conn)
+
+    first = await get_campaign(campaign.id, conn=conn)
+    repository_calls.clear()
+    second = await get_campaign(campaign.id, conn=conn)
+
+    assert repository_calls == []
+    assert second is not first
+    assert second.ai_processing_data == {"content": {"headline": "H"}}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_save_invalidates(database, cache):
+    """Test a save through any object evicts the cached row"""
+    conn = database.conn
+    campaign = await _saved(conn)
+    await get_campaign(campaign.id, conn=conn)
+
+    await campaign.update(conn, status="approved")
+    assert (await get_campaign(campaign.id, conn=conn)).status == "approved"
+    assert cache.invalidations >= 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_and_size_bound(database, cache):
+    """Test entries expire after the TTL and the least recently used is evicted"""
+    conn = database.conn
+    a, b, c = [await _saved(conn, name) for name in ("A", "B", "C")]
+    for campaign in (a, b, c):
+        await get_campaign(campaign.id, conn=conn)
+    assert cache.stats()["size"] == 2
+    assert cache.evictions == 1
+    assert cache.get(a.id) is None
+
+    cache._clock.now += 11
+    assert cache.get(c.id) is None
+
+
+@pytest.mark.asyncio
+async def test_request_scope_is_an_identity_map(database, cache):
+    """Test repeated lookups in one scope return the same object, and not after it closes"""
+    conn = database.conn
+    campaign = await _saved(conn)
+
+    with campaign_scope():
+        first = await get_campaign(campaign.id, conn=conn)
+        first.feedback = "looks good"
+        assert await get_campaign(campaign.id, conn=conn) is first
+        assert cache.request_hits == 1
+
+    other = await get_campaign(campaign.id, conn=conn)
+    assert other is not first
+    assert other.feedback is None
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_endpoint():
+    """Test hit/miss counters are exposed for monitoring"""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/health/cache")
+    assert response.status_code == 200
+    assert {"hits", "request_hits", "misses", "evictions", "size"} <= set(response.json())
@@ -0,0 +1,61 @@
+"""
+Tests for trigger-maintained status counters
+"""
+import pytest
+from app.models.campaign import Campaign
+from app.models.campaign_counts import (
+    count_campaigns,
+    get_review_status_counts,
+    get_status_counts,
+    rebuild_status_counts
+)
+
+
+async def _actual_counts(conn, column):
+    async with conn.execute(
+        f"SELECT {column}, COUNT(*) FROM campaigns WHERE {column} IS NOT NULL GROUP BY {column}"
+    ) as cursor:
+        return {row[0]: row[1] for row in await cursor.fetchall()}
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_inserts_updates_and_deletes(isolated_db):
+    """Test the counter tables match GROUP BY counts after every kind of write"""
+    conn = isolated_db.conn
+    campaigns = []
+    for i in range(6):
+        campaign = Campaign(campaign_name=f"C{i}", advertiser_name="Acme", status="draft")
+        await campaign.save(conn)
+        campaigns.append(campaign)
+
+    await campaigns[0].update(conn, status="approved", review_status="approved")
+    await campaigns[1].update(conn, status="ready", review_status="pending")
+    await campaigns[2].update(conn, review_status="pending")
+    await campaigns[2].update(conn, review_status=None)
+    await conn.execute("DELETE FROM campaigns WHERE id = ?", (campaigns[3].id,))
+    await conn.commit()
+
+    assert await get_status_counts(conn) == await _actual_counts(conn, "status")
+    assert await get_status_counts(conn) == {"draft": 3, "approved": 1, "ready": 1}
+    assert await get_review_status_counts(conn) == await _actual_counts(conn, "review_status")
+
+    assert await count_campaigns(conn) == (5, False)
+    assert await count_campaigns(conn, status="draft") == (3, False)
+    assert await count_campaigns(conn, any_review_status=True) == (2, False)
+    assert await count_campaigns(conn, review_status="pending", any_review_status=True) == (1, False)
+    assert await count_campaigns(conn, mode="none") == (None, False)
+
+
+@pytest.mark.asyncio
+async def test_counters_can_be_rebuilt(isolated_db):
+    """Test counters are recomputed from the campaigns table"""
+    conn = isolated_db.conn
+    for status in ("draft", "draft", "ready"):
+        await Campaign(campaign_name="C", advertiser_name="Acme", status=status).save(conn)
+    await conn.execute("DELETE FROM campaign_status_counts")
+    await conn.execute("DELETE FROM review_status_counts")
+    await conn.commit()
+
+    await rebuild_status_counts(conn)
+    await conn.commit()
+    assert await get_status_counts(conn) == {"draft": 2, "ready": 1}
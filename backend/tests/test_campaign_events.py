@@ -0,0 +1,116 @@
+"""
+Tests for the campaign change log and the /campaigns/changes feed
+"""
+import pytest
+from httpx import AsyncClient
+from app.models.campaign import Campaign
+from app.services.campaign_service import campaign_cache, get_campaign
+from app.services.change_feed_service import ChangeFeedFollower, get_campaign_changes
+from app.storage.repository import repository_for
+
+
+@pytest.fixture(autouse=True)
+def _change_feed(database):
+    if not repository_for(database.conn).change_feed:
+        pytest.skip("Backend has no change feed (clients are told to reset)")
+
+
+async def _execute(conn, sql, *params):
+    """Run a statement outside the repository, as another worker would"""
+    if hasattr(conn, "fetchval"):
+        await conn.execute(sql.replace("?", "$1"), *params)
+    else:
+        await conn.execute(sql, params)
+        await conn.commit()
+
+
+async def _saved(conn, name, **fields) -> Campaign:
+    campaign = Campaign(campaign_name=name, advertiser_name="Acme", **fields)
+    await campaign.save(conn)
+    return campaign
+
+
+@pytest.mark.asyncio
+async def test_every_write_is_logged_in_order(database):
+    """Test inserts, updates, batch writes and deletes append events with growing seq"""
+    conn = database.conn
+    repository = repository_for(conn)
+    first = await _saved(conn, "First", ai_processing_data={"content": {"headline": "One"}})
+    second = await _saved(conn, "Second")
+    await first.update(conn, status="rejected")
+    first.feedback, second.feedback = "Again", "Again"
+    await repository.write_all([(c,) + c._pending_write() for c in (first, second)])
+    await _execute(conn, "DELETE FROM campaigns WHERE id = ?", second.id)
+
+    events = await repository.get_events(0, 100)
+    assert [(campaign_id, kind) for _, campaign_id, kind in events] == [
+        (first.id, "insert"), (second.id, "insert"), (first.id, "update"),
+        (first.id, "update"), (second.id, "update"), (second.id, "delete"),
+    ]
+    seqs = [seq for seq, _, _ in events]
+    assert seqs == sorted(seqs) and len(set(seqs)) == len(seqs)
+
+    changes = await get_campaign_changes(conn, seqs[1], limit=100)
+    assert [c.id for c in changes["changed"]] == [first.id]
+    assert changes["changed"][0].ai_processing_data["content"] == {"headline": "One"}
+    assert changes["deleted"] == [second.id]
+    assert (changes["next_since"], changes["has_more"], changes["reset"]) == (seqs[-1], False, False)
+
+    paged = await get_campaign_changes(conn, 0, limit=2)
+    assert (paged["next_since"], paged["has_more"]) == (seqs[1], True)
+    assert (await get_campaign_changes(conn, seqs[-1]))["changed"] == []
+
+
+@pytest.mark.asyncio
+async def test_feed_resets_when_events_were_pruned(database):
+    """Test pruning keeps the latest event and clients behind it are told to reload"""
+    conn = database.conn
+    repository = repository_for(conn)
+    for i in range(3):
+        await _saved(conn, f"Campaign {i}")
+    await _execute(conn, "UPDATE campaign_events SET changed_at = ?", "2020-01-01T00:00:00")
+
+    assert await repository.prune_events("2021-01-01T00:00:00") == 2
+    oldest, latest = await repository.get_event_bounds()
+    assert oldest == latest
+    assert (await get_campaign_changes(conn, 0))["reset"] is True
+    assert (await get_campaign_changes(conn, latest - 1))["reset"] is False
+    assert (await get_campaign_changes(conn, latest + 5))["reset"] is True
+
+
+@pytest.mark.asyncio
+async def test_follower_invalidates_campaigns_changed_elsewhere(database, monkeypatch):
+    """Test the follower drops cached campaigns written by another worker"""
+    conn = database.conn
+    monkeypatch.setattr("app.services.campaign_service.db", database)
+    campaign = await _saved(conn, "Cached")
+    follower = ChangeFeedFollower()
+    follower.last_seq = (await repository_for(conn).get_event_bounds())[1]
+
+    assert (await get_campaign(campaign.id, conn=conn)).status == "draft"
+    assert campaign_cache.get(campaign.id) is not None
+    await _execute(conn, "UPDATE campaigns SET status = 'uploaded' WHERE id = ?", campaign.id)
+
+    assert await follower.poll(conn) == 1
+    assert campaign_cache.get(campaign.id) is None
+    assert (await get_campaign(campaign.id, conn=conn)).status == "uploaded"
+
+
+@pytest.mark.asyncio
+async def test_list_then_follow_changes(database, database_client: AsyncClient):
+    """Test a client can follow a list from its changes_since"""
+    conn = database.conn
+    kept = await _saved(conn, "Kept")
+    response = await database_client.get("/api/v1/campaigns")
+    since = response.json()["changes_since"]
+
+    await kept.update(conn, status="uploaded")
+    added = await _saved(conn, "Added")
+    response = await database_client.get("/api/v1/campaigns/changes", params={"since": since})
+    assert response.status_code == 200
+    body = response.json()
+    assert [(c["id"], c["status"]) for c in body["changed"]] == [(kept.id, "uploaded"), (added.id, "draft")]
+    assert body["deleted"] == [] and body["reset"] is False
+
+    response = await database_client.get("/api/v1/campaigns/changes", params={"since": body["next_since"]})
+    assert response.json()["changed"] == []
@@ -0,0 +1,152 @@
+"""
+Tests for Campaign model persistence and change tracking
+"""
+import pytest
+from app.models.campaign import Campaign
+
+
+async def _insert_campaign(conn, **kwargs) -> Campaign:
+    campaign = Campaign(campaign_name="Spring Sale", advertiser_name="Acme", **kwargs)
+    await campaign.save(conn)
+    return campaign
+
+
+@pytest.mark.asyncio
+async def test_new_campaign_is_inserted(isolated_db):
+    """Test saving a new campaign inserts the full row"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn, ai_processing_data={"content": {"subject_line": "Hi"}})
+
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    assert loaded.campaign_name == "Spring Sale"
+    assert loaded.ai_processing_data == {"content": {"subject_line": "Hi"}}
+    assert loaded.dirty_fields == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_update_only_writes_changed_columns(isolated_db):
+    """Test update() issues an UPDATE for just the changed columns"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn)
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+
+    statements = []
+    await conn.set_trace_callback(statements.append)
+    try:
+        await loaded.update(conn, review_status="approved")
+    finally:
+        await conn.set_trace_callback(None)
+
+    # Statements run by triggers are traced with the text of the statement that fired them
+    writes = list(dict.fromkeys(s for s in statements if s.lstrip().upper().startswith(("UPDATE", "INSERT"))))
+    assert len(writes) == 1
+    assert writes[0].startswith("UPDATE campaigns SET review_status = ")
+    assert "updated_at" in writes[0]
+    assert "ai_processing_data" not in writes[0]
+    assert "campaign_name" not in writes[0]
+
+    reloaded = await Campaign.get_by_id(conn, campaign.id)
+    assert reloaded.review_status == "approved"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_ai_data_is_not_rewritten(isolated_db):
+    """Test reassigning an equal ai_processing_data dict skips the JSON column"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn, ai_processing_data={"logo": {"s3_url": "s3://b/k"}})
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+
+    statements = []
+    await conn.set_trace_callback(statements.append)
+    try:
+        await loaded.update(conn, ai_processing_data=dict(loaded.ai_processing_data), status="processed")
+    finally:
+        await conn.set_trace_callback(None)
+
+    update = next(s for s in statements if s.startswith("UPDATE"))
+    assert "ai_processing_data" not in update
+    assert "status = " in update
+
+
+@pytest.mark.asyncio
+async def test_changed_ai_data_is_written(isolated_db):
+    """Test in-place changes to ai_processing_data are persisted through update()"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn, ai_processing_data={"content": {}})
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+
+    loaded.ai_processing_data["ai_results"] = {"text_optimization": {"headline": "New"}}
+    await loaded.update(conn, ai_processing_data=loaded.ai_processing_data)
+
+    reloaded = await Campaign.get_by_id(conn, campaign.id)
+    assert reloaded.ai_processing_data["ai_results"]["text_optimization"]["headline"] == "New"
+
+
+@pytest.mark.asyncio
+async def test_save_without_changes_is_noop(isolated_db):
+    """Test saving a clean campaign issues no statements"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn)
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+
+    statements = []
+    await conn.set_trace_callback(statements.append)
+    try:
+        await loaded.save(conn)
+    finally:
+        await conn.set_trace_callback(None)
+
+    assert statements == []
+
+
+def test_mark_dirty_rejects_unknown_column():
+    """Test mark_dirty validates column names"""
+    campaign = Campaign(campaign_name="A", advertiser_name="B")
+    with pytest.raises(ValueError):
+        campaign.mark_dirty("not_a_column")
+
+
+@pytest.mark.asyncio
+async def test_ai_data_is_decoded_lazily(isolated_db):
+    """Test from_row defers decoding ai_processing_data until it is accessed"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn, ai_processing_data={"content": {"subject_line": "Hi"}})
+
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    assert not loaded.ai_data_decoded
+    assert loaded.campaign_name == "Spring Sale"
+    assert not loaded.ai_data_decoded
+
+    assert loaded.ai_processing_data["content"]["subject_line"] == "Hi"
+    assert loaded.ai_data_decoded
+
+
+@pytest.mark.asyncio
+async def test_untouched_ai_data_is_written_back_verbatim(isolated_db):
+    """Test a row re-inserted without touching the blob keeps its original bytes"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn)
+    raw = '{ "content" : {"subject_line": "Hi",  "ratio": 1.50} }'
+    await conn.execute("UPDATE campaigns SET ai_processing_data = ? WHERE id = ?", (raw, campaign.id))
+    await conn.commit()
+
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    # Force the full-row insert fallback in save()
+    await conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign.id,))
+    await conn.commit()
+    await loaded.update(conn, review_status="pending")
+
+    async with conn.execute("SELECT ai_processing_data FROM campaigns WHERE id = ?", (campaign.id,)) as cursor:
+        assert (await cursor.fetchone())[0] == raw
+
+
+@pytest.mark.asyncio
+async def test_invalid_ai_json_decodes_to_empty_dict(isolated_db):
+    """Test a corrupt blob still loads, as an empty dict, when accessed"""
+    conn = isolated_db.conn
+    campaign = await _insert_campaign(conn)
+    await conn.execute("UPDATE campaigns SET ai_processing_data = '{oops' WHERE id = ?", (campaign.id,))
+    await conn.commit()
+
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    assert loaded.ai_processing_data == {}
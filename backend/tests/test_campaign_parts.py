@@ -0,0 +1,159 @@
+"""
+Tests for normalized ai_processing_data tables
+"""
+import json
+import pytest
+from app.models.campaign import Campaign
+from app.models.campaign_parts import (
+    PART_ASSETS,
+    PART_CONTENT,
+    PART_IMAGE_ANALYSIS,
+    backfill_campaign_parts,
+    load_campaign_parts
+)
+
+
+AI_DATA = {
+    "logo": {"filename": "logo.png", "s3_url": "s3://bucket/logo.png", "size": 120},
+    "hero_images": [
+        {"filename": "hero1.jpg", "s3_url": "s3://bucket/hero1.jpg", "size": 300},
+        {"filename": "hero2.jpg", "s3_url": "s3://bucket/hero2.jpg", "size": 310}
+    ],
+    "content": {"subject_line": "Big Sale", "cta_text": "Shop", "body_copy": None},
+    "ai_results": {
+        "text_optimization": {"headline": "Save now"},
+        "image_analysis": {"logo": {"alt_text": "Acme logo"}},
+        "optimized_images": {"logo": "s3://bucket/opt_logo.jpg", "hero_images": []}
+    }
+}
+
+
+async def _save(conn, **kwargs) -> Campaign:
+    campaign = Campaign(campaign_name="Sale", advertiser_name="Acme", **kwargs)
+    await campaign.save(conn)
+    return campaign
+
+
+@pytest.mark.asyncio
+async def test_save_writes_normalized_parts(isolated_db):
+    """Test saving a campaign populates assets, content and AI result rows"""
+    conn = isolated_db.conn
+    campaign = await _save(conn, ai_processing_data=AI_DATA)
+
+    parts = await load_campaign_parts(conn, [campaign.id], ["assets", "content", "text_optimization"])
+    data = parts[campaign.id]
+    assert data["logo"]["filename"] == "logo.png"
+    assert [h["filename"] for h in data["hero_images"]] == ["hero1.jpg", "hero2.jpg"]
+    assert data["content"] == {"subject_line": "Big Sale", "cta_text": "Shop"}
+    assert data["ai_results"] == {"text_optimization": {"headline": "Save now"}}
+
+
+@pytest.mark.asyncio
+async def test_parts_follow_ai_data_updates(isolated_db):
+    """Test updating ai_processing_data rewrites the normalized rows"""
+    conn = isolated_db.conn
+    campaign = await _save(conn, ai_processing_data=AI_DATA)
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+
+    loaded.ai_processing_data["content"]["subject_line"] = "Bigger Sale"
+    loaded.ai_processing_data["hero_images"] = []
+    await loaded.update(conn, ai_processing_data=loaded.ai_processing_data)
+
+    data = (await load_campaign_parts(conn, [campaign.id], ["assets", "content"]))[campaign.id]
+    assert data["content"]["subject_line"] == "Bigger Sale"
+    assert "hero_images" not in data
+
+
+@pytest.mark.asyncio
+async def test_list_summaries_skip_image_analysis(isolated_db):
+    """Test list loading never selects the blob or image analysis rows"""
+    conn = isolated_db.conn
+    await _save(conn, ai_processing_data=AI_DATA)
+
+    statements = []
+    await conn.set_trace_callback(statements.append)
+    try:
+        campaigns = await Campaign.get_summaries(conn, limit=10)
+    finally:
+        await conn.set_trace_callback(None)
+
+    assert len(campaigns) == 1
+    assert campaigns[0].ai_processing_data["content"]["subject_line"] == "Big Sale"
+    assert "ai_results" not in campaigns[0].ai_processing_data
+    assert not any("ai_processing_data" in s for s in statements)
+    assert not any("campaign_ai_results" in s for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_partial_campaign_cannot_overwrite_blob(isolated_db):
+    """Test campaigns loaded with partial ai data refuse to save ai_processing_data"""
+    conn = isolated_db.conn
+    campaign = await _save(conn, ai_processing_data=AI_DATA)
+    partial = await Campaign.get_by_id_with_parts(conn, campaign.id, [PART_CONTENT])
+
+    with pytest.raises(ValueError):
+        await partial.update(conn, ai_processing_data=partial.ai_processing_data)
+
+    # Plain column updates are still fine
+    partial = await Campaign.get_by_id_with_parts(conn, campaign.id, [PART_CONTENT])
+    await partial.update(conn, review_status="pending")
+    full = await Campaign.get_by_id(conn, campaign.id)
+    assert full.review_status == "pending"
+    assert full.ai_processing_data == AI_DATA
+
+
+@pytest.mark.asyncio
+async def test_backfill_migrates_existing_blobs(isolated_db):
+    """Test the backfill normalizes rows written before the tables existed"""
+    conn = isolated_db.conn
+    campaign = await _save(conn)
+    # Simulate a legacy row: blob present, no normalized rows
+    await conn.execute(
+        "UPDATE campaigns SET ai_processing_data = ? WHERE id = ?",
+        (json.dumps(AI_DATA), campaign.id)
+    )
+    await conn.commit()
+
+    migrated = await backfill_campaign_parts(conn, batch_size=1)
+    assert migrated == 1
+
+    data = (await load_campaign_parts(conn, [campaign.id], [PART_IMAGE_ANALYSIS]))[campaign.id]
+    assert data["ai_results"]["image_analysis"] == {"logo": {"alt_text": "Acme logo"}}
+
+    # Re-running is a no-op
+    assert await backfill_campaign_parts(conn) == 0
+
+
+@pytest.mark.asyncio
+async def test_lists_read_blob_until_backfilled(isolated_db):
+    """Test list reads fall back to the blob for campaigns without normalized rows"""
+    conn = isolated_db.conn
+    campaign = await _save(conn)
+    await conn.execute(
+        "UPDATE campaigns SET ai_processing_data = ? WHERE id = ?",
+        (json.dumps(AI_DATA), campaign.id)
+    )
+    await conn.commit()
+
+    listed = (await Campaign.get_summaries(conn, parts=[PART_ASSETS, PART_CONTENT]))[0]
+    assert listed.ai_processing_data == {
+        "logo": AI_DATA["logo"],
+        "hero_images": AI_DATA["hero_images"],
+        "content": {"subject_line": "Big Sale", "cta_text": "Shop"}
+    }
+    await backfill_campaign_parts(conn)
+    assert (await Campaign.get_summaries(conn, parts=[PART_ASSETS, PART_CONTENT]))[0].ai_processing_data == \
+        listed.ai_processing_data
+
+
+@pytest.mark.asyncio
+async def test_backfill_skips_undecodable_blobs(isolated_db):
+    """Test blobs that cannot be decoded get no (empty) normalized rows and are retried later"""
+    conn = isolated_db.conn
+    campaign = await _save(conn)
+    await conn.execute("UPDATE campaigns SET ai_processing_data = '{oops' WHERE id = ?", (campaign.id,))
+    await conn.commit()
+
+    assert await backfill_campaign_parts(conn) == 0
+    async with conn.execute("SELECT COUNT(*) FROM campaign_content WHERE campaign_id = ?", (campaign.id,)) as cursor:
+        assert (await cursor.fetchone())[0] == 0
@@ -0,0 +1,147 @@
+"""
+Tests for FTS5 campaign search
+"""
+import pytest
+from httpx import AsyncClient
+from app.main import app
+from app.database import get_read_db
+from app.models.campaign import Campaign
+from app.models.campaign_search import (
+    backfill_search_index,
+    build_match_query,
+    search_campaign_rows
+)
+
+
+async def _save(conn, name, advertiser="Acme", status="draft", **content) -> Campaign:
+    campaign = Campaign(
+        campaign_name=name,
+        advertiser_name=advertiser,
+        status=status,
+        ai_processing_data={"content": content} if content else None
+    )
+    await campaign.save(conn)
+    return campaign
+
+
+async def _search(conn, text, **kwargs):
+    rows = await search_campaign_rows(conn, build_match_query(text), ["id"], **kwargs)
+    return [row["id"] for row in rows]
+
+
+@pytest.fixture
+async def api(isolated_db):
+    """HTTP client whose read endpoints use the isolated database"""
+    async def read_db():
+        yield isolated_db.conn
+
+    app.dependency_overrides[get_read_db] = read_db
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            yield ac
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+
+
+def test_match_query_quotes_terms():
+    """Test user input becomes quoted prefix terms, so FTS5 syntax is inert"""
+    assert build_match_query("Spring sal") == '"Spring"* "sal"*'
+    assert build_match_query('NEAR(a b) OR "x') == '"NEAR"* "a"* "b"* "OR"* "x"*'
+    assert build_match_query("  -- ") is None
+
+
+@pytest.mark.asyncio
+async def test_index_follows_campaign_and_content_changes(isolated_db):
+    """Test triggers keep the index in sync with names and content"""
+    conn = isolated_db.conn
+    campaign = await _save(conn, "Spring Sale", subject_line="Fresh tulips", body_copy="Garden deals")
+
+    assert await _search(conn, "tulip") == [campaign.id]
+    assert await _search(conn, "garden spr") == [campaign.id]
+
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    loaded.ai_processing_data["content"]["subject_line"] = "Autumn leaves"
+    await loaded.update(conn, campaign_name="Fall Sale", ai_processing_data=loaded.ai_processing_data)
+    assert await _search(conn, "tulip") == []
+    assert await _search(conn, "spring") == []
+    assert await _search(conn, "autumn fall") == [campaign.id]
+
+    await conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign.id,))
+    await conn.commit()
+    assert await _search(conn, "fall") == []
+
+
+@pytest.mark.asyncio
+async def test_name_matches_rank_above_body_matches(isolated_db):
+    """Test campaign name hits outrank body copy hits"""
+    conn = isolated_db.conn
+    body_hit = await _save(conn, "Weekly deals", body_copy="Lanterns for every patio")
+    name_hit = await _save(conn, "Lantern Festival")
+
+    assert await _search(conn, "lantern") == [name_hit.id, body_hit.id]
+
+
+@pytest.mark.asyncio
+async def test_search_filters_by_status(isolated_db):
+    """Test the status filter applies to search results"""
+    conn = isolated_db.conn
+    await _save(conn, "Holiday Gifts", status="draft")
+    approved = await _save(conn, "Holiday Travel", status="approved")
+
+    assert await _search(conn, "holiday", status="approved") == [approved.id]
+
+
+@pytest.mark.asyncio
+async def test_backfill_indexes_existing_rows(isolated_db):
+    """Test the backfill indexes campaigns written before the index existed"""
+    conn = isolated_db.conn
+    campaign = await _save(conn, "Winter Clearance", headline="Everything must go")
+    await conn.execute("DELETE FROM campaigns_fts")
+    await conn.commit()
+    assert await _search(conn, "winter") == []
+
+    assert await backfill_search_index(conn, batch_size=1) == 1
+    assert await _search(conn, "everything") == [campaign.id]
+    assert await backfill_search_index(conn) == 0
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_pages_with_cursor(api, isolated_db):
+    """Test /campaigns/search walks all matches with next_cursor"""
+    for i in range(5):
+        await _save(isolated_db.conn, f"Summer Promo {i}")
+    await _save(isolated_db.conn, "Unrelated")
+
+    ids, cursor = [], None
+    for _ in range(10):
+        params = {"q": "summ", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await api.get("/api/v1/campaigns/search", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        ids.extend(c["id"] for c in body["campaigns"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(ids) == len(set(ids)) == 5
+
+    response = await api.get("/api/v1/campaigns/search", params={"q": "summ", "cursor": "bad"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_feedback_and_exact_id(api, isolated_db):
+    """Test review feedback is searchable and a campaign ID finds that campaign"""
+    conn = isolated_db.conn
+    campaign = await _save(conn, "Autumn Auction")
+    await campaign.update(conn, feedback="Logo is blurry")
+    other = await _save(conn, "Coins", status="approved")
+
+    assert await _search(conn, "blurr") == [campaign.id]
+
+    response = await api.get("/api/v1/campaigns/search", params={"q": other.id})
+    assert [c["id"] for c in response.json()["campaigns"]] == [other.id]
+    response = await api.get("/api/v1/campaigns/search", params={"q": other.id, "status": "draft"})
+    assert response.json()["campaigns"] == []
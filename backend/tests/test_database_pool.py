@@ -0,0 +1,122 @@
+"""
+Tests for the SQLite read pool and writer connection
+"""
+import asyncio
+import pytest
+import sqlite3
+from app.storage.pool import ReadPool, PoolTimeoutError, build_pragmas, open_connection
+
+
+@pytest.fixture
+async def writer(tmp_path):
+    """Writer connection on a temporary WAL database with one row"""
+    db_path = tmp_path / "pool_test.db"
+    conn = await open_connection(
+        db_path,
+        build_pragmas(5000, 1024, 0, journal_mode="WAL", synchronous="NORMAL")
+    )
+    await conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    await conn.execute("INSERT INTO items (name) VALUES ('first')")
+    await conn.commit()
+    yield conn, db_path
+    await conn.close()
+
+
+@pytest.mark.asyncio
+async def test_writer_uses_wal(writer):
+    """Test writer connection is switched to WAL journaling"""
+    conn, _ = writer
+    async with conn.execute("PRAGMA journal_mode") as cursor:
+        row = await cursor.fetchone()
+    assert row[0].lower() == "wal"
+
+
+@pytest.mark.asyncio
+async def test_read_pool_reads_committed_rows(writer):
+    """Test pooled readers see rows committed by the writer"""
+    _, db_path = writer
+    pool = ReadPool(db_path, size=2, pragmas=build_pragmas(5000, 1024, 0))
+    await pool.open()
+    try:
+        async with pool.acquire() as conn:
+            async with conn.execute("SELECT name FROM items") as cursor:
+                row = await cursor.fetchone()
+        assert row["name"] == "first"
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_read_pool_rejects_writes(writer):
+    """Test pooled connections are read-only"""
+    _, db_path = writer
+    pool = ReadPool(db_path, size=1, pragmas=build_pragmas(5000, 1024, 0))
+    await pool.open()
+    try:
+        async with pool.acquire() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                await conn.execute("INSERT INTO items (name) VALUES ('nope')")
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_read_pool_acquire_timeout(writer):
+    """Test acquire times out when every connection is checked out"""
+    _, db_path = writer
+    pool = ReadPool(db_path, size=1, pragmas=build_pragmas(5000, 1024, 0), acquire_timeout=0.05)
+    await pool.open()
+    try:
+        async with pool.acquire():
+            with pytest.raises(PoolTimeoutError):
+                async with pool.acquire():
+                    pass
+        stats = pool.stats()
+        assert stats["timeouts"] == 1
+        assert stats["acquisitions"] == 1
+        assert stats["idle"] == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_read_pool_replaces_dead_connection(writer):
+    """Test health check reconnects a connection that was closed underneath the pool"""
+    _, db_path = writer
+    pool = ReadPool(
+        db_path,
+        size=1,
+        pragmas=build_pragmas(5000, 1024, 0),
+        health_check_interval=0
+    )
+    await pool.open()
+    try:
+        async with pool.acquire() as conn:
+            await conn.close()
+        async with pool.acquire() as conn:
+            async with conn.execute("SELECT COUNT(*) FROM items") as cursor:
+                row = await cursor.fetchone()
+        assert row[0] == 1
+        assert pool.stats()["reconnects"] == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_read_pool_concurrent_readers(writer):
+    """Test concurrent readers share the pool without exceeding its size"""
+    _, db_path = writer
+    pool = ReadPool(db_path, size=2, pragmas=build_pragmas(5000, 1024, 0))
+    await pool.open()
+
+    async def read():
+        async with pool.acquire() as conn:
+            async with conn.execute("SELECT name FROM items") as cursor:
+                return (await cursor.fetchone())["name"]
+
+    try:
+        results = await asyncio.gather(*[read() for _ in range(10)])
+        assert results == ["first"] * 10
+        assert pool.stats()["acquisitions"] == 10
+    finally:
+        await pool.close()
@@ -0,0 +1,64 @@
+"""
+Tests for the SQLite maintenance service
+"""
+import pytest
+from app.models.campaign import Campaign
+from app.services.maintenance_service import MaintenanceService
+
+
+async def _fill(conn, count: int):
+    for i in range(count):
+        await Campaign(
+            campaign_name=f"Campaign {i}", advertiser_name="Acme",
+            ai_processing_data={"content": {"headline": "x" * 2000}}
+        ).save(conn)
+
+
+@pytest.mark.asyncio
+async def test_busy_database_only_gets_passive_checkpoints(isolated_db):
+    """Test recent writes hold back analyze, vacuum and truncation"""
+    service = MaintenanceService()
+    await _fill(isolated_db.conn, 5)
+    try:
+        actions = await service.run_once(isolated_db)
+    finally:
+        await service.close()
+
+    assert [action["action"] for action in actions] == ["checkpoint_passive"]
+    assert not actions[0]["busy"]
+    assert service.stats()["size"]["auto_vacuum"] == "INCREMENTAL"
+
+
+@pytest.mark.asyncio
+async def test_quiet_database_is_analyzed_vacuumed_and_truncated(isolated_db, monkeypatch):
+    """Test a quiet pass refreshes statistics, frees pages within budget and truncates the WAL"""
+    monkeypatch.setattr("app.config.settings.MAINTENANCE_VACUUM_PAGES", 10)
+    monkeypatch.setattr("app.config.settings.MAINTENANCE_WAL_TRUNCATE_MB", 0.0)
+    conn = isolated_db.conn
+    await _fill(conn, 50)
+    await conn.execute("DELETE FROM campaigns")
+    await conn.commit()
+
+    service = MaintenanceService()
+    try:
+        before = await service.sample(conn, isolated_db)
+        actions = await service.run_once(isolated_db, force_quiet=True)
+        after = await service.sample(conn, isolated_db)
+    finally:
+        await service.close()
+
+    names = [action["action"] for action in actions]
+    assert names[0] == "checkpoint_passive"
+    assert {"analyze", "optimize"} & set(names)
+    vacuum = next(action for action in actions if action["action"] == "incremental_vacuum")
+    assert vacuum["pages"] == 10
+    assert after["page_count"] == before["page_count"] - 10
+    truncate = next(action for action in actions if action["action"] == "checkpoint_truncate")
+    assert not truncate["busy"]
+    assert after["wal_bytes"] == 0
+
+    async with conn.execute("SELECT COUNT(*) FROM sqlite_stat1") as cursor:
+        assert (await cursor.fetchone())[0] > 0
+    stats = service.stats()
+    assert stats["action_counts"]["incremental_vacuum"] == 1
+    assert stats["samples"] and stats["trend"]["window_hours"] == 0.0
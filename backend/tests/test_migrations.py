@@ -0,0 +1,147 @@
+"""
+Tests for the versioned schema migration engine
+"""
+import asyncio
+import json
+import pytest
+from app import migrate as migrate_cli
+from app.models.campaign_counts import get_status_counts
+from app.storage.migrations import (
+    Migration,
+    MigrationError,
+    get_schema_version,
+    migrate,
+    run_backfills
+)
+from app.storage.pool import build_pragmas, open_connection
+from app.storage.schema import MIGRATIONS, SCHEMA_VERSION
+
+
+@pytest.fixture
+async def conn(tmp_path):
+    connection = await open_connection(tmp_path / "migrations.db", build_pragmas(5000, 1024, 0))
+    yield connection
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_current_schema_skips_introspection(isolated_db):
+    """Test a current database costs a single PRAGMA read"""
+    conn = isolated_db.conn
+    assert await get_schema_version(conn) == SCHEMA_VERSION
+
+    statements = []
+    await conn.set_trace_callback(statements.append)
+    try:
+        assert await migrate(conn, MIGRATIONS) == []
+    finally:
+        await conn.set_trace_callback(None)
+
+    assert statements == ["PRAGMA user_version"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_database_is_upgraded(conn):
+    """Test a database from the column-probing releases gains new columns and tables"""
+    await conn.execute("""
+        CREATE TABLE campaigns (
+            id TEXT PRIMARY KEY, campaign_name TEXT NOT NULL, advertiser_name TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'draft', created_at TEXT NOT NULL, approved_at TEXT,
+            assets_s3_path TEXT, html_s3_path TEXT, proof_s3_path TEXT,
+            ai_processing_data TEXT, updated_at TEXT, feedback TEXT
+        )
+    """)
+    await conn.execute(
+        "INSERT INTO campaigns (id, campaign_name, advertiser_name, status, created_at, ai_processing_data) "
+        "VALUES ('c1', 'Sale', 'Acme', 'ready', '2024-01-01', ?)",
+        (json.dumps({"content": {"subject_line": "Hi"}}),)
+    )
+    await conn.commit()
+
+    applied = await migrate(conn, MIGRATIONS)
+    assert [m.version for m in applied] == list(range(1, SCHEMA_VERSION + 1))
+
+    async with conn.execute("PRAGMA table_info(campaigns)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    assert {"review_status", "performance_score", "scheduled_at"} <= columns
+    assert await get_status_counts(conn) == {"ready": 1}
+
+    # Data backfills run once and are recorded; normalizing the content already
+    # re-indexed the row for search through the campaign_content triggers
+    assert await run_backfills(conn, MIGRATIONS) == {3: 1, 5: 0, 6: 0}
+    assert await run_backfills(conn, MIGRATIONS) == {}
+    async with conn.execute("SELECT subject_line FROM campaign_content WHERE campaign_id = 'c1'") as cursor:
+        assert (await cursor.fetchone())[0] == "Hi"
+    async with conn.execute("SELECT rowid FROM campaigns_fts WHERE campaigns_fts MATCH 'hi'") as cursor:
+        assert len(await cursor.fetchall()) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_rolls_back_everything(conn):
+    """Test pending migrations are applied atomically, version included"""
+    async def create_table(c):
+        await c.execute("CREATE TABLE first (id INTEGER)")
+
+    async def broken(c):
+        await c.execute("CREATE TABLE second (id INTEGER)")
+        raise RuntimeError("boom")
+
+    with pytest.raises(MigrationError):
+        await migrate(conn, [Migration(1, "first", create_table), Migration(2, "broken", broken)])
+
+    assert await get_schema_version(conn) == 0
+    async with conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'") as cursor:
+        assert await cursor.fetchall() == []
+
+
+@pytest.mark.asyncio
+async def test_newer_database_is_rejected(conn):
+    """Test the app refuses to run against a schema it does not know"""
+    await conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with pytest.raises(MigrationError):
+        await migrate(conn, MIGRATIONS)
+
+
+def test_cli_migrates_and_reports_status(tmp_path, capsys):
+    """Test the CLI applies migrations and then reports a current schema"""
+    db_path = str(tmp_path / "cli.db")
+    assert migrate_cli.main(["--db", db_path]) == 0
+    assert migrate_cli.main(["--db", db_path, "--status"]) == 0
+    out = capsys.readouterr().out
+    assert f"Schema version: {SCHEMA_VERSION} (latest {SCHEMA_VERSION})" in out
+    assert "pending" not in out
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_apply_each_migration_once(conn, tmp_path):
+    """Test a second process re-checks the version under the write lock"""
+    other = await open_connection(tmp_path / "migrations.db", build_pragmas(5000, 1024, 0))
+    applied = []
+
+    async def create_table(c):
+        applied.append(c)
+        await c.execute("CREATE TABLE once (id INTEGER)")
+        # Hold the write lock while the other worker waits on BEGIN IMMEDIATE
+        await asyncio.sleep(0.2)
+
+    migrations = [Migration(1, "once", create_table)]
+    try:
+        results = await asyncio.gather(migrate(conn, migrations), migrate(other, migrations))
+    finally:
+        await other.close()
+    assert len(applied) == 1
+    assert sorted(len(r) for r in results) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_startup_fails_on_schema_errors(monkeypatch):
+    """Test lifespan lets MigrationError abort startup instead of serving an old schema"""
+    from app import main
+
+    async def init_db():
+        raise MigrationError("run `python -m app.migrate` before starting the app")
+
+    monkeypatch.setattr(main.db, "init_db", init_db)
+    with pytest.raises(MigrationError):
+        async with main.lifespan(main.app):
+            pass
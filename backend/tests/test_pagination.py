@@ -0,0 +1,107 @@
+"""
+Tests for keyset (cursor) pagination of campaign lists
+"""
+import pytest
+from app.models.campaign import Campaign
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+async def _seed(conn, count: int):
+    # Pairs of campaigns share a created_at so the id tie-breaker matters
+    for i in range(count):
+        campaign = Campaign(
+            campaign_name=f"C{i}",
+            advertiser_name="Acme",
+            status="ready" if i % 3 else "draft",
+            created_at=f"2024-01-{i // 2 + 1:02d}T00:00:00",
+            review_status="pending" if i % 2 else None
+        )
+        await campaign.save(conn)
+
+
+def test_cursor_round_trip():
+    """Test cursors decode back to their (created_at, id) position"""
+    token = encode_cursor("2024-01-01T00:00:00", "abc")
+    assert decode_cursor(token) == ("2024-01-01T00:00:00", "abc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_match_offset_order(database):
+    """Test walking with `after` yields the same rows as one big offset page"""
+    conn = database.conn
+    await _seed(conn, 11)
+    expected = [c.id for c in await Campaign.get_summaries(conn, limit=100)]
+
+    seen, after = [], None
+    while True:
+        page = await Campaign.get_summaries(conn, limit=4, after=after)
+        if not page:
+            break
+        seen.extend(c.id for c in page)
+        after = (page[-1].created_at, page[-1].id)
+
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_keyset_queries_use_composite_indexes(isolated_db):
+    """Test filtered keyset queries are served by the (filter, created_at, id) indexes"""
+    conn = isolated_db.conn
+    for column, index in (("status", "idx_campaigns_status_created"),
+                          ("review_status", "idx_campaigns_review_created")):
+        async with conn.execute(f"""
+            EXPLAIN QUERY PLAN
+            SELECT id FROM campaigns
+            WHERE {column} = ? AND (created_at, id) < (?, ?)
+            ORDER BY created_at DESC, id DESC LIMIT 10
+        """, ("x", "2024", "id")) as cursor:
+            plan = " ".join(row[3] for row in await cursor.fetchall())
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_cursor_paging(database_client, database):
+    """Test /campaigns hands out next_cursor until the last page"""
+    await _seed(database.conn, 7)
+
+    ids, cursor = [], None
+    for _ in range(10):
+        params = {"limit": 3, "count": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        body = (await database_client.get("/api/v1/campaigns", params=params)).json()
+        assert body["total"] is None
+        ids.extend(c["id"] for c in body["campaigns"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(ids) == len(set(ids)) == 7
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_offset_paging_still_counts(database_client, database):
+    """Test offset paging keeps returning exact totals"""
+    await _seed(database.conn, 7)
+    params = {"limit": 5, "offset": 2, "status": "ready"}
+    body = (await database_client.get("/api/v1/campaigns", params=params)).json()
+    assert body["total"] == 4
+    assert body["total_estimated"] is False
+    assert len(body["campaigns"]) == 2
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_review_list_rejects_bad_cursor(database_client, database):
+    """Test malformed cursors and cursor+offset are client errors"""
+    response = await database_client.get("/api/v1/campaigns/review/list", params={"cursor": "!!"})
+    assert response.status_code == 400
+
+    cursor = encode_cursor("2024-01-01T00:00:00", "x")
+    response = await database_client.get(
+        "/api/v1/campaigns/review/list", params={"cursor": cursor, "offset": 2}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,159 @@
+"""
+Tests for the ai_processing_data storage codec and background re-encoding
+"""
+import pytest
+from app.models.campaign import Campaign
+from app.models.campaign_payloads import reencode_payloads, sample_payloads
+from app.utils.payload_codec import (
+    CODEC_JSON,
+    CODEC_MSGPACK,
+    CODEC_MSGPACK_ZSTD,
+    TAG_MSGPACK_ZSTD,
+    PayloadCodec,
+    PayloadCodecError,
+    set_payload_codec,
+    train_dictionary
+)
+
+PAYLOAD = {
+    "content": {"subject_line": "Spring Sale", "headline": "Lanterns", "body_copy": "Lanterns for every patio"},
+    "ai_results": {"image_analysis": {"score": 0.87, "tags": ["outdoor", "lighting"], "ok": True}},
+    "hero_images": [{"s3_key": "assets/1/hero.png", "width": 1200}]
+}
+
+
+def _payload(i: int) -> dict:
+    payload = {k: dict(v) if isinstance(v, dict) else list(v) for k, v in PAYLOAD.items()}
+    payload["content"] = dict(PAYLOAD["content"], headline=f"Lanterns {i}")
+    return payload
+
+
+@pytest.fixture
+def active_codec():
+    """Swap the global codec for a test"""
+    previous = set_payload_codec(None)
+
+    def use(codec: PayloadCodec) -> PayloadCodec:
+        set_payload_codec(codec)
+        return codec
+
+    yield use
+    set_payload_codec(previous)
+
+
+def test_every_codec_decodes_every_format():
+    """Test any codec reads JSON text and both binary formats"""
+    dictionary = train_dictionary([_payload(i) for i in range(200)], size=4096)
+    writers = [
+        PayloadCodec(CODEC_JSON),
+        PayloadCodec(CODEC_MSGPACK),
+        PayloadCodec(CODEC_MSGPACK_ZSTD),
+        PayloadCodec(CODEC_MSGPACK_ZSTD, dictionaries=[dictionary])
+    ]
+    readers = [
+        PayloadCodec(name, dictionaries=[dictionary])
+        for name in (CODEC_JSON, CODEC_MSGPACK, CODEC_MSGPACK_ZSTD)
+    ]
+    for writer in writers:
+        stored = writer.encode(PAYLOAD)
+        assert writer.is_current(stored)
+        for reader in readers:
+            assert reader.decode(stored) == PAYLOAD
+    assert isinstance(writers[0].encode(PAYLOAD), str)
+    assert writers[3].encode(PAYLOAD)[0] == TAG_MSGPACK_ZSTD
+    assert not writers[3].is_current(writers[2].encode(PAYLOAD))
+    assert writers[0].encode({}) is None
+
+
+def test_compressed_payloads_are_smaller_and_checked():
+    """Test the trained dictionary shrinks payloads and unknown dictionaries are rejected"""
+    dictionary = train_dictionary([_payload(i) for i in range(200)], size=4096)
+    codec = PayloadCodec(CODEC_MSGPACK_ZSTD, dictionaries=[dictionary])
+    stored = codec.encode(_payload(1000))
+    assert len(stored) < len(PayloadCodec(CODEC_JSON).encode(_payload(1000))) / 2
+
+    with pytest.raises(PayloadCodecError):
+        PayloadCodec(CODEC_MSGPACK_ZSTD).decode(stored)
+    with pytest.raises(PayloadCodecError):
+        codec.decode(bytes([TAG_MSGPACK_ZSTD]) + b"not a frame")
+    with pytest.raises(PayloadCodecError):
+        PayloadCodec("pickle")
+
+
+def test_unpackable_values_stay_json():
+    """Test values msgpack cannot hold (e.g. huge ints) are written as JSON text"""
+    codec = PayloadCodec(CODEC_MSGPACK)
+    stored = codec.encode({"big": 2 ** 70})
+    assert isinstance(stored, str)
+    assert codec.decode(stored) == {"big": 2 ** 70}
+
+
+@pytest.mark.asyncio
+async def test_campaign_round_trips_and_old_rows_decode(isolated_db, active_codec):
+    """Test campaigns save in the active codec while JSON rows keep loading"""
+    conn = isolated_db.conn
+    old = Campaign(campaign_name="Old", advertiser_name="Acme", ai_processing_data=PAYLOAD)
+    await old.save(conn)
+
+    active_codec(PayloadCodec(CODEC_MSGPACK_ZSTD))
+    new = Campaign(campaign_name="New", advertiser_name="Acme", ai_processing_data=PAYLOAD)
+    await new.save(conn)
+
+    async with conn.execute("SELECT id, typeof(ai_processing_data) FROM campaigns") as cursor:
+        types = {row[0]: row[1] for row in await cursor.fetchall()}
+    assert types == {old.id: "text", new.id: "blob"}
+    for campaign in (old, new):
+        assert (await Campaign.get_by_id(conn, campaign.id)).ai_processing_data == PAYLOAD
+
+    # Untouched blobs are not rewritten by unrelated updates
+    loaded = await Campaign.get_by_id(conn, old.id)
+    await loaded.update(conn, status="approved")
+    async with conn.execute("SELECT typeof(ai_processing_data) FROM campaigns WHERE id = ?", (old.id,)) as cursor:
+        assert (await cursor.fetchone())[0] == "text"
+
+
+@pytest.mark.asyncio
+async def test_reencode_rewrites_old_rows_in_batches(isolated_db, active_codec):
+    """Test the re-encoder converts every stale row, skips current ones and is idempotent"""
+    conn = isolated_db.conn
+    campaigns = []
+    for i in range(7):
+        campaign = Campaign(campaign_name=f"C{i}", advertiser_name="Acme", ai_processing_data=_payload(i))
+        await campaign.save(conn)
+        campaigns.append(campaign)
+    await conn.execute("UPDATE campaigns SET ai_processing_data = '{oops' WHERE id = ?", (campaigns[0].id,))
+    await conn.commit()
+
+    codec = active_codec(PayloadCodec(CODEC_MSGPACK))
+    assert await reencode_payloads(conn, codec, batch_size=3) == 6
+    assert await reencode_payloads(conn, codec, batch_size=3) == 0
+
+    async with conn.execute("SELECT typeof(ai_processing_data), COUNT(*) FROM campaigns GROUP BY 1") as cursor:
+        assert dict(await cursor.fetchall()) == {"blob": 6, "text": 1}
+    for i, campaign in enumerate(campaigns[1:], start=1):
+        assert (await Campaign.get_by_id(conn, campaign.id)).ai_processing_data == _payload(i)
+    assert len(await sample_payloads(conn, limit=10)) == 6
+
+
+@pytest.mark.asyncio
+async def test_undecodable_payload_is_never_overwritten(isolated_db, active_codec):
+    """Test a blob the active codec cannot read loads empty but refuses to be saved over"""
+    conn = isolated_db.conn
+    dictionary = train_dictionary([_payload(i) for i in range(200)], size=4096)
+    active_codec(PayloadCodec(CODEC_MSGPACK_ZSTD, dictionaries=[dictionary]))
+    campaign = Campaign(campaign_name="Packed", advertiser_name="Acme", ai_processing_data=PAYLOAD)
+    await campaign.save(conn)
+
+    # Dictionary missing from the configuration
+    active_codec(PayloadCodec(CODEC_MSGPACK_ZSTD))
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    assert loaded.ai_processing_data == {}
+    loaded.ai_processing_data["ai_results"] = {"image_analysis": {}}
+    loaded.mark_dirty("ai_processing_data")
+    with pytest.raises(ValueError):
+        await loaded.save(conn)
+
+    other = await Campaign.get_by_id(conn, campaign.id)
+    await other.update(conn, status="approved")
+    active_codec(PayloadCodec(CODEC_MSGPACK_ZSTD, dictionaries=[dictionary]))
+    assert (await Campaign.get_by_id(conn, campaign.id)).ai_processing_data == PAYLOAD
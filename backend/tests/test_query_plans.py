@@ -0,0 +1,85 @@
+"""
+Query-plan regression tests for every catalogued SQL statement
+Runs app.storage.query_catalog against a seeded 100k-campaign database. The
+plans are kept in tests/query_plans/sqlite.txt; after an intended change,
+regenerate it with UPDATE_QUERY_PLANS=1 pytest tests/test_query_plans.py
+"""
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from app.database import Database
+from app.storage.query_catalog import QUERIES, explain_catalog, redundant_indexes
+
+SEED_CAMPAIGNS = 100_000
+SNAPSHOT = Path(__file__).parent / "query_plans" / "sqlite.txt"
+
+STATUSES = ["draft"] * 5 + ["uploaded"] * 10 + ["processed"] * 10 + ["ready"] * 5 + ["approved"] * 60 + ["rejected"] * 10
+
+
+def _seed(path: str):
+    """Bulk-insert campaigns with their content rows, then ANALYZE"""
+    rng = random.Random(7)
+    start = datetime(2023, 1, 1)
+    rows = []
+    for i in range(SEED_CAMPAIGNS):
+        created = start + timedelta(minutes=7 * i)
+        status = rng.choice(STATUSES)
+        scheduling = rng.choice([None] * 8 + ["scheduled", "sent"]) if status == "approved" else None
+        review = rng.choice([None] * 7 + ["pending", "approved", "rejected"])
+        score = round(rng.random() * 100, 2) if status == "approved" and rng.random() < 0.7 else None
+        rows.append((
+            f"{i:08d}-seed", f"Campaign {i} {rng.choice(['Spring', 'Summer', 'Estate', 'Coins'])} Sale",
+            f"Advertiser {i % 900}", status, created.isoformat(), created.isoformat(),
+            (created + timedelta(days=3)).isoformat() if scheduling else None, scheduling, review, score,
+            '{"content": {"headline": "Lots"}}'
+        ))
+    conn = sqlite3.connect(path)
+    with conn:
+        # Content first, so the search triggers index each campaign once
+        conn.executemany(
+            "INSERT INTO campaign_content (campaign_id, headline) VALUES (?, 'Lots')",
+            [(row[0],) for row in rows]
+        )
+        conn.executemany("""
+            INSERT INTO campaigns (id, campaign_name, advertiser_name, status, created_at, updated_at,
+                                   scheduled_at, scheduling_status, review_status, performance_score,
+                                   ai_processing_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+@pytest.fixture
+async def seeded_db(tmp_path):
+    database = Database(db_path=str(tmp_path / "campaigns.db"))
+    await database.init_db()
+    _seed(str(database.db_path))
+    yield database
+    await database.close()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_catalogued_queries_use_indexes(seeded_db):
+    """Test no catalogued statement scans a table or sorts in a temp b-tree, and plans match the snapshot"""
+    report = await explain_catalog(seeded_db.conn)
+    assert set(report.entries) == {entry.name for entry in QUERIES}
+    assert all(report.entries.values())
+    assert report.problems == {}
+
+    plans = report.render(with_statements=False)
+    if os.environ.get("UPDATE_QUERY_PLANS"):
+        SNAPSHOT.parent.mkdir(exist_ok=True)
+        SNAPSHOT.write_text(plans)
+    assert plans == SNAPSHOT.read_text()
+
+
+@pytest.mark.asyncio
+async def test_schema_has_no_redundant_indexes(isolated_db):
+    """Test every index earns its write cost (none is a prefix of another)"""
+    assert await redundant_indexes(isolated_db.conn) == []
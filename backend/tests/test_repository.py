@@ -0,0 +1,178 @@
+"""
+Tests for the campaign repository, run against every storage backend (see the
+`database` fixture in conftest.py)
+"""
+import pytest
+from app.database import Database, create_database
+from app.models.campaign import Campaign
+from app.models.campaign_parts import PART_CONTENT
+from app.storage.repository import repository_for
+from app.storage.sharding import ShardSet
+from app.utils.payload_codec import CODEC_MSGPACK_ZSTD, PayloadCodec, set_payload_codec
+
+
+async def _save(conn, name, status="draft", **fields) -> Campaign:
+    campaign = Campaign(campaign_name=name, advertiser_name="Acme", status=status, **fields)
+    await campaign.save(conn)
+    return campaign
+
+
+def test_database_url_selects_backend(tmp_path):
+    """Test the DATABASE_URL scheme picks the backend"""
+    assert isinstance(create_database(f"sqlite:///{tmp_path}/a.db"), Database)
+    assert type(create_database("postgresql://localhost/campaigns")).__name__ == "PostgresDatabase"
+    with pytest.raises(ValueError):
+        create_database("mysql://localhost/campaigns")
+
+
+@pytest.mark.asyncio
+async def test_save_update_and_load(database):
+    """Test inserts, partial updates and lazy ai_processing_data survive a round trip"""
+    conn = database.conn
+    campaign = await _save(conn, "Spring Sale", ai_processing_data={"content": {"subject_line": "Hi"}})
+
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    assert loaded.campaign_name == "Spring Sale"
+    assert not loaded.ai_data_decoded
+    assert loaded.ai_processing_data == {"content": {"subject_line": "Hi"}}
+
+    await loaded.update(conn, status="approved", performance_score=0.5)
+    reloaded = await Campaign.get_by_id(conn, campaign.id)
+    assert (reloaded.status, reloaded.performance_score) == ("approved", 0.5)
+    assert reloaded.ai_processing_data["content"]["subject_line"] == "Hi"
+    assert await Campaign.get_by_id(conn, "missing") is None
+
+
+@pytest.mark.asyncio
+async def test_binary_payload_codec(database):
+    """Test campaigns saved with a binary codec load back on every backend"""
+    conn = database.conn
+    previous = set_payload_codec(PayloadCodec(CODEC_MSGPACK_ZSTD))
+    try:
+        campaign = await _save(conn, "Packed", ai_processing_data={"content": {"headline": "Hi"}})
+        await campaign.update(conn, ai_processing_data={"content": {"headline": "Bye"}})
+    finally:
+        set_payload_codec(previous)
+    loaded = await Campaign.get_by_id(conn, campaign.id)
+    assert loaded.ai_processing_data == {"content": {"headline": "Bye"}}
+
+
+@pytest.mark.asyncio
+async def test_write_all_is_atomic(database):
+    """Test batched writes commit together and roll back together"""
+    conn = database.conn
+    repository = repository_for(conn)
+    existing = await _save(conn, "Existing")
+    existing.status = "approved"
+    fresh = Campaign(campaign_name="Fresh", advertiser_name="Acme")
+    writes = [(existing,) + existing._pending_write(), (fresh,) + fresh._pending_write()]
+    await repository.write_all(writes)
+    assert (await Campaign.get_by_id(conn, existing.id)).status == "approved"
+    assert await Campaign.get_by_id(conn, fresh.id) is not None
+
+    duplicate = Campaign(id=fresh.id, campaign_name="Duplicate", advertiser_name="Acme")
+    other = Campaign(campaign_name="Other", advertiser_name="Acme")
+    with pytest.raises(Exception):
+        await repository.write_all([(other,) + other._pending_write(), (duplicate,) + duplicate._pending_write()])
+    assert await Campaign.get_by_id(conn, other.id) is None
+
+
+@pytest.mark.asyncio
+async def test_write_all_batches_same_column_updates(database):
+    """Test same-column updates are applied as a batch, and a vanished row is written back in full"""
+    conn = database.conn
+    repository = repository_for(conn)
+    campaigns = [await _save(conn, f"Batch {i}", ai_processing_data={"content": {"headline": str(i)}}) for i in range(3)]
+    loaded = await repository.get_by_ids([c.id for c in campaigns] + ["missing"])
+    assert sorted(c.id for c in loaded) == sorted(c.id for c in campaigns)
+
+    # Removed behind the batch's back (e.g. archived)
+    if isinstance(conn, ShardSet):
+        shard = conn.writer(conn.shard_for(campaigns[2].advertiser_name))
+        await shard.execute("DELETE FROM campaigns WHERE id = ?", (campaigns[2].id,))
+        await shard.commit()
+    elif hasattr(conn, "fetchval"):
+        await conn.execute("DELETE FROM campaigns WHERE id = $1", campaigns[2].id)
+    else:
+        await conn.execute("DELETE FROM campaigns WHERE id = ?", (campaigns[2].id,))
+        await conn.commit()
+
+    for campaign in loaded:
+        campaign.status = "rejected"
+    await repository.write_all([(c,) + c._pending_write() for c in loaded])
+    for campaign in campaigns:
+        stored = await Campaign.get_by_id(conn, campaign.id)
+        assert stored.status == "rejected"
+        assert stored.ai_processing_data == campaign.ai_processing_data
+
+
+@pytest.mark.asyncio
+async def test_summaries_keyset_paging_and_parts(database):
+    """Test list summaries page by cursor and carry only the requested parts"""
+    conn = database.conn
+    for i in range(5):
+        await _save(
+            conn, f"Campaign {i}", created_at=f"2024-01-0{i + 1}T00:00:00",
+            ai_processing_data={"content": {"headline": f"H{i}"}, "ai_results": {"image_analysis": {"x": 1}}}
+        )
+
+    seen, after = [], None
+    while True:
+        page = await Campaign.get_summaries(conn, limit=2, after=after)
+        if not page:
+            break
+        seen.extend(c.campaign_name for c in page)
+        after = (page[-1].created_at, page[-1].id)
+    assert seen == [f"Campaign {i}" for i in reversed(range(5))]
+
+    first = (await Campaign.get_summaries(conn, limit=1, parts=[PART_CONTENT]))[0]
+    assert first.ai_processing_data == {"content": {"headline": "H4"}}
+    with pytest.raises(ValueError):
+        await first.update(conn, ai_processing_data={})
+
+
+@pytest.mark.asyncio
+async def test_counts_follow_writes(database):
+    """Test status and review totals track inserts and status changes"""
+    conn = database.conn
+    repository = repository_for(conn)
+    draft = await _save(conn, "A")
+    await _save(conn, "B", review_status="pending")
+    await draft.update(conn, status="approved")
+
+    assert await repository.get_status_counts() == {"draft": 1, "approved": 1}
+    assert await repository.count_campaigns() == (2, False)
+    assert await repository.count_campaigns(status="approved") == (1, False)
+    assert await repository.count_campaigns(any_review_status=True) == (1, False)
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_filters_and_pages(database):
+    """Test search ranks name hits first, filters by status and pages by sort key"""
+    conn = database.conn
+    repository = repository_for(conn)
+    body_hit = await _save(conn, "Weekly deals", ai_processing_data={"content": {"body_copy": "Lanterns for every patio"}})
+    name_hit = await _save(conn, "Lantern Festival", status="approved")
+
+    results = await repository.search("lant")
+    assert [c.id for c, _ in results] == [name_hit.id, body_hit.id]
+    assert [c.id for c, _ in await repository.search("lantern", status="draft")] == [body_hit.id]
+
+    page = await repository.search("lantern", limit=1)
+    rest = await repository.search("lantern", after=page[-1][1])
+    assert [c.id for c, _ in page + rest] == [name_hit.id, body_hit.id]
+    assert await repository.search("  -- ") == []
+
+    await body_hit.update(conn, feedback="Logo is blurry")
+    assert [c.id for c, _ in await repository.search("blurr")] == [body_hit.id]
+
+
+@pytest.mark.asyncio
+async def test_scheduled_campaigns(database):
+    """Test upcoming and past scheduled campaigns are split on the current time"""
+    conn = database.conn
+    past = await _save(conn, "Past", scheduling_status="scheduled", scheduled_at="2000-01-01T00:00:00")
+    future = await _save(conn, "Future", scheduling_status="scheduled", scheduled_at="2999-01-01T00:00:00")
+
+    assert [c.id for c in await Campaign.get_scheduled_campaigns(conn)] == [future.id]
+    assert [c.id for c in await Campaign.get_past_scheduled_campaigns(conn)] == [past.id]
@@ -0,0 +1,83 @@
+"""
+Tests for the per-advertiser sharded SQLite backend
+"""
+import pytest
+from app.config import settings
+from app.database import create_database
+from app.models.campaign import Campaign
+from app.services.change_feed_service import get_campaign_changes
+from app.storage.repository import repository_for
+from app.storage.sharding import ShardedDatabase, shard_for, shard_path
+
+
+async def _names_in(database, index):
+    async with database.shards[index].conn.execute("SELECT campaign_name FROM campaigns") as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+def _advertisers(count):
+    """One advertiser name per shard"""
+    names = {}
+    i = 0
+    while len(names) < count:
+        names.setdefault(shard_for(f"Advertiser {i}", count), f"Advertiser {i}")
+        i += 1
+    return [names[index] for index in range(count)]
+
+
+@pytest.fixture
+async def sharded(tmp_path):
+    database = ShardedDatabase(str(tmp_path / "campaigns.db"), shard_count=3)
+    await database.init_db()
+    yield database
+    await database.close()
+
+
+def test_shard_count_selects_sharded_database(tmp_path, monkeypatch):
+    """Test DB_SHARDS > 1 splits the SQLite file into one file per shard"""
+    monkeypatch.setattr(settings, "DB_SHARDS", 4)
+    database = create_database(f"sqlite:///{tmp_path / 'campaigns.db'}")
+    assert isinstance(database, ShardedDatabase)
+    assert [shard.db_path for shard in database.shards] == [
+        shard_path(tmp_path / "campaigns.db", index) for index in range(4)
+    ]
+    assert shard_path(tmp_path / "campaigns.db", 2).name == "campaigns.shard2.db"
+
+
+@pytest.mark.asyncio
+async def test_campaigns_live_in_their_advertisers_shard(sharded):
+    """Test writes route by advertiser and lists merge newest first across shards"""
+    advertisers = _advertisers(3)
+    for i in range(6):
+        await Campaign(
+            campaign_name=f"Campaign {i}", advertiser_name=advertisers[i % 3],
+            created_at=f"2024-01-0{i + 1}T00:00:00"
+        ).save(sharded.conn)
+
+    for index in range(3):
+        assert await _names_in(sharded, index) == {f"Campaign {index}", f"Campaign {index + 3}"}
+
+    listed = await Campaign.get_all(sharded.conn, limit=4, offset=1)
+    assert [c.campaign_name for c in listed] == [f"Campaign {i}" for i in (4, 3, 2, 1)]
+    assert await repository_for(sharded.conn).count_campaigns() == (6, False)
+
+    changes = await get_campaign_changes(sharded.conn, since=0)
+    assert changes["reset"] is True
+
+
+@pytest.mark.asyncio
+async def test_advertiser_change_moves_campaign(sharded):
+    """Test changing advertiser moves the whole row to the new advertiser's shard"""
+    first, second, _ = _advertisers(3)
+    campaign = Campaign(
+        campaign_name="Moving", advertiser_name=first, ai_processing_data={"content": {"headline": "Hi"}}
+    )
+    await campaign.save(sharded.conn)
+
+    await campaign.update(sharded.conn, advertiser_name=second, status="approved")
+
+    assert await _names_in(sharded, 0) == set()
+    assert await _names_in(sharded, 1) == {"Moving"}
+    stored = await Campaign.get_by_id(sharded.conn, campaign.id)
+    assert (stored.advertiser_name, stored.status) == (second, "approved")
+    assert stored.ai_processing_data == {"content": {"headline": "Hi"}}
@@ -0,0 +1,124 @@
+"""
+Tests for online database snapshots and restore
+"""
+import asyncio
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app import snapshot as snapshot_cli
+from app.database import Database
+from app.models.campaign import Campaign
+from app.services import snapshot_service as snapshot_module
+from app.services.snapshot_service import create_snapshot, expired_snapshots, restore_snapshot, snapshot_key
+
+
+class FakeS3:
+    """Keeps uploaded objects as files in a directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.root.mkdir()
+
+    async def upload_large_file(self, path, s3_key, content_type=None, chunk_size_mb=16):
+        target = self.root / s3_key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        return f"s3://bucket/{s3_key}"
+
+    async def download_file(self, s3_key, path):
+        shutil.copyfile(self.root / s3_key, path)
+
+    async def list_files(self, prefix):
+        return [
+            {"key": str(path.relative_to(self.root)), "size": path.stat().st_size, "last_modified": None}
+            for path in sorted(self.root.glob(f"{prefix}*"))
+        ]
+
+    async def delete_file(self, s3_key):
+        (self.root / s3_key).unlink()
+        return True
+
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path):
+    fake = FakeS3(tmp_path / "bucket")
+    monkeypatch.setattr(snapshot_module, "s3_service", fake)
+    return fake
+
+
+async def _save(conn, count, prefix="Campaign"):
+    for i in range(count):
+        await Campaign(
+            campaign_name=f"{prefix} {i}", advertiser_name="Acme",
+            ai_processing_data={"content": {"headline": "x" * 500}}
+        ).save(conn)
+
+
+async def _names(database):
+    async with database.conn.execute("SELECT campaign_name FROM campaigns") as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_during_writes_restores_consistent_copy(isolated_db, s3, tmp_path, monkeypatch):
+    """Test a stepped snapshot taken while writing restores into a working database"""
+    monkeypatch.setattr("app.config.settings.SNAPSHOT_STEP_PAGES", 4)
+    monkeypatch.setattr("app.config.settings.SNAPSHOT_STEP_SLEEP_MS", 1.0)
+    await _save(isolated_db.conn, 100)
+
+    writer = asyncio.create_task(_save(isolated_db.conn, 50, prefix="During"))
+    snapshot = await create_snapshot(isolated_db)
+    await writer
+
+    assert snapshot["steps"] > 1
+    assert 0 < snapshot["compressed_bytes"] < snapshot["bytes"]
+    assert (s3.root / snapshot["key"]).exists()
+
+    restored_path = tmp_path / "restored" / "isolated_campaigns.db"
+    assert await restore_snapshot(restored_path) == snapshot["key"]
+    restored = Database(db_path=str(restored_path))
+    await restored.init_db()
+    try:
+        names = await _names(restored)
+        assert {f"Campaign {i}" for i in range(100)} <= names
+        # Later writes are not in the snapshot; those in it are whole campaigns
+        assert len(await Campaign.get_all(restored.conn, limit=500)) == len(names)
+    finally:
+        await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_restore_picks_newest_snapshot_before_point_in_time(isolated_db, s3, tmp_path):
+    """Test --at restores the state of the newest snapshot at or before it"""
+    await _save(isolated_db.conn, 3, prefix="First")
+    first = await create_snapshot(isolated_db)
+    # Snapshot keys have second resolution
+    await asyncio.sleep(1.1)
+    await _save(isolated_db.conn, 3, prefix="Second")
+    await create_snapshot(isolated_db)
+
+    at = datetime.fromisoformat(first["taken_at"]).replace(microsecond=0) + timedelta(milliseconds=500)
+    assert await restore_snapshot(isolated_db.db_path, at=at) == first["key"]
+    await isolated_db.close()
+    # The CLI also takes times with an offset or Z, converted to UTC
+    plus_two = at.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+    for value in (at.isoformat() + "Z", plus_two.isoformat()):
+        assert await snapshot_cli.run("restore", isolated_db.db_path, at=value) == 0
+    await isolated_db.init_db()
+    assert await _names(isolated_db) == {f"First {i}" for i in range(3)}
+
+
+def test_retention_keeps_recent_snapshots_and_one_per_day(monkeypatch):
+    """Test every recent snapshot is kept, then the newest of each day, then none"""
+    monkeypatch.setattr("app.config.settings.SNAPSHOT_KEEP_ALL_HOURS", 24.0)
+    monkeypatch.setattr("app.config.settings.SNAPSHOT_KEEP_DAILY_DAYS", 3.0)
+    now = datetime(2025, 11, 10, 12, 0)
+    taken = [now - timedelta(hours=hours) for hours in (1, 10, 30, 34, 50, 60, 100)]
+    keys = [snapshot_key("data/campaigns.db", at) for at in taken]
+
+    expired = expired_snapshots(keys + ["snapshots/campaigns/notes.txt"], now)
+
+    # 30h and 34h ago are both on Nov 9 (keep the newer); 50h/60h on Nov 8; 100h is past 3 days
+    assert expired == [keys[3], keys[5], keys[6]]
+    assert expired_snapshots(keys[-1:], now) == []
@@ -0,0 +1,65 @@
+"""
+Tests for the campaign unit of work
+"""
+import pytest
+from app.models.campaign import Campaign
+from app.services.campaign_service import create_campaign, get_campaign, update_campaign_assets
+from app.storage.repository import repository_for
+from app.storage.unit_of_work import current_unit_of_work, unit_of_work
+
+
+async def _count(conn) -> int:
+    total, _ = await repository_for(conn).count_campaigns()
+    return total
+
+
+@pytest.fixture
+def writer(database, monkeypatch):
+    """Point the services' global database at the per-backend one"""
+    monkeypatch.setattr("app.services.campaign_service.db", database)
+    return database.conn
+
+
+@pytest.mark.asyncio
+async def test_upload_flow_is_one_write_and_no_reads(writer, repository_calls):
+    """Test create + asset update + re-fetch become a single INSERT"""
+    async with unit_of_work(writer):
+        campaign = await create_campaign("Spring Sale", "Acme", conn=writer)
+        updated = await update_campaign_assets(
+            campaign.id, f"assets/{campaign.id}/", {"content": {"headline": "Hi"}}, conn=writer
+        )
+        assert updated is campaign
+        assert await get_campaign(campaign.id, conn=writer) is campaign
+        assert await _count(writer) == 0
+
+    assert [name for name, _ in repository_calls] == ["write_all"]
+    (writes,) = repository_calls[0][1]
+    assert [(c, kind) for c, kind, _ in writes] == [(campaign, "insert")]
+
+    stored = await Campaign.get_by_id(writer, campaign.id)
+    assert stored.status == "uploaded"
+    assert stored.ai_processing_data == {"content": {"headline": "Hi"}}
+    assert campaign.dirty_fields == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_failure_discards_staged_writes(writer):
+    """Test an exception inside the block leaves no orphan draft row"""
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(writer):
+            await create_campaign("Spring Sale", "Acme", conn=writer)
+            raise RuntimeError("S3 upload failed")
+
+    assert await _count(writer) == 0
+    assert current_unit_of_work() is None
+
+
+@pytest.mark.asyncio
+async def test_nested_blocks_join_the_outer_unit(writer):
+    """Test an inner unit of work flushes with the outer one"""
+    async with unit_of_work(writer) as outer:
+        async with unit_of_work(writer) as inner:
+            assert inner is outer
+            await create_campaign("A", "Acme", conn=writer)
+        assert await _count(writer) == 0
+    assert await _count(writer) == 1
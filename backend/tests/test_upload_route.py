@@ -8,7 +8,7 @@ from io import BytesIO
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_upload_endpoint_missing_fields(client: AsyncClient):
+async def test_upload_endpoint_missing_fields(database_client: AsyncClient):
     """Test upload endpoint with missing required fields"""
     # Create a mock image file
     image_data = b'\x89PNG\r\n\x1a\n' + b'0' * 100
@@ -22,14 +22,14 @@ async def test_upload_endpoint_missing_fields(client: AsyncClient):
         # Missing other required fields
     }
     
-    response = await client.post("/api/v1/upload", files=files, data=data)
+    response = await database_client.post("/api/v1/upload", files=files, data=data)
     # Should return validation error
     assert response.status_code in [400, 422]
 
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_upload_endpoint_invalid_file_type(client: AsyncClient):
+async def test_upload_endpoint_invalid_file_type(database_client: AsyncClient):
     """Test upload endpoint with invalid file type"""
     # Create a text file instead of image
     text_data = b"This is not an image"
@@ -46,7 +46,7 @@ async def test_upload_endpoint_invalid_file_type(client: AsyncClient):
         "body_copy": "Test Body"
     }
     
-    response = await client.post("/api/v1/upload", files=files, data=data)
+    response = await database_client.post("/api/v1/upload", files=files, data=data)
     # Should return validation error for invalid file type
     assert response.status_code in [400, 422]
 
@@ -0,0 +1,110 @@
+"""
+Tests for the group-commit write coordinator
+"""
+import asyncio
+import pytest
+from app.models.campaign import Campaign
+from app.storage.pool import build_pragmas, open_connection
+from app.storage.write_coordinator import WriteCoordinator, run_write
+
+
+@pytest.fixture
+async def conn(tmp_path):
+    """WAL connection with a scratch table"""
+    connection = await open_connection(
+        tmp_path / "writes.db",
+        build_pragmas(5000, 1024, 0, journal_mode="WAL", synchronous="NORMAL")
+    )
+    await connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    await connection.commit()
+    yield connection
+    await connection.close()
+
+
+def _insert(name):
+    async def op(c):
+        await c.execute("INSERT INTO items (name) VALUES (?)", (name,))
+        return name
+    return op
+
+
+async def _count(c) -> int:
+    async with c.execute("SELECT COUNT(*) FROM items") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_commit(conn):
+    """Test writes arriving inside the window are committed as one batch"""
+    coordinator = WriteCoordinator(conn, window_ms=20, max_batch=64)
+    try:
+        results = await asyncio.gather(*[run_write(conn, _insert(f"item-{i}")) for i in range(10)])
+        assert results == [f"item-{i}" for i in range(10)]
+        assert await _count(conn) == 10
+
+        stats = coordinator.stats()
+        assert stats["writes"] == 10
+        assert stats["batches"] == 1
+        assert stats["fsyncs_saved"] == 9
+    finally:
+        await coordinator.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_max_size(conn):
+    """Test batches are split once max_batch writes are queued"""
+    coordinator = WriteCoordinator(conn, window_ms=20, max_batch=4)
+    try:
+        await asyncio.gather(*[run_write(conn, _insert(f"item-{i}")) for i in range(10)])
+        stats = coordinator.stats()
+        assert stats["batches"] == 3
+        assert stats["max_batch_size"] == 4
+    finally:
+        await coordinator.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_abort_batch(conn):
+    """Test one failing write is rolled back without losing the rest of the batch"""
+    coordinator = WriteCoordinator(conn, window_ms=20)
+    try:
+        results = await asyncio.gather(
+            run_write(conn, _insert("a")),
+            run_write(conn, _insert("a")),  # violates UNIQUE
+            run_write(conn, _insert("b")),
+            return_exceptions=True
+        )
+        assert results[0] == "a"
+        assert isinstance(results[1], Exception)
+        assert results[2] == "b"
+        assert await _count(conn) == 2
+        assert coordinator.stats()["failed_writes"] == 1
+    finally:
+        await coordinator.stop()
+
+
+@pytest.mark.asyncio
+async def test_run_write_without_coordinator_commits_directly(conn):
+    """Test run_write falls back to execute + commit on unmanaged connections"""
+    await run_write(conn, _insert("solo"))
+    assert not conn.in_transaction
+    assert await _count(conn) == 1
+
+
+@pytest.mark.asyncio
+async def test_campaign_updates_are_group_committed(isolated_db):
+    """Test concurrent Campaign.update calls on the writer share a commit"""
+    conn = isolated_db.conn
+    campaigns = []
+    for i in range(5):
+        campaign = Campaign(campaign_name=f"C{i}", advertiser_name="Acme")
+        await campaign.save(conn)
+        campaigns.append(campaign)
+
+    before = isolated_db.writes.stats()["batches"]
+    await asyncio.gather(*[c.update(conn, review_status="approved") for c in campaigns])
+    assert isolated_db.writes.stats()["batches"] - before == 1
+
+    for campaign in campaigns:
+        loaded = await Campaign.get_by_id(conn, campaign.id)
+        assert loaded.review_status == "approved"
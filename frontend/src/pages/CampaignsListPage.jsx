@@ -8,7 +8,7 @@ import ScheduleModal from '../components/ScheduleModal';
 import StatsCards from '../components/StatsCards';
 import CampaignsSearchBar from '../components/CampaignsSearchBar';
 import StatusBadge from '../components/StatusBadge';
-import { listCampaigns, resetCampaign, scheduleCampaign, cancelSchedule } from '../services/api';
+import { listCampaigns, searchCampaigns, resetCampaign, scheduleCampaign, cancelSchedule } from '../services/api';
 import { useToast } from '../contexts/ToastContext';
 import {
   STATUS_OPTIONS,
@@ -28,9 +28,12 @@ function CampaignsListPage() {
   const [error, setError] = useState(null);
   const [statusFilter, setStatusFilter] = useState('');
   const [searchQuery, setSearchQuery] = useState('');
+  const [debouncedQuery, setDebouncedQuery] = useState('');
   const [total, setTotal] = useState(0);
   const [limit] = useState(100);
   const [offset, setOffset] = useState(0);
+  // Search pages by cursor: searchCursors[n] fetches page n (page 0 needs none)
+  const [searchCursors, setSearchCursors] = useState([null]);
   const [resettingId, setResettingId] = useState(null);
   const [schedulingId, setSchedulingId] = useState(null);
   const [showScheduleModal, setShowScheduleModal] = useState(false);
@@ -39,9 +42,15 @@ function CampaignsListPage() {
   const [cancelingId, setCancelingId] = useState(null);
   const [stats, setStats] = useState({ total: 0, approved: 0, rejected: 0, ready: 0 });
 
+  // Search on the server once the user pauses typing
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedQuery(searchQuery.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
   useEffect(() => {
     loadCampaigns();
-  }, [statusFilter, offset]);
+  }, [statusFilter, offset, debouncedQuery]);
 
   const loadCampaigns = async () => {
     try {
@@ -57,13 +66,35 @@ function CampaignsListPage() {
         params.status = statusFilter;
       }
       
+      if (debouncedQuery) {
+        const page = Math.floor(offset / limit);
+        const cursor = page > 0 ? searchCursors[page] : undefined;
+        const results = await searchCampaigns({ q: debouncedQuery, status: params.status, limit, cursor });
+        const pageCampaigns = results.campaigns || [];
+        setCampaigns(pageCampaigns);
+        // Search has no total; count what has been seen, plus one when another page exists
+        setTotal(offset + pageCampaigns.length + (results.next_cursor ? 1 : 0));
+        setSearchCursors((previous) => {
+          const cursors = page === 0 ? [null] : previous.slice(0, page + 1);
+          cursors[page + 1] = results.next_cursor || null;
+          return cursors;
+        });
+        return;
+      }
+      
       const response = await listCampaigns({ ...params, include_stats: true });
       setCampaigns(response.campaigns || []);
       setTotal(response.total || 0);
       
-      // Calculate stats from response or campaigns
+      // Stats are counts by status across all campaigns (not just this page)
       if (response.stats) {
-        setStats(response.stats);
+        const byStatus = response.stats;
+        setStats({
+          total: Object.values(byStatus).reduce((sum, count) => sum + count, 0),
+          approved: byStatus.approved || 0,
+          rejected: byStatus.rejected || 0,
+          ready: (byStatus.ready || 0) + (byStatus.processed || 0),
+        });
       } else {
         const campaignStats = {
           total: response.total || 0,
@@ -96,17 +127,11 @@ function CampaignsListPage() {
     setOffset(0); // Reset to first page when search changes
   };
 
-  // Filter campaigns by search query
-  const filteredCampaigns = campaigns.filter(campaign => {
-    if (!searchQuery) return true;
-    const query = searchQuery.toLowerCase();
-    return (
-      (campaign.campaign_name || '').toLowerCase().includes(query) ||
-      (campaign.advertiser_name || '').toLowerCase().includes(query) ||
-      (campaign.id || '').toLowerCase().includes(query) ||
-      (campaign.feedback || '').toLowerCase().includes(query)
-    );
-  });
+  // Search results are already filtered on the server
+  const filteredCampaigns = campaigns;
+  const hasNextPage = debouncedQuery
+    ? Boolean(searchCursors[Math.floor(offset / limit) + 1])
+    : offset + limit < total;
 
   const handleViewCampaign = (campaignId, status, e) => {
     if (e) {
@@ -407,11 +432,11 @@ function CampaignsListPage() {
           </div>
           
           {/* Pagination */}
-          {total > limit && (
+          {(offset > 0 || hasNextPage) && (
             <div className="bg-hibid-gray-50 px-6 py-4 border-t border-hibid-gray-200">
               <div className="flex items-center justify-between">
                 <div className="text-sm text-hibid-gray-700">
-                  Showing {offset + 1} to {Math.min(offset + limit, filteredCampaigns.length)} of {filteredCampaigns.length} {searchQuery ? 'filtered' : ''} campaigns
+                  Showing {offset + 1} to {offset + filteredCampaigns.length}{debouncedQuery ? ' matching' : ` of ${total}`} campaigns
                 </div>
                 <div className="flex items-center gap-2">
                   <button
@@ -423,7 +448,7 @@ function CampaignsListPage() {
                   </button>
                   <button
                     onClick={() => setOffset(offset + limit)}
-                    disabled={offset + limit >= filteredCampaigns.length}
+                    disabled={!hasNextPage}
                     className="px-4 py-2 text-sm border border-hibid-gray-300 rounded-lg hover:bg-hibid-gray-50 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
                   >
                     Next
@@ -237,6 +237,17 @@ export const listCampaigns = async (params = {}) => {
   return response.data;
 };
 
+/**
+ * Full-text search over campaigns (name, advertiser, subject line, headline, body copy, feedback);
+ * a query that is exactly a campaign ID returns that campaign first
+ * @param {Object} params - Query parameters (q, status, limit, cursor)
+ * @returns {Promise} Search response with campaigns (best matches first) and next_cursor
+ */
+export const searchCampaigns = async (params = {}) => {
+  const response = await api.get('/campaigns/search', { params });
+  return response.data;
+};
+
 /**
  * Get campaign detail by ID
  * @param {string} campaignId - Campaign ID